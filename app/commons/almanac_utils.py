@@ -0,0 +1,226 @@
+"""
+Almanac of nights - sun twilight transitions, moon rise/set/phase and moonless astronomical night. Events depend only
+on location and date, so they are computed once per rounded location and night and persisted in almanac_nights table.
+Nights are filled on demand (get_almanac_night) and for saved locations by nightly precompute_almanac job.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+import pytz
+from flask import current_app
+from skyfield import almanac
+from skyfield.api import load, wgs84
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import AlmanacNight, Location
+
+# 0.01 deg shifts twilight times by few seconds
+ALMANAC_LATLON_DECIMALS = 2
+ALMANAC_INSERT_BATCH = 100
+
+# states of almanac.dark_twilight_day
+TWILIGHT_ASTRONOMICAL = 1
+TWILIGHT_NAUTICAL = 2
+TWILIGHT_CIVIL = 3
+TWILIGHT_DAY = 4
+
+_TWILIGHT_COLUMNS = {
+    TWILIGHT_ASTRONOMICAL: ('astro_dusk', 'astro_dawn'),
+    TWILIGHT_NAUTICAL: ('nautical_dusk', 'nautical_dawn'),
+    TWILIGHT_CIVIL: ('civil_dusk', 'civil_dawn'),
+    TWILIGHT_DAY: ('sunset', 'sunrise'),
+}
+
+AlmanacKey = Tuple[float, float, date]
+
+
+def _to_date(for_date) -> date:
+    if isinstance(for_date, datetime):
+        return for_date.date()
+    return for_date
+
+
+def almanac_key(latitude: float, longitude: float, for_date) -> AlmanacKey:
+    return round(latitude, ALMANAC_LATLON_DECIMALS), round(longitude, ALMANAC_LATLON_DECIMALS), _to_date(for_date)
+
+
+def night_start_utc(longitude: float, for_date) -> datetime:
+    """
+    Local mean noon of for_date in naive UTC, the night lasts till the next local mean noon.
+    """
+    d = _to_date(for_date)
+    return datetime(d.year, d.month, d.day, 12) - timedelta(hours=longitude / 15.0)
+
+
+def _dark_window(times: List[datetime], states, level: int) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Interval when dark_twilight_day state is below level, i.e. sun is below level's altitude.
+    """
+    dusk = None
+    for t, state in zip(times, states):
+        if dusk is None:
+            if state < level:
+                dusk = t
+        elif state >= level:
+            return dusk, t
+    return None, None
+
+
+def _moonless_window(dusk: Optional[datetime], dawn: Optional[datetime], moon_events: List[Tuple[datetime, bool]],
+                     events_from: datetime, events_to: datetime) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Part of the dark window (dusk, dawn) before moon rise or after moon set.
+    """
+    if not dusk or not dawn:
+        return None, None
+    rise_sets = []
+    moon_rise = None
+    for t, is_rise in moon_events:
+        if is_rise:
+            moon_rise = t
+        else:
+            rise_sets.append((moon_rise, t))
+            moon_rise = None
+    if moon_rise:
+        rise_sets.append((moon_rise, None))
+
+    t1, t2 = dusk, dawn
+    for moon_rise, moon_set in rise_sets:
+        moon_rise = moon_rise or events_from
+        moon_set = moon_set or events_to
+        if moon_set < t1 or moon_rise > t2:
+            continue
+        if moon_rise < t1 and moon_set > t2:
+            return None, None
+        if moon_rise > t1:
+            t2 = moon_rise
+        else:
+            t1 = moon_set
+    if t1 > t2:
+        return None, None
+    return t1, t2
+
+
+def _utc_datetimes(times) -> List[datetime]:
+    return [t.replace(tzinfo=None) for t in times.utc_datetime()]
+
+
+def compute_almanac_night(latitude: float, longitude: float, for_date, eph=None) -> AlmanacNight:
+    ts = load.timescale()
+    if eph is None:
+        eph = load('de421.bsp')
+    observer = wgs84.latlon(latitude, longitude)
+    start = night_start_utc(longitude, for_date)
+    end = start + timedelta(hours=24)
+
+    night = AlmanacNight(latitude=latitude, longitude=longitude, for_date=_to_date(for_date))
+
+    t, y = almanac.find_discrete(ts.from_datetime(start.replace(tzinfo=timezone.utc)),
+                                 ts.from_datetime(end.replace(tzinfo=timezone.utc)),
+                                 almanac.dark_twilight_day(eph, observer))
+    times = _utc_datetimes(t)
+    for level, (dusk_attr, dawn_attr) in _TWILIGHT_COLUMNS.items():
+        dusk, dawn = _dark_window(times, y, level)
+        setattr(night, dusk_attr, dusk)
+        setattr(night, dawn_attr, dawn)
+
+    # moon can be up already at the night start, hence half a day margin on both sides
+    events_from, events_to = start - timedelta(hours=12), end + timedelta(hours=12)
+    t, y = almanac.find_discrete(ts.from_datetime(events_from.replace(tzinfo=timezone.utc)),
+                                 ts.from_datetime(events_to.replace(tzinfo=timezone.utc)),
+                                 almanac.risings_and_settings(eph, eph['Moon'], observer))
+    moon_events = list(zip(_utc_datetimes(t), (bool(is_rise) for is_rise in y)))
+    night.moon_rise = next((t for t, is_rise in moon_events if is_rise and start <= t < end), None)
+    night.moon_set = next((t for t, is_rise in moon_events if not is_rise and start <= t < end), None)
+    night.moonless_from, night.moonless_to = _moonless_window(night.astro_dusk, night.astro_dawn, moon_events,
+                                                              events_from, events_to)
+
+    midnight = ts.from_datetime((start + timedelta(hours=12)).replace(tzinfo=timezone.utc))
+    night.moon_phase = float(almanac.moon_phase(eph, midnight).degrees)
+    night.moon_illumination = float(almanac.fraction_illuminated(eph, 'moon', midnight))
+    return night
+
+
+def _find_almanac_night(key: AlmanacKey) -> Optional[AlmanacNight]:
+    return AlmanacNight.query.filter_by(latitude=key[0], longitude=key[1], for_date=key[2]).first()
+
+
+def _store_almanac_night(key: AlmanacKey, night: AlmanacNight) -> AlmanacNight:
+    """
+    Store night in own session, caller's transaction is neither committed nor rolled back.
+    """
+    with Session(db.engine, expire_on_commit=False) as session:
+        try:
+            session.add(night)
+            session.commit()
+        except IntegrityError:
+            # stored concurrently by other request
+            session.rollback()
+            return _find_almanac_night(key) or night
+        except SQLAlchemyError:
+            session.rollback()
+            current_app.logger.exception('Almanac night store failed.')
+    return night
+
+
+def get_almanac_night(latitude: float, longitude: float, for_date) -> AlmanacNight:
+    """
+    Almanac of the night following for_date at location, computed and stored if it is not available.
+    """
+    key = almanac_key(latitude, longitude, for_date)
+    night = _find_almanac_night(key)
+    if night is None:
+        night = _store_almanac_night(key, compute_almanac_night(*key))
+    return night
+
+
+def _localize(dt: Optional[datetime], tz_info) -> Optional[datetime]:
+    return pytz.utc.localize(dt).astimezone(tz_info) if dt else None
+
+
+def get_twilight_window(night: AlmanacNight, level: int, tz_info) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Local times of (dusk, dawn) of the twilight level, (None, None) if sun does not get below it.
+    """
+    dusk_attr, dawn_attr = _TWILIGHT_COLUMNS[level]
+    dusk, dawn = getattr(night, dusk_attr), getattr(night, dawn_attr)
+    if not dusk or not dawn:
+        return None, None
+    return _localize(dusk, tz_info), _localize(dawn, tz_info)
+
+
+def get_moonless_window(night: AlmanacNight, tz_info) -> Tuple[Optional[datetime], Optional[datetime]]:
+    if not night.moonless_from or not night.moonless_to:
+        return None, None
+    return _localize(night.moonless_from, tz_info), _localize(night.moonless_to, tz_info)
+
+
+def precompute_almanac(days: int, start_date: Optional[date] = None) -> int:
+    """
+    Fill almanac of saved locations for the next days. Returns number of computed nights.
+    """
+    start_date = start_date or date.today()
+    end_date = start_date + timedelta(days=days)
+    keys = set()
+    for latitude, longitude in db.session.query(Location.latitude, Location.longitude) \
+            .filter(Location.latitude.isnot(None), Location.longitude.isnot(None)).distinct():
+        for n in range(days):
+            keys.add(almanac_key(latitude, longitude, start_date + timedelta(days=n)))
+
+    existing = db.session.query(AlmanacNight.latitude, AlmanacNight.longitude, AlmanacNight.for_date) \
+        .filter(AlmanacNight.for_date >= start_date, AlmanacNight.for_date < end_date)
+    keys.difference_update(tuple(row) for row in existing)
+    if not keys:
+        return 0
+
+    eph = load('de421.bsp')
+    count = 0
+    for key in sorted(keys, key=lambda k: (k[2], k[0], k[1])):
+        db.session.add(compute_almanac_night(*key, eph=eph))
+        count += 1
+        if count % ALMANAC_INSERT_BATCH == 0:
+            db.session.commit()
+    db.session.commit()
+    return count
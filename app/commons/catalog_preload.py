@@ -0,0 +1,56 @@
+import gc
+import os
+from typing import Dict, Optional
+
+from flask import current_app
+
+
+def preload_chart_catalogs(scene_datasets: bool = True) -> None:
+    """
+    Load chart catalogues and data derived from them in the parent process before workers are forked.
+    Loaded objects are moved to the permanent GC generation, so collections in workers don't write
+    to their pages and the pages stay shared copy-on-write. Requires app context.
+    """
+    from .chart_generator import get_dso_hide_filter, get_dso_name_index, load_used_catalogs
+
+    load_used_catalogs()
+    get_dso_name_index()
+    get_dso_hide_filter()
+    if scene_datasets:
+        from .chart_scene import preload_scene_datasets
+        preload_scene_datasets()
+    gc.collect()
+    gc.freeze()
+
+
+def process_memory_usage(pid: Optional[int] = None) -> Dict[str, int]:
+    """
+    Resident, proportional and shared memory of the process in kB (Linux only, empty elsewhere).
+    """
+    proc_dir = '/proc/{}'.format(pid or 'self')
+    usage = {}
+    try:
+        with open(os.path.join(proc_dir, 'smaps_rollup')) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    usage[parts[0].rstrip(':').lower()] = int(parts[1])
+    except OSError:
+        try:
+            with open(os.path.join(proc_dir, 'statm')) as f:
+                _, resident, shared = f.read().split()[:3]
+            page_kb = os.sysconf('SC_PAGE_SIZE') // 1024
+            usage = {'rss': int(resident) * page_kb, 'shared': int(shared) * page_kb}
+        except (OSError, ValueError):
+            return {}
+    if 'shared_clean' in usage:
+        usage['shared'] = usage['shared_clean'] + usage.get('shared_dirty', 0)
+    return usage
+
+
+def log_process_memory_usage(label: str, logger=None) -> None:
+    usage = process_memory_usage()
+    if not usage:
+        return
+    (logger or current_app.logger).info('{} pid={} rss={}kB pss={}kB shared={}kB'.format(
+        label, os.getpid(), usage.get('rss'), usage.get('pss', '-'), usage.get('shared')))
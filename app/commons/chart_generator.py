@@ -15,6 +15,8 @@ import ctypes as ct
 import cairo
 from skyfield.api import load
 from enum import Enum
+from dataclasses import dataclass
+from typing import Any, List, Optional, Set, Tuple
 import threading
 from astropy.time import Time
 
@@ -28,6 +30,7 @@ from fchart3 import CoordSystem
 from flask import (
     abort,
     current_app,
+    has_app_context,
     request,
     session,
     url_for,
@@ -47,13 +50,32 @@ from .solar_system_chart_utils import get_solsys_bodies, get_planet_moons
 
 from .utils import to_float
 from .chart_theme_definition import COMMON_THEMES, ChartThemeDefinition
+from .chart_render_pool import (
+    CHART_RENDER_IMG,
+    CHART_RENDER_PDF,
+    ChartRenderPoolBusy,
+    is_chart_render_pool_enabled,
+    submit_chart_render_job,
+)
+from .chart_image_cache import (
+    ChartImageCacheEntry,
+    build_chart_image_cache_key,
+    get_catalogs_version,
+    get_chart_image_cache,
+    quantize,
+)
+from .dso_name_index import DsoNameIndex
+from .star_zone_cache import install_star_zone_cache
 from .dso_utils import CHART_COMET_PREFIX
 
 MOBILE_WIDTH = 768
 
 used_catalogs = None
-dso_name_cache = {}
+# catalogs version of files loaded by this process
+used_catalogs_loaded_version = None
+dso_name_index = None
 dso_hide_filter = None
+star_zone_cache = None
 
 MAX_IMG_WIDTH = 3000
 MAX_IMG_HEIGHT = 3000
@@ -146,23 +168,26 @@ class FlagValue(Enum):
     MIRROR_Y = 'Y'
     CHART_OLD_MODE = 'L'
 
-free_mem_counter = 0
-NO_FREE_MEM_CYCLES = 200
+STAR_ZONE_CACHE_MAX_BYTES = 256 * 1024 * 1024
 
 FORCE_SHOWING_DSOS = ['NGC 1909', 'IC443']
 
 ADD_SHOW_CATALOGS = ['Berk', 'King']
 
+CATALOG_SUPPLEMENTS = [
+    # LDN replaces some outlines with some DSO (Veil) with rect
+    # 'Lynds Catalogue of Bright Nebulae.sup',
+    'M31 global clusters, Revised Bologna Catalogue v5.sup',
+    'M33 global clusters,  2007 catalog.sup',
+    'VDB, catalogue of reflection nebulae.sup',
+]
+
 PICKER_RADIUS = 4.0
 
 DEFAULT_SCREEN_FONT_SIZE = 3.3
 DEFAULT_PDF_FONT_SIZE = 3.0
 
-chart_font_face = None
-chart_font_face_initialized = False
-
-pdf_font_face = None
-pdf_font_face_initialized = False
+font_face_cache = {}
 
 skyfield_ts = load.timescale()
 
@@ -203,14 +228,6 @@ class ChartControl:
         self.eyepiece_fov = eyepiece_fov
         self.chart_mode = chart_mode
 
-def free_star_memory(increment):
-    global free_mem_counter
-    used_catalogs = load_used_catalogs()
-    free_mem_counter += increment
-    if free_mem_counter > NO_FREE_MEM_CYCLES:
-        free_mem_counter = 0
-        used_catalogs.free_mem()
-
 def resolve_chart_mode():
     request_flags = request.args.get('flags') or ''
     if FlagValue.CHART_OLD_MODE.value in request_flags:
@@ -225,41 +242,63 @@ def resolve_chart_mode():
 
 
 def load_used_catalogs():
-    global used_catalogs, catalog_lock
+    global used_catalogs, used_catalogs_loaded_version, catalog_lock
     if used_catalogs is None:
         with catalog_lock:
             if used_catalogs is None:
+                used_catalogs_loaded_version = get_used_catalogs_version()
                 fchart3_data_dir = os.path.join(fchart3.get_catalogs_dir())
                 data_dir = os.path.join(os.getcwd(), 'data/')
                 extra_star_data_dir = os.path.join(os.getcwd(), 'data/stars_gaia/')
-                supplements = [
-                                # LDN replaces some outlines with some DSO (Veil) with rect
-                                # 'Lynds Catalogue of Bright Nebulae.sup',
-                                'M31 global clusters, Revised Bologna Catalogue v5.sup',
-                                'M33 global clusters,  2007 catalog.sup',
-                                'VDB, catalogue of reflection nebulae.sup']
                 used_catalogs = fchart3.UsedCatalogs(fchart3_data_dir,
                                                      extra_star_data_dir,
-                                                     supplements=[os.path.join(data_dir, 'supplements', s) for s in supplements],
+                                                     supplements=[os.path.join(data_dir, 'supplements', s) for s in CATALOG_SUPPLEMENTS],
                                                      limit_magnitude_deepsky=100.0,
                                                      force_asterisms=False,
                                                      force_unknown=False,
                                                      show_catalogs=ADD_SHOW_CATALOGS,
                                                      use_pgc_catalog=True,
                                                      enhanced_mw_optim_max_col_diff=14/255.0)
+                _install_star_zone_cache(used_catalogs)
     return used_catalogs
 
 
+def _install_star_zone_cache(catalogs):
+    global star_zone_cache
+    if catalogs.star_catalog is None:
+        return
+    max_bytes = STAR_ZONE_CACHE_MAX_BYTES
+    if has_app_context():
+        max_bytes = int(current_app.config.get('STAR_ZONE_CACHE_MAX_BYTES', max_bytes))
+    star_zone_cache = install_star_zone_cache(catalogs.star_catalog, max_bytes)
+
+
+def get_star_zone_cache_stats():
+    if star_zone_cache is None:
+        return {}
+    return star_zone_cache.stats()
+
+
+def get_dso_name_index():
+    global dso_name_index
+    if dso_name_index is None:
+        catalogs = load_used_catalogs()
+        with catalog_lock:
+            if dso_name_index is None:
+                dso_name_index = DsoNameIndex(catalogs.deeplist, catalogs.messierlist)
+    return dso_name_index
+
+
 def get_dso_hide_filter():
     global dso_hide_filter
     if dso_hide_filter is None:
-        dso_hide_filter = []
+        hide_filter = set()
         with open(os.path.join(os.getcwd(), 'data/dso_hide_filter.csv'), 'r') as ifile:
-            lines = ifile.readlines()
-            for line in lines:
+            for line in ifile:
                 dso = _find_dso_by_name(line.strip())
                 if dso:
-                    dso_hide_filter.append(dso)
+                    hide_filter.add(dso)
+        dso_hide_filter = frozenset(hide_filter)
     return dso_hide_filter
 
 
@@ -298,12 +337,13 @@ def resolve_active_chart_theme_definition(force_light_mode=False):
 
 def _setup_skymap_graphics(config, fld_size, width, font_size, force_light_mode=False, is_pdf=False):
     chart_def, _, _ = resolve_active_chart_theme_definition(force_light_mode=force_light_mode)
+    font_file = current_app.config.get('PDF_FONT') if is_pdf else current_app.config.get('CHART_FONT')
+    _fill_skymap_graphics(config, chart_def, _get_font_face(font_file), fld_size, width, font_size)
+
+
+def _fill_skymap_graphics(config, chart_def, font, fld_size, width, font_size):
     chart_def.fill_config(config)
 
-    if is_pdf:
-        font = _get_pdf_font_face()
-    else:
-        font = _get_chart_font_face()
     if font is None:
         font = 'sans'
 
@@ -434,21 +474,108 @@ def common_chart_pos_img(obj_ra, obj_dec, dso_names=None, visible_objects=None,
 
     flags = request.args.get('flags')
 
-    img_bytes = BytesIO()
     img_formats = current_app.config.get('CHART_IMG_FORMATS')
 
+    img_cache = get_chart_image_cache()
+    img_cache_key = None
+    if img_cache.enabled and not is_used_catalogs_outdated():
+        img_cache_key = _get_chart_pos_img_cache_key(obj_ra, obj_dec, is_equatorial, phi, theta, gui_fld_size, width, height,
+                                                     maglim, dso_maglim, flags, img_formats, dso_names=dso_names,
+                                                     highlights_dso_list=highlights_dso_list, observed_dso_ids=observed_dso_ids,
+                                                     highlights_pos_list=highlights_pos_list, trajectory=trajectory,
+                                                     hl_constellation=hl_constellation,
+                                                     highlights_style=highlights_style, highlights_size=highlights_size,
+                                                     dso_highlights_style=dso_highlights_style,
+                                                     dso_highlights_size=dso_highlights_size)
+        cache_entry = img_cache.get(img_cache_key)
+        if cache_entry is not None:
+            if visible_objects is not None and cache_entry.visible_objects:
+                visible_objects.extend(cache_entry.visible_objects)
+            return BytesIO(cache_entry.img_data), _get_out_img_format(cache_entry.img_format)
+
+    img_bytes = BytesIO()
+
     img_format = _create_chart(img_bytes, visible_objects, obj_ra, obj_dec, is_equatorial, phi, theta, gui_fld_size, gui_fld_label, width, height,
                                maglim, dso_maglim, show_legend=False, dso_names=dso_names, flags=flags, highlights_dso_list=highlights_dso_list,
                                observed_dso_ids=observed_dso_ids, highlights_pos_list=highlights_pos_list, trajectory=trajectory,
                                hl_constellation=hl_constellation, img_formats=img_formats,
                                highlights_style=highlights_style, highlights_size=highlights_size,
                                dso_highlights_style=dso_highlights_style, dso_highlights_size=dso_highlights_size)
+    if img_cache_key is not None:
+        img_cache.put(img_cache_key, ChartImageCacheEntry(img_data=img_bytes.getvalue(), img_format=img_format,
+                                                          visible_objects=list(visible_objects) if visible_objects is not None else None))
     img_bytes.seek(0)
+    return img_bytes, _get_out_img_format(img_format)
+
+
+def _get_out_img_format(img_format):
     if img_format == 'jpg':
-        out_img_format = 'jpeg'
-    else:
-        out_img_format = img_format
-    return img_bytes, out_img_format
+        return 'jpeg'
+    return img_format
+
+
+def _get_chart_pos_img_cache_key(obj_ra, obj_dec, is_equatorial, phi, theta, fld_size, width, height, maglim, dso_maglim, flags,
+                                 img_formats, dso_names=None, highlights_dso_list=None, observed_dso_ids=None,
+                                 highlights_pos_list=None, trajectory=None, hl_constellation=None,
+                                 highlights_style='circle', highlights_size=1.0,
+                                 dso_highlights_style='circle', dso_highlights_size=1.0):
+    coord_step = current_app.config.get('CHART_IMG_CACHE_COORD_STEP')
+    time_bucket = int(current_app.config.get('CHART_IMG_CACHE_TIME_BUCKET'))
+    chart_def, theme_name, _ = resolve_active_chart_theme_definition()
+    _, lat, lon = resolve_chart_city_lat_lon()
+
+    # chart time affects horizon, horizontal coordinates and solar system bodies
+    chart_time_bucket = int(get_chart_datetime().timestamp()) // time_bucket
+
+    params = {
+        'catalogs': get_used_catalogs_version(),
+        'theme_name': theme_name,
+        'theme': vars(chart_def),
+        'font': (current_app.config.get('CHART_FONT'), fchart3.LABELi18N),
+        'equatorial': is_equatorial,
+        'phi': quantize(phi, coord_step),
+        'theta': quantize(theta, coord_step),
+        'obj': (quantize(obj_ra, coord_step), quantize(obj_dec, coord_step)),
+        'fsz': fld_size,
+        'size': (width, height),
+        'maglim': (maglim, dso_maglim),
+        'flags': flags,
+        'format': (_resolve_chart_img_format(width, img_formats, flags), request.args.get('hqual', '')),
+        'location': (round(lat, 4), round(lon, 4)),
+        'time': chart_time_bucket,
+        'dso_names': sorted(dso_names) if dso_names else None,
+        'highlights_dso': sorted((hl_dso.id, hl_dso.name) for hl_dso in highlights_dso_list) if highlights_dso_list else None,
+        'observed_dso_ids': sorted(observed_dso_ids) if observed_dso_ids else None,
+        'highlights_pos': [tuple(hlpos) for hlpos in highlights_pos_list] if highlights_pos_list else None,
+        'trajectory': [(pt.ra, pt.dec, pt.label) for pt in trajectory] if trajectory else None,
+        'hl_constellation': hl_constellation,
+        'highlights_style': (highlights_style, highlights_size, dso_highlights_style, dso_highlights_size),
+    }
+    return build_chart_image_cache_key(params)
+
+
+def get_used_catalogs_version():
+    data_dir = os.path.join(os.getcwd(), 'data')
+    data_files = [os.path.join(data_dir, 'dso_hide_filter.csv'), os.path.join(data_dir, 'PGC_update.dat')]
+    data_files.extend(os.path.join(data_dir, 'supplements', s) for s in CATALOG_SUPPLEMENTS)
+    # star zones are read from fchart3 star catalogues and extra gaia stars
+    data_dirs = [fchart3.get_catalogs_dir(), os.path.join(data_dir, 'stars_gaia')]
+    return get_catalogs_version(getattr(fchart3, '__version__', ''), data_files, data_dirs)
+
+
+def get_loaded_catalogs_version():
+    """
+    Catalogs version of files loaded by this process.
+    """
+    load_used_catalogs()
+    return used_catalogs_loaded_version
+
+
+def is_used_catalogs_outdated():
+    """
+    Catalogue files were updated after this process loaded them, its output must not be cached under current version.
+    """
+    return used_catalogs_loaded_version is not None and used_catalogs_loaded_version != get_used_catalogs_version()
 
 
 def common_chart_legend_img():
@@ -1028,20 +1155,170 @@ def _check_in_mag_interval(mag, mag_interval):
     return mag
 
 
+def _resolve_chart_img_format(width, img_formats, flags):
+    avif = request.args.get('avif', '')
+    avif_width_threshold = int(current_app.config.get('CHART_AVIF_THRESHOLD_WIDTH'))
+    optimize_traffic = session.get('optimize_traffic', 'false')
+
+    if avif_width_threshold >= width and ('avif' in img_formats) and avif == '1' and optimize_traffic == 'true':
+        img_format = 'avif'
+    elif 'jpg' in img_formats:
+        img_format = 'jpg'
+    else:
+        img_format = 'png'
+
+    show_dss = FlagValue.DSS_COLORED.value in flags or FlagValue.DSS_BLUE.value in flags or FlagValue.DSS_FRAM.value in flags
+
+    if show_dss and img_format == 'jpg':
+        img_format = 'png'
+
+    return img_format
+
+
+@dataclass
+class ChartRenderJob:
+    """
+    Request independent chart render parameters. Job is picklable, so it can be rendered in chart render pool.
+    """
+    is_equatorial: bool
+    phi: float
+    theta: float
+    fld_size: float
+    fld_label: str
+    star_maglim: float
+    dso_maglim: float
+    flags: str
+    chart_def: ChartThemeDefinition
+    theme: str
+    font_file: Optional[str]
+    lat: float
+    lon: float
+    chart_dt: datetime
+    utc_time: datetime
+    obj_ra: Optional[float] = None
+    obj_dec: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    img_format: str = 'png'
+    high_quality: bool = False
+    jpg_quality: Optional[int] = None
+    avif_quality: Optional[int] = None
+    avif_speed: Optional[int] = None
+    show_legend: bool = True
+    landscape: bool = True
+    eyepiece_fov: Optional[float] = None
+    dso_names: Optional[List[str]] = None
+    highlights_dso: Optional[List[Tuple[int, str]]] = None
+    observed_dso_ids: Optional[Set[int]] = None
+    highlights_pos_list: Optional[List[Any]] = None
+    trajectory: Optional[List[Any]] = None
+    hl_constellation: Optional[str] = None
+    highlights_style: str = 'circle'
+    highlights_size: float = 1.0
+    dso_highlights_style: str = 'circle'
+    dso_highlights_size: float = 1.0
+    collect_visible_objects: bool = False
+
+
+def _create_chart_render_job(obj_ra, obj_dec, is_equatorial, phi, theta, fld_size, fld_label, star_maglim, dso_maglim, flags,
+                             force_light_mode=False, font_file=None, dso_names=None, highlights_dso_list=None,
+                             observed_dso_ids=None, highlights_pos_list=None, trajectory=None, hl_constellation=None,
+                             visible_objects=None, **kwargs):
+    chart_def, _, _ = resolve_active_chart_theme_definition(force_light_mode=force_light_mode)
+    _, lat, lon = resolve_chart_city_lat_lon()
+    return ChartRenderJob(
+        is_equatorial=is_equatorial,
+        phi=phi,
+        theta=theta,
+        fld_size=fld_size,
+        fld_label=fld_label,
+        star_maglim=star_maglim,
+        dso_maglim=dso_maglim if dso_maglim is not None else -10,
+        flags=flags or '',
+        chart_def=chart_def,
+        theme=session.get('theme', ''),
+        font_file=font_file,
+        lat=lat,
+        lon=lon,
+        chart_dt=get_chart_datetime(),
+        utc_time=get_utc_time(),
+        obj_ra=obj_ra,
+        obj_dec=obj_dec,
+        dso_names=list(dso_names) if dso_names else None,
+        highlights_dso=[(hl_dso.id, hl_dso.name) for hl_dso in highlights_dso_list] if highlights_dso_list else None,
+        observed_dso_ids=set(observed_dso_ids) if observed_dso_ids else None,
+        highlights_pos_list=list(highlights_pos_list) if highlights_pos_list else None,
+        trajectory=trajectory,
+        hl_constellation=hl_constellation,
+        collect_visible_objects=visible_objects is not None,
+        **kwargs
+    )
+
+
+def _render_chart_job(kind, job, fobj, visible_objects):
+    if is_chart_render_pool_enabled():
+        try:
+            img_data, img_format, job_visible_objects = submit_chart_render_job(kind, job)
+        except ChartRenderPoolBusy:
+            current_app.logger.warning('Chart render pool is busy.')
+            abort(503)
+        fobj.write(img_data)
+        if visible_objects is not None and job_visible_objects:
+            visible_objects.extend(job_visible_objects)
+        return img_format
+    if kind == CHART_RENDER_PDF:
+        return render_chart_pdf(job, fobj, visible_objects)
+    return render_chart_img(job, fobj, visible_objects)
+
+
 def _create_chart(png_fobj, visible_objects, obj_ra, obj_dec, is_equatorial, phi, theta, fld_size, fld_label, width, height, star_maglim,
                   dso_maglim, show_legend=True, dso_names=None, flags='', highlights_dso_list=None, observed_dso_ids=None,
                   highlights_pos_list=None, trajectory=None, hl_constellation=None, img_formats='png',
                   highlights_style='circle', highlights_size=1.0,
                   dso_highlights_style='circle', dso_highlights_size=1.0):
-    """Create chart in czsky process."""
+    """Create chart in czsky process or in chart render pool."""
+    high_quality = request.args.get('hqual', '') == '1'
+
+    jpg_low_quality = int(current_app.config.get('CHART_JPEG_LOW_QUALITY'))
+    jpg_high_quality = int(current_app.config.get('CHART_JPEG_HIGH_QUALITY'))
+
+    avif_speed = int(current_app.config.get('CHART_AVIF_SPEED'))
+    avif_low_quality = int(current_app.config.get('CHART_AVIF_LOW_QUALITY'))
+    avif_high_quality = int(current_app.config.get('CHART_AVIF_HIGH_QUALITY'))
+
+    job = _create_chart_render_job(obj_ra, obj_dec, is_equatorial, phi, theta, fld_size, fld_label, star_maglim, dso_maglim, flags,
+                                   font_file=current_app.config.get('CHART_FONT'), dso_names=dso_names,
+                                   highlights_dso_list=highlights_dso_list, observed_dso_ids=observed_dso_ids,
+                                   highlights_pos_list=highlights_pos_list, trajectory=trajectory,
+                                   hl_constellation=hl_constellation, visible_objects=visible_objects,
+                                   width=width,
+                                   height=height,
+                                   img_format=_resolve_chart_img_format(width, img_formats, flags),
+                                   high_quality=high_quality,
+                                   jpg_quality=jpg_high_quality if high_quality else jpg_low_quality,
+                                   avif_quality=avif_high_quality if high_quality else avif_low_quality,
+                                   avif_speed=avif_speed,
+                                   show_legend=show_legend,
+                                   highlights_style=highlights_style,
+                                   highlights_size=highlights_size,
+                                   dso_highlights_style=dso_highlights_style,
+                                   dso_highlights_size=dso_highlights_size)
+
+    return _render_chart_job(CHART_RENDER_IMG, job, png_fobj, visible_objects)
+
+
+def render_chart_img(job, png_fobj, visible_objects=None):
+    """Render chart image. Doesn't use request context."""
     tm = time()
 
-    high_quality = request.args.get('hqual', '')
+    flags = job.flags
+    fld_size = job.fld_size
+    width = job.width
 
     used_catalogs = load_used_catalogs()
 
     config = fchart3.EngineConfiguration()
-    _setup_skymap_graphics(config, fld_size, width, DEFAULT_SCREEN_FONT_SIZE)
+    _fill_skymap_graphics(config, job.chart_def, _get_font_face(job.font_file), fld_size, width, DEFAULT_SCREEN_FONT_SIZE)
 
     if width <= MOBILE_WIDTH:
         config.star_mag_shift = 0.6
@@ -1061,7 +1338,7 @@ def _create_chart(png_fobj, visible_objects, obj_ra, obj_dec, is_equatorial, phi
     config.show_star_labels = _eval_show_star_labels(FlagValue.SHOW_STAR_LABELS.value in flags, fld_size, width)
     config.show_picker = False  # do not show picker, only activate it
     config.show_horizon = True
-    config.use_optimized_mw = (high_quality != '1')
+    config.use_optimized_mw = not job.high_quality
     config.show_comet_tail = FlagValue.SHOW_COMET_TAIL.value in flags
 
     if FlagValue.SHOW_PICKER.value in flags:
@@ -1072,73 +1349,49 @@ def _create_chart(png_fobj, visible_objects, obj_ra, obj_dec, is_equatorial, phi
     config.show_mag_scale_legend = True
     config.show_numeric_map_scale_legend = True
 
-    if show_legend:
+    if job.show_legend:
         config.show_field_border = True
         config.widget_mode = fchart3.WidgetMode.NORMAL
     else:
         config.widget_mode = fchart3.WidgetMode.ALLOC_SPACE_ONLY
 
-    _, lat, lon = resolve_chart_city_lat_lon()
-    config.coord_system = CoordSystem.EQUATORIAL if is_equatorial else CoordSystem.HORIZONTAL
+    lat, lon = job.lat, job.lon
+    config.coord_system = CoordSystem.EQUATORIAL if job.is_equatorial else CoordSystem.HORIZONTAL
     config.observer_lat_deg = lat
     config.observer_lon_deg = lon
 
-    if dso_maglim is None:
-        dso_maglim = -10
-
-    avif = request.args.get('avif', '')
-
-    jpg_low_quality = int(current_app.config.get('CHART_JPEG_LOW_QUALITY'))
-    jpg_high_quality = int(current_app.config.get('CHART_JPEG_HIGH_QUALITY'))
-    jpg_quality = jpg_high_quality if high_quality == '1' else jpg_low_quality
-
-    avif_speed = int(current_app.config.get('CHART_AVIF_SPEED'))
-    avif_low_quality = int(current_app.config.get('CHART_AVIF_LOW_QUALITY'))
-    avif_high_quality = int(current_app.config.get('CHART_AVIF_HIGH_QUALITY'))
-    avif_quality = avif_high_quality if high_quality == '1' else avif_low_quality
-    avif_width_threshold = int(current_app.config.get('CHART_AVIF_THRESHOLD_WIDTH'))
-
-    optimize_traffic = session.get('optimize_traffic', 'false')
-
-    if avif_width_threshold >= width and ('avif' in img_formats) and avif == '1' and optimize_traffic == 'true':
-        img_format = 'avif'
-    elif 'jpg' in img_formats:
-        img_format = 'jpg'
-    else:
-        img_format = 'png'
+    img_format = job.img_format
 
     show_dss = FlagValue.DSS_COLORED.value in flags or FlagValue.DSS_BLUE.value in flags or FlagValue.DSS_FRAM.value in flags
 
-    if show_dss and img_format == 'jpg':
-        img_format = 'png'
-
     config.projection = fchart3.ProjectionType.STEREOGRAPHIC
 
-    artist = fchart3.CairoDrawing(png_fobj, width if width else 220, height if height else 220, format=img_format,
-                                  pixels=True if width else False, jpg_quality=jpg_quality,
-                                  avif_quality=avif_quality, avif_speed=avif_speed)
+    artist = fchart3.CairoDrawing(png_fobj, width if width else 220, job.height if job.height else 220, format=img_format,
+                                  pixels=True if width else False, jpg_quality=job.jpg_quality,
+                                  avif_quality=job.avif_quality, avif_speed=job.avif_speed)
     # artist = fchart3.SkiaDrawing(png_fobj, width if width else 220, height if height else 220, format=img_format,
     #                               pixels=True if width else False, jpg_quality=jpg_quality)
-    engine = fchart3.SkymapEngine(artist, language=fchart3.LABELi18N, lm_stars=star_maglim, lm_deepsky=dso_maglim)
+    engine = fchart3.SkymapEngine(artist, language=fchart3.LABELi18N, lm_stars=job.star_maglim, lm_deepsky=job.dso_maglim)
     engine.set_configuration(config)
 
     mirror_x = FlagValue.MIRROR_X.value in flags
     mirror_y = FlagValue.MIRROR_Y.value in flags
 
-    engine.set_field(phi, theta, deg2rad(fld_size)/2.0, fld_label, mirror_x, mirror_y)
+    engine.set_field(job.phi, job.theta, deg2rad(fld_size)/2.0, job.fld_label, mirror_x, mirror_y)
 
-    if not highlights_pos_list and (obj_ra is not None) and (obj_dec is not None):
-        highlights = _create_highlights(obj_ra, obj_dec, config.highlight_linewidth*1.3)
-    elif highlights_pos_list:
-        highlights = _create_highlights_from_pos_list(highlights_pos_list, config, highlights_style, highlights_size)
+    obj_ra, obj_dec = job.obj_ra, job.obj_dec
+    if not job.highlights_pos_list and (obj_ra is not None) and (obj_dec is not None):
+        highlights = _create_highlights(obj_ra, obj_dec, config.highlight_linewidth*1.3, job.theme)
+    elif job.highlights_pos_list:
+        highlights = _create_highlights_from_pos_list(job.highlights_pos_list, config, job.highlights_style, job.highlights_size)
         if (obj_ra is not None) and (obj_dec is not None):
-            highlights.extend(_create_highlights(obj_ra, obj_dec, config.highlight_linewidth*1.3))
+            highlights.extend(_create_highlights(obj_ra, obj_dec, config.highlight_linewidth*1.3, job.theme))
     else:
         highlights = None
 
     showing_dsos = set()
-    if dso_names:
-        for dso_name in dso_names:
+    if job.dso_names:
+        for dso_name in job.dso_names:
             dso = _find_dso_by_name(dso_name)
             if dso:
                 showing_dsos.add(dso)
@@ -1148,8 +1401,9 @@ def _create_chart(png_fobj, visible_objects, obj_ra, obj_dec, is_equatorial, phi
         if dso:
             showing_dsos.add(dso)
 
-    dso_highlights = _create_dso_highlights(highlights_dso_list, observed_dso_ids, highlight_style=dso_highlights_style,
-                                            highlight_size=dso_highlights_size) if highlights_dso_list else None
+    dso_highlights = _create_dso_highlights(job.highlights_dso, job.observed_dso_ids, job.theme,
+                                            highlight_style=job.dso_highlights_style,
+                                            highlight_size=job.dso_highlights_size) if job.highlights_dso else None
 
     transparent = False
     if show_dss:
@@ -1160,19 +1414,19 @@ def _create_chart(png_fobj, visible_objects, obj_ra, obj_dec, is_equatorial, phi
         transparent = True
 
     if FlagValue.SHOW_SOLAR_SYSTEM.value in flags:
-        sl_bodies = get_solsys_bodies(get_utc_time(), rad2deg(lat), rad2deg(lon))
+        sl_bodies = get_solsys_bodies(job.utc_time, rad2deg(lat), rad2deg(lon))
     else:
         sl_bodies = None
 
     if fld_size <= 12:
-        pl_moons = get_planet_moons(get_utc_time(), star_maglim) if FlagValue.SHOW_SOLAR_SYSTEM.value in flags else None
+        pl_moons = get_planet_moons(job.utc_time, job.star_maglim) if FlagValue.SHOW_SOLAR_SYSTEM.value in flags else None
     else:
         pl_moons = None
 
-    trajectories = [trajectory] if trajectory else None
+    trajectories = [job.trajectory] if job.trajectory else None
 
     engine.make_map(used_catalogs,
-                    dt=get_chart_datetime(),
+                    dt=job.chart_dt,
                     jd=None,  # jd=skyfield_ts.now().tdb,
                     solsys_bodies=sl_bodies,
                     planet_moons=pl_moons,
@@ -1181,12 +1435,10 @@ def _create_chart(png_fobj, visible_objects, obj_ra, obj_dec, is_equatorial, phi
                     highlights=highlights,
                     dso_hide_filter=get_dso_hide_filter(),
                     trajectories=trajectories,
-                    hl_constellation=hl_constellation,
+                    hl_constellation=job.hl_constellation,
                     visible_objects=visible_objects,
                     transparent=transparent)
 
-    free_star_memory(1)
-
     print("Map created within : {} s".format(str(time()-tm)), flush=True)
 
     return img_format
@@ -1195,16 +1447,31 @@ def _create_chart(png_fobj, visible_objects, obj_ra, obj_dec, is_equatorial, phi
 def _create_chart_pdf(pdf_fobj, visible_objects, obj_ra, obj_dec, is_equatorial, phi, theta, fld_size, fld_label, star_maglim, dso_maglim,
                       landscape=True, show_legend=True, dso_names=None, flags='', highlights_dso_list=None,
                       observed_dso_ids=None, highlights_pos_list=None, trajectory=None, eyepiece_fov=None):
-    """Create chart PDF in czsky process."""
+    """Create chart PDF in czsky process or in chart render pool."""
+    job = _create_chart_render_job(obj_ra, obj_dec, is_equatorial, phi, theta, fld_size, fld_label, star_maglim, dso_maglim, flags,
+                                   force_light_mode=True, font_file=current_app.config.get('PDF_FONT'), dso_names=dso_names,
+                                   highlights_dso_list=highlights_dso_list, observed_dso_ids=observed_dso_ids,
+                                   highlights_pos_list=highlights_pos_list, trajectory=trajectory,
+                                   visible_objects=visible_objects,
+                                   img_format='pdf',
+                                   show_legend=show_legend,
+                                   landscape=landscape,
+                                   eyepiece_fov=eyepiece_fov)
+
+    _render_chart_job(CHART_RENDER_PDF, job, pdf_fobj, visible_objects)
+
+
+def render_chart_pdf(job, pdf_fobj, visible_objects=None):
+    """Render chart PDF. Doesn't use request context."""
     tm = time()
 
-    if flags is None:
-        flags = ''
+    flags = job.flags
+    fld_size = job.fld_size
 
     used_catalogs = load_used_catalogs()
 
     config = fchart3.EngineConfiguration()
-    _setup_skymap_graphics(config, fld_size, None, DEFAULT_PDF_FONT_SIZE, force_light_mode=True, is_pdf=True)
+    _fill_skymap_graphics(config, job.chart_def, _get_font_face(job.font_file), fld_size, None, DEFAULT_PDF_FONT_SIZE)
 
     config.show_dso_legend = False
     config.show_orientation_legend = True
@@ -1222,67 +1489,66 @@ def _create_chart_pdf(pdf_fobj, visible_objects, obj_ra, obj_dec, is_equatorial,
     config.show_enhanced_milky_way_30k = False
     config.show_dso_mag = FlagValue.SHOW_DSO_MAG.value in flags
     config.show_star_labels = _eval_show_star_labels(FlagValue.SHOW_STAR_LABELS.value in flags, fld_size, 1000)
-    config.eyepiece_fov = eyepiece_fov
+    config.eyepiece_fov = job.eyepiece_fov
     config.star_mag_shift = 1.5  # increase radius of star by 1.5 magnitude
     config.show_horizon = True
     config.show_comet_tail = FlagValue.SHOW_COMET_TAIL.value in flags
 
-    if show_legend:
+    if job.show_legend:
         config.show_mag_scale_legend = True
         config.show_map_scale_legend = True
         config.show_field_border = True
 
-    _, lat, lon = resolve_chart_city_lat_lon()
-    config.coord_system = CoordSystem.EQUATORIAL if is_equatorial else CoordSystem.HORIZONTAL
+    lat, lon = job.lat, job.lon
+    config.coord_system = CoordSystem.EQUATORIAL if job.is_equatorial else CoordSystem.HORIZONTAL
     config.observer_lat_deg = lat
     config.observer_lon_deg = lon
 
-    if dso_maglim is None:
-        dso_maglim = -10
-
+    landscape = job.landscape
     if landscape:
         artist = fchart3.CairoDrawing(pdf_fobj, 267, 180, format='pdf', landscape=landscape)
     else:
         artist = fchart3.CairoDrawing(pdf_fobj, 180, 267, format='pdf', landscape=landscape)
-    engine = fchart3.SkymapEngine(artist, language=fchart3.LABELi18N, lm_stars=star_maglim, lm_deepsky=dso_maglim)
+    engine = fchart3.SkymapEngine(artist, language=fchart3.LABELi18N, lm_stars=job.star_maglim, lm_deepsky=job.dso_maglim)
     engine.set_configuration(config)
 
     mirror_x = FlagValue.MIRROR_X.value in flags
     mirror_y = FlagValue.MIRROR_Y.value in flags
 
-    engine.set_field(phi, theta, deg2rad(fld_size) / 2.0, fld_label, mirror_x, mirror_y)
+    engine.set_field(job.phi, job.theta, deg2rad(fld_size) / 2.0, job.fld_label, mirror_x, mirror_y)
 
-    if not highlights_pos_list and obj_ra is not None and obj_dec is not None:
-        highlights = _create_highlights(obj_ra, obj_dec, config.highlight_linewidth*1.3, True)
-    elif highlights_pos_list:
-        highlights = _create_highlights_from_pos_list(highlights_pos_list, config)
+    obj_ra, obj_dec = job.obj_ra, job.obj_dec
+    if not job.highlights_pos_list and obj_ra is not None and obj_dec is not None:
+        highlights = _create_highlights(obj_ra, obj_dec, config.highlight_linewidth*1.3, 'light')
+    elif job.highlights_pos_list:
+        highlights = _create_highlights_from_pos_list(job.highlights_pos_list, config)
         if (obj_ra is not None) and (obj_dec is not None):
-            highlights.extend(_create_highlights(obj_ra, obj_dec, config.highlight_linewidth*1.3))
+            highlights.extend(_create_highlights(obj_ra, obj_dec, config.highlight_linewidth*1.3, job.theme))
     else:
         highlights = None
 
     showing_dsos = set()
-    if dso_names:
-        for dso_name in dso_names:
+    if job.dso_names:
+        for dso_name in job.dso_names:
             dso = _find_dso_by_name(dso_name)
             if dso:
                 showing_dsos.add(dso)
 
-    dso_highlights = _create_dso_highlights(highlights_dso_list, observed_dso_ids, True) if highlights_dso_list else None
+    dso_highlights = _create_dso_highlights(job.highlights_dso, job.observed_dso_ids, 'light') if job.highlights_dso else None
 
     dso_hide_filter = get_dso_hide_filter()
 
     if FlagValue.SHOW_SOLAR_SYSTEM.value in flags:
-        sl_bodies = get_solsys_bodies(get_utc_time(), rad2deg(lat), rad2deg(lon))
+        sl_bodies = get_solsys_bodies(job.utc_time, rad2deg(lat), rad2deg(lon))
     else:
         sl_bodies = None
 
-    pl_moons = get_planet_moons(get_utc_time(), star_maglim) if FlagValue.SHOW_SOLAR_SYSTEM.value in flags else None
+    pl_moons = get_planet_moons(job.utc_time, job.star_maglim) if FlagValue.SHOW_SOLAR_SYSTEM.value in flags else None
 
-    trajectories = [trajectory] if trajectory else None
+    trajectories = [job.trajectory] if job.trajectory else None
 
     engine.make_map(used_catalogs,
-                    dt=get_chart_datetime(),
+                    dt=job.chart_dt,
                     solsys_bodies=sl_bodies,
                     planet_moons=pl_moons,
                     showing_dsos=showing_dsos,
@@ -1294,6 +1560,8 @@ def _create_chart_pdf(pdf_fobj, visible_objects, obj_ra, obj_dec, is_equatorial,
 
     print("PDF map created within : {} ms".format(str(time()-tm)), flush=True)
 
+    return 'pdf'
+
 
 def _create_chart_legend(png_fobj, is_equatorial, phi, theta, width, height, fld_size, fld_label, star_maglim, dso_maglim, eyepiece_fov, flags='', img_format='png'):
     # tm = time()
@@ -1337,15 +1605,11 @@ def _create_chart_legend(png_fobj, is_equatorial, phi, theta, width, height, fld
 
     engine.make_map(used_catalogs, transparent=True)
 
-    free_star_memory(1)
-
     # app.logger.info("Map created within : %s ms", str(time()-tm))
 
 
-def _create_highlights(obj_ra, obj_dec, line_width, force_light_mode=False):
-    if force_light_mode or session.get('theme', '') == 'light':
-        color = (0.0, 0.5, 0.0)
-    elif session.get('theme', '') == 'night':
+def _create_highlights(obj_ra, obj_dec, line_width, theme):
+    if theme == 'night':
         color = (0.5, 0.2, 0.0)
     else:
         color = (0.0, 0.5, 0.0)
@@ -1354,22 +1618,22 @@ def _create_highlights(obj_ra, obj_dec, line_width, force_light_mode=False):
     return [hl]
 
 
-def _create_dso_highlights(highlights_dso_list, observed_dso_ids, force_light_mode=False, highlight_style='circle', highlight_size=1.0):
+def _create_dso_highlights(highlights_dso, observed_dso_ids, theme, highlight_style='circle', highlight_size=1.0):
     full_highlighted_dsos = set()
     dashed_highlighted_dsos = set()
 
-    for hl_dso in highlights_dso_list:
-        dso = _find_dso_by_name(hl_dso.name)
+    for hl_dso_id, hl_dso_name in highlights_dso:
+        dso = _find_dso_by_name(hl_dso_name)
         if dso:
-            if observed_dso_ids and hl_dso.id in observed_dso_ids:
+            if observed_dso_ids and hl_dso_id in observed_dso_ids:
                 dashed_highlighted_dsos.add(dso)
             else:
                 full_highlighted_dsos.add(dso)
 
-    if force_light_mode or session.get('theme', '') == 'light':
+    if theme == 'light':
         color = (0.1, 0.2, 0.4)
         line_width = 0.3
-    elif session.get('theme', '') == 'night':
+    elif theme == 'night':
         color = (0.4, 0.2, 0.1)
         line_width = 0.3
     else:
@@ -1406,12 +1670,7 @@ def _create_highlights_from_pos_list(highlights_pos_list, config, highlight_styl
 
 
 def _find_dso_by_name(dso_name):
-    if dso_name not in dso_name_cache:
-        dso, cat, name = used_catalogs.lookup_dso(dso_name)
-        dso_name_cache[dso_name] = dso
-    else:
-        dso = dso_name_cache[dso_name]
-    return dso
+    return get_dso_name_index().lookup(dso_name)
 
 
 def _get_chart_legend_flags(form):
@@ -1608,28 +1867,12 @@ def rad2deg(angle):
     return angle * 180.0 / pi
 
 
-def _get_chart_font_face():
-    global chart_font_face
-    global chart_font_face_initialized
-
-    if not chart_font_face_initialized:
-        chart_font_face_initialized = True
-        if current_app.config.get('CHART_FONT'):
-            chart_font_face = _create_cairo_font_face_for_file(current_app.config.get('CHART_FONT'), 0)
-
-    return chart_font_face
-
-
-def _get_pdf_font_face():
-    global pdf_font_face
-    global pdf_font_face_initialized
-
-    if not pdf_font_face_initialized:
-        pdf_font_face_initialized = True
-        if current_app.config.get('PDF_FONT'):
-            pdf_font_face = _create_cairo_font_face_for_file(current_app.config.get('PDF_FONT'), 0)
-
-    return pdf_font_face
+def _get_font_face(font_file):
+    if not font_file:
+        return None
+    if font_file not in font_face_cache:
+        font_face_cache[font_file] = _create_cairo_font_face_for_file(font_file, 0)
+    return font_face_cache[font_file]
 
 
 ft_initialized = False
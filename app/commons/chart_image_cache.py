@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from flask import current_app
+
+CHART_IMG_CACHE_VERSION = "chart-img-v1"
+DISK_PRUNE_INTERVAL = 100
+# catalogue files are stat'ed again after this many seconds
+CATALOGS_VERSION_TTL = 60.0
+
+
+@dataclass(frozen=True)
+class ChartImageCacheEntry:
+    img_data: bytes
+    img_format: str
+    visible_objects: Optional[List[Any]]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.img_data)
+
+
+class ChartImageCache:
+    """
+    Bounded image cache of rendered charts. Memory tier is LRU bounded by number of entries and total bytes,
+    optional disk tier stores entries as files named by key digest.
+    """
+    def __init__(self, max_entries: int = 0, max_bytes: int = 0, disk_dir: Optional[str] = None, disk_max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, ChartImageCacheEntry]" = OrderedDict()
+        self._nbytes = 0
+        self._disk_stores = 0
+        self._stats = {
+            'hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+        }
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or bool(self.disk_dir)
+
+    def get(self, key: str) -> Optional[ChartImageCacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry
+
+        entry = self._disk_get(key)
+        with self._lock:
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['disk_hits'] += 1
+        self._mem_put(key, entry)
+        return entry
+
+    def put(self, key: str, entry: ChartImageCacheEntry) -> None:
+        with self._lock:
+            self._stats['stores'] += 1
+        self._mem_put(key, entry)
+        self._disk_put(key, entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            for file_name in os.listdir(self.disk_dir):
+                try:
+                    os.remove(os.path.join(self.disk_dir, file_name))
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            result = dict(self._stats)
+            result['entries'] = len(self._entries)
+            result['bytes'] = self._nbytes
+        lookups = result['hits'] + result['disk_hits'] + result['misses']
+        result['hit_ratio'] = (result['hits'] + result['disk_hits']) / lookups if lookups else 0.0
+        return result
+
+    def _mem_put(self, key: str, entry: ChartImageCacheEntry) -> None:
+        if self.max_entries <= 0 or (self.max_bytes > 0 and entry.nbytes > self.max_bytes):
+            return
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self._nbytes -= old_entry.nbytes
+            self._entries[key] = entry
+            self._nbytes += entry.nbytes
+            while self._entries and (len(self._entries) > self.max_entries or
+                                     (self.max_bytes > 0 and self._nbytes > self.max_bytes)):
+                _, evicted = self._entries.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+                self._stats['evictions'] += 1
+
+    def _disk_paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.disk_dir, key)
+        return base + '.img', base + '.json'
+
+    def _disk_get(self, key: str) -> Optional[ChartImageCacheEntry]:
+        if not self.disk_dir:
+            return None
+        img_path, meta_path = self._disk_paths(key)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with open(img_path, 'rb') as f:
+                img_data = f.read()
+        except (OSError, ValueError):
+            return None
+        return ChartImageCacheEntry(img_data=img_data, img_format=meta.get('img_format'),
+                                    visible_objects=meta.get('visible_objects'))
+
+    def _disk_put(self, key: str, entry: ChartImageCacheEntry) -> None:
+        if not self.disk_dir:
+            return
+        img_path, meta_path = self._disk_paths(key)
+        suffix = '.{}.tmp'.format(os.getpid())
+        try:
+            with open(img_path + suffix, 'wb') as f:
+                f.write(entry.img_data)
+            with open(meta_path + suffix, 'w') as f:
+                json.dump({'img_format': entry.img_format, 'visible_objects': entry.visible_objects}, f, default=float)
+            # image first, metadata last - reader requires metadata, so partially stored entry is never visible
+            os.replace(img_path + suffix, img_path)
+            os.replace(meta_path + suffix, meta_path)
+        except OSError:
+            current_app.logger.exception('Chart image cache: failed to store {}'.format(key))
+            return
+
+        with self._lock:
+            self._disk_stores += 1
+            prune = self.disk_max_bytes > 0 and self._disk_stores % DISK_PRUNE_INTERVAL == 0
+        if prune:
+            self._disk_prune()
+
+    def _disk_prune(self) -> None:
+        files = []
+        total = 0
+        for file_name in os.listdir(self.disk_dir):
+            if not file_name.endswith('.json'):
+                continue
+            meta_path = os.path.join(self.disk_dir, file_name)
+            img_path = meta_path[:-len('.json')] + '.img'
+            try:
+                st_meta = os.stat(meta_path)
+                st_img = os.stat(img_path)
+            except OSError:
+                continue
+            size = st_meta.st_size + st_img.st_size
+            files.append((st_meta.st_atime, size, meta_path, img_path))
+            total += size
+        files.sort()
+        for _, size, meta_path, img_path in files:
+            if total <= self.disk_max_bytes:
+                break
+            for path in (meta_path, img_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            with self._lock:
+                self._stats['evictions'] += 1
+
+
+_chart_image_cache_lock = threading.Lock()
+_chart_image_cache: Optional[ChartImageCache] = None
+# (expires at, version)
+_catalogs_version: Optional[Tuple[float, str]] = None
+
+
+def get_chart_image_cache() -> ChartImageCache:
+    global _chart_image_cache
+    if _chart_image_cache is None:
+        with _chart_image_cache_lock:
+            if _chart_image_cache is None:
+                _chart_image_cache = ChartImageCache(
+                    max_entries=int(current_app.config.get('CHART_IMG_CACHE_SIZE', 0)),
+                    max_bytes=int(current_app.config.get('CHART_IMG_CACHE_MAX_BYTES', 0)),
+                    disk_dir=current_app.config.get('CHART_IMG_CACHE_DIR') or None,
+                    disk_max_bytes=int(current_app.config.get('CHART_IMG_CACHE_DISK_MAX_BYTES', 0)),
+                )
+    return _chart_image_cache
+
+
+def get_chart_image_cache_stats() -> Dict[str, Any]:
+    return get_chart_image_cache().stats()
+
+
+def _data_dir_files(data_dir: str) -> List[str]:
+    files = []
+    for root, _, file_names in os.walk(data_dir):
+        files.extend(os.path.join(root, file_name) for file_name in file_names)
+    return sorted(files)
+
+
+def get_catalogs_version(fchart3_version: str, data_files: List[str], data_dirs: Sequence[str] = ()) -> str:
+    """
+    Version of the rendered content - fchart3 version and sizes and modification times of the catalogue files
+    loaded by czsky (data_files and all files in data_dirs), so cache entries are not reused after catalogue update.
+    Files are checked again after CATALOGS_VERSION_TTL seconds.
+    """
+    global _catalogs_version
+    now = time.monotonic()
+    if _catalogs_version is None or _catalogs_version[0] < now:
+        parts = [fchart3_version]
+        for data_file in list(data_files) + [f for data_dir in data_dirs for f in _data_dir_files(data_dir)]:
+            try:
+                stat = os.stat(data_file)
+                parts.append('{}:{}:{}'.format(os.path.basename(data_file), stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                parts.append(os.path.basename(data_file))
+        _catalogs_version = (now + CATALOGS_VERSION_TTL, hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:16])
+    return _catalogs_version[1]
+
+
+def quantize(value: Optional[float], step: float) -> Optional[float]:
+    if value is None:
+        return None
+    return round(round(float(value) / step) * step, 9)
+
+
+def build_chart_image_cache_key(params: Dict[str, Any]) -> str:
+    """
+    Content address of the chart image - digest of normalized chart parameters.
+    """
+    payload = json.dumps([CHART_IMG_CACHE_VERSION, params], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
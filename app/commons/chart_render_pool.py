@@ -0,0 +1,192 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from io import BytesIO
+from multiprocessing.connection import Client, Listener
+from typing import Any, Optional, Tuple
+
+from flask import current_app
+
+CHART_RENDER_IMG = 'img'
+CHART_RENDER_PDF = 'pdf'
+
+POOL_CONNECT_TIMEOUT = 2.0
+
+
+class ChartRenderPoolBusy(Exception):
+    """Render pool queue is full or the render did not finish in time."""
+
+
+def _get_authkey(secret_key: str) -> bytes:
+    return ('chart-render-pool:' + secret_key).encode('utf-8')
+
+
+def _parse_address(address: str):
+    if ':' in address and not address.startswith('/'):
+        host, port = address.rsplit(':', 1)
+        return host, int(port)
+    return address
+
+
+def is_chart_render_pool_enabled() -> bool:
+    return bool(current_app.config.get('CHART_RENDER_POOL_ADDRESS'))
+
+
+def submit_chart_render_job(kind: str, job: Any) -> Tuple[bytes, str, Optional[list]]:
+    """
+    Send render job to the chart render pool and wait for the result.
+    Falls back to in-process rendering when the pool is not running.
+    """
+    address = _parse_address(current_app.config.get('CHART_RENDER_POOL_ADDRESS'))
+    timeout = float(current_app.config.get('CHART_RENDER_POOL_TIMEOUT'))
+    try:
+        conn = Client(address, authkey=_get_authkey(current_app.config.get('SECRET_KEY')))
+    except OSError:
+        current_app.logger.warning('Chart render pool is not available, rendering in web worker.')
+        return _render_job(kind, job)
+
+    try:
+        conn.send((kind, job))
+        # server applies render timeout, client waits a bit longer for the answer
+        if not conn.poll(timeout + POOL_CONNECT_TIMEOUT):
+            raise ChartRenderPoolBusy('Chart render timeout.')
+        status, result = conn.recv()
+    except (EOFError, OSError):
+        raise ChartRenderPoolBusy('Chart render pool connection closed.')
+    finally:
+        conn.close()
+
+    if status == 'ok':
+        return result
+    if status in ('busy', 'timeout'):
+        raise ChartRenderPoolBusy(status)
+    raise RuntimeError('Chart render failed: {}'.format(result))
+
+
+def _render_job(kind: str, job: Any) -> Tuple[bytes, str, Optional[list]]:
+    from .chart_generator import render_chart_img, render_chart_pdf
+
+    fobj = BytesIO()
+    visible_objects = [] if job.collect_visible_objects else None
+    if kind == CHART_RENDER_PDF:
+        img_format = render_chart_pdf(job, fobj, visible_objects)
+    else:
+        img_format = render_chart_img(job, fobj, visible_objects)
+    return fobj.getvalue(), img_format, visible_objects
+
+
+def _warmup_render_worker() -> int:
+    return os.getpid()
+
+
+class ChartRenderPool:
+    """
+    Pool of pre-warmed render processes. Catalogues are loaded in the pool process before the workers are forked,
+    so workers share them. Web workers connect through local socket, each connection carries one render job.
+    """
+    def __init__(self, address, secret_key: str, workers: int, max_queue: int, timeout: float):
+        self.address = address
+        self.authkey = _get_authkey(secret_key)
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        # future -> executor of jobs submitted and not finished yet
+        self._running = {}
+
+    def start(self) -> None:
+        from .catalog_preload import preload_chart_catalogs
+
+        preload_chart_catalogs(scene_datasets=False)
+        self._executor = self._create_executor()
+        pids = set(self._executor.map(_warmup_render_worker, range(self.workers)))
+        current_app.logger.info('Chart render pool started with {} workers: {}'.format(len(pids), sorted(pids)))
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('fork'))
+
+    def _submit(self, kind: str, job: Any):
+        """
+        Submit job counted as pending until it really finishes, timed out render keeps its worker busy.
+        """
+        with self._lock:
+            if self._pending >= self.max_queue:
+                return None, None
+            executor = self._executor
+            try:
+                future = executor.submit(_render_job, kind, job)
+            except Exception:
+                # broken executor, workers are recreated for the next job
+                self._executor = self._create_executor()
+                raise
+            self._pending += 1
+            self._running[future] = executor
+        future.add_done_callback(self._job_done)
+        return executor, future
+
+    def _job_done(self, future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._running.pop(future, None)
+
+    def _recycle_executor(self, executor, stuck_future) -> None:
+        """
+        Replace executor with stuck render by fresh workers. Process pool can not stop single job, so the old
+        workers are killed once the other jobs running on them finish or time out too.
+        """
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = self._create_executor()
+        threading.Thread(target=self._retire_executor, args=(executor, stuck_future), daemon=True).start()
+
+    def _retire_executor(self, executor, stuck_future) -> None:
+        with self._lock:
+            others = [f for f, e in self._running.items() if e is executor and f is not stuck_future]
+        wait(others, timeout=self.timeout)
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def serve_forever(self) -> None:
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+        with Listener(self.address, authkey=self.authkey) as listener:
+            while True:
+                try:
+                    conn = listener.accept()
+                except (OSError, EOFError):
+                    continue
+                threading.Thread(target=self._handle_connection, args=(conn,), daemon=True).start()
+
+    def _handle_connection(self, conn) -> None:
+        try:
+            kind, job = conn.recv()
+            try:
+                executor, future = self._submit(kind, job)
+                if future is None:
+                    conn.send(('busy', None))
+                    return
+                conn.send(('ok', future.result(timeout=self.timeout)))
+            except FutureTimeoutError:
+                self._recycle_executor(executor, future)
+                conn.send(('timeout', None))
+            except Exception as e:
+                conn.send(('error', str(e)))
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+
+def run_chart_render_pool(app) -> None:
+    pool = ChartRenderPool(_parse_address(app.config.get('CHART_RENDER_POOL_ADDRESS')),
+                           app.config.get('SECRET_KEY'),
+                           workers=int(app.config.get('CHART_RENDER_POOL_WORKERS')),
+                           max_queue=int(app.config.get('CHART_RENDER_POOL_MAX_QUEUE')),
+                           timeout=float(app.config.get('CHART_RENDER_POOL_TIMEOUT')))
+    pool.start()
+    pool.serve_forever()
@@ -1,14 +1,22 @@
 import hashlib
+import json
 import math
+import struct
 import threading
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple, TypedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypedDict
 
 import numpy as np
-from flask import abort, current_app, request, session, url_for
+from flask import Response, abort, current_app, jsonify, request, session, url_for
 
 import fchart3
 
+from .scene_dataset_store import (
+    SceneDataset,
+    SceneDatasetStore,
+    encode_scene_dataset,
+    make_scene_dataset_response,
+)
 from .star_label_utils import resolve_star_label_metadata
 from .chart_generator import (
     DSO_MAG_SCALES,
@@ -23,7 +31,9 @@ from .chart_generator import (
     get_chart_datetime,
     get_dso_hide_filter,
     get_fld_size_mags_from_request,
-    free_star_memory,
+    get_loaded_catalogs_version,
+    get_used_catalogs_version,
+    is_used_catalogs_outdated,
     load_used_catalogs,
     resolve_active_chart_theme_definition,
     rad2deg,
@@ -45,14 +55,27 @@ CONSTELL_LINES_VERSION = "constellation-lines-v1"
 CONSTELL_BOUNDARIES_VERSION = "constellation-boundaries-v1"
 STAR_ZONE_BATCH_MAX = 64
 
-_mw_cache_lock = threading.Lock()
-_mw_dataset_cache: Dict[Tuple[str, bool], Dict[str, Any]] = {}
-_dso_outlines_cache_lock = threading.Lock()
-_dso_outlines_dataset_cache: Optional[Dict[str, Any]] = None
-_constell_lines_cache_lock = threading.Lock()
-_constell_lines_dataset_cache: Optional[Dict[str, Any]] = None
-_constell_boundaries_cache_lock = threading.Lock()
-_constell_boundaries_dataset_cache: Optional[Dict[str, Any]] = None
+# Binary star zones: little-endian, every section is 4 byte aligned so the client can map typed arrays directly.
+#   header:      magic "CZS1", u32 zones count
+#   zone header: i32 level, i32 zone, u32 flags (1 = missing), u32 stars count n, u32 labels length
+#   zone body:   f32 ra[n], f32 dec[n], f32 mag[n], i16 bv[n] (+pad), labels JSON {"i": [...], "t": [...]} (+pad)
+STARS_BIN_MAGIC = b"CZS1"
+STARS_BIN_MIMETYPE = "application/x-czsky-stars"
+STARS_BIN_ZONE_MISSING = 1
+_stars_bin_header = struct.Struct("<4sI")
+_stars_bin_zone_header = struct.Struct("<iiIII")
+
+SCENE_DATASET_DSO_OUTLINES = "dso-outlines"
+SCENE_DATASET_CONSTELL_LINES = "constellation-lines"
+SCENE_DATASET_CONSTELL_BOUNDARIES = "constellation-boundaries"
+SCENE_DATASET_MW_PREFIX = "milkyway-"
+MW_QUALITIES = ("10k", "30k")
+
+# List scenes emit members within field radius * margin, client reloads the scene after pan or zoom
+SCENE_LIST_FIELD_MARGIN = 1.5
+
+_scene_dataset_store_lock = threading.Lock()
+_scene_dataset_store: Optional[SceneDatasetStore] = None
 
 # Mapping from czsky database type codes to fchart3/JS renderer type codes
 CZSKY_TYPE_TO_SCENE = {
@@ -261,23 +284,73 @@ def build_scene_dso_item_from_model(dso: Any) -> SceneDsoItem:
     }
 
 
-def ensure_scene_dso_item(scene: Dict[str, Any], dso: Any, force_visible: bool = True) -> None:
+def scene_dso_index(scene: Dict[str, Any]) -> Dict[str, SceneDsoItem]:
+    dso_index: Dict[str, SceneDsoItem] = {}
+    for item in scene.setdefault("objects", {}).setdefault("dso", []):
+        if item:
+            dso_index.setdefault(item.get("id"), item)
+    return dso_index
+
+
+def ensure_scene_dso_item(scene: Dict[str, Any], dso: Any, force_visible: bool = True,
+                          dso_index: Optional[Dict[str, SceneDsoItem]] = None) -> None:
+    """
+    Add dso to the scene unless it is already there. Pass dso_index from scene_dso_index() when adding many objects.
+    """
     if scene is None or dso is None:
         return
     dso_id = scene_dso_id_from_name(getattr(dso, "name", ""))
     if not dso_id:
         return
-    scene_objects = scene.setdefault("objects", {})
-    dso_items = scene_objects.setdefault("dso", [])
-    for item in dso_items:
-        if item and item.get("id") == dso_id:
-            if force_visible:
-                item["force_visible"] = True
-            return
-    item = build_scene_dso_item_from_model(dso)
+    if dso_index is None:
+        dso_index = scene_dso_index(scene)
+    item = dso_index.get(dso_id)
+    if item is None:
+        item = build_scene_dso_item_from_model(dso)
+        scene["objects"]["dso"].append(item)
+        dso_index[dso_id] = item
     if force_visible:
         item["force_visible"] = True
-    dso_items.append(item)
+
+
+def scene_list_selection(scene: Dict[str, Any], ras: Sequence[float], decs: Sequence[float]) -> np.ndarray:
+    """
+    Indices of list members near the scene field.
+    """
+    count = len(ras)
+    meta = scene.get("meta") or {}
+    center = meta.get("center") or {}
+    center_ra, center_dec = center.get("equatorial_ra"), center.get("equatorial_dec")
+    fov_deg = meta.get("fov_deg")
+    if center_ra is None or center_dec is None or fov_deg is None:
+        return np.arange(count)
+    # half diagonal of the widest supported aspect ratio
+    radius = deg2rad(fov_deg) / 2.0 * math.sqrt(2.0) * SCENE_LIST_FIELD_MARGIN
+    if radius >= math.pi:
+        return np.arange(count)
+    ras = np.asarray(ras, dtype=float)
+    decs = np.asarray(decs, dtype=float)
+    cos_sep = (np.sin(decs) * math.sin(center_dec)
+               + np.cos(decs) * math.cos(center_dec) * np.cos(ras - center_ra))
+    return np.nonzero(cos_sep >= math.cos(radius))[0]
+
+
+def add_scene_list_dsos(scene: Dict[str, Any], dsos: Sequence[Any],
+                        build_highlight: Callable[[Any], SceneHighlight]) -> None:
+    """
+    Scene items and highlights of list members selected by scene_list_selection(), list size goes to meta["list"].
+    """
+    dsos = [dso for dso in dsos if dso is not None]
+    selected = scene_list_selection(scene, [dso.ra for dso in dsos], [dso.dec for dso in dsos])
+    dso_index = scene_dso_index(scene)
+    highlights = scene["objects"].setdefault("highlights", [])
+    for i in selected:
+        ensure_scene_dso_item(scene, dsos[i], dso_index=dso_index)
+        highlights.append(build_highlight(dsos[i]))
+    scene.setdefault("meta", {})["list"] = {
+        "total": len(dsos),
+        "count": len(selected),
+    }
 
 
 def build_scene_trajectory_item(
@@ -408,6 +481,7 @@ def build_shared_scene_urls(req: SceneRequest) -> Dict[str, str]:
     params = _scene_common_params(req)
     return {
         "stars_zones": url_for("main_chart.chart_stars_zones_v1", **params),
+        "stars_zones_bin": url_for("main_chart.chart_stars_zones_bin_v1", cv=get_used_catalogs_version()),
         "milkyway_catalog": url_for("main_chart.chart_milkyway_catalog_v1", **params),
         "milkyway_select": url_for("main_chart.chart_milkyway_select_v1", **params),
         "dso_outlines_catalog": url_for("main_chart.chart_dso_outlines_catalog_v1", **params),
@@ -461,6 +535,39 @@ def _serialize_star_selection(star_sel, star_catalog) -> List[dict]:
         )
     return stars_out
 
+def _star_selection_labels(star_sel: Any, bsc_hip_map) -> Tuple[List[int], List[str]]:
+    """Indices and texts of labelled stars, only stars with HIP present in bsc_hip_map are visited."""
+    sel_names = star_sel.dtype.names if getattr(star_sel, "dtype", None) is not None else ()
+    if not bsc_hip_map or not sel_names or "hip" not in sel_names:
+        return [], []
+    hip_ar = star_sel["hip"]
+    candidates = np.nonzero((hip_ar > 0) & np.isin(hip_ar, _bsc_hip_keys(bsc_hip_map)))[0]
+    label_idx = []
+    label_text = []
+    for i in candidates.tolist():
+        metadata = resolve_star_label_metadata(bsc_hip_map.get(int(hip_ar[i])))
+        if not metadata:
+            continue
+        text = (metadata.get("full_text") or metadata.get("text") or "").strip()
+        if not text:
+            continue
+        label_idx.append(i)
+        label_text.append(text)
+    return label_idx, label_text
+
+
+_bsc_hip_keys_cache: Tuple[int, Optional[np.ndarray]] = (0, None)
+
+
+def _bsc_hip_keys(bsc_hip_map) -> np.ndarray:
+    global _bsc_hip_keys_cache
+    map_id, keys = _bsc_hip_keys_cache
+    if keys is None or map_id != id(bsc_hip_map):
+        keys = np.fromiter(bsc_hip_map.keys(), dtype=np.int64, count=len(bsc_hip_map))
+        _bsc_hip_keys_cache = (id(bsc_hip_map), keys)
+    return keys
+
+
 def _serialize_star_selection_compact(star_sel: Any, bsc_hip_map=None) -> dict:
     """Compact columnar format for stars with optional sparse labels."""
     if star_sel is None or len(star_sel) == 0:
@@ -468,34 +575,13 @@ def _serialize_star_selection_compact(star_sel: Any, bsc_hip_map=None) -> dict:
 
     sel_names = star_sel.dtype.names if getattr(star_sel, "dtype", None) is not None else ()
     has_bvind = bool(sel_names) and "bvind" in sel_names
-    has_hip = bool(sel_names) and "hip" in sel_names
 
     ra_ar, dec_ar = _cart_to_radec(star_sel["x"], star_sel["y"], star_sel["z"])
 
     n = len(ra_ar)
-    mag_out = [round(float(star_sel["mag"][i]), 2) for i in range(n)]
-    bv_out = [int(star_sel["bvind"][i]) for i in range(n)] if has_bvind else [-1] * n
-    labels_out = None
-    if has_hip and bsc_hip_map:
-        label_idx = []
-        label_text = []
-        for i in range(n):
-            hip = int(star_sel["hip"][i])
-            if hip <= 0:
-                continue
-            metadata = resolve_star_label_metadata(bsc_hip_map.get(hip))
-            if not metadata:
-                continue
-            text = (metadata.get("full_text") or metadata.get("text") or "").strip()
-            if not text:
-                continue
-            label_idx.append(i)
-            label_text.append(text)
-        if label_idx:
-            labels_out = {
-                "i": label_idx,
-                "t": label_text,
-            }
+    mag_out = np.round(np.asarray(star_sel["mag"], dtype=np.float64), 2).tolist()
+    bv_out = np.asarray(star_sel["bvind"], dtype=np.int64).tolist() if has_bvind else [-1] * n
+    label_idx, label_text = _star_selection_labels(star_sel, bsc_hip_map)
 
     ra_min, ra_max = float(np.min(ra_ar)), float(np.max(ra_ar))
     dec_min, dec_max = float(np.min(dec_ar)), float(np.max(dec_ar))
@@ -510,21 +596,88 @@ def _serialize_star_selection_compact(star_sel: Any, bsc_hip_map=None) -> dict:
             "d": delta_scale,
             "ra0": round(ra_min, 6),
             "dec0": round(dec_min, 6),
-            "ra": [int(round((float(ra_ar[i]) - ra_min) * delta_scale)) for i in range(n)],
-            "dec": [int(round((float(dec_ar[i]) - dec_min) * delta_scale)) for i in range(n)],
+            "ra": np.rint((ra_ar - ra_min) * delta_scale).astype(np.int64).tolist(),
+            "dec": np.rint((dec_ar - dec_min) * delta_scale).astype(np.int64).tolist(),
             "mag": mag_out,
             "bv": bv_out,
         }
     else:
         out = {
-            "ra": [round(float(ra_ar[i]), 6) for i in range(n)],
-            "dec": [round(float(dec_ar[i]), 6) for i in range(n)],
+            "ra": np.round(ra_ar, 6).tolist(),
+            "dec": np.round(dec_ar, 6).tolist(),
             "mag": mag_out,
             "bv": bv_out,
         }
-    if labels_out:
-        out["labels"] = labels_out
+    if label_idx:
+        out["labels"] = {
+            "i": label_idx,
+            "t": label_text,
+        }
     return out
+
+
+def _pad4(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 4)
+
+
+def encode_star_zone_bin(level: int, zone: int, star_sel: Any, bsc_hip_map=None) -> bytes:
+    """Binary zone record, columns are written straight from numpy buffers."""
+    if star_sel is None or len(star_sel) == 0:
+        flags = STARS_BIN_ZONE_MISSING if star_sel is None else 0
+        return _stars_bin_zone_header.pack(level, zone, flags, 0, 0)
+
+    sel_names = star_sel.dtype.names or ()
+    ra_ar, dec_ar = _cart_to_radec(star_sel["x"], star_sel["y"], star_sel["z"])
+    n = len(ra_ar)
+    if "bvind" in sel_names:
+        bv_ar = np.asarray(star_sel["bvind"], dtype="<i2")
+    else:
+        bv_ar = np.full(n, -1, dtype="<i2")
+
+    label_idx, label_text = _star_selection_labels(star_sel, bsc_hip_map)
+    labels = json.dumps({"i": label_idx, "t": label_text}, ensure_ascii=False,
+                        separators=(",", ":")).encode("utf-8") if label_idx else b""
+
+    return b"".join((
+        _stars_bin_zone_header.pack(level, zone, 0, n, len(labels)),
+        np.asarray(ra_ar, dtype="<f4").tobytes(),
+        np.asarray(dec_ar, dtype="<f4").tobytes(),
+        np.asarray(star_sel["mag"], dtype="<f4").tobytes(),
+        _pad4(bv_ar.tobytes()),
+        _pad4(labels),
+    ))
+
+
+def decode_stars_zones_bin(data: bytes) -> List[dict]:
+    """Inverse of iter_stars_zones_bin_v1 output, used by tests and tools."""
+    magic, zones_count = _stars_bin_header.unpack_from(data, 0)
+    if magic != STARS_BIN_MAGIC:
+        raise ValueError("invalid star zones data")
+    offset = _stars_bin_header.size
+    zones = []
+    for _ in range(zones_count):
+        level, zone, flags, n, labels_len = _stars_bin_zone_header.unpack_from(data, offset)
+        offset += _stars_bin_zone_header.size
+        ra = np.frombuffer(data, dtype="<f4", count=n, offset=offset)
+        dec = np.frombuffer(data, dtype="<f4", count=n, offset=offset + 4 * n)
+        mag = np.frombuffer(data, dtype="<f4", count=n, offset=offset + 8 * n)
+        bv = np.frombuffer(data, dtype="<i2", count=n, offset=offset + 12 * n)
+        offset += 12 * n + 2 * n + (-2 * n % 4)
+        labels = json.loads(data[offset:offset + labels_len].decode("utf-8")) if labels_len else None
+        offset += labels_len + (-labels_len % 4)
+        zones.append({
+            "level": level,
+            "zone": zone,
+            "missing": bool(flags & STARS_BIN_ZONE_MISSING),
+            "ra": ra,
+            "dec": dec,
+            "mag": mag,
+            "bv": bv,
+            "labels": labels,
+        })
+    return zones
+
+
 def _serialize_unknown_nebulae(unknown_nebulae) -> List[dict]:
     nebulae_out: List[dict] = []
     if not unknown_nebulae:
@@ -612,18 +765,6 @@ def _serialize_dso_outlines_dataset(used_catalogs) -> Dict[str, Any]:
     }
 
 
-def _get_dso_outlines_dataset() -> Dict[str, Any]:
-    global _dso_outlines_dataset_cache
-    with _dso_outlines_cache_lock:
-        if _dso_outlines_dataset_cache is not None:
-            return _dso_outlines_dataset_cache
-
-    used_catalogs = load_used_catalogs()
-    dataset = _serialize_dso_outlines_dataset(used_catalogs)
-    with _dso_outlines_cache_lock:
-        _dso_outlines_dataset_cache = dataset
-    return dataset
-
 
 def _serialize_constellation_lines_dataset(used_catalogs) -> Dict[str, Any]:
     const_catalog = getattr(used_catalogs, "constell_catalog", None)
@@ -650,18 +791,6 @@ def _serialize_constellation_lines_dataset(used_catalogs) -> Dict[str, Any]:
     }
 
 
-def _get_constellation_lines_dataset() -> Dict[str, Any]:
-    global _constell_lines_dataset_cache
-    with _constell_lines_cache_lock:
-        if _constell_lines_dataset_cache is not None:
-            return _constell_lines_dataset_cache
-
-    used_catalogs = load_used_catalogs()
-    dataset = _serialize_constellation_lines_dataset(used_catalogs)
-    with _constell_lines_cache_lock:
-        _constell_lines_dataset_cache = dataset
-    return dataset
-
 
 def _serialize_constellation_boundaries_dataset(used_catalogs) -> Dict[str, Any]:
     const_catalog = getattr(used_catalogs, "constell_catalog", None)
@@ -702,19 +831,6 @@ def _serialize_constellation_boundaries_dataset(used_catalogs) -> Dict[str, Any]
     }
 
 
-def _get_constellation_boundaries_dataset() -> Dict[str, Any]:
-    global _constell_boundaries_dataset_cache
-    with _constell_boundaries_cache_lock:
-        if _constell_boundaries_dataset_cache is not None:
-            return _constell_boundaries_dataset_cache
-
-    used_catalogs = load_used_catalogs()
-    dataset = _serialize_constellation_boundaries_dataset(used_catalogs)
-    with _constell_boundaries_cache_lock:
-        _constell_boundaries_dataset_cache = dataset
-    return dataset
-
-
 def _parse_zone_refs_arg(raw: str) -> List[Tuple[int, int]]:
     refs: List[Tuple[int, int]] = []
     if not raw:
@@ -802,17 +918,52 @@ def _mw_dataset_from_catalog(used_catalogs, quality: str, optimized: bool) -> Di
     }
 
 
-def _get_mw_dataset(quality: str, optimized: bool) -> Dict[str, Any]:
-    key = (quality, optimized)
-    with _mw_cache_lock:
-        cached = _mw_dataset_cache.get(key)
-        if cached is not None:
-            return cached
+def _mw_dataset_name(quality: str, optimized: bool) -> str:
+    return f"{SCENE_DATASET_MW_PREFIX}{quality}-{'opti' if optimized else 'full'}"
+
+
+def _scene_dataset_names() -> List[str]:
+    names = [SCENE_DATASET_DSO_OUTLINES, SCENE_DATASET_CONSTELL_LINES, SCENE_DATASET_CONSTELL_BOUNDARIES]
+    names.extend(_mw_dataset_name(quality, optimized) for quality in MW_QUALITIES for optimized in (True, False))
+    return names
+
+
+def _build_scene_dataset(name: str) -> Dict[str, Any]:
     used_catalogs = load_used_catalogs()
-    dataset = _mw_dataset_from_catalog(used_catalogs, quality, optimized)
-    with _mw_cache_lock:
-        _mw_dataset_cache[key] = dataset
-    return dataset
+    if name == SCENE_DATASET_DSO_OUTLINES:
+        return _serialize_dso_outlines_dataset(used_catalogs)
+    if name == SCENE_DATASET_CONSTELL_LINES:
+        return _serialize_constellation_lines_dataset(used_catalogs)
+    if name == SCENE_DATASET_CONSTELL_BOUNDARIES:
+        return _serialize_constellation_boundaries_dataset(used_catalogs)
+    if name.startswith(SCENE_DATASET_MW_PREFIX):
+        quality, variant = name[len(SCENE_DATASET_MW_PREFIX):].split("-")
+        return _mw_dataset_from_catalog(used_catalogs, quality, variant == "opti")
+    raise ValueError(f"Unknown scene dataset: {name}")
+
+
+def get_scene_dataset(name: str) -> SceneDataset:
+    global _scene_dataset_store
+    if _scene_dataset_store is None:
+        with _scene_dataset_store_lock:
+            if _scene_dataset_store is None:
+                _scene_dataset_store = SceneDatasetStore(_build_scene_dataset,
+                                                         current_app.config.get("SCENE_DATASETS_DIR"),
+                                                         get_used_catalogs_version())
+    return _scene_dataset_store.get(name)
+
+
+def preload_scene_datasets() -> None:
+    for name in _scene_dataset_names():
+        get_scene_dataset(name)
+
+
+def build_all_scene_datasets() -> Dict[str, SceneDataset]:
+    """Encode all scene datasets with maximal compression, used by the offline build."""
+    return {
+        name: encode_scene_dataset(name, _build_scene_dataset(name), gzip_level=9, br_quality=11)
+        for name in _scene_dataset_names()
+    }
 
 
 def _select_mw_polygons(used_catalogs, quality: str, optimized: bool, center_ra: float, center_dec: float, field_size: float) -> List[int]:
@@ -876,6 +1027,68 @@ def _bbox_from_point(px: float, py: float, radius_px: float, width: int, height:
     return x1, y1, x2, y2
 
 
+def _build_selection_index(
+    ids: Sequence[str],
+    ra: np.ndarray,
+    dec: np.ndarray,
+    radius_px: np.ndarray,
+    center_ra: float,
+    center_dec: float,
+    width: int,
+    height: int,
+    fov_deg: float,
+    mirror_x: bool,
+    mirror_y: bool,
+) -> Tuple[List[dict], List[object]]:
+    """
+    Array version of _stereographic_project_px + _bbox_from_point over all selectable objects.
+    Returns selection_index and flat img_map of objects whose bbox intersects the image.
+    """
+    field_radius = math.radians(fov_deg) / 2.0
+    plane_r = 2.0 * math.tan(field_radius / 2.0)
+    if len(ids) == 0 or plane_r <= 1e-9:
+        return [], []
+
+    ra = np.asarray(ra, dtype=float)
+    dec = np.asarray(dec, dtype=float)
+    dra = np.mod(ra - center_ra + math.pi, 2.0 * math.pi) - math.pi
+    sin_dec, cos_dec = np.sin(dec), np.cos(dec)
+    cos_dra = np.cos(dra)
+    sin_c, cos_c = math.sin(center_dec), math.cos(center_dec)
+
+    denom = 1.0 + sin_c * sin_dec + cos_c * cos_dec * cos_dra
+    visible = denom > 1e-9
+    k = 2.0 / np.where(visible, denom, 1.0)
+    x = k * cos_dec * np.sin(dra)
+    y = k * (cos_c * sin_dec - sin_c * cos_dec * cos_dra)
+
+    scale = (max(width, height) / 2.0) / plane_r
+    if mirror_x:
+        x = -x
+    if mirror_y:
+        y = -y
+    px = width / 2.0 + x * scale
+    py = height / 2.0 - y * scale
+
+    x1 = np.maximum(0, np.floor(px - radius_px))
+    y1 = np.maximum(0, np.floor(py - radius_px))
+    x2 = np.minimum(width - 1, np.ceil(px + radius_px))
+    y2 = np.minimum(height - 1, np.ceil(py + radius_px))
+    visible &= (x2 >= 0) & (y2 >= 0) & (x1 < width) & (y1 < height)
+
+    selection_index: List[dict] = []
+    img_map: List[object] = []
+    sel = np.nonzero(visible)[0]
+    boxes = np.stack([x1[sel], y1[sel], x2[sel], y2[sel]], axis=1).astype(np.int64).tolist()
+    for i, bbox in zip(sel.tolist(), boxes):
+        obj_id = ids[i]
+        selection_index.append({"id": obj_id, "bbox": bbox})
+        # Keep compatibility with existing fchart.js flat img_map parser.
+        img_map.append(obj_id)
+        img_map.extend(bbox)
+    return selection_index, img_map
+
+
 def _star_radius_px(mag: float) -> float:
     if mag <= 0:
         return 4.0
@@ -907,7 +1120,7 @@ def _build_scene_index(req: SceneRequest, center_ra: float, center_dec: float, l
     dso_items: List[dict] = []
     if FlagValue.SHOW_DEEPSKY.value in req.flags and used_catalogs.deepsky_catalog is not None:
         dso_list = used_catalogs.deepsky_catalog.select_deepsky((center_ra, center_dec), field_size, req.dso_maglim)
-        dso_hide = set(get_dso_hide_filter() or [])
+        dso_hide = get_dso_hide_filter()
         for dso in dso_list:
             if dso in dso_hide:
                 continue
@@ -1022,37 +1235,21 @@ def _build_scene_index(req: SceneRequest, center_ra: float, center_dec: float, l
     mirror_x = FlagValue.MIRROR_X.value in req.flags
     mirror_y = FlagValue.MIRROR_Y.value in req.flags
 
-    selection_index: List[dict] = []
-    img_map: List[object] = []
-
-    def add_selectable(obj_id: str, ra: float, dec: float, radius_px: float):
-        pxy = _stereographic_project_px(
-            ra,
-            dec,
-            center_ra,
-            center_dec,
-            req.width,
-            req.height,
-            req.fld_size_deg,
-            mirror_x,
-            mirror_y,
-        )
-        if pxy is None:
-            return
-        bbox = _bbox_from_point(pxy[0], pxy[1], radius_px, req.width, req.height)
-        if bbox is None:
-            return
-        x1, y1, x2, y2 = bbox
-        selection_index.append({"id": obj_id, "bbox": [x1, y1, x2, y2]})
-        # Keep compatibility with existing fchart.js flat img_map parser.
-        img_map.extend([obj_id, x1, y1, x2, y2])
-
-    for dso in dso_items:
-        add_selectable(dso["id"], dso["ra"], dso["dec"], 8.0)
-    for pl in planets:
-        add_selectable(pl["id"], pl["ra"], pl["dec"], 6.0)
-    for st in stars_preview:
-        add_selectable(st["id"], st["ra"], st["dec"], max(3.0, _star_radius_px(st["mag"])))
+    selectables = dso_items + planets + stars_preview
+    selection_index, img_map = _build_selection_index(
+        [obj["id"] for obj in selectables],
+        np.array([obj["ra"] for obj in selectables], dtype=float),
+        np.array([obj["dec"] for obj in selectables], dtype=float),
+        np.array([8.0] * len(dso_items) + [6.0] * len(planets)
+                 + [max(3.0, _star_radius_px(st["mag"])) for st in stars_preview], dtype=float),
+        center_ra,
+        center_dec,
+        req.width,
+        req.height,
+        req.fld_size_deg,
+        mirror_x,
+        mirror_y,
+    )
 
     if req.debug_stars == "preview_only":
         lod_level = 0
@@ -1066,20 +1263,19 @@ def _build_scene_index(req: SceneRequest, center_ra: float, center_dec: float, l
     mw_selection: List[int] = []
     mw_fade = None
     mw_dataset_id = None
+    mw_digest = None
     if mw["mode"] != "off":
         mw_fade = _mw_fade(req, bg_color, mw_color)
         if mw_fade is None:
             mw["mode"] = "off"
         else:
-            mw_dataset = _get_mw_dataset(mw["quality"], mw["optimized"])
-            mw_dataset_id = mw_dataset["dataset_id"]
+            mw_dataset = get_scene_dataset(_mw_dataset_name(mw["quality"], mw["optimized"]))
+            mw_dataset_id = mw_dataset.meta["dataset_id"]
+            mw_digest = mw_dataset.digest
             mw_selection = _select_mw_polygons(used_catalogs, mw["quality"], mw["optimized"], center_ra, center_dec, field_size)
-    dso_outlines_dataset = _get_dso_outlines_dataset()
-    dso_outlines_dataset_id = dso_outlines_dataset.get("dataset_id")
-    constell_lines_dataset = _get_constellation_lines_dataset()
-    constell_lines_dataset_id = constell_lines_dataset.get("dataset_id")
-    constell_boundaries_dataset = _get_constellation_boundaries_dataset()
-    constell_boundaries_dataset_id = constell_boundaries_dataset.get("dataset_id")
+    dso_outlines_dataset = get_scene_dataset(SCENE_DATASET_DSO_OUTLINES)
+    constell_lines_dataset = get_scene_dataset(SCENE_DATASET_CONSTELL_LINES)
+    constell_boundaries_dataset = get_scene_dataset(SCENE_DATASET_CONSTELL_BOUNDARIES)
     eyepiece_fov = to_float(request.args.get("epfov"), None)
     if eyepiece_fov is not None and eyepiece_fov <= 0:
         eyepiece_fov = None
@@ -1132,22 +1328,26 @@ def _build_scene_index(req: SceneRequest, center_ra: float, center_dec: float, l
                 "quality": mw["quality"],
                 "optimized": mw["optimized"],
                 "dataset_id": mw_dataset_id,
+                "digest": mw_digest,
                 "fade": mw_fade,
             },
             "dso_outlines": {
                 "version": DSO_OUTLINES_VERSION,
-                "dataset_id": dso_outlines_dataset_id,
-                "objects_count": dso_outlines_dataset.get("stats", {}).get("objects_count", 0),
+                "dataset_id": dso_outlines_dataset.meta.get("dataset_id"),
+                "digest": dso_outlines_dataset.digest,
+                "objects_count": (dso_outlines_dataset.meta.get("stats") or {}).get("objects_count", 0),
             },
             "constellation_lines": {
                 "version": CONSTELL_LINES_VERSION,
-                "dataset_id": constell_lines_dataset_id,
-                "lines_count": constell_lines_dataset.get("stats", {}).get("lines_count", 0),
+                "dataset_id": constell_lines_dataset.meta.get("dataset_id"),
+                "digest": constell_lines_dataset.digest,
+                "lines_count": (constell_lines_dataset.meta.get("stats") or {}).get("lines_count", 0),
             },
             "constellation_boundaries": {
                 "version": CONSTELL_BOUNDARIES_VERSION,
-                "dataset_id": constell_boundaries_dataset_id,
-                "boundaries_count": constell_boundaries_dataset.get("stats", {}).get("boundaries_count", 0),
+                "dataset_id": constell_boundaries_dataset.meta.get("dataset_id"),
+                "digest": constell_boundaries_dataset.digest,
+                "boundaries_count": (constell_boundaries_dataset.meta.get("stats") or {}).get("boundaries_count", 0),
             },
             "widgets": widgets_meta,
             "shared_urls": build_shared_scene_urls(req),
@@ -1195,7 +1395,7 @@ def build_scene_v1() -> Dict:
     return _build_scene_index(req, center_ra, center_dec, lat, lon)
 
 
-def build_stars_zones_v1() -> Dict:
+def _get_requested_zone_refs() -> List[Tuple[int, int]]:
     raw_zones = request.args.get("zones", "")
     try:
         zone_refs = _parse_zone_refs_arg(raw_zones)
@@ -1203,6 +1403,11 @@ def build_stars_zones_v1() -> Dict:
         abort(400)
     if len(zone_refs) > STAR_ZONE_BATCH_MAX:
         abort(400)
+    return zone_refs
+
+
+def build_stars_zones_v1() -> Dict:
+    zone_refs = _get_requested_zone_refs()
 
     used_catalogs = load_used_catalogs()
     star_catalog = used_catalogs.star_catalog
@@ -1229,8 +1434,6 @@ def build_stars_zones_v1() -> Dict:
         stars_total += len(stars_compact["ra"])
         zones_out.append({"level": level, "zone": zone, "stars": stars_compact})
 
-    free_star_memory(1)
-
     return {
         "version": STARS_VERSION,
         "zones": zones_out,
@@ -1239,11 +1442,53 @@ def build_stars_zones_v1() -> Dict:
     }
 
 
-def build_milkyway_catalog_v1() -> Dict:
+def stars_zones_bin_etag(zone_refs: List[Tuple[int, int]]) -> str:
+    """Zone content changes only with the catalogue, ETag is derived from loaded catalogue version and zone refs."""
+    key = "{}:bin:{}:{}".format(STARS_VERSION, get_loaded_catalogs_version(),
+                                ",".join("L{}Z{}".format(level, zone) for level, zone in zone_refs))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def build_stars_zones_bin_v1() -> Response:
+    zone_refs = _get_requested_zone_refs()
+    etag = stars_zones_bin_etag(zone_refs)
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(iter_stars_zones_bin_v1(zone_refs), mimetype=STARS_BIN_MIMETYPE)
+    response.set_etag(etag)
+    if is_used_catalogs_outdated():
+        # catalogue files were updated after this process loaded them, zones behind the url will change on restart
+        response.headers["Cache-Control"] = "public, no-cache"
+    else:
+        # url carries catalogue version, content behind the url never changes
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
+def iter_stars_zones_bin_v1(zone_refs: List[Tuple[int, int]]):
+    """Yields binary star zones response chunk by chunk, one chunk per zone."""
+    used_catalogs = load_used_catalogs()
+    star_catalog = used_catalogs.star_catalog
+    if star_catalog is None:
+        yield _stars_bin_header.pack(STARS_BIN_MAGIC, 0)
+        return
+
+    yield _stars_bin_header.pack(STARS_BIN_MAGIC, len(zone_refs))
+    for level, zone in zone_refs:
+        zone_sel = star_catalog.select_zone_stars(level, zone, None)
+        yield encode_star_zone_bin(level, zone, zone_sel, bsc_hip_map=used_catalogs.bsc_hip_map)
+
+
+def build_milkyway_catalog_v1() -> Response:
+    quality = request.args.get("quality")
+    if request.args.get("dsv") and quality in MW_QUALITIES:
+        # dataset addressed by digest does not depend on the view
+        return make_scene_dataset_response(get_scene_dataset(_mw_dataset_name(quality, request.args.get("optimized") != "0")))
     req = _resolve_scene_request()
     mode = _mw_mode_with_overrides(req)
     if mode["mode"] == "off":
-        return {
+        return jsonify({
             "version": MW_VERSION,
             "mode": "off",
             "dataset_id": None,
@@ -1252,8 +1497,8 @@ def build_milkyway_catalog_v1() -> Dict:
             "points": [],
             "polygons": [],
             "stats": {"points_count": 0, "polygons_count": 0},
-        }
-    return _get_mw_dataset(mode["quality"], mode["optimized"])
+        })
+    return make_scene_dataset_response(get_scene_dataset(_mw_dataset_name(mode["quality"], mode["optimized"])))
 
 
 def build_milkyway_select_v1() -> Dict:
@@ -1285,12 +1530,12 @@ def build_milkyway_select_v1() -> Dict:
             "selection": [],
             "fade": None,
         }
-    dataset = _get_mw_dataset(mode["quality"], mode["optimized"])
+    dataset = get_scene_dataset(_mw_dataset_name(mode["quality"], mode["optimized"]))
     selection = _select_mw_polygons(used_catalogs, mode["quality"], mode["optimized"], center_ra, center_dec, field_size)
     return {
         "version": MW_VERSION,
         "mode": mode["mode"],
-        "dataset_id": dataset["dataset_id"],
+        "dataset_id": dataset.meta["dataset_id"],
         "quality": mode["quality"],
         "optimized": mode["optimized"],
         "selection": selection,
@@ -1298,13 +1543,13 @@ def build_milkyway_select_v1() -> Dict:
     }
 
 
-def build_dso_outlines_catalog_v1() -> Dict:
-    return _get_dso_outlines_dataset()
+def build_dso_outlines_catalog_v1() -> Response:
+    return make_scene_dataset_response(get_scene_dataset(SCENE_DATASET_DSO_OUTLINES))
 
 
-def build_constellation_lines_catalog_v1() -> Dict:
-    return _get_constellation_lines_dataset()
+def build_constellation_lines_catalog_v1() -> Response:
+    return make_scene_dataset_response(get_scene_dataset(SCENE_DATASET_CONSTELL_LINES))
 
 
-def build_constellation_boundaries_catalog_v1() -> Dict:
-    return _get_constellation_boundaries_dataset()
+def build_constellation_boundaries_catalog_v1() -> Response:
+    return make_scene_dataset_response(get_scene_dataset(SCENE_DATASET_CONSTELL_BOUNDARIES))
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import threading
+from io import BytesIO
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from skyfield.api import load
+
+from .kepler_utils import GeocentricObservation, HeliocentricOrbits, observe_from_earth
+
+COMET_ORBIT_STORE_VERSION = 1
+COMET_ORBIT_STORE_FILE = 'CometEls.npz'
+
+_ELEMENT_COLUMNS = ('q', 'e', 'inc', 'node', 'peri', 'tp', 'magnitude_g', 'magnitude_k')
+
+
+class CometEphemeris(GeocentricObservation):
+    def __init__(self, observation: GeocentricObservation, mag: np.ndarray):
+        super().__init__(observation.ra, observation.dec, observation.dist_earth, observation.dist_sun)
+        self.mag = mag
+
+
+class CometOrbitStore:
+    """
+    Parsed MPC comet elements as arrays indexed by comet_id. Positions and magnitudes of all comets are computed
+    at once, the store is persisted next to the source file and rebuilt only when the source changes.
+    """
+    def __init__(self, comet_ids: Sequence[str], elements: Dict[str, np.ndarray], source_digest: Optional[str] = None):
+        self.comet_ids = np.asarray(comet_ids, dtype=str)
+        self.elements = {name: np.asarray(elements[name], dtype=float) for name in _ELEMENT_COLUMNS}
+        self.source_digest = source_digest
+        self._index = {comet_id: i for i, comet_id in enumerate(self.comet_ids.tolist())}
+        self._orbits = None
+
+    @classmethod
+    def from_dataframe(cls, mpc_comets, ts, source_digest: Optional[str] = None):
+        tp = ts.tt(mpc_comets['perihelion_year'].to_numpy(), mpc_comets['perihelion_month'].to_numpy(),
+                   mpc_comets['perihelion_day'].to_numpy()).tt
+        return cls(mpc_comets['comet_id'].to_numpy(), {
+            'q': mpc_comets['perihelion_distance_au'].to_numpy(),
+            'e': mpc_comets['eccentricity'].to_numpy(),
+            'inc': mpc_comets['inclination_degrees'].to_numpy(),
+            'node': mpc_comets['longitude_of_ascending_node_degrees'].to_numpy(),
+            'peri': mpc_comets['argument_of_perihelion_degrees'].to_numpy(),
+            'tp': np.atleast_1d(tp),
+            'magnitude_g': mpc_comets['magnitude_g'].to_numpy(),
+            'magnitude_k': mpc_comets['magnitude_k'].to_numpy(),
+        }, source_digest)
+
+    @classmethod
+    def load(cls, path: str):
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data['version']) != COMET_ORBIT_STORE_VERSION:
+                    return None
+                return cls(data['comet_id'], {name: data[name] for name in _ELEMENT_COLUMNS}, str(data['source_digest']))
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def save(self, path: str) -> None:
+        tmp_path = path + '.tmp.npz'
+        np.savez_compressed(tmp_path, version=COMET_ORBIT_STORE_VERSION, source_digest=self.source_digest or '',
+                            comet_id=self.comet_ids, **self.elements)
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        return len(self.comet_ids)
+
+    def index_of(self, comet_id: str) -> Optional[int]:
+        return self._index.get(comet_id)
+
+    @property
+    def orbits(self) -> HeliocentricOrbits:
+        if self._orbits is None:
+            el = self.elements
+            self._orbits = HeliocentricOrbits(el['q'], el['e'], el['inc'], el['node'], el['peri'], el['tp'])
+        return self._orbits
+
+    def observe(self, t, eph, indices: Optional[np.ndarray] = None) -> CometEphemeris:
+        """
+        Geocentric positions and total magnitudes at skyfield time t, indices select subset of comets.
+        """
+        orbits = self.orbits
+        g = self.elements['magnitude_g']
+        k = self.elements['magnitude_k']
+        if indices is not None:
+            el = {name: values[indices] for name, values in self.elements.items()}
+            orbits = HeliocentricOrbits(el['q'], el['e'], el['inc'], el['node'], el['peri'], el['tp'])
+            g, k = el['magnitude_g'], el['magnitude_k']
+        observation = observe_from_earth(orbits, t.tt, eph['earth'].at(t).position.au, eph['sun'].at(t).position.au)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mag = g + 5.0 * np.log10(observation.dist_earth) + 2.5 * k * np.log10(observation.dist_sun)
+        return CometEphemeris(observation, mag)
+
+
+_comet_orbit_store_lock = threading.Lock()
+_comet_orbit_store: Optional[CometOrbitStore] = None
+
+
+def get_comet_orbit_store(load_dataframe, source_url: str, reload: bool) -> CometOrbitStore:
+    """
+    Orbit store of the MPC comet file. load_dataframe(fileobj) parses the source when the persisted store
+    is missing or outdated.
+    """
+    global _comet_orbit_store
+    with load.open(source_url, reload=reload) as f:
+        data = f.read()
+    digest = hashlib.sha1(data).hexdigest()
+
+    with _comet_orbit_store_lock:
+        if _comet_orbit_store is not None and _comet_orbit_store.source_digest == digest:
+            return _comet_orbit_store
+
+        store_path = load.path_to(COMET_ORBIT_STORE_FILE)
+        store = CometOrbitStore.load(store_path)
+        if store is None or store.source_digest != digest:
+            store = CometOrbitStore.from_dataframe(load_dataframe(BytesIO(data)), load.timescale(builtin=True), digest)
+            store.save(store_path)
+        _comet_orbit_store = store
+        return store
@@ -31,12 +31,15 @@ from app.models import (
     Constellation,
 )
 from imports.import_utils import progress
+from .comet_orbit_store import CometOrbitStore, get_comet_orbit_store
 
 utc = dt_module.timezone.utc
 
 # comets intended to be periodically updated, so it is not part of import package
 
 all_comets = None
+# comet_id -> row position in all_comets
+all_comets_index = None
 all_comets_expiration = datetime.now() + timedelta(days=1)
 
 
@@ -152,6 +155,7 @@ def find_comet_by_cobs_name(cobs_comet_name):
 
 def get_all_comets(update_cobs_props=True, force_reload=False):
     global all_comets
+    global all_comets_index
     global all_comets_expiration
     now = datetime.now()
     if all_comets is None or now > all_comets_expiration or force_reload:
@@ -171,9 +175,11 @@ def get_all_comets(update_cobs_props=True, force_reload=False):
             all_comets['comet_id'] = np.where(all_comets['designation_packed'].isnull(), all_comets['designation'], all_comets['designation_packed'])
             all_comets['comet_id'] = all_comets['comet_id'].str.replace('/', '')
             all_comets['comet_id'] = all_comets['comet_id'].str.replace(' ', '')
+            all_comets_index = {comet_id: i for i, comet_id in enumerate(all_comets['comet_id'])}
 
         if update_cobs_props:
             after = datetime.today() - timedelta(days=31)
+            cobs_props = {}
             for comet in Comet.query.filter_by().all():
                 mag, coma_diameter = comet.eval_mag, None
                 real_mag = False
@@ -187,24 +193,34 @@ def get_all_comets(update_cobs_props=True, force_reload=False):
                     mag, coma_diameter = get_mag_coma_from_observations(observs)
                     current_app.logger.info('Setup comet mag from COBS comet={} mag={} coma_diameter={}'.format(comet_id, mag, coma_diameter))
                     real_mag = True
+                pos = all_comets_index.get(comet_id)
+                if pos is None:
+                    continue
                 try:
-                    all_comets.loc[all_comets['comet_id'] == comet_id, 'mag'] = float('{:.1f}'.format(mag)) if mag else None
-                    all_comets.loc[all_comets['comet_id'] == comet_id, 'coma_diameter'] = '{:.1f}\''.format(coma_diameter) if coma_diameter else '-'
-                    all_comets.loc[all_comets['comet_id'] == comet_id, 'cur_ra'] = comet.cur_ra_str_short()
-                    all_comets.loc[all_comets['comet_id'] == comet_id, 'cur_dec'] = comet.cur_dec_str_short()
                     constell = Constellation.get_constellation_by_id(comet.cur_constell_id)
-                    all_comets.loc[all_comets['comet_id'] == comet_id, 'cur_constell'] = constell.iau_code if constell is not None else ''
-                    all_comets.loc[all_comets['comet_id'] == comet_id, 'real_mag'] = real_mag
+                    cobs_props[all_comets.index[pos]] = {
+                        'mag': float('{:.1f}'.format(mag)) if mag else None,
+                        'coma_diameter': '{:.1f}\''.format(coma_diameter) if coma_diameter else '-',
+                        'cur_ra': comet.cur_ra_str_short(),
+                        'cur_dec': comet.cur_dec_str_short(),
+                        'cur_constell': constell.iau_code if constell is not None else '',
+                        'real_mag': real_mag,
+                    }
                 except Exception:
                     pass
 
+            if cobs_props:
+                labels = list(cobs_props.keys())
+                for column in ('mag', 'coma_diameter', 'cur_ra', 'cur_dec', 'cur_constell', 'real_mag'):
+                    all_comets.loc[labels, column] = [props[column] for props in cobs_props.values()]
+
     return all_comets
 
 
 def find_mpc_comet(comet_id):
     all_comets = get_all_comets()
-    c = all_comets.loc[all_comets['comet_id'] == comet_id]
-    return c.iloc[0] if len(c) > 0 else None
+    pos = all_comets_index.get(comet_id)
+    return all_comets.iloc[pos] if pos is not None else None
 
 
 def get_mpc_comet_position(mpc_comet, dt):
@@ -219,16 +235,36 @@ def get_mpc_comet_position(mpc_comet, dt):
     return comet_ra_ang, comet_dec_ang
 
 
+def _load_mpc_comets_dataframe(f):
+    all_mpc_comets = mpc.load_comets_dataframe_slow(f)
+    all_mpc_comets = (all_mpc_comets.sort_values('reference')
+                      .groupby('designation', as_index=False).last()
+                      .set_index('designation', drop=False))
+    all_mpc_comets['comet_id'] = np.where(all_mpc_comets['designation_packed'].isnull(), all_mpc_comets['designation'], all_mpc_comets['designation_packed'])
+    all_mpc_comets['comet_id'] = all_mpc_comets['comet_id'].str.replace('/','')
+    all_mpc_comets['comet_id'] = all_mpc_comets['comet_id'].str.replace(' ', '')
+    return all_mpc_comets
+
+
 def load_all_mpc_comets(reload_comets):
     with load.open(mpc.COMET_URL, reload=reload_comets) as f:
-        all_mpc_comets = mpc.load_comets_dataframe_slow(f)
-        all_mpc_comets = (all_mpc_comets.sort_values('reference')
-                          .groupby('designation', as_index=False).last()
-                          .set_index('designation', drop=False))
-        all_mpc_comets['comet_id'] = np.where(all_mpc_comets['designation_packed'].isnull(), all_mpc_comets['designation'], all_mpc_comets['designation_packed'])
-        all_mpc_comets['comet_id'] = all_mpc_comets['comet_id'].str.replace('/','')
-        all_mpc_comets['comet_id'] = all_mpc_comets['comet_id'].str.replace(' ', '')
-        return all_mpc_comets
+        return _load_mpc_comets_dataframe(f)
+
+
+def _get_comet_orbit_store(all_mpc_comets, reload_comets):
+    if all_mpc_comets is not None:
+        return CometOrbitStore.from_dataframe(all_mpc_comets, load.timescale(builtin=True))
+    return get_comet_orbit_store(_load_mpc_comets_dataframe, mpc.COMET_URL, reload_comets)
+
+
+def _bulk_update_comets(mappings, progress_title):
+    try:
+        db.session.bulk_update_mappings(Comet, mappings)
+        db.session.commit()
+    except IntegrityError as err:
+        current_app.logger.error('\nIntegrity error {}'.format(err))
+        db.session.rollback()
+    current_app.logger.info('{} {} comets.'.format(progress_title, len(mappings)))
 
 
 def _save_comets(comets, show_progress, progress_title):
@@ -302,31 +338,20 @@ def import_update_comets(all_mpc_comets, show_progress=False):
 
 
 def update_evaluated_comet_brightness(all_mpc_comets=None, show_progress=False, reload_comets=True):
-    if all_mpc_comets is None:
-        all_mpc_comets = load_all_mpc_comets(reload_comets)
+    store = _get_comet_orbit_store(all_mpc_comets, reload_comets)
     ts = load.timescale(builtin=True)
     eph = load('de421.bsp')
-    sun, earth = eph['sun'], eph['earth']
     t = ts.now()
 
-    comets = []
-    for index, mpc_comet in all_mpc_comets.iterrows():
-        m = 22.0
-        try:
-            skf_comet = sun + mpc.comet_orbit(mpc_comet, ts, GM_SUN)
-            dist_earth = earth.at(t).observe(skf_comet).distance().au
-            dist_sun = sun.at(t).observe(skf_comet).distance().au
-            m = mpc_comet['magnitude_g'] + 5.0*np.log10(dist_earth) + 2.5*mpc_comet['magnitude_k']*np.log10(dist_sun)
-            current_app.logger.info('Comet: {} de={} ds={} m={} g={}'.format(mpc_comet['designation'], dist_earth, dist_sun, m, mpc_comet['magnitude_k']))
-            comet = Comet.query.filter_by(comet_id=mpc_comet['comet_id']).first()
-            if comet:
-                comet.eval_mag = m
-                comets.append(comet)
-        except Exception as err:
-            current_app.logger.error('\nError {}'.format(err))
-            pass
-
-    _save_comets(comets, show_progress, 'Saving comets...')
+    ephemeris = store.observe(t, eph)
+    mappings = []
+    for comet_row_id, comet_id in db.session.query(Comet.id, Comet.comet_id).all():
+        i = store.index_of(comet_id)
+        if i is None or not np.isfinite(ephemeris.mag[i]):
+            continue
+        mappings.append({'id': comet_row_id, 'eval_mag': float(ephemeris.mag[i])})
+
+    _bulk_update_comets(mappings, 'Evaluated brightness of')
     current_app.logger.info('Comets\' evaluated brightness updated.')
 
 
@@ -442,8 +467,7 @@ def update_comets_cobs_observations():
 
 
 def update_comets_positions(all_mpc_comets=None, show_progress=False, reload_comets=True):
-    if all_mpc_comets is None:
-        all_mpc_comets = load_all_mpc_comets(reload_comets)
+    store = _get_comet_orbit_store(all_mpc_comets, reload_comets)
 
     ts = load.timescale(builtin=True)
     eph = load('de421.bsp')
@@ -455,21 +479,31 @@ def update_comets_positions(all_mpc_comets=None, show_progress=False, reload_com
     sun_ra = sun_ra_ang.radians
     sun_dec = sun_dec_ang.radians
 
-    comets = []
-
-    for db_comet in Comet.query.all():
-        c = all_mpc_comets.loc[all_mpc_comets['comet_id'] == db_comet.comet_id]
-        mpc_comet = c.iloc[0] if len(c) > 0 else None
-        if mpc_comet is not None:
-            skf_comet = sun + mpc.comet_orbit(mpc_comet, ts, GM_SUN)
-            ra_ang, dec_ang, distance = earth.at(t).observe(skf_comet).radec()
-            db_comet.cur_ra = ra_ang.radians
-            db_comet.cur_dec = dec_ang.radians
-            db_comet.cur_tail_pa = pos_angle(db_comet.cur_ra, db_comet.cur_dec, sun_ra, sun_dec)
-            const_code = constellation_at(position_from_radec(ra_ang.radians / np.pi * 12.0, dec_ang.radians / np.pi * 180.0))
-            db_comet.cur_constell_id = Constellation.get_constellation_by_iau_code(const_code).id if const_code else None
-
-            comets.append(db_comet)
-
-    _save_comets(comets, show_progress, 'Saving comets...')
+    db_comets = []
+    indices = []
+    for comet_row_id, comet_id in db.session.query(Comet.id, Comet.comet_id).all():
+        i = store.index_of(comet_id)
+        if i is not None:
+            db_comets.append(comet_row_id)
+            indices.append(i)
+    if not indices:
+        current_app.logger.info('Comets\' positions updated.')
+        return
+
+    ephemeris = store.observe(t, eph, np.array(indices))
+    const_codes = constellation_at(position_from_radec(ephemeris.ra / np.pi * 12.0, ephemeris.dec / np.pi * 180.0))
+
+    mappings = []
+    for k, comet_row_id in enumerate(db_comets):
+        ra, dec = float(ephemeris.ra[k]), float(ephemeris.dec[k])
+        constell = Constellation.get_constellation_by_iau_code(const_codes[k]) if const_codes[k] else None
+        mappings.append({
+            'id': comet_row_id,
+            'cur_ra': ra,
+            'cur_dec': dec,
+            'cur_tail_pa': pos_angle(ra, dec, sun_ra, sun_dec),
+            'cur_constell_id': constell.id if constell else None,
+        })
+
+    _bulk_update_comets(mappings, 'Updated positions of')
     current_app.logger.info('Comets\' positions updated.')
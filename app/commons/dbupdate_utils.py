@@ -1,5 +1,5 @@
 from datetime import datetime
-from app.models import DbUpdate
+from app.models import DbUpdate, DB_CATALOGUE_VERSION_PREFIX
 
 from app import db
 
@@ -24,3 +24,23 @@ def ask_dbupdate_permit(dbupdate_key, expired_time_delta):
         return True
 
     return False
+
+
+def get_catalogue_version(table_name):
+    """
+    Version of catalogue table shared by all processes, incremented by mark_catalogue_updated.
+    """
+    count = db.session.query(DbUpdate.count).filter_by(id=DB_CATALOGUE_VERSION_PREFIX + table_name.upper()).scalar()
+    return count or 0
+
+
+def mark_catalogue_updated(table_name):
+    dbu = DbUpdate.query.filter_by(id=DB_CATALOGUE_VERSION_PREFIX + table_name.upper()).first()
+    if not dbu:
+        dbu = DbUpdate()
+        dbu.id = DB_CATALOGUE_VERSION_PREFIX + table_name.upper()
+        dbu.expired = None
+        dbu.count = 0
+    dbu.count += 1
+    db.session.add(dbu)
+    db.session.commit()
@@ -0,0 +1,67 @@
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping, Optional, Tuple
+
+
+def parse_dso_lookup_name(dso_name: str) -> Tuple[str, str]:
+    """
+    Catalogue and designation of DSO name ('NGC 1909', 'IC443', 'Sh2-155', 'M-1-92', ...) as parsed by
+    fchart3 UsedCatalogs.lookup_dso.
+    """
+    index = 0
+    cat = ''
+    if dso_name[0:3] == 'Sh2':
+        cat = 'Sh2'
+        index = 4
+    elif dso_name[0:2].upper() == '3C':
+        cat = '3C'
+        index = 2
+    else:
+        i = 0
+        for i, ch in enumerate(dso_name):
+            if ch.isalpha():
+                cat += ch
+            else:
+                index = i
+                break
+        if cat == 'M' and i + 1 < len(dso_name) and dso_name[i + 1] in '-_':
+            cat = 'Mi'
+        if cat.upper() == 'N' or cat == '':
+            cat = 'NGC'
+        if cat.upper() in ('I', 'IC'):
+            cat = 'IC'
+    return cat, dso_name[index:].upper().strip()
+
+
+class DsoNameIndex:
+    """
+    Immutable (catalogue, designation) -> DSO map of the loaded deepsky catalogue. Built once when catalogues
+    are loaded, so forked workers share it. Resolves names to the same object as the linear
+    UsedCatalogs.lookup_dso: first object in catalogue order matching by own names or by synonym.
+    """
+    def __init__(self, deeplist: Iterable[Any], messierlist: Iterable[Any]):
+        names = {}
+        for dso in deeplist:
+            cat = dso.cat.upper()
+            for name in dso.all_names:
+                names.setdefault((cat, name), dso)
+            for syn_cat, syn_name in dso.synonyms:
+                names.setdefault((syn_cat.upper(), syn_name), dso)
+        messier = {}
+        for mdso in messierlist:
+            messier.setdefault(mdso.messier, mdso)
+        self._names: Mapping[Tuple[str, str], Any] = MappingProxyType(names)
+        self._messier: Mapping[int, Any] = MappingProxyType(messier)
+
+    def __len__(self):
+        return len(self._names)
+
+    def lookup(self, dso_name: str) -> Optional[Any]:
+        if not dso_name:
+            return None
+        cat, name = parse_dso_lookup_name(dso_name)
+        if cat.upper() == 'M':
+            try:
+                return self._messier.get(int(name))
+            except ValueError:
+                return None
+        return self._names.get((cat.upper(), name))
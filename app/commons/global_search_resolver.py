@@ -8,17 +8,16 @@ from sqlalchemy import func
 from app.commons.search_sky_object_utils import (
     _search_by_bayer_flamsteed,
     _search_star_from_catalog,
-    search_comet,
     search_constellation,
     search_double_star,
     search_dso,
     search_earth_moon,
-    search_minor_planet,
+    search_named_object,
     search_planet,
     search_planet_moon,
     search_star,
 )
-from app.models import Star
+from app.models import Star, SEARCH_NAME_STAR
 
 
 def _search_star_safe(query: str):
@@ -96,20 +95,16 @@ def resolve_global_object(query: str) -> dict[str, Any] | None:
             "object": planet_moon,
         }
 
-    comet = search_comet(query)
-    if comet:
-        return {
-            "matched_by": "comet",
-            "object_type": "comet",
-            "object": comet,
-        }
-
-    minor_planet = search_minor_planet(query)
-    if minor_planet:
-        return {
-            "matched_by": "minor_planet",
-            "object_type": "minor_planet",
-            "object": minor_planet,
+    # comets, minor planets and names and aliases of other catalogue objects
+    object_type, obj = search_named_object(query)
+    if obj:
+        result = {
+            "matched_by": object_type,
+            "object_type": object_type,
+            "object": obj,
         }
+        if object_type == SEARCH_NAME_STAR:
+            result["user_description"] = None
+        return result
 
     return None
@@ -4,16 +4,12 @@ from flask import (
 
 from flask_login import current_user
 
-from sqlalchemy import or_
-
 from app.models import (
-    DeepskyObject,
     DoubleStarList,
     DsoList,
     DsoListItem,
     ObservingSession,
     ObservedList,
-    ObservedListItem,
     ObsSessionPlanRun,
     ObservationTargetType,
     SessionPlan,
@@ -27,6 +23,7 @@ from app.models import (
 from app import db
 
 from app.commons.permission_utils import allow_view_session_plan, allow_view_user_object_list
+from app.commons.user_membership_cache import get_observed_ids
 from .dso_utils import (
     CHART_DOUBLE_STAR_PREFIX,
     CHART_COMET_PREFIX,
@@ -175,41 +172,22 @@ def create_observed_dso_ids_list():
     return None
 
 
+def _filter_observed(dso_ids_query):
+    observed = get_observed_ids(current_user.id)
+    return set(r[0] for r in dso_ids_query.all() if r[0] in observed)
+
+
 def find_wish_list_observed(wish_list):
     if not current_user.is_anonymous and wish_list:
-        observed_query = db.session.query(WishListItem.dso_id) \
-            .filter(WishListItem.wish_list_id == wish_list.id) \
-            .join(WishListItem.deepsky_object)
-        observed_subquery = db.session.query(ObservedListItem.dso_id) \
-            .join(ObservedList) \
-            .filter(ObservedList.user_id == current_user.id) \
-            .filter(ObservedListItem.dso_id.is_not(None))
-        observed_query = observed_query.filter(or_(WishListItem.dso_id.in_(observed_subquery), DeepskyObject.master_id.in_(observed_subquery)))
-        return set(r[0] for r in observed_query.all())
+        return _filter_observed(db.session.query(WishListItem.dso_id).filter(WishListItem.wish_list_id == wish_list.id))
     return None
 
 def find_dso_list_observed(dso_list_id):
     if not current_user.is_anonymous:
-        observed_query = db.session.query(DsoListItem.dso_id) \
-            .filter(DsoListItem.dso_list_id == dso_list_id) \
-            .join(DsoListItem.deepsky_object)
-        observed_subquery = db.session.query(ObservedListItem.dso_id) \
-            .join(ObservedList) \
-            .filter(ObservedList.user_id == current_user.id) \
-            .filter(ObservedListItem.dso_id.is_not(None))
-        observed_query = observed_query.filter(or_(DsoListItem.dso_id.in_(observed_subquery), DeepskyObject.master_id.in_(observed_subquery)))
-        return set(r[0] for r in observed_query.all())
+        return _filter_observed(db.session.query(DsoListItem.dso_id).filter(DsoListItem.dso_list_id == dso_list_id))
     return None
 
 def find_session_plan_observed(session_plan):
     if not current_user.is_anonymous and session_plan:
-        observed_query = db.session.query(SessionPlanItem.dso_id) \
-            .filter(SessionPlanItem.session_plan_id == session_plan.id) \
-            .join(SessionPlanItem.deepsky_object)
-        observed_subquery = db.session.query(ObservedListItem.dso_id) \
-            .join(ObservedList) \
-            .filter(ObservedList.user_id == current_user.id) \
-            .filter(ObservedListItem.dso_id.is_not(None))
-        observed_query = observed_query.filter(or_(SessionPlanItem.dso_id.in_(observed_subquery), DeepskyObject.master_id.in_(observed_subquery)))
-        return set(r[0] for r in observed_query.all())
+        return _filter_observed(db.session.query(SessionPlanItem.dso_id).filter(SessionPlanItem.session_plan_id == session_plan.id))
     return None
@@ -0,0 +1,141 @@
+"""
+Vectorized two-body propagation of heliocentric orbits and their geocentric observation.
+
+Orbits are given by perihelion elements referred to ecliptic J2000 (as in MPC comet and MPCORB files),
+all bodies are propagated to one epoch in a single NumPy pass. Results agree with skyfield
+sun + KeplerOrbit observed from Earth (light-time corrected astrometric position), the Sun is taken
+as not moving during light-time.
+"""
+import numpy as np
+from skyfield.constants import AU_KM, C_AUDAY, DAY_S, GM_SUN_Pitjeva_2005_km3_s2
+from skyfield.data.spice import inertial_frames
+
+GM_SUN_AU3_D2 = GM_SUN_Pitjeva_2005_km3_s2 * DAY_S * DAY_S / AU_KM ** 3
+
+_ECLIPJ2000_TO_ICRF = inertial_frames['ECLIPJ2000'].T
+# eccentricities closer to 1 are solved as parabolic orbits
+PARABOLIC_TOLERANCE = 1e-8
+KEPLER_ITERATIONS = 50
+
+
+class HeliocentricOrbits:
+    """
+    Orbital elements of many bodies. Angles in degrees, perihelion distance q in au, perihelion time tp as TT Julian date.
+    """
+    def __init__(self, q, e, inc_deg, node_deg, peri_deg, tp):
+        self.q = np.asarray(q, dtype=float)
+        self.e = np.asarray(e, dtype=float)
+        self.tp = np.asarray(tp, dtype=float)
+        self._rotation = _perifocal_to_icrf(np.radians(inc_deg), np.radians(node_deg), np.radians(peri_deg))
+
+    @classmethod
+    def from_mean_anomaly(cls, a, e, inc_deg, node_deg, peri_deg, mean_anomaly_deg, epoch_tt):
+        """
+        Elliptic orbits given by semimajor axis and mean anomaly at epoch (MPCORB).
+        """
+        a = np.asarray(a, dtype=float)
+        n = np.sqrt(GM_SUN_AU3_D2 / a ** 3)
+        tp = np.asarray(epoch_tt, dtype=float) - np.radians(np.asarray(mean_anomaly_deg, dtype=float)) / n
+        return cls(a * (1.0 - np.asarray(e, dtype=float)), e, inc_deg, node_deg, peri_deg, tp)
+
+    def __len__(self):
+        return len(self.q)
+
+    def positions(self, t_tt):
+        """
+        Heliocentric ICRF positions in au at TT Julian date (scalar or per body array), shape (3, n).
+        """
+        x, y = _perifocal_xy(self.q, self.e, np.asarray(t_tt, dtype=float) - self.tp)
+        return np.einsum('ijn,jn->in', self._rotation, np.array([x, y]))
+
+
+def _perifocal_to_icrf(inc, node, peri):
+    """
+    Rotation matrices (3, 2, n) of perifocal x, y axes to ICRF.
+    """
+    cos_node, sin_node = np.cos(node), np.sin(node)
+    cos_peri, sin_peri = np.cos(peri), np.sin(peri)
+    cos_inc, sin_inc = np.cos(inc), np.sin(inc)
+    p = np.array([cos_node * cos_peri - sin_node * sin_peri * cos_inc,
+                  sin_node * cos_peri + cos_node * sin_peri * cos_inc,
+                  sin_peri * sin_inc])
+    q = np.array([-cos_node * sin_peri - sin_node * cos_peri * cos_inc,
+                  -sin_node * sin_peri + cos_node * cos_peri * cos_inc,
+                  cos_peri * sin_inc])
+    ecliptic = np.stack([p, q], axis=1)
+    return np.einsum('ij,jkn->ikn', _ECLIPJ2000_TO_ICRF, ecliptic)
+
+
+def _perifocal_xy(q, e, dt):
+    """
+    Position in orbital plane (perihelion on x axis) dt days after perihelion.
+    """
+    x = np.empty(len(q))
+    y = np.empty(len(q))
+    dt = np.broadcast_to(dt, q.shape)
+
+    parabolic = np.abs(e - 1.0) < PARABOLIC_TOLERANCE
+    elliptic = (e < 1.0) & ~parabolic
+    hyperbolic = (e > 1.0) & ~parabolic
+
+    if elliptic.any():
+        qe, ee = q[elliptic], e[elliptic]
+        a = qe / (1.0 - ee)
+        m = np.sqrt(GM_SUN_AU3_D2 / a ** 3) * dt[elliptic]
+        m = np.mod(m + np.pi, 2.0 * np.pi) - np.pi
+        ea = m + 0.85 * ee * np.sign(np.sin(m))
+        for _ in range(KEPLER_ITERATIONS):
+            ea = ea - (ea - ee * np.sin(ea) - m) / (1.0 - ee * np.cos(ea))
+        x[elliptic] = a * (np.cos(ea) - ee)
+        y[elliptic] = a * np.sqrt(1.0 - ee * ee) * np.sin(ea)
+
+    if hyperbolic.any():
+        qh, eh = q[hyperbolic], e[hyperbolic]
+        a = qh / (eh - 1.0)
+        m = np.sqrt(GM_SUN_AU3_D2 / a ** 3) * dt[hyperbolic]
+        ha = np.sign(m) * np.log(2.0 * np.abs(m) / eh + 1.8)
+        for _ in range(KEPLER_ITERATIONS):
+            ha = ha - (eh * np.sinh(ha) - ha - m) / (eh * np.cosh(ha) - 1.0)
+        x[hyperbolic] = a * (eh - np.cosh(ha))
+        y[hyperbolic] = a * np.sqrt(eh * eh - 1.0) * np.sinh(ha)
+
+    if parabolic.any():
+        qp = q[parabolic]
+        # Barker's equation s^3 + 3s = w, s = tan(true anomaly / 2)
+        w = 3.0 * np.sqrt(GM_SUN_AU3_D2 / (2.0 * qp ** 3)) * dt[parabolic]
+        c = np.cbrt(w / 2.0 + np.sqrt(w * w / 4.0 + 1.0))
+        s = c - 1.0 / c
+        x[parabolic] = qp * (1.0 - s * s)
+        y[parabolic] = 2.0 * qp * s
+
+    return x, y
+
+
+class GeocentricObservation:
+    """
+    Astrometric ra/dec (radians) and distances (au) of the bodies.
+    """
+    def __init__(self, ra, dec, dist_earth, dist_sun):
+        self.ra = ra
+        self.dec = dec
+        self.dist_earth = dist_earth
+        self.dist_sun = dist_sun
+
+
+def observe_from_earth(orbits: HeliocentricOrbits, t_tt, earth_bcrs_au, sun_bcrs_au, light_time_iterations=3):
+    """
+    Light-time corrected geocentric positions of all orbits at TT Julian date t_tt. Barycentric positions
+    of Earth and Sun at t_tt are taken from the ephemeris by the caller.
+    """
+    earth = np.asarray(earth_bcrs_au, dtype=float).reshape(3, 1)
+    sun = np.asarray(sun_bcrs_au, dtype=float).reshape(3, 1)
+    light_time = np.zeros(len(orbits))
+    for _ in range(light_time_iterations):
+        helio = orbits.positions(t_tt - light_time)
+        geo = sun + helio - earth
+        dist_earth = np.sqrt(np.sum(geo * geo, axis=0))
+        light_time = dist_earth / C_AUDAY
+    ra = np.mod(np.arctan2(geo[1], geo[0]), 2.0 * np.pi)
+    dec = np.arcsin(np.clip(geo[2] / dist_earth, -1.0, 1.0))
+    dist_sun = np.sqrt(np.sum(helio * helio, axis=0))
+    return GeocentricObservation(ra, dec, dist_earth, dist_sun)
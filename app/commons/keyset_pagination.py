@@ -0,0 +1,137 @@
+"""
+Keyset (seek) pagination of catalogue list pages.
+
+Pages are still addressed by page number. The sort key of the last row of each served page is remembered per filter
+signature, next pages are read by seeking after the nearest remembered key instead of OFFSET scan from
+the beginning, pages near the end are read in reversed order from the end. Total counts are cached per filter
+signature as well. Cache entries are bound to catalogue version (see dbupdate_utils.mark_catalogue_updated),
+so they are dropped when the catalogue is updated.
+"""
+import threading
+from typing import Any, List, Tuple
+
+from lru import LRU
+from sqlalchemy import and_, or_
+
+from app.commons.dbupdate_utils import get_catalogue_version
+
+# filter signatures with cached total count
+KEYSET_COUNT_CACHE_SIZE = 4096
+# filter signature, sort and page size combinations with cached page keys
+KEYSET_PAGES_CACHE_SIZE = 1024
+# remembered page keys of one combination
+KEYSET_MAX_PAGE_KEYS = 2048
+
+_cache_lock = threading.Lock()
+_counts = LRU(KEYSET_COUNT_CACHE_SIZE)
+_page_keys = LRU(KEYSET_PAGES_CACHE_SIZE)
+
+
+def clear_keyset_pagination_cache():
+    with _cache_lock:
+        _counts.clear()
+        _page_keys.clear()
+
+
+def _filter_signature(query):
+    compiled = query.statement.compile()
+    return str(compiled), tuple(sorted((name, repr(value)) for name, value in compiled.params.items()))
+
+
+def _split_sort(sort_def, sort_by, default_sort_field):
+    column, desc = None, False
+    if sort_by:
+        desc = sort_by[0] == '-'
+        column = sort_def.get(sort_by[1:] if desc else sort_by)
+    if column is None:
+        column, desc = default_sort_field, False
+    return column, desc
+
+
+def _order_by(column, tiebreaker, desc):
+    if column is tiebreaker:
+        return [tiebreaker.desc() if desc else tiebreaker.asc()]
+    if desc:
+        return [column.desc().nulls_first(), tiebreaker.desc()]
+    return [column.asc().nulls_last(), tiebreaker.asc()]
+
+
+def _seek_filter(column, tiebreaker, desc, key):
+    """ Rows following row with key (column value, tiebreaker value) in _order_by order """
+    value, key_id = key
+    if column is tiebreaker:
+        return tiebreaker < key_id if desc else tiebreaker > key_id
+    if desc:
+        if value is None:
+            return or_(and_(column.is_(None), tiebreaker < key_id), column.isnot(None))
+        return and_(column.isnot(None), or_(column < value, and_(column == value, tiebreaker < key_id)))
+    if value is None:
+        return and_(column.is_(None), tiebreaker > key_id)
+    return or_(column > value, and_(column == value, tiebreaker > key_id), column.is_(None))
+
+
+def _row_key(row, column, tiebreaker):
+    return getattr(row, column.key), getattr(row, tiebreaker.key)
+
+
+def _nearest_page_key(page_keys, page):
+    if not page_keys:
+        return 0, None
+    lower_pages = [p for p in page_keys if p < page]
+    if not lower_pages:
+        return 0, None
+    key_page = max(lower_pages)
+    return key_page, page_keys[key_page]
+
+
+def paginate_catalogue_query(query, sort_def, sort_by, default_sort_field, tiebreaker, page, per_page,
+                             catalogue_table) -> Tuple[List[Any], int]:
+    """
+    Rows of the page and total count of rows of filtered catalogue query. Rows are ordered by sort_def column
+    selected by sort_by (or default_sort_field) and tiebreaker (primary key), so page boundaries are stable.
+    """
+    column, desc = _split_sort(sort_def, sort_by, default_sort_field)
+    version = get_catalogue_version(catalogue_table)
+    signature = (catalogue_table, version) + _filter_signature(query)
+
+    with _cache_lock:
+        total = _counts.get(signature)
+    if total is None:
+        total = query.count()
+        with _cache_lock:
+            _counts[signature] = total
+
+    start = (page - 1) * per_page
+    if page < 1 or start >= total:
+        return [], total
+    end = min(start + per_page, total)
+
+    pages_signature = signature + (column.key, desc, per_page)
+    with _cache_lock:
+        page_keys = _page_keys.get(pages_signature)
+        key_page, key = _nearest_page_key(page_keys, page)
+
+    forward_skip = start - key_page * per_page
+    backward_skip = total - end
+    if backward_skip < forward_skip:
+        rows = query.order_by(*_order_by(column, tiebreaker, not desc)).limit(end - start).offset(backward_skip).all()
+        rows.reverse()
+    else:
+        page_query = query
+        if key is not None:
+            page_query = page_query.filter(_seek_filter(column, tiebreaker, desc, key))
+        page_query = page_query.order_by(*_order_by(column, tiebreaker, desc)).limit(per_page)
+        if forward_skip > 0:
+            page_query = page_query.offset(forward_skip)
+        rows = page_query.all()
+
+    if rows:
+        with _cache_lock:
+            page_keys = _page_keys.get(pages_signature)
+            if page_keys is None:
+                page_keys = {}
+                _page_keys[pages_signature] = page_keys
+            if len(page_keys) >= KEYSET_MAX_PAGE_KEYS:
+                page_keys.pop(next(iter(page_keys)))
+            page_keys[page] = _row_key(rows[-1], column, tiebreaker)
+    return rows, total
@@ -0,0 +1,82 @@
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from skyfield.timelib import julian_day
+
+from .kepler_utils import GeocentricObservation, HeliocentricOrbits, observe_from_earth
+
+_ELEMENT_COLUMNS = ('a', 'e', 'inc', 'node', 'peri', 'mean_anomaly', 'epoch')
+
+
+def _unpack_mpc_digit(c: str) -> int:
+    return ord(c) - (48 if c.isdigit() else 55)
+
+
+def unpack_mpc_epochs(epochs_packed: Sequence[str]) -> np.ndarray:
+    """
+    TT Julian dates of MPC packed epochs (e.g. 'K243V'), same as skyfield mpcorb_orbit.
+    """
+    epochs = [str(s).strip() for s in epochs_packed]
+    year = np.array([100 * _unpack_mpc_digit(s[0]) + int(s[1:3]) for s in epochs], dtype=int)
+    month = np.array([_unpack_mpc_digit(s[3]) for s in epochs], dtype=int)
+    day = np.array([_unpack_mpc_digit(s[4]) for s in epochs], dtype=int)
+    return julian_day(year, month, day) - 0.5
+
+
+def apparent_magnitudes_hg(h, g, dist_earth, dist_sun, earth_sun_dist) -> np.ndarray:
+    """
+    Apparent magnitudes in IAU H-G system, NaN where magnitude can't be evaluated.
+    """
+    h = np.asarray(h, dtype=float)
+    g = np.asarray(g, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fac = (dist_sun ** 2 + dist_earth ** 2 - earth_sun_dist ** 2) / (2.0 * dist_sun * dist_earth)
+        beta = np.arccos(np.clip(fac, -1.0, 1.0))
+        tan_half_beta = np.tan(beta / 2.0)
+        psi_1 = np.exp(-3.33 * tan_half_beta ** 0.63)
+        psi_2 = np.exp(-1.87 * tan_half_beta ** 1.22)
+        mag = h + 5.0 * np.log10(dist_sun * dist_earth) - 2.5 * np.log10((1.0 - g) * psi_1 + g * psi_2)
+    mag[~np.isfinite(mag)] = np.nan
+    return mag
+
+
+class MinorPlanetOrbitStore:
+    """
+    MPCORB elements as arrays indexed by packed designation, positions of all minor planets are computed at once.
+    """
+    def __init__(self, designations: Sequence[str], elements: Dict[str, np.ndarray]):
+        self.designations = np.asarray(designations, dtype=str)
+        self.elements = {name: np.asarray(elements[name], dtype=float) for name in _ELEMENT_COLUMNS}
+        self._index = {designation: i for i, designation in enumerate(self.designations.tolist())}
+
+    @classmethod
+    def from_dataframe(cls, mpc_minor_planets):
+        return cls(mpc_minor_planets['designation_packed'].astype(str).str.strip().to_numpy(), {
+            'a': mpc_minor_planets['semimajor_axis_au'].to_numpy(),
+            'e': mpc_minor_planets['eccentricity'].to_numpy(),
+            'inc': mpc_minor_planets['inclination_degrees'].to_numpy(),
+            'node': mpc_minor_planets['longitude_of_ascending_node_degrees'].to_numpy(),
+            'peri': mpc_minor_planets['argument_of_perihelion_degrees'].to_numpy(),
+            'mean_anomaly': mpc_minor_planets['mean_anomaly_degrees'].to_numpy(),
+            'epoch': unpack_mpc_epochs(mpc_minor_planets['epoch_packed']),
+        })
+
+    def __len__(self):
+        return len(self.designations)
+
+    def index_of(self, designation: str) -> Optional[int]:
+        return self._index.get(designation)
+
+    def orbits(self, indices: Optional[np.ndarray] = None) -> HeliocentricOrbits:
+        el = self.elements
+        if indices is not None:
+            el = {name: values[indices] for name, values in el.items()}
+        return HeliocentricOrbits.from_mean_anomaly(el['a'], el['e'], el['inc'], el['node'], el['peri'],
+                                                    el['mean_anomaly'], el['epoch'])
+
+    def observe(self, t, eph, indices: Optional[np.ndarray] = None) -> GeocentricObservation:
+        """
+        Geocentric positions at skyfield time t, indices select subset of minor planets.
+        """
+        return observe_from_earth(self.orbits(indices), t.tt, eph['earth'].at(t).position.au,
+                                  eph['sun'].at(t).position.au)
@@ -22,18 +22,25 @@ from flask import (
     current_app,
 )
 
-from app.models import Constellation, MinorPlanet
+from app.models import Constellation, MinorPlanet, SEARCH_NAME_MINOR_PLANET
 
 from app import db
+from app.commons.minor_planet_orbit_store import MinorPlanetOrbitStore, apparent_magnitudes_hg
+from app.commons.mpcorb_index import MpcorbIndex, build_mpcorb_index, normalize_minor_planet_query
+from app.commons.dbupdate_utils import mark_catalogue_updated
+from app.commons.search_name_index import index_object_search_names
 
-from imports.import_utils import progress
 from imports.import_minor_planets import assign_minor_planet_from_mpc_row
 
 utc = dt_module.timezone.utc
 
 all_minor_planets = None
+minor_planet_orbit_store = None
+mpcorb_excerpt_designations = None
 MPCORB_EXCERPT_FILE = 'data/MPCORB.9999.DAT'
 MPCORB_FULL_GZ_FILE = 'data/MPCORB.DAT.gz'
+MPCORB_FULL_FILE = 'data/MPCORB.DAT'
+MPCORB_INDEX_FILE = 'data/MPCORB.DAT.idx'
 MPCORB_URL = 'https://minorplanetcenter.net/iau/MPCORB/MPCORB.DAT.gz'
 MPCORB_MAX_AGE = timedelta(days=1)
 
@@ -51,9 +58,17 @@ def get_all_mpc_minor_planets():
     return all_minor_planets
 
 
+def get_minor_planet_orbit_store():
+    global minor_planet_orbit_store
+    if minor_planet_orbit_store is None:
+        minor_planet_orbit_store = MinorPlanetOrbitStore.from_dataframe(get_all_mpc_minor_planets())
+    return minor_planet_orbit_store
+
+
 def reset_minor_planets_cache():
-    global all_minor_planets
+    global all_minor_planets, minor_planet_orbit_store
     all_minor_planets = None
+    minor_planet_orbit_store = None
     _get_minor_planet_cached.cache_clear()
 
 
@@ -180,111 +195,91 @@ def update_minor_planet_brightness(minor_planet, mpc_minor_planet=None):
         minor_planet.eval_mag = apparent_magnitude
 
 
-def _save_minor_planets(minor_planets, show_progress, progress_title):
+def _bulk_update_minor_planets(mappings, progress_title):
     try:
-        line_cnt = 1
-        commit_cnt = 0
-        for minor_planet in minor_planets:
-            if show_progress:
-                progress(line_cnt, len(minor_planets), progress_title)
-            line_cnt += 1
-            db.session.add(minor_planet)
-            commit_cnt += 1
-            if commit_cnt % 100 == 0:
-                db.session.commit()
-        if show_progress:
-            print('')
+        db.session.bulk_update_mappings(MinorPlanet, mappings)
         db.session.commit()
     except IntegrityError as err:
         current_app.logger.error('\nIntegrity error {}'.format(err))
         db.session.rollback()
+    current_app.logger.info('{} {} minor planets.'.format(progress_title, len(mappings)))
 
 
-def update_minor_planets_positions(show_progress=False):
-    mpc_minor_planets = get_all_mpc_minor_planets()
+def _observe_db_minor_planets(*columns):
+    """
+    Observe all minor planets in db found in MPCORB excerpt at once. Returns db rows, observation and time.
+    """
+    store = get_minor_planet_orbit_store()
 
     ts = load.timescale(builtin=True)
     eph = load('de421.bsp')
     t = ts.now()
 
-    constellation_at = load_constellation_map()
+    db_minor_planets = []
+    indices = []
+    query = db.session.query(MinorPlanet.id, MinorPlanet.mpc_designation, MinorPlanet.int_designation, *columns)
+    for minor_planet in query.all():
+        i = store.index_of(_get_minor_planet_mpc_designation(minor_planet))
+        if i is not None:
+            db_minor_planets.append(minor_planet)
+            indices.append(i)
+    if not indices:
+        return [], None, eph, t
+    return db_minor_planets, store.observe(t, eph, np.array(indices)), eph, t
 
-    minor_planets = []
 
-    i = 0
-
-    for minor_planet in MinorPlanet.query.all():
-        mpc_mplanet = find_mpc_minor_planet(minor_planet)
-        if mpc_mplanet is not None:
-            _calculate_minor_planet_current_values(minor_planet, mpc_mplanet, ts, eph, t, constellation_at)
-            minor_planets.append(minor_planet)
-            if show_progress:
-                progress(i, len(mpc_minor_planets), 'Evaluating minor planet positions...')
-            elif i % 500 == 0:
-                current_app.logger.info('Updated {} minor planets positions.'.format(i))
-            i += 1
+def update_minor_planets_positions(show_progress=False):
+    db_minor_planets, observation, eph, t = _observe_db_minor_planets()
+    if not db_minor_planets:
+        current_app.logger.info('Minor planets\' positions updated.')
+        return
 
-    _save_minor_planets(minor_planets, show_progress, 'Saving minor planets...')
+    constellation_at = load_constellation_map()
+    const_codes = constellation_at(position_from_radec(observation.ra / np.pi * 12.0, observation.dec / np.pi * 180.0))
+
+    sun_ra_ang, sun_dec_ang, _ = eph['earth'].at(t).observe(eph['sun']).radec()
+    sun_ra, sun_dec = sun_ra_ang.radians, sun_dec_ang.radians
+    dist_from_sun = np.arccos(np.clip(
+        np.sin(observation.dec) * np.sin(sun_dec) +
+        np.cos(observation.dec) * np.cos(sun_dec) * np.cos(observation.ra - sun_ra), -1.0, 1.0))
+
+    mappings = []
+    for k, minor_planet in enumerate(db_minor_planets):
+        constell = Constellation.get_constellation_by_iau_code(const_codes[k]) if const_codes[k] else None
+        mappings.append({
+            'id': minor_planet.id,
+            'cur_ra': float(observation.ra[k]),
+            'cur_dec': float(observation.dec[k]),
+            'cur_constell_id': constell.id if constell else None,
+            'cur_angular_dist_from_sun': float(dist_from_sun[k]),
+        })
+
+    _bulk_update_minor_planets(mappings, 'Updated positions of')
     current_app.logger.info('Minor planets\' positions updated.')
 
 
-def _get_apparent_magnitude_hg( H_absolute_magnitude, G_slope, body_earth_distanceAU, body_sun_distanceAU, earth_sun_distanceAU ):
-    fac = (body_sun_distanceAU**2 + body_earth_distanceAU**2 - earth_sun_distanceAU**2) / (2 * body_sun_distanceAU * body_earth_distanceAU)
-    if fac < -1:
-        fac = -1
-    if fac > 1:
-        fac = 1
-    beta = math.acos(fac)
-
-    # Have found a combination of G_slope, Psi_1 and Psi_2 can lead to a negative value in the log calculation.
-    try:
-        psi_t = math.exp(math.log(math.tan(beta / 2.0)) * 0.63)
-        Psi_1 = math.exp(-3.33 * psi_t)
-        psi_t = math.exp(math.log(math.tan(beta / 2.0)) * 1.22)
-        Psi_2 = math.exp(-1.87 * psi_t)
-
-        apparentMagnitude = H_absolute_magnitude + \
-                            5.0 * math.log10(body_sun_distanceAU * body_earth_distanceAU) - \
-                            2.5 * math.log10((1 - G_slope) * Psi_1 + G_slope * Psi_2)
-    except:
-        apparentMagnitude = None
-
-    return apparentMagnitude
+def _get_apparent_magnitude_hg(H_absolute_magnitude, G_slope, body_earth_distanceAU, body_sun_distanceAU, earth_sun_distanceAU):
+    apparent_magnitude = apparent_magnitudes_hg([H_absolute_magnitude], [G_slope], np.array([body_earth_distanceAU]),
+                                                np.array([body_sun_distanceAU]), np.array([earth_sun_distanceAU]))[0]
+    return None if np.isnan(apparent_magnitude) else float(apparent_magnitude)
 
 
 def update_minor_planets_brightness(show_progress=False):
-    ts = load.timescale(builtin=True)
-    eph = load('de421.bsp')
-    t = ts.now()
-
-    sun, earth = eph['sun'], eph['earth']
+    db_minor_planets, observation, eph, t = _observe_db_minor_planets(MinorPlanet.magnitude_H, MinorPlanet.magnitude_G)
+    if not db_minor_planets:
+        current_app.logger.info('Minor planets\' brightnesses updated.')
+        return
 
-    ra, dec, earth_sun_distance = earth.at(t).observe(sun).apparent().radec()
+    earth_sun = eph['sun'].at(t).position.au - eph['earth'].at(t).position.au
+    earth_sun_distance = np.sqrt(np.sum(earth_sun * earth_sun))
 
-    mpc_minor_planets = get_all_mpc_minor_planets()
+    mags = apparent_magnitudes_hg([mp.magnitude_H for mp in db_minor_planets], [mp.magnitude_G for mp in db_minor_planets],
+                                  observation.dist_earth, observation.dist_sun, earth_sun_distance)
 
-    minor_planets = []
-    i = 0
+    mappings = [{'id': minor_planet.id, 'eval_mag': float(mags[k])}
+                for k, minor_planet in enumerate(db_minor_planets) if not np.isnan(mags[k])]
 
-    for minor_planet in MinorPlanet.query.all():
-        mpc_minor_planet = find_mpc_minor_planet(minor_planet)
-        body = sun + mpc.mpcorb_orbit(mpc_minor_planet, ts, GM_SUN)
-        ra, dec, sun_body_distance = sun.at(t).observe(body).radec()
-        ra, dec, earth_body_distance = earth.at(t).observe(body).apparent().radec()
-
-        apparent_magnitude = _get_apparent_magnitude_hg(minor_planet.magnitude_H, minor_planet.magnitude_G,
-                                                        earth_body_distance.au, sun_body_distance.au,
-                                                        earth_sun_distance.au)
-        if apparent_magnitude:
-            minor_planet.eval_mag = apparent_magnitude
-            minor_planets.append(minor_planet)
-        if show_progress:
-            progress(i, len(mpc_minor_planets), 'Evaluating minor planet brightness...')
-        elif i % 500 == 0:
-            current_app.logger.info('Updated {} minor planets brightness.'.format(i))
-        i += 1
-
-    _save_minor_planets(minor_planets, show_progress, 'Saving minor planets...')
+    _bulk_update_minor_planets(mappings, 'Updated brightness of')
     current_app.logger.info('Minor planets\' brightnesses updated.')
 
 
@@ -316,15 +311,31 @@ def ensure_full_mpcorb_file(force_reload=False):
             current_app.logger.warning('Using stale MPCORB.DAT.gz because refresh failed.', exc_info=True)
             return MPCORB_FULL_GZ_FILE
         raise
+    rebuild_mpcorb_index(MPCORB_FULL_GZ_FILE)
     return MPCORB_FULL_GZ_FILE
 
 
-def _normalize_minor_planet_query(query):
-    return ' '.join((query or '').replace('"', '').strip().split()).lower()
+def rebuild_mpcorb_index(mpcorb_file=None):
+    mpcorb_file = mpcorb_file or ensure_full_mpcorb_file()
+    records = build_mpcorb_index(mpcorb_file, MPCORB_FULL_FILE, MPCORB_INDEX_FILE)
+    current_app.logger.info('MPCORB index rebuilt, {} records.'.format(records))
+    return records
+
+
+def get_mpcorb_index(mpcorb_file=None, build=True):
+    """
+    Index of the full MPCORB file, built when it is missing or older than the downloaded file.
+    """
+    mpcorb_file = mpcorb_file or ensure_full_mpcorb_file()
+    index = MpcorbIndex.open(MPCORB_FULL_FILE, MPCORB_INDEX_FILE, mpcorb_file)
+    if index is None and build:
+        rebuild_mpcorb_index(mpcorb_file)
+        index = MpcorbIndex.open(MPCORB_FULL_FILE, MPCORB_INDEX_FILE, mpcorb_file)
+    return index
 
 
 def _mpcorb_line_matches(line, query):
-    normalized_query = _normalize_minor_planet_query(query)
+    normalized_query = normalize_minor_planet_query(query)
     if not normalized_query:
         return False
 
@@ -341,6 +352,12 @@ def _mpcorb_line_matches(line, query):
 
 def find_mpcorb_line_by_designation(query, mpcorb_file=None):
     mpcorb_file = mpcorb_file or ensure_full_mpcorb_file()
+    index = get_mpcorb_index(mpcorb_file)
+    if index is not None:
+        line = index.find_line(query)
+        # numbers and exact designations/names are indexed, only substring queries fall back to scan
+        if line is not None or normalize_minor_planet_query(query).isdigit():
+            return line
     opener = gzip.open if mpcorb_file.endswith('.gz') else open
     with opener(mpcorb_file, 'rt', encoding='ascii', errors='ignore') as f:
         for current_row, line in enumerate(f, start=1):
@@ -360,33 +377,44 @@ def _load_mpcorb_line(line):
     return minor_planets.iloc[0]
 
 
-def _append_mpcorb_excerpt_line(line):
-    mpc_designation = line[:7].strip()
-    if os.path.exists(MPCORB_EXCERPT_FILE):
+def _get_mpcorb_excerpt_designations():
+    global mpcorb_excerpt_designations
+    if not os.path.exists(MPCORB_EXCERPT_FILE):
+        return set()
+    st = os.stat(MPCORB_EXCERPT_FILE)
+    signature = (st.st_size, st.st_mtime_ns)
+    if mpcorb_excerpt_designations is None or mpcorb_excerpt_designations[0] != signature:
         with open(MPCORB_EXCERPT_FILE, 'r', encoding='ascii', errors='ignore') as f:
-            for existing_line in f:
-                if existing_line[:7].strip() == mpc_designation:
-                    return
+            mpcorb_excerpt_designations = (signature, {line[:7].strip() for line in f})
+    return mpcorb_excerpt_designations[1]
+
+
+def _write_mpcorb_excerpt_lines(lines):
     with open(MPCORB_EXCERPT_FILE, 'a', encoding='ascii') as f:
-        if not line.endswith('\n'):
-            line += '\n'
-        f.write(line)
+        for line in lines:
+            if not line.endswith('\n'):
+                line += '\n'
+            f.write(line)
+
+
+def _append_mpcorb_excerpt_line(line):
+    if line[:7].strip() not in _get_mpcorb_excerpt_designations():
+        _write_mpcorb_excerpt_lines([line])
 
 
 def append_mpcorb_excerpt_lines_by_designations(mpc_designations, mpcorb_file=None):
     needed_designations = {str(x).strip() for x in mpc_designations if x}
+    needed_designations -= _get_mpcorb_excerpt_designations()
     if not needed_designations:
         return
 
-    existing_designations = set()
-    if os.path.exists(MPCORB_EXCERPT_FILE):
-        with open(MPCORB_EXCERPT_FILE, 'r', encoding='ascii', errors='ignore') as f:
-            existing_designations = {line[:7].strip() for line in f}
-    needed_designations -= existing_designations
-    if not needed_designations:
+    mpcorb_file = mpcorb_file or ensure_full_mpcorb_file()
+    index = get_mpcorb_index(mpcorb_file)
+    if index is not None:
+        found_lines = index.find_lines_by_designations(needed_designations)
+        _write_mpcorb_excerpt_lines(found_lines[designation] for designation in sorted(found_lines))
         return
 
-    mpcorb_file = mpcorb_file or ensure_full_mpcorb_file()
     opener = gzip.open if mpcorb_file.endswith('.gz') else open
     found_lines = []
     with opener(mpcorb_file, 'rt', encoding='ascii', errors='ignore') as f:
@@ -396,13 +424,7 @@ def append_mpcorb_excerpt_lines_by_designations(mpc_designations, mpcorb_file=No
                 needed_designations.remove(line[:7].strip())
                 if not needed_designations:
                     break
-
-    if found_lines:
-        with open(MPCORB_EXCERPT_FILE, 'a', encoding='ascii') as f:
-            for line in found_lines:
-                if not line.endswith('\n'):
-                    line += '\n'
-                f.write(line)
+    _write_mpcorb_excerpt_lines(found_lines)
 
 
 def import_minor_planet_by_designation(query):
@@ -438,4 +460,6 @@ def import_minor_planet_by_designation(query):
     update_minor_planet_brightness(minor_planet, mpc_minor_planet)
     db.session.add(minor_planet)
     db.session.commit()
+    index_object_search_names(SEARCH_NAME_MINOR_PLANET, minor_planet)
+    mark_catalogue_updated(MinorPlanet.__tablename__)
     return minor_planet
@@ -0,0 +1,156 @@
+"""
+Seekable copy of the full MPCORB file. The gzipped MPC file is decompressed once per download and a sqlite
+sidecar maps packed designation, number and readable designation/name of every record to its line offset.
+"""
+import gzip
+import os
+import re
+import sqlite3
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MPCORB_INDEX_VERSION = 1
+# records are 202 chars long and start with packed designation, header lines don't
+_MIN_RECORD_LENGTH = 160
+_RECORD_START_RE = re.compile(r'^[0-9A-Za-z~]{5,7}\s')
+_NUMBERED_DESIGNATION_RE = re.compile(r'^\((\d+)\)\s*(.*)$')
+
+
+def normalize_minor_planet_query(query: Optional[str]) -> str:
+    return ' '.join((query or '').replace('"', '').strip().split()).lower()
+
+
+def _mpcorb_line_keys(line: str) -> List[Tuple[str, str]]:
+    keys = [('p', line[:7].strip().lower())]
+    readable = normalize_minor_planet_query(line[166:194])
+    if readable:
+        keys.append(('n', readable))
+        m = _NUMBERED_DESIGNATION_RE.match(readable)
+        if m:
+            keys.append(('#', str(int(m.group(1)))))
+            if m.group(2):
+                keys.append(('n', m.group(2)))
+    return keys
+
+
+def _source_signature(source_file: str) -> str:
+    st = os.stat(source_file)
+    return '{}:{}:{}'.format(MPCORB_INDEX_VERSION, st.st_size, st.st_mtime_ns)
+
+
+def build_mpcorb_index(source_file: str, dat_file: str, index_file: str) -> int:
+    """
+    Decompress source_file (MPCORB.DAT.gz) to dat_file and write the offset index. Returns number of records.
+    """
+    token = uuid.uuid4().hex
+    tmp_dat_file = '{}.{}.tmp'.format(dat_file, token)
+    tmp_index_file = '{}.{}.tmp'.format(index_file, token)
+    opener = gzip.open if source_file.endswith('.gz') else open
+    records = 0
+    try:
+        conn = sqlite3.connect(tmp_index_file)
+        try:
+            conn.execute('CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT)')
+            conn.execute('CREATE TABLE keys (kind TEXT, key TEXT, offset INTEGER, PRIMARY KEY (kind, key)) WITHOUT ROWID')
+            with opener(source_file, 'rb') as src, open(tmp_dat_file, 'wb') as dst:
+                offset = 0
+                batch = []
+                for raw_line in src:
+                    dst.write(raw_line)
+                    line = raw_line.decode('ascii', errors='ignore')
+                    if len(line) >= _MIN_RECORD_LENGTH and _RECORD_START_RE.match(line):
+                        batch.extend((kind, key, offset) for kind, key in _mpcorb_line_keys(line))
+                        records += 1
+                        if len(batch) >= 10000:
+                            conn.executemany('INSERT OR IGNORE INTO keys VALUES (?, ?, ?)', batch)
+                            batch = []
+                    offset += len(raw_line)
+                conn.executemany('INSERT OR IGNORE INTO keys VALUES (?, ?, ?)', batch)
+            conn.execute('INSERT INTO meta VALUES (?, ?)', ('source', _source_signature(source_file)))
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp_dat_file, dat_file)
+        os.replace(tmp_index_file, index_file)
+    finally:
+        for tmp_file in (tmp_dat_file, tmp_index_file):
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+    return records
+
+
+class MpcorbIndex:
+    """
+    Line lookups in the decompressed MPCORB file. Every returned line is checked against the looked up key,
+    so a lookup racing a rebuild returns None instead of a wrong record.
+    """
+    def __init__(self, dat_file: str, index_file: str):
+        self.dat_file = dat_file
+        self.index_file = index_file
+
+    @classmethod
+    def open(cls, dat_file: str, index_file: str, source_file: str) -> Optional['MpcorbIndex']:
+        """
+        Index built from the current source_file, None if it is missing or outdated.
+        """
+        if not (os.path.exists(dat_file) and os.path.exists(index_file) and os.path.exists(source_file)):
+            return None
+        try:
+            conn = sqlite3.connect('file:{}?mode=ro'.format(index_file), uri=True)
+            try:
+                row = conn.execute("SELECT value FROM meta WHERE name='source'").fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        if row is None or row[0] != _source_signature(source_file):
+            return None
+        return cls(dat_file, index_file)
+
+    def _find_offsets(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+        offsets = {}
+        conn = sqlite3.connect('file:{}?mode=ro'.format(self.index_file), uri=True)
+        try:
+            for kind, key in keys:
+                row = conn.execute('SELECT offset FROM keys WHERE kind=? AND key=?', (kind, key)).fetchone()
+                if row is not None:
+                    offsets[(kind, key)] = row[0]
+        finally:
+            conn.close()
+        return offsets
+
+    def _read_lines(self, offsets: Dict[Tuple[str, str], int]) -> Dict[Tuple[str, str], str]:
+        lines = {}
+        with open(self.dat_file, 'rb') as f:
+            for key, offset in offsets.items():
+                f.seek(offset)
+                line = f.readline().decode('ascii', errors='ignore')
+                if key in _mpcorb_line_keys(line):
+                    lines[key] = line
+        return lines
+
+    def find_line(self, query: str) -> Optional[str]:
+        """
+        Record matching packed designation, number, readable designation or name.
+        """
+        normalized_query = normalize_minor_planet_query(query)
+        if not normalized_query:
+            return None
+        keys = [('p', normalized_query)]
+        if normalized_query.isdigit():
+            keys.append(('#', str(int(normalized_query))))
+        else:
+            keys.append(('n', normalized_query))
+        lines = self._read_lines(self._find_offsets(keys))
+        for key in keys:
+            if key in lines:
+                return lines[key]
+        return None
+
+    def find_lines_by_designations(self, mpc_designations: Iterable[str]) -> Dict[str, str]:
+        """
+        Records of packed designations, designations not in the index are left out.
+        """
+        keys = {('p', str(d).strip().lower()): str(d).strip() for d in mpc_designations if d}
+        lines = self._read_lines(self._find_offsets(keys))
+        return {keys[key]: line for key, line in lines.items()}
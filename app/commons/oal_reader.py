@@ -0,0 +1,293 @@
+"""
+Streaming reader of OAL (openastronomylog) files used by observation import.
+
+Unlike parse() of generated openastronomylog module it doesn't build object tree of whole document, elements
+are read by pull parser, only fields consumed by import are extracted and every processed element is cleared.
+Values are converted the same way as generated parser does.
+"""
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+from lxml import etree
+
+from app.commons.openastronomylog import GeneratedsSuper
+
+OAL_READ_CHUNK_SIZE = 64 * 1024
+
+XSI_TYPE_ATTR = '{http://www.w3.org/2001/XMLSchema-instance}type'
+
+
+@dataclass
+class OalMeasure:
+    """ Angle or surface brightness, value is raw text as in generated parser (valueOf_) """
+    value: str
+    unit: Optional[str]
+
+
+@dataclass
+class OalSite:
+    id: Optional[str]
+    name: Optional[str] = None
+    longitude: Optional[OalMeasure] = None
+    latitude: Optional[OalMeasure] = None
+
+
+@dataclass
+class OalSession:
+    id: Optional[str]
+    begin: Optional[datetime] = None
+    end: Optional[datetime] = None
+    site: Optional[str] = None
+    weather: Optional[str] = None
+    equipment: Optional[str] = None
+    comments: Optional[str] = None
+
+
+@dataclass
+class OalTarget:
+    id: Optional[str]
+    xsi_type: Optional[str] = None
+    name: Optional[str] = None
+
+    def is_double_star(self):
+        return self.xsi_type in ('deepSkyDS', 'deepSkyMS')
+
+
+@dataclass
+class OalScope:
+    """ focal_length is read for scopeType only, magnification for fixedMagnificationOpticsType only """
+    id: Optional[str]
+    xsi_type: Optional[str] = None
+    model: Optional[str] = None
+    type: Optional[str] = None
+    vendor: Optional[str] = None
+    aperture: Optional[float] = None
+    focal_length: Optional[float] = None
+    magnification: Optional[float] = None
+
+
+@dataclass
+class OalEyepiece:
+    id: Optional[str]
+    model: Optional[str] = None
+    vendor: Optional[str] = None
+    focal_length: Optional[float] = None
+    apparent_fov: Optional[OalMeasure] = None
+
+
+@dataclass
+class OalLens:
+    id: Optional[str]
+    model: Optional[str] = None
+    vendor: Optional[str] = None
+    factor: Optional[float] = None
+
+
+@dataclass
+class OalFilter:
+    id: Optional[str]
+    model: Optional[str] = None
+    vendor: Optional[str] = None
+    type: Optional[str] = None
+
+
+@dataclass
+class OalObservation:
+    id: Optional[str]
+    site: Optional[str] = None
+    session: Optional[str] = None
+    target: Optional[str] = None
+    begin: Optional[datetime] = None
+    end: Optional[datetime] = None
+    faintest_star: Optional[float] = None
+    sky_quality: Optional[OalMeasure] = None
+    seeing: Optional[int] = None
+    scope: Optional[str] = None
+    eyepiece: Optional[str] = None
+    lens: Optional[str] = None
+    filter: Optional[str] = None
+    results: List[Optional[str]] = field(default_factory=list)
+
+
+@dataclass
+class OalDocument:
+    sites: List[OalSite] = field(default_factory=list)
+    sessions: List[OalSession] = field(default_factory=list)
+    targets: List[OalTarget] = field(default_factory=list)
+    scopes: List[OalScope] = field(default_factory=list)
+    eyepieces: List[OalEyepiece] = field(default_factory=list)
+    lenses: List[OalLens] = field(default_factory=list)
+    filters: List[OalFilter] = field(default_factory=list)
+    observations: List[OalObservation] = field(default_factory=list)
+
+
+def _local_name(tag):
+    # OAL elements except root are unqualified
+    return tag if tag[0] != '{' else tag.rpartition('}')[2]
+
+
+def _children(elem):
+    return {_local_name(child.tag): child for child in elem if isinstance(child.tag, str)}
+
+
+def _text(children, name):
+    child = children.get(name)
+    return child.text if child is not None else None
+
+
+def _float(children, name):
+    text = _text(children, name)
+    return float(text) if text else None
+
+
+def _int(children, name):
+    text = _text(children, name)
+    return int(text) if text else None
+
+
+def _datetime(children, name):
+    text = _text(children, name)
+    if not text:
+        return None
+    if len(text) == 19:
+        # local time without fraction and zone offset, as exported by CzSky
+        return datetime.fromisoformat(text)
+    return GeneratedsSuper.gds_parse_datetime(text)
+
+
+def _measure(children, name):
+    child = children.get(name)
+    if child is None:
+        return None
+    value = child.text or ''
+    for sub_child in child:
+        if sub_child.tail is not None:
+            value += sub_child.tail
+    return OalMeasure(value=value, unit=child.get('unit'))
+
+
+def _xsi_type(elem):
+    xsi_type = elem.get(XSI_TYPE_ATTR)
+    if xsi_type is None:
+        return None
+    return xsi_type.rpartition(':')[2]
+
+
+def _read_site(elem, children):
+    return OalSite(id=elem.get('id'), name=_text(children, 'name'),
+                   longitude=_measure(children, 'longitude'), latitude=_measure(children, 'latitude'))
+
+
+def _read_session(elem, children):
+    return OalSession(id=elem.get('id'), begin=_datetime(children, 'begin'), end=_datetime(children, 'end'),
+                      site=_text(children, 'site'), weather=_text(children, 'weather'),
+                      equipment=_text(children, 'equipment'), comments=_text(children, 'comments'))
+
+
+def _read_target(elem, children):
+    return OalTarget(id=elem.get('id'), xsi_type=_xsi_type(elem), name=_text(children, 'name'))
+
+
+def _read_scope(elem, children):
+    xsi_type = _xsi_type(elem)
+    return OalScope(id=elem.get('id'), xsi_type=xsi_type, model=_text(children, 'model'), type=_text(children, 'type'),
+                    vendor=_text(children, 'vendor'), aperture=_float(children, 'aperture'),
+                    focal_length=_float(children, 'focalLength') if xsi_type == 'scopeType' else None,
+                    magnification=_float(children, 'magnification') if xsi_type == 'fixedMagnificationOpticsType' else None)
+
+
+def _read_eyepiece(elem, children):
+    return OalEyepiece(id=elem.get('id'), model=_text(children, 'model'), vendor=_text(children, 'vendor'),
+                       focal_length=_float(children, 'focalLength'), apparent_fov=_measure(children, 'apparentFOV'))
+
+
+def _read_lens(elem, children):
+    return OalLens(id=elem.get('id'), model=_text(children, 'model'), vendor=_text(children, 'vendor'),
+                   factor=_float(children, 'factor'))
+
+
+def _read_filter(elem, children):
+    return OalFilter(id=elem.get('id'), model=_text(children, 'model'), vendor=_text(children, 'vendor'),
+                     type=_text(children, 'type'))
+
+
+def _read_observation(elem, children):
+    results = []
+    if 'result' in children:
+        for child in elem:
+            if isinstance(child.tag, str) and _local_name(child.tag) == 'result':
+                results.append(_text(_children(child), 'description'))
+    return OalObservation(id=elem.get('id'), site=_text(children, 'site'), session=_text(children, 'session'),
+                          target=_text(children, 'target'), begin=_datetime(children, 'begin'),
+                          end=_datetime(children, 'end'), faintest_star=_float(children, 'faintestStar'),
+                          sky_quality=_measure(children, 'sky-quality'), seeing=_int(children, 'seeing'),
+                          scope=_text(children, 'scope'), eyepiece=_text(children, 'eyepiece'),
+                          lens=_text(children, 'lens'), filter=_text(children, 'filter'), results=results)
+
+
+# section -> (item element, reader), sections are named as OalDocument lists
+_SECTION_READERS = {
+    'sites': ('site', _read_site),
+    'sessions': ('session', _read_session),
+    'targets': ('target', _read_target),
+    'scopes': ('scope', _read_scope),
+    'eyepieces': ('eyepiece', _read_eyepiece),
+    'lenses': ('lens', _read_lens),
+    'filters': ('filter', _read_filter),
+}
+
+# only children of root element are reported by parser, references to sites, targets or equipment
+# nested in observations don't produce events
+_READ_TAGS = ['{*}' + tag for tag in list(_SECTION_READERS) + ['observation']]
+
+
+def _read_element(oal_document, elem):
+    parent = elem.getparent()
+    if parent is None or parent.getparent() is not None:
+        return False
+    tag = _local_name(elem.tag)
+    if tag == 'observation':
+        oal_document.observations.append(_read_observation(elem, _children(elem)))
+        return True
+    item_tag, reader = _SECTION_READERS[tag]
+    items = getattr(oal_document, tag)
+    for child in elem:
+        if isinstance(child.tag, str) and _local_name(child.tag) == item_tag:
+            items.append(reader(child, _children(child)))
+    return True
+
+
+def _free_element(elem):
+    elem.clear()
+    parent = elem.getparent()
+    while elem.getprevious() is not None:
+        del parent[0]
+
+
+def _read_events(parser, oal_document):
+    for _, elem in parser.read_events():
+        if _read_element(oal_document, elem):
+            _free_element(elem)
+
+
+def read_oal_observations(file) -> OalDocument:
+    """
+    Read OAL document from file object (binary or text) or path.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'rb') as f:
+            return read_oal_observations(f)
+
+    oal_document = OalDocument()
+    parser = etree.XMLPullParser(events=('end',), tag=_READ_TAGS, recover=True)
+    while True:
+        data = file.read(OAL_READ_CHUNK_SIZE)
+        if not data:
+            break
+        parser.feed(data)
+        _read_events(parser, oal_document)
+    parser.close()
+    _read_events(parser, oal_document)
+    return oal_document
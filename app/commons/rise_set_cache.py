@@ -0,0 +1,198 @@
+import struct
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from flask import current_app
+from lru import LRU
+from redis import Redis
+from redis.exceptions import RedisError
+
+from app import db
+from app.models import Catalogue, DeepskyObject, Location
+from .rise_set_utils import RiseSetElements, RiseSetEngine, datetime_to_jd
+
+RISE_SET_CACHE_VERSION = 'rs1'
+REDIS_RETRY_INTERVAL = 60.0
+# redis hash of a night is kept this long after the night date
+REDIS_EXPIRE_DAYS = 2
+
+_element_struct = struct.Struct('<dd')
+
+Elements = Tuple[float, float]
+
+
+class LocalRiseSetStore:
+    """
+    Per-process store of rise/set elements, LRU over nights.
+    """
+    def __init__(self, max_nights: int):
+        self._nights = LRU(max(max_nights, 1))
+        self._lock = threading.Lock()
+
+    def get_many(self, night_key: str, dso_ids: Sequence[int]) -> Dict[int, Elements]:
+        with self._lock:
+            night = self._nights.get(night_key)
+            if night is None:
+                return {}
+            return {dso_id: night[dso_id] for dso_id in dso_ids if dso_id in night}
+
+    def put_many(self, night_key: str, for_date: date, elements: Dict[int, Elements]) -> None:
+        with self._lock:
+            night = self._nights.get(night_key)
+            if night is None:
+                night = {}
+                self._nights[night_key] = night
+            night.update(elements)
+
+
+class RedisRiseSetStore:
+    """
+    Rise/set elements shared by all workers, one redis hash per night and location. Local store is used
+    when redis is not available.
+    """
+    def __init__(self, redis_conn, fallback: LocalRiseSetStore):
+        self.redis_conn = redis_conn
+        self.fallback = fallback
+        self._retry_at = 0.0
+
+    def get_many(self, night_key: str, dso_ids: Sequence[int]) -> Dict[int, Elements]:
+        if not dso_ids or not self._redis_available():
+            return self.fallback.get_many(night_key, dso_ids)
+        try:
+            values = self.redis_conn.hmget(night_key, [str(dso_id) for dso_id in dso_ids])
+        except RedisError:
+            self._redis_failed()
+            return self.fallback.get_many(night_key, dso_ids)
+        return {dso_id: _element_struct.unpack(value) for dso_id, value in zip(dso_ids, values) if value is not None}
+
+    def put_many(self, night_key: str, for_date: date, elements: Dict[int, Elements]) -> None:
+        if not elements:
+            return
+        if not self._redis_available():
+            self.fallback.put_many(night_key, for_date, elements)
+            return
+        expire_at = datetime.combine(for_date + timedelta(days=REDIS_EXPIRE_DAYS), datetime.min.time(), tzinfo=timezone.utc)
+        try:
+            pipe = self.redis_conn.pipeline(transaction=False)
+            pipe.hset(night_key, mapping={str(dso_id): _element_struct.pack(*value) for dso_id, value in elements.items()})
+            pipe.expireat(night_key, int(expire_at.timestamp()))
+            pipe.execute()
+        except RedisError:
+            self._redis_failed()
+            self.fallback.put_many(night_key, for_date, elements)
+
+    def _redis_available(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def _redis_failed(self) -> None:
+        current_app.logger.warning('Rise/set cache: redis is not available, using local store.')
+        self._retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+
+
+_rise_set_store_lock = threading.Lock()
+_rise_set_store = None
+
+
+def get_rise_set_store():
+    global _rise_set_store
+    if _rise_set_store is None:
+        with _rise_set_store_lock:
+            if _rise_set_store is None:
+                local_store = LocalRiseSetStore(int(current_app.config.get('RISE_SET_CACHE_LOCAL_NIGHTS', 16)))
+                if current_app.config.get('RISE_SET_CACHE_BACKEND') == 'redis':
+                    redis_conn = Redis(host=current_app.config.get('RQ_DEFAULT_HOST'),
+                                       port=current_app.config.get('RQ_DEFAULT_PORT'),
+                                       db=current_app.config.get('RQ_DEFAULT_DB', 0),
+                                       password=current_app.config.get('RQ_DEFAULT_PASSWORD'),
+                                       socket_timeout=1.0,
+                                       socket_connect_timeout=1.0)
+                    _rise_set_store = RedisRiseSetStore(redis_conn, local_store)
+                else:
+                    _rise_set_store = local_store
+    return _rise_set_store
+
+
+def _to_date(for_date) -> date:
+    if isinstance(for_date, datetime):
+        return for_date.date()
+    if isinstance(for_date, date):
+        return for_date
+    # astropy Time
+    return for_date.to_datetime().date()
+
+
+def rise_set_night_key(lat: float, lon: float, for_date) -> str:
+    return '{}:{:.4f}:{:.4f}:{}'.format(RISE_SET_CACHE_VERSION, lat, lon, _to_date(for_date).isoformat())
+
+
+def night_reference_jd(lon: float, for_date) -> float:
+    """
+    Local mean midnight following the for_date evening.
+    """
+    d = _to_date(for_date)
+    return datetime_to_jd(datetime(d.year, d.month, d.day, tzinfo=timezone.utc)) + 1.0 - lon / 360.0
+
+
+def compute_rise_set_elements(lat: float, lon: float, for_date, ra_dec_list: Iterable[Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    ra_dec = np.array(list(ra_dec_list), dtype=float).reshape(-1, 2)
+    ref_jd = night_reference_jd(lon, for_date)
+    return RiseSetEngine(ra_dec[:, 0], ra_dec[:, 1], lat, lon, ref_jd).elements(ref_jd)
+
+
+def get_rise_set_elements(lat: float, lon: float, for_date, items: List[Tuple[int, float, float]]) -> RiseSetElements:
+    """
+    Rise/set elements of (dso_id, ra, dec) items for the night of for_date. Cached elements are fetched in bulk,
+    missing ones are computed in one pass and stored back.
+    """
+    night_key = rise_set_night_key(lat, lon, for_date)
+    store = get_rise_set_store()
+    cached = store.get_many(night_key, [item[0] for item in items])
+
+    missing = [i for i, item in enumerate(items) if item[0] not in cached]
+    transit = np.empty(len(items))
+    half_arc = np.empty(len(items))
+    for i, item in enumerate(items):
+        value = cached.get(item[0])
+        if value is not None:
+            transit[i], half_arc[i] = value
+
+    if missing:
+        m_transit, m_half_arc = compute_rise_set_elements(lat, lon, for_date, [items[i][1:] for i in missing])
+        transit[missing] = m_transit
+        half_arc[missing] = m_half_arc
+        store.put_many(night_key, _to_date(for_date),
+                       {items[i][0]: (float(m_transit[j]), float(m_half_arc[j])) for j, i in enumerate(missing)})
+
+    return RiseSetElements(transit, half_arc)
+
+
+def precompute_rise_set_cache(nights: int, cat_codes: Iterable[str], start_date: Optional[date] = None) -> int:
+    """
+    Fill rise/set cache for public locations, the next nights and DSOs of the catalogues.
+    Returns number of stored nights.
+    """
+    cat_ids = [cat_id for cat_id in (Catalogue.get_catalogue_id_by_cat_code(code) for code in cat_codes) if cat_id]
+    if not cat_ids:
+        return 0
+    items = db.session.query(DeepskyObject.id, DeepskyObject.ra, DeepskyObject.dec) \
+        .filter(DeepskyObject.catalogue_id.in_(cat_ids)) \
+        .filter(DeepskyObject.ra.isnot(None), DeepskyObject.dec.isnot(None)) \
+        .all()
+    if not items:
+        return 0
+
+    store = get_rise_set_store()
+    start_date = start_date or date.today()
+    count = 0
+    for location in Location.query.filter_by(is_public=True).all():
+        for n in range(nights):
+            for_date = start_date + timedelta(days=n)
+            transit, half_arc = compute_rise_set_elements(location.latitude, location.longitude, for_date,
+                                                          [item[1:] for item in items])
+            store.put_many(rise_set_night_key(location.latitude, location.longitude, for_date), for_date,
+                           {item[0]: (float(transit[i]), float(half_arc[i])) for i, item in enumerate(items)})
+            count += 1
+    return count
@@ -0,0 +1,259 @@
+"""
+Vectorized rise / meridian transit / set computation for fixed RA/Dec targets.
+
+All targets of one night and location are processed in one NumPy pass. Coordinates are precessed
+from J2000 to the date, local sidereal time is computed from GMST (UT1 ~ UTC). Events are solved
+analytically from the horizon hour angle, so the result does not depend on grid resolution.
+Results agree with astroplan Observer.target_rise_time / target_set_time / target_meridian_transit_time
+(horizon 0, no refraction) within one minute; nutation and aberration are neglected.
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+JD_J2000 = 2451545.0
+SIDEREAL_RATE = 1.00273790935
+SIDEREAL_DAY = 1.0 / SIDEREAL_RATE
+
+_J2000_DT = datetime(2000, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+WHICH_NEXT = 'next'
+WHICH_PREVIOUS = 'previous'
+WHICH_NEAREST = 'nearest'
+
+
+def datetime_to_jd(dt):
+    """
+    Julian date of datetime, aware datetime is converted to UTC, naive one is taken as UTC.
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return JD_J2000 + (dt - _J2000_DT).total_seconds() / 86400.0
+
+
+def jd_to_datetime(jd, tz_info=None):
+    """
+    Returns aware datetime or None when jd is NaN (event does not occur).
+    """
+    if jd is None or np.isnan(jd):
+        return None
+    dt = _J2000_DT + timedelta(days=float(jd) - JD_J2000)
+    return dt.astimezone(tz_info) if tz_info is not None else dt
+
+
+def to_jd(t):
+    """
+    Julian date from astropy Time, datetime or float jd.
+    """
+    if isinstance(t, datetime):
+        return datetime_to_jd(t)
+    if hasattr(t, 'utc'):
+        return float(t.utc.jd)
+    return float(t)
+
+
+def gmst_deg(jd):
+    """
+    Greenwich mean sidereal time in degrees (Meeus 12.4).
+    """
+    d = np.asarray(jd, dtype=float) - JD_J2000
+    t = d / 36525.0
+    return np.mod(280.46061837 + 360.98564736629 * d + 0.000387933 * t * t - t * t * t / 38710000.0, 360.0)
+
+
+def lst_deg(jd, lon_deg):
+    return np.mod(gmst_deg(jd) + lon_deg, 360.0)
+
+
+def precess_from_j2000(ra, dec, jd):
+    """
+    Precess J2000 RA/Dec arrays (radians) to mean equinox of date jd (Meeus 21.3).
+    """
+    ra = np.asarray(ra, dtype=float)
+    dec = np.asarray(dec, dtype=float)
+    t = (jd - JD_J2000) / 36525.0
+    arcsec = np.pi / (180.0 * 3600.0)
+    zeta = (2306.2181 * t + 0.30188 * t * t + 0.017998 * t * t * t) * arcsec
+    z = (2306.2181 * t + 1.09468 * t * t + 0.018203 * t * t * t) * arcsec
+    theta = (2004.3109 * t - 0.42665 * t * t - 0.041833 * t * t * t) * arcsec
+
+    cos_dec = np.cos(dec)
+    sin_dec = np.sin(dec)
+    ra_zeta = ra + zeta
+    a = cos_dec * np.sin(ra_zeta)
+    b = np.cos(theta) * cos_dec * np.cos(ra_zeta) - np.sin(theta) * sin_dec
+    c = np.sin(theta) * cos_dec * np.cos(ra_zeta) + np.cos(theta) * sin_dec
+    return np.mod(np.arctan2(a, b) + z, 2.0 * np.pi), np.arcsin(np.clip(c, -1.0, 1.0))
+
+
+def sun_ra_dec(jd):
+    """
+    Low precision (0.01 deg) apparent RA/Dec of the Sun in radians, Astronomical Almanac formula.
+    """
+    n = np.asarray(jd, dtype=float) - JD_J2000
+    mean_lon = np.radians(280.460 + 0.9856474 * n)
+    mean_anomaly = np.radians(357.528 + 0.9856003 * n)
+    ecl_lon = mean_lon + np.radians(1.915 * np.sin(mean_anomaly) + 0.020 * np.sin(2.0 * mean_anomaly))
+    eps = np.radians(23.439 - 0.0000004 * n)
+    ra = np.mod(np.arctan2(np.cos(eps) * np.sin(ecl_lon), np.cos(ecl_lon)), 2.0 * np.pi)
+    return ra, np.arcsin(np.sin(eps) * np.sin(ecl_lon))
+
+
+def altitude_deg(ra, dec, lat_deg, lon_deg, jd):
+    """
+    Geometric altitude of equinox-of-date RA/Dec (radians, scalars or arrays broadcastable with jd).
+    """
+    ha = np.radians(lst_deg(jd, lon_deg)) - ra
+    lat = np.radians(lat_deg)
+    sin_alt = np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(ha)
+    return np.degrees(np.arcsin(np.clip(sin_alt, -1.0, 1.0)))
+
+
+def sun_altitude_deg(lat_deg, lon_deg, jd):
+    sun_ra, sun_dec = sun_ra_dec(jd)
+    return altitude_deg(sun_ra, sun_dec, lat_deg, lon_deg, jd)
+
+
+def solar_midnight_jd(lon_deg, jd):
+    """
+    Next local solar midnight (lower culmination of the Sun) after jd.
+    """
+    t = jd
+    for _ in range(2):
+        sun_ra, _ = sun_ra_dec(t)
+        ha = np.mod(lst_deg(t, lon_deg) - np.degrees(sun_ra), 360.0)
+        t = t + (180.0 - ha) / 360.0
+    return t if t > jd else t + 1.0
+
+
+class RiseSetEngine:
+    """
+    Rise/transit/set and altitude of many fixed targets for one location.
+    Targets are given as J2000 RA/Dec arrays in radians, epoch_jd is date used for precession
+    (any time during the night is fine).
+    """
+    def __init__(self, ra, dec, lat_deg, lon_deg, epoch_jd, horizon_deg=0.0):
+        self.lat = np.radians(lat_deg)
+        self.lon_deg = lon_deg
+        self.ra, self.dec = precess_from_j2000(ra, dec, epoch_jd)
+        self.ra_deg = np.degrees(self.ra)
+        self.horizon = np.radians(horizon_deg)
+        cos_h0 = (np.sin(self.horizon) - np.sin(self.lat) * np.sin(self.dec)) / (np.cos(self.lat) * np.cos(self.dec))
+        # cos_h0 > 1 never rises, cos_h0 < -1 circumpolar - both have no rise/set event
+        with np.errstate(invalid='ignore'):
+            self.h0_deg = np.where(np.abs(cos_h0) <= 1.0, np.degrees(np.arccos(np.clip(cos_h0, -1.0, 1.0))), np.nan)
+        self.never_rises = cos_h0 > 1.0
+        self.circumpolar = cos_h0 < -1.0
+
+    def __len__(self):
+        return len(self.ra)
+
+    def hour_angle_deg(self, jd):
+        """
+        Hour angle in range (-180, 180>, shape (n_targets,) for scalar jd or (n_targets, n_times) for jd array.
+        """
+        lst = lst_deg(jd, self.lon_deg)
+        if np.ndim(lst) == 0:
+            ha = lst - self.ra_deg
+        else:
+            ha = lst[np.newaxis, :] - self.ra_deg[:, np.newaxis]
+        return 180.0 - np.mod(180.0 - ha, 360.0)
+
+    def altitude_deg(self, jd):
+        """
+        Geometric altitude, shape (n_targets,) for scalar jd or (n_targets, n_times) for jd array.
+        """
+        ha = np.radians(self.hour_angle_deg(jd))
+        dec = self.dec if np.ndim(ha) == 1 else self.dec[:, np.newaxis]
+        sin_alt = np.sin(self.lat) * np.sin(dec) + np.cos(self.lat) * np.cos(dec) * np.cos(ha)
+        return np.degrees(np.arcsin(np.clip(sin_alt, -1.0, 1.0)))
+
+    def is_up(self, jd):
+        return self.altitude_deg(jd) > np.degrees(self.horizon)
+
+    def transit_jd(self, jd, which=WHICH_NEAREST):
+        return self._event_jd(jd, np.zeros(len(self)), which)
+
+    def rise_jd(self, jd, which=WHICH_NEAREST):
+        return self._event_jd(jd, -self.h0_deg, which)
+
+    def set_jd(self, jd, which=WHICH_NEAREST):
+        return self._event_jd(jd, self.h0_deg, which)
+
+    def elements(self, jd):
+        """
+        Returns (transit, half_arc) - meridian transit nearest to jd and half of the diurnal arc above horizon
+        in days, +inf for circumpolar and -inf for never rising targets. See RiseSetElements.
+        """
+        half_arc = np.where(self.circumpolar, np.inf, np.where(self.never_rises, -np.inf, self.h0_deg / 360.0 * SIDEREAL_DAY))
+        return self.transit_jd(jd), half_arc
+
+    def max_altitude_deg(self, jd_from, jd_to):
+        """
+        Maximal altitude of each target in time interval <jd_from, jd_to> shorter than one day.
+        """
+        alt = np.maximum(self.altitude_deg(jd_from), self.altitude_deg(jd_to))
+        transit = self.transit_jd(jd_from, which=WHICH_NEXT)
+        culmination = 90.0 - np.degrees(np.abs(self.lat - self.dec))
+        return np.where(transit <= jd_to, culmination, alt)
+
+    def _event_jd(self, jd, event_ha_deg, which):
+        """
+        Time when hour angle reaches event_ha_deg, NaN where event_ha_deg is NaN.
+        """
+        ha = self.hour_angle_deg(jd)
+        return _select_event(jd, np.mod(event_ha_deg - ha, 360.0) / 360.0 * SIDEREAL_DAY, which)
+
+
+class RiseSetElements:
+    """
+    Rise/transit/set of fixed targets reconstructed from night elements (transit, half_arc) produced
+    by RiseSetEngine.elements(). Elements do not depend on time window, so they can be cached per night
+    and location and evaluated for any window within that night.
+    """
+    def __init__(self, transit_jd, half_arc):
+        self.transit = np.asarray(transit_jd, dtype=float)
+        self.half_arc = np.asarray(half_arc, dtype=float)
+        finite = np.isfinite(self.half_arc)
+        with np.errstate(invalid='ignore'):
+            self._rise = np.where(finite, self.transit - self.half_arc, np.nan)
+            self._set = np.where(finite, self.transit + self.half_arc, np.nan)
+
+    def __len__(self):
+        return len(self.transit)
+
+    def is_up(self, jd):
+        ha = np.mod(jd - self.transit + SIDEREAL_DAY / 2.0, SIDEREAL_DAY) - SIDEREAL_DAY / 2.0
+        return np.abs(ha) < self.half_arc
+
+    def transit_jd(self, jd, which=WHICH_NEAREST):
+        return _select_event(jd, np.mod(self.transit - jd, SIDEREAL_DAY), which)
+
+    def rise_jd(self, jd, which=WHICH_NEAREST):
+        return _select_event(jd, np.mod(self._rise - jd, SIDEREAL_DAY), which)
+
+    def set_jd(self, jd, which=WHICH_NEAREST):
+        return _select_event(jd, np.mod(self._set - jd, SIDEREAL_DAY), which)
+
+
+def _select_event(jd, dt_next, which):
+    """
+    dt_next is time from jd to the next occurrence of periodic event in days.
+    """
+    if which == WHICH_NEXT:
+        dt = dt_next
+    elif which == WHICH_PREVIOUS:
+        dt = dt_next - SIDEREAL_DAY
+    elif which == WHICH_NEAREST:
+        dt = np.where(dt_next <= SIDEREAL_DAY / 2.0, dt_next, dt_next - SIDEREAL_DAY)
+    else:
+        raise ValueError('Unknown event selection: {}'.format(which))
+    return jd + dt
+
+
+def rise_transit_set_jd(ra, dec, lat_deg, lon_deg, jd, which=WHICH_NEAREST, horizon_deg=0.0):
+    """
+    Returns (rise, transit, set) Julian date arrays, NaN for targets without rise/set.
+    """
+    engine = RiseSetEngine(ra, dec, lat_deg, lon_deg, jd, horizon_deg=horizon_deg)
+    return engine.rise_jd(jd, which), engine.transit_jd(jd, which), engine.set_jd(jd, which)
@@ -0,0 +1,152 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import brotli
+from flask import Response, request
+
+SCENE_DATASET_MANIFEST = 'manifest.json'
+SCENE_DATASET_IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+SCENE_DATASET_REVALIDATE_CACHE_CONTROL = 'public, no-cache'
+
+
+@dataclass(frozen=True)
+class SceneDataset:
+    """
+    Encoded scene dataset. Only compressed variants are kept, meta holds the part of the payload
+    needed by the scene (dataset_id, stats).
+    """
+    name: str
+    digest: str
+    meta: Dict[str, Any]
+    gzip_data: bytes
+    br_data: Optional[bytes]
+
+    def raw_data(self) -> bytes:
+        return gzip.decompress(self.gzip_data)
+
+
+def encode_scene_dataset(name: str, payload: Dict[str, Any], gzip_level: int = 6, br_quality: int = 5) -> SceneDataset:
+    raw = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return SceneDataset(
+        name=name,
+        digest=hashlib.sha256(raw).hexdigest()[:20],
+        meta={key: payload.get(key) for key in ('dataset_id', 'stats')},
+        gzip_data=gzip.compress(raw, compresslevel=gzip_level, mtime=0),
+        br_data=brotli.compress(raw, quality=br_quality),
+    )
+
+
+def _dataset_file_name(dataset: SceneDataset, ext: str) -> str:
+    return '{}.{}.json.{}'.format(dataset.name, dataset.digest, ext)
+
+
+def write_scene_datasets(out_dir: str, datasets: Dict[str, SceneDataset], catalogs_version: str) -> None:
+    """
+    Write content hashed dataset files and the manifest. Manifest is replaced atomically, files
+    of previous builds are removed afterwards.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {'catalogs_version': catalogs_version, 'datasets': {}}
+    keep = {SCENE_DATASET_MANIFEST}
+    for name, dataset in datasets.items():
+        files = {'gz': dataset.gzip_data}
+        if dataset.br_data is not None:
+            files['br'] = dataset.br_data
+        for ext, data in files.items():
+            file_name = _dataset_file_name(dataset, ext)
+            with open(os.path.join(out_dir, file_name), 'wb') as f:
+                f.write(data)
+            keep.add(file_name)
+        manifest['datasets'][name] = {'digest': dataset.digest, 'meta': dataset.meta, 'encodings': sorted(files)}
+
+    tmp_path = os.path.join(out_dir, SCENE_DATASET_MANIFEST + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, os.path.join(out_dir, SCENE_DATASET_MANIFEST))
+
+    for file_name in os.listdir(out_dir):
+        if file_name not in keep and '.json.' in file_name:
+            os.remove(os.path.join(out_dir, file_name))
+
+
+def read_scene_datasets(in_dir: str, catalogs_version: str) -> Dict[str, SceneDataset]:
+    """
+    Datasets written by write_scene_datasets, empty when there is no build or it was built for other catalogues.
+    """
+    try:
+        with open(os.path.join(in_dir, SCENE_DATASET_MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('catalogs_version') != catalogs_version:
+        return {}
+
+    datasets = {}
+    for name, entry in manifest.get('datasets', {}).items():
+        files = {}
+        try:
+            for ext in entry['encodings']:
+                file_name = '{}.{}.json.{}'.format(name, entry['digest'], ext)
+                with open(os.path.join(in_dir, file_name), 'rb') as f:
+                    files[ext] = f.read()
+        except (OSError, KeyError):
+            continue
+        if 'gz' not in files:
+            continue
+        datasets[name] = SceneDataset(name=name, digest=entry['digest'], meta=entry.get('meta') or {},
+                                      gzip_data=files['gz'], br_data=files.get('br'))
+    return datasets
+
+
+class SceneDatasetStore:
+    """
+    Per-process store of encoded scene datasets. Prebuilt datasets are loaded from dataset_dir on first use,
+    missing ones are built by build_fn and encoded once.
+    """
+    def __init__(self, build_fn: Callable[[str], Dict[str, Any]], dataset_dir: Optional[str], catalogs_version: str):
+        self.build_fn = build_fn
+        self.dataset_dir = dataset_dir
+        self.catalogs_version = catalogs_version
+        self._datasets: Optional[Dict[str, SceneDataset]] = None
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> SceneDataset:
+        with self._lock:
+            if self._datasets is None:
+                self._datasets = read_scene_datasets(self.dataset_dir, self.catalogs_version) if self.dataset_dir else {}
+            dataset = self._datasets.get(name)
+        if dataset is None:
+            dataset = encode_scene_dataset(name, self.build_fn(name))
+            with self._lock:
+                self._datasets[name] = dataset
+        return dataset
+
+
+def make_scene_dataset_response(dataset: SceneDataset) -> Response:
+    """
+    Pre-encoded dataset response. Request carrying dataset digest in 'dsv' argument addresses immutable content.
+    """
+    if dataset.digest in request.if_none_match:
+        response = Response(status=304)
+    else:
+        if dataset.br_data is not None and request.accept_encodings['br']:
+            data, encoding = dataset.br_data, 'br'
+        elif request.accept_encodings['gzip']:
+            data, encoding = dataset.gzip_data, 'gzip'
+        else:
+            data, encoding = dataset.raw_data(), None
+        response = Response(data, mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(dataset.digest)
+    response.vary.add('Accept-Encoding')
+    if request.args.get('dsv') == dataset.digest:
+        response.headers['Cache-Control'] = SCENE_DATASET_IMMUTABLE_CACHE_CONTROL
+    else:
+        response.headers['Cache-Control'] = SCENE_DATASET_REVALIDATE_CACHE_CONTROL
+    return response
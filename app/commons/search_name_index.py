@@ -0,0 +1,296 @@
+"""
+Name and alias search index of catalogue objects (DSOs, stars, double stars, comets, minor planets).
+
+Names are stored normalized in search_names table. On PostgreSQL substring search is served by pg_trgm GIN index
+of normalized name, other databases (SQLite in tests and development) use in-memory trigram index per object type
+loaded from the table on first search of the type. Queries shorter than a trigram are LIKE scans of the table.
+Hits are ranked: exact match, prefix match, then the closest name.
+The index is rebuilt per object type by catalogue importers (rebuild_search_names), single imported objects
+are added by index_object_search_names and loaded by in-memory indexes incrementally.
+"""
+import re
+import threading
+import unicodedata
+from array import array
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import case, func, select
+
+from app import db
+from app.commons.dbupdate_utils import get_catalogue_version, mark_catalogue_updated
+from app.models import (
+    Comet,
+    DeepskyObject,
+    DoubleStar,
+    MinorPlanet,
+    SearchName,
+    Star,
+    SEARCH_NAME_COMET,
+    SEARCH_NAME_DOUBLE_STAR,
+    SEARCH_NAME_DSO,
+    SEARCH_NAME_MINOR_PLANET,
+    SEARCH_NAME_STAR,
+)
+
+SEARCH_NAMES_INSERT_BATCH = 5000
+
+# object type -> (model, name attributes)
+SEARCH_NAME_SOURCES = {
+    SEARCH_NAME_DSO: (DeepskyObject, ('name', 'common_name')),
+    SEARCH_NAME_DOUBLE_STAR: (DoubleStar, ('common_cat_id', 'wds_number')),
+    SEARCH_NAME_STAR: (Star, ('common_name',)),
+    SEARCH_NAME_COMET: (Comet, ('designation',)),
+    SEARCH_NAME_MINOR_PLANET: (MinorPlanet, ('designation', 'mpc_designation', 'int_designation')),
+}
+
+_MAX_OBJECT_NAMES = max(len(attrs) for _, attrs in SEARCH_NAME_SOURCES.values())
+
+# queries shorter than trigram can't use trigram index
+_TRIGRAM_LEN = 3
+
+_memory_indexes = {}
+_memory_index_locks = {object_type: threading.Lock() for object_type in SEARCH_NAME_SOURCES}
+
+
+@dataclass
+class SearchHit:
+    object_type: str
+    object_id: int
+    name: str
+    rank: int
+
+
+def normalize_search_name(name):
+    if name is None:
+        return ''
+    name = str(name).strip().lower()
+    name = ''.join(char for char in unicodedata.normalize('NFKD', name) if not unicodedata.combining(char))
+    return re.sub(r'[\s\-_]+', ' ', name)
+
+
+def _object_names(values):
+    names = []
+    for value in values:
+        if value is None:
+            continue
+        name = str(value).strip()
+        norm_name = normalize_search_name(name)
+        if norm_name and all(norm_name != n for _, n in names):
+            names.append((name[:256], norm_name[:256]))
+    return names
+
+
+def _rebuild_version_key(object_type):
+    return '{}_{}'.format(SearchName.__tablename__, object_type)
+
+
+def _update_version_key(object_type):
+    return '{}_{}_upd'.format(SearchName.__tablename__, object_type)
+
+
+def rebuild_search_names(object_type=None):
+    """
+    Rebuild index entries of object type (all types if None) from the catalogue table.
+    """
+    object_types = [object_type] if object_type else list(SEARCH_NAME_SOURCES)
+    for otype in object_types:
+        model, attrs = SEARCH_NAME_SOURCES[otype]
+        SearchName.query.filter_by(object_type=otype).delete(synchronize_session=False)
+        batch = []
+        columns = [getattr(model, attr) for attr in attrs]
+        for row in db.session.query(model.id, *columns).yield_per(SEARCH_NAMES_INSERT_BATCH):
+            for name, norm_name in _object_names(row[1:]):
+                batch.append({'object_type': otype, 'object_id': row[0], 'name': name, 'norm_name': norm_name})
+            if len(batch) >= SEARCH_NAMES_INSERT_BATCH:
+                db.session.execute(SearchName.__table__.insert(), batch)
+                batch = []
+        if batch:
+            db.session.execute(SearchName.__table__.insert(), batch)
+    db.session.commit()
+    for otype in object_types:
+        mark_catalogue_updated(_rebuild_version_key(otype))
+
+
+def index_object_search_names(object_type, obj):
+    """
+    Replace index entries of single object, used when object is imported outside of catalogue import.
+    """
+    _, attrs = SEARCH_NAME_SOURCES[object_type]
+    old_ids = [row[0] for row in db.session.query(SearchName.id).filter_by(object_type=object_type, object_id=obj.id)]
+    # new entries are inserted before old ones are deleted so they get ids above all loaded entries
+    for name, norm_name in _object_names([getattr(obj, attr) for attr in attrs]):
+        db.session.add(SearchName(object_type=object_type, object_id=obj.id, name=name, norm_name=norm_name))
+    db.session.flush()
+    if old_ids:
+        SearchName.query.filter(SearchName.id.in_(old_ids)).delete(synchronize_session=False)
+    db.session.commit()
+    mark_catalogue_updated(_update_version_key(object_type))
+
+
+def _trigrams(norm_name):
+    return {norm_name[i:i + 3] for i in range(len(norm_name) - 2)}
+
+
+def _rank(norm_name, norm_query):
+    if norm_name == norm_query:
+        return 0
+    return 1 if norm_name.startswith(norm_query) else 2
+
+
+class _MemorySearchIndex:
+    """
+    Trigram posting lists of normalized names of one object type, substring candidates are intersection of postings
+    of query trigrams. Entries of objects reindexed by index_object_search_names are appended by load(), rows
+    of older entries are skipped.
+    """
+    def __init__(self, object_type):
+        self.object_type = object_type
+        self.version = None
+        self._max_id = 0
+        self._object_ids = array('l')
+        self._names = []
+        self._norm_names = []
+        self._postings = {}
+        # object id -> first row of its current entries
+        self._replaced = {}
+
+    def load(self):
+        """
+        Append entries stored since the last load.
+        """
+        is_update = self._max_id > 0
+        updated_objects = set()
+        query = db.session.query(SearchName.id, SearchName.object_id, SearchName.name, SearchName.norm_name) \
+            .filter(SearchName.object_type == self.object_type, SearchName.id > self._max_id) \
+            .order_by(SearchName.id)
+        for entry_id, object_id, name, norm_name in query.yield_per(SEARCH_NAMES_INSERT_BATCH):
+            row = len(self._object_ids)
+            if is_update and object_id not in updated_objects:
+                updated_objects.add(object_id)
+                self._replaced[object_id] = row
+            self._object_ids.append(object_id)
+            self._names.append(name)
+            self._norm_names.append(norm_name)
+            for trigram in _trigrams(norm_name):
+                posting = self._postings.get(trigram)
+                if posting is None:
+                    posting = self._postings[trigram] = array('l')
+                posting.append(row)
+            self._max_id = entry_id
+
+    def search(self, norm_query):
+        posting_lists = sorted((self._postings.get(trigram, ()) for trigram in _trigrams(norm_query)), key=len)
+        candidates = set(posting_lists[0])
+        for posting_list in posting_lists[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting_list)
+        hits = []
+        for row in candidates:
+            object_id, norm_name = self._object_ids[row], self._norm_names[row]
+            if norm_query in norm_name and row >= self._replaced.get(object_id, 0):
+                hits.append((_rank(norm_name, norm_query), len(norm_name), self.object_type, object_id,
+                             self._names[row]))
+        return hits
+
+
+def _get_memory_index(object_type):
+    version = (get_catalogue_version(_rebuild_version_key(object_type)),
+               get_catalogue_version(_update_version_key(object_type)))
+    with _memory_index_locks[object_type]:
+        index = _memory_indexes.get(object_type)
+        if index is None or index.version[0] != version[0]:
+            index = _MemorySearchIndex(object_type)
+            index.load()
+        elif index.version[1] != version[1]:
+            index.load()
+        index.version = version
+        _memory_indexes[object_type] = index
+        return index
+
+
+def _like_escape(text):
+    return text.replace('/', '//').replace('%', '/%').replace('_', '/_')
+
+
+def _like_contains(norm_query):
+    return SearchName.norm_name.like('%' + _like_escape(norm_query) + '%', escape='/')
+
+
+def _search_like(norm_query, object_types, limit, is_postgresql):
+    # whole pattern is passed as parameter, so planner can use trigram index for it
+    rank = case((SearchName.norm_name == norm_query, 0),
+                (SearchName.norm_name.like(_like_escape(norm_query) + '%', escape='/'), 1),
+                else_=2)
+    query = db.session.query(SearchName.object_type, SearchName.object_id, SearchName.name, rank) \
+        .filter(_like_contains(norm_query))
+    if object_types:
+        query = query.filter(SearchName.object_type.in_(object_types))
+    order_by = [rank]
+    if is_postgresql:
+        order_by.append(func.similarity(SearchName.norm_name, norm_query).desc())
+    query = query.order_by(*order_by, func.length(SearchName.norm_name), SearchName.object_type, SearchName.object_id)
+    if limit:
+        # object can match by several names
+        query = query.limit(limit * _MAX_OBJECT_NAMES)
+    return [SearchHit(object_type=row[0], object_id=row[1], name=row[2], rank=row[3]) for row in query]
+
+
+def _search_memory(norm_query, object_types):
+    hits = []
+    for object_type in object_types or SEARCH_NAME_SOURCES:
+        hits.extend(_get_memory_index(object_type).search(norm_query))
+    hits.sort()
+    return [SearchHit(object_type=h[2], object_id=h[3], name=h[4], rank=h[0]) for h in hits]
+
+
+def search_object_names(query, object_types=None, limit: Optional[int] = 10) -> List[SearchHit]:
+    """
+    Objects whose name or alias contains query, best hit of every object ordered by rank.
+    """
+    norm_query = normalize_search_name(query)
+    if not norm_query:
+        return []
+    is_postgresql = db.session.get_bind().dialect.name == 'postgresql'
+    if is_postgresql or len(norm_query) < _TRIGRAM_LEN:
+        hits = _search_like(norm_query, object_types, limit, is_postgresql)
+    else:
+        hits = _search_memory(norm_query, object_types)
+    result = []
+    found = set()
+    for hit in hits:
+        key = (hit.object_type, hit.object_id)
+        if key not in found:
+            found.add(key)
+            result.append(hit)
+            if limit and len(result) >= limit:
+                break
+    return result
+
+
+def search_exact_object_names(query, object_types) -> List[SearchHit]:
+    """
+    Objects whose name or alias equals query (B-tree index of normalized name), ordered by object_types.
+    """
+    norm_query = normalize_search_name(query)
+    if not norm_query:
+        return []
+    rows = db.session.query(SearchName.object_type, SearchName.object_id, SearchName.name) \
+        .filter(SearchName.norm_name == norm_query, SearchName.object_type.in_(object_types)) \
+        .order_by(SearchName.object_id)
+    hits = [SearchHit(object_type=row[0], object_id=row[1], name=row[2], rank=0) for row in rows]
+    hits.sort(key=lambda hit: object_types.index(hit.object_type))
+    return hits
+
+
+def search_object_ids(object_type, query, limit: Optional[int] = None) -> List[int]:
+    return [hit.object_id for hit in search_object_names(query, (object_type,), limit=limit)]
+
+
+def search_object_ids_select(object_type, query):
+    """
+    Subquery of ids of objects whose name or alias contains query, for IN filter of catalogue list queries.
+    """
+    return select(SearchName.object_id).where(SearchName.object_type == object_type,
+                                              _like_contains(normalize_search_name(query)))
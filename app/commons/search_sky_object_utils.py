@@ -3,6 +3,7 @@ import urllib.parse
 import unicodedata
 
 from .dso_utils import normalize_dso_name, denormalize_dso_name, normalize_double_star_name
+from .search_name_index import SEARCH_NAME_SOURCES, search_exact_object_names, search_object_ids, search_object_names
 from .greek import GREEK_TO_LAT, SHORT_LAT_TO_GREEK, LONG_LAT_TO_GREEK, LONG_LAT_CZ_TO_GREEK, SHORT_LAT_TO_GREEK_EXT
 from .utils import get_lang_and_editor_user_from_request
 
@@ -11,11 +12,17 @@ from app.models import (
     Constellation,
     DeepskyObject,
     DoubleStar,
+    DoubleStarDesignation,
     MinorPlanet,
     Planet,
     PlanetMoon,
     Star,
     UserStarDescription,
+    SEARCH_NAME_COMET,
+    SEARCH_NAME_DOUBLE_STAR,
+    SEARCH_NAME_DSO,
+    SEARCH_NAME_MINOR_PLANET,
+    SEARCH_NAME_STAR,
 )
 
 from sqlalchemy import func, or_
@@ -179,7 +186,7 @@ def search_double_star(query, number_search=True):
             if bayer:
                 query = GREEK_TO_LAT[bayer] + ' ' + ' '.join(words[1:])
 
-        double_star = DoubleStar.query.filter(DoubleStar.norm_other_designation.like('%;' + query.title() + ';%')).first()
+        double_star = DoubleStar.query.filter(DoubleStar.id.in_(DoubleStarDesignation.double_star_ids(query))).first()
 
     return double_star
 
@@ -197,8 +204,9 @@ def search_double_star_strict(query):
 def search_comet(query):
     if len(query) > 5:
         search_expr = query.replace('"', '')
-        comet = Comet.query.filter(Comet.designation.like('%' + search_expr + '%')).first()
-        return comet
+        comet_ids = search_object_ids(SEARCH_NAME_COMET, search_expr, limit=1)
+        if comet_ids:
+            return Comet.query.filter_by(id=comet_ids[0]).first()
     return None
 
 
@@ -211,17 +219,32 @@ def search_comet_exact(query):
 
 def search_minor_planet(query):
     if len(query) > 3:
-        filters = [
-            MinorPlanet.designation.like('%' + query + '%'),
-            func.lower(MinorPlanet.mpc_designation) == func.lower(query.strip()),
-        ]
-        if query.strip().isdigit():
-            filters.append(MinorPlanet.int_designation == int(query.strip()))
-        minor_planet = MinorPlanet.query.filter(or_(*filters)).first()
-        return minor_planet
+        # designation, mpc designation and number are indexed
+        minor_planet_ids = search_object_ids(SEARCH_NAME_MINOR_PLANET, query, limit=1)
+        if minor_planet_ids:
+            return MinorPlanet.query.filter_by(id=minor_planet_ids[0]).first()
     return None
 
 
+def search_named_object(query):
+    """
+    Object found by name or alias as (object type, object), (None, None) if nothing matches. DSOs, double stars
+    and stars match exact name only (unknown designation must fall through to Simbad), comets and minor planets
+    match substring of designation.
+    """
+    if len(query) <= 3:
+        return None, None
+    query = query.replace('"', '')
+    hits = search_exact_object_names(query, (SEARCH_NAME_DSO, SEARCH_NAME_DOUBLE_STAR, SEARCH_NAME_STAR))
+    if not hits:
+        object_types = (SEARCH_NAME_COMET, SEARCH_NAME_MINOR_PLANET) if len(query) > 5 else (SEARCH_NAME_MINOR_PLANET,)
+        hits = search_object_names(query, object_types, limit=1)
+    if hits:
+        model, _ = SEARCH_NAME_SOURCES[hits[0].object_type]
+        return hits[0].object_type, model.query.filter_by(id=hits[0].object_id).first()
+    return None, None
+
+
 def search_minor_planet_exact(query):
     if len(query) > 3:
         filters = [
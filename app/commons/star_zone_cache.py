@@ -0,0 +1,155 @@
+import logging
+import mmap
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+# bookkeeping cost of one cached zone, keeps empty zones bounded by the byte budget too
+ZONE_ENTRY_OVERHEAD = 256
+
+
+def _zone_nbytes(zone_stars) -> int:
+    return int(getattr(zone_stars, 'nbytes', 0)) + ZONE_ENTRY_OVERHEAD
+
+
+class StarZoneCache:
+    """
+    Star zones of geodesic star catalogue shared by all catalogue levels, LRU bounded by total bytes.
+    Hot sky regions stay resident, zones are evicted only when the budget is exceeded.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._zones: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._nbytes = 0
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+        }
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            zone_stars = self._zones.get(key)
+            if zone_stars is None:
+                self._stats['misses'] += 1
+                return None
+            self._zones.move_to_end(key)
+            self._stats['hits'] += 1
+            return zone_stars
+
+    def put(self, key: Hashable, zone_stars: Any) -> None:
+        nbytes = _zone_nbytes(zone_stars)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old_zone_stars = self._zones.pop(key, None)
+            if old_zone_stars is not None:
+                self._nbytes -= _zone_nbytes(old_zone_stars)
+            self._zones[key] = zone_stars
+            self._nbytes += nbytes
+            while self._nbytes > self.max_bytes:
+                _, evicted = self._zones.popitem(last=False)
+                self._nbytes -= _zone_nbytes(evicted)
+                self._stats['evictions'] += 1
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            zone_stars = self._zones.pop(key, None)
+            if zone_stars is not None:
+                self._nbytes -= _zone_nbytes(zone_stars)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._zones.clear()
+            self._nbytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            result = dict(self._stats)
+            result['zones'] = len(self._zones)
+            result['bytes'] = self._nbytes
+            result['max_bytes'] = self.max_bytes
+        lookups = result['hits'] + result['misses']
+        result['hit_ratio'] = result['hits'] / lookups if lookups else 0.0
+        return result
+
+
+class _ZoneFileMap:
+    """
+    Read-only memory map of catalogue component file. Zones are decoded straight from the mapped pages,
+    so concurrent loads don't share seek position of the component file and forked workers share page cache.
+    """
+    def __init__(self, cat_comp):
+        self._cat_comp = cat_comp
+        self._reader = cat_comp._data_reader
+        self._dtype = np.dtype(cat_comp._get_data_format())
+        with open(cat_comp.file_name, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read_zone(self, zone: int):
+        records = self._reader.get_record_count(zone)
+        if records <= 0:
+            return []
+        zone_stars = np.frombuffer(self._mmap, dtype=self._dtype, count=records, offset=self._reader.get_offset(zone))
+        if self._reader.byteswap:
+            zone_stars = zone_stars.byteswap()
+        return self._cat_comp._convert_zone_stars(zone_stars)
+
+
+class CachedZoneBlocks:
+    """
+    Replacement of zone list (_star_blocks) of fchart3 GeodesicStarGaiaCatalogComponent backed by shared
+    StarZoneCache. Missing zone is read from memory mapped file, if file can't be mapped the component reads
+    it by itself and stores it back by item assignment.
+    """
+    def __init__(self, cache: StarZoneCache, level: int, nr_of_zones: int, zone_file: Optional[_ZoneFileMap] = None):
+        self._cache = cache
+        self._level = level
+        self._nr_of_zones = nr_of_zones
+        self._zone_file = zone_file
+
+    def __len__(self) -> int:
+        return self._nr_of_zones
+
+    def __getitem__(self, zone: int):
+        key = (self._level, zone)
+        zone_stars = self._cache.get(key)
+        if zone_stars is None and self._zone_file is not None:
+            zone_stars = self._zone_file.read_zone(zone)
+            self._cache.put(key, zone_stars)
+        return zone_stars
+
+    def __setitem__(self, zone: int, zone_stars) -> None:
+        key = (self._level, zone)
+        if zone_stars is None:
+            self._cache.discard(key)
+        else:
+            self._cache.put(key, zone_stars)
+
+
+def install_star_zone_cache(star_catalog, max_bytes: int) -> Optional[StarZoneCache]:
+    """
+    Attach bounded zone cache to loaded levels of star catalogue. Level 0 is static and stays fully loaded.
+    Returns None if the catalogue has no loadable levels or its fchart3 internals are not the expected ones,
+    the catalogue keeps its own zone reading then.
+    """
+    cache = StarZoneCache(max_bytes)
+    star_blocks = []
+    try:
+        for cat_comp in getattr(star_catalog, '_cat_components', []):
+            if cat_comp.level == 0 or not cat_comp._file_opened:
+                continue
+            try:
+                zone_file = _ZoneFileMap(cat_comp)
+            except (OSError, ValueError):
+                zone_file = None
+            star_blocks.append((cat_comp, CachedZoneBlocks(cache, cat_comp.level, len(cat_comp._star_blocks), zone_file)))
+    except (AttributeError, TypeError) as e:
+        logging.getLogger(__name__).warning('Star zone cache is not installed, unsupported fchart3 star catalogue: %s', e)
+        return None
+    for cat_comp, blocks in star_blocks:
+        cat_comp._star_blocks = blocks
+    return cache if star_blocks else None
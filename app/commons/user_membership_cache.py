@@ -0,0 +1,252 @@
+"""
+Per-user membership sets of observed list and wish list, used to mark observed and wished objects in catalogue lists,
+planner tables and chart highlights.
+
+Ids of every (list kind, user, object type) are stored as compact sorted uint32 array tagged by generation of the
+user's list. Views that modify the list bump the generation by invalidate_user_membership() after commit, so entries
+loaded before the change are not used anymore. Arrays are kept in redis shared by all workers (local per-process
+store is used as fallback) and returned as frozensets for O(1) membership tests.
+"""
+import struct
+import threading
+import time
+from array import array
+from typing import FrozenSet, Optional, Tuple
+
+from flask import current_app
+from lru import LRU
+from redis import Redis
+from redis.exceptions import RedisError
+
+from app import db
+from app.models import (
+    DeepskyObject,
+    ObservedList,
+    ObservedListItem,
+    WishList,
+    WishListItem,
+)
+
+USER_MEMBERSHIP_CACHE_VERSION = 'um1'
+REDIS_RETRY_INTERVAL = 60.0
+REDIS_EXPIRE_SECONDS = 24 * 3600
+
+MEMBERSHIP_OBSERVED = 'observed'
+MEMBERSHIP_WISHLIST = 'wishlist'
+
+MEMBERSHIP_DSO = 'dso'
+MEMBERSHIP_DOUBLE_STAR = 'double_star'
+MEMBERSHIP_COMET = 'comet'
+MEMBERSHIP_MINOR_PLANET = 'minor_planet'
+
+# list kind -> (list model, item model, item list id column name)
+_MEMBERSHIP_LISTS = {
+    MEMBERSHIP_OBSERVED: (ObservedList, ObservedListItem, 'observed_list_id'),
+    MEMBERSHIP_WISHLIST: (WishList, WishListItem, 'wish_list_id'),
+}
+
+_MEMBERSHIP_ID_COLUMNS = {
+    MEMBERSHIP_DSO: 'dso_id',
+    MEMBERSHIP_DOUBLE_STAR: 'double_star_id',
+    MEMBERSHIP_COMET: 'comet_id',
+    MEMBERSHIP_MINOR_PLANET: 'minor_planet_id',
+}
+
+_generation_struct = struct.Struct('<q')
+
+Membership = Tuple[int, Optional[FrozenSet[int]]]
+
+
+def pack_member_ids(generation: int, ids) -> bytes:
+    return _generation_struct.pack(generation) + array('I', sorted(ids)).tobytes()
+
+
+def unpack_member_ids(value: bytes) -> Tuple[int, FrozenSet[int]]:
+    ids = array('I')
+    ids.frombytes(value[_generation_struct.size:])
+    return _generation_struct.unpack_from(value)[0], frozenset(ids)
+
+
+class LocalMembershipStore:
+    """
+    Per-process store of membership sets, LRU over (kind, user, object type). Entries expire after ttl seconds,
+    it bounds staleness of lists changed in other processes.
+    """
+    def __init__(self, max_entries: int, ttl: float):
+        self._entries = LRU(max(max_entries, 1))
+        self._ttl = ttl
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, user_id: int, object_type: str) -> Membership:
+        with self._lock:
+            generation = self._generations.get((kind, user_id), 0)
+            entry = self._entries.get((kind, user_id, object_type))
+            if entry is None or entry[0] != generation or entry[1] < time.monotonic():
+                return generation, None
+            return generation, entry[2]
+
+    def put(self, kind: str, user_id: int, object_type: str, generation: int, ids: FrozenSet[int]) -> None:
+        with self._lock:
+            if self._generations.get((kind, user_id), 0) == generation:
+                self._entries[(kind, user_id, object_type)] = (generation, time.monotonic() + self._ttl, ids)
+
+    def invalidate(self, kind: str, user_id: int) -> None:
+        with self._lock:
+            self._generations[(kind, user_id)] = self._generations.get((kind, user_id), 0) + 1
+
+
+class RedisMembershipStore:
+    """
+    Membership sets shared by all workers. Generation of user's list is redis counter without expiration (it must
+    never go back to value of existing entry), entries are packed arrays tagged by generation. Local store is used
+    when redis is not available, invalidations made meanwhile are replayed to redis when it is reachable again.
+    """
+    def __init__(self, redis_conn, fallback: LocalMembershipStore):
+        self.redis_conn = redis_conn
+        self.fallback = fallback
+        self._retry_at = 0.0
+        # (kind, user_id) of invalidations not written to redis
+        self._pending_invalidations = set()
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, user_id: int, object_type: str) -> Membership:
+        if not self._redis_available():
+            return self.fallback.get(kind, user_id, object_type)
+        try:
+            generation, value = self.redis_conn.mget(_generation_key(kind, user_id), _entry_key(kind, user_id, object_type))
+        except RedisError:
+            self._redis_failed()
+            return self.fallback.get(kind, user_id, object_type)
+        generation = int(generation) if generation is not None else 0
+        if value is not None:
+            entry_generation, ids = unpack_member_ids(value)
+            if entry_generation == generation:
+                return generation, ids
+        return generation, None
+
+    def put(self, kind: str, user_id: int, object_type: str, generation: int, ids: FrozenSet[int]) -> None:
+        if not self._redis_available():
+            self.fallback.put(kind, user_id, object_type, generation, ids)
+            return
+        try:
+            self.redis_conn.set(_entry_key(kind, user_id, object_type), pack_member_ids(generation, ids),
+                                ex=REDIS_EXPIRE_SECONDS)
+        except RedisError:
+            self._redis_failed()
+            self.fallback.put(kind, user_id, object_type, generation, ids)
+
+    def invalidate(self, kind: str, user_id: int) -> None:
+        self.fallback.invalidate(kind, user_id)
+        if self._redis_available():
+            try:
+                self.redis_conn.incr(_generation_key(kind, user_id))
+                return
+            except RedisError:
+                self._redis_failed()
+        with self._lock:
+            self._pending_invalidations.add((kind, user_id))
+
+    def _redis_available(self) -> bool:
+        if time.monotonic() < self._retry_at:
+            return False
+        return not self._pending_invalidations or self._replay_invalidations()
+
+    def _replay_invalidations(self) -> bool:
+        with self._lock:
+            pending, self._pending_invalidations = self._pending_invalidations, set()
+        try:
+            pipe = self.redis_conn.pipeline(transaction=False)
+            for kind, user_id in pending:
+                pipe.incr(_generation_key(kind, user_id))
+            pipe.execute()
+        except RedisError:
+            # extra increment of already replayed generation does no harm
+            with self._lock:
+                self._pending_invalidations.update(pending)
+            self._redis_failed()
+            return False
+        return True
+
+    def _redis_failed(self) -> None:
+        current_app.logger.warning('User membership cache: redis is not available, using local store.')
+        self._retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+
+
+def _generation_key(kind: str, user_id: int) -> str:
+    return '{}:{}:{}:gen'.format(USER_MEMBERSHIP_CACHE_VERSION, kind, user_id)
+
+
+def _entry_key(kind: str, user_id: int, object_type: str) -> str:
+    return '{}:{}:{}:{}'.format(USER_MEMBERSHIP_CACHE_VERSION, kind, user_id, object_type)
+
+
+_membership_store_lock = threading.Lock()
+_membership_store = None
+
+
+def get_membership_store():
+    global _membership_store
+    if _membership_store is None:
+        with _membership_store_lock:
+            if _membership_store is None:
+                local_store = LocalMembershipStore(int(current_app.config.get('USER_MEMBERSHIP_CACHE_LOCAL_SIZE', 4096)),
+                                                   float(current_app.config.get('USER_MEMBERSHIP_CACHE_LOCAL_TTL', 60)))
+                if current_app.config.get('USER_MEMBERSHIP_CACHE_BACKEND') == 'redis':
+                    redis_conn = Redis(host=current_app.config.get('RQ_DEFAULT_HOST'),
+                                       port=current_app.config.get('RQ_DEFAULT_PORT'),
+                                       db=current_app.config.get('RQ_DEFAULT_DB', 0),
+                                       password=current_app.config.get('RQ_DEFAULT_PASSWORD'),
+                                       socket_timeout=1.0,
+                                       socket_connect_timeout=1.0)
+                    _membership_store = RedisMembershipStore(redis_conn, local_store)
+                else:
+                    _membership_store = local_store
+    return _membership_store
+
+
+def clear_membership_store():
+    global _membership_store
+    with _membership_store_lock:
+        _membership_store = None
+
+
+def _load_member_ids(kind: str, user_id: int, object_type: str) -> FrozenSet[int]:
+    list_model, item_model, list_id_attr = _MEMBERSHIP_LISTS[kind]
+    id_column = getattr(item_model, _MEMBERSHIP_ID_COLUMNS[object_type])
+    ids_query = db.session.query(id_column) \
+        .join(list_model, list_model.id == getattr(item_model, list_id_attr)) \
+        .filter(list_model.user_id == user_id, id_column.isnot(None))
+    ids = {row[0] for row in ids_query}
+    if object_type == MEMBERSHIP_DSO and ids:
+        # child of listed master object is listed too
+        ids.update(row[0] for row in db.session.query(DeepskyObject.id).filter(DeepskyObject.master_id.in_(ids_query)))
+    return frozenset(ids)
+
+
+def get_user_member_ids(kind: str, user_id: int, object_type: str = MEMBERSHIP_DSO) -> FrozenSet[int]:
+    """
+    Ids of objects of object type in user's observed list or wish list.
+    """
+    store = get_membership_store()
+    # generation is read before loading, so concurrent invalidation makes loaded entry obsolete
+    generation, ids = store.get(kind, user_id, object_type)
+    if ids is None:
+        ids = _load_member_ids(kind, user_id, object_type)
+        store.put(kind, user_id, object_type, generation, ids)
+    return ids
+
+
+def get_observed_ids(user_id: int, object_type: str = MEMBERSHIP_DSO) -> FrozenSet[int]:
+    return get_user_member_ids(MEMBERSHIP_OBSERVED, user_id, object_type)
+
+
+def get_wished_ids(user_id: int, object_type: str = MEMBERSHIP_DSO) -> FrozenSet[int]:
+    return get_user_member_ids(MEMBERSHIP_WISHLIST, user_id, object_type)
+
+
+def invalidate_user_membership(kind: str, user_id: int) -> None:
+    """
+    Must be called after commit of any change of user's observed list or wish list items.
+    """
+    get_membership_store().invalidate(kind, user_id)
@@ -1,18 +1,15 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_svg import FigureCanvasSVG
-from matplotlib.lines import Line2D
-from datetime import datetime
-import matplotlib.dates as mdates
-from matplotlib.patches import Patch
-import io
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from html import escape
+from typing import Tuple
+
+from .rise_set_utils import RiseSetEngine, datetime_to_jd, jd_to_datetime, solar_midnight_jd, sun_altitude_deg
 
 try:
     from astropy import units as u
-    from astropy.time import Time
-    from astropy.coordinates import SkyCoord, EarthLocation, get_sun
-    from astroplan import Observer, FixedTarget
+    from astropy.coordinates import SkyCoord
     import warnings
     warnings.filterwarnings('ignore')
     ASTRO_AVAILABLE = True
@@ -93,6 +90,61 @@ def _make_target_from_coords(ra, dec):
         return SkyCoord(ra=float(ra_s) * u.rad, dec=float(dec_s) * u.rad, frame='icrs')
 
 
+TWILIGHT_BANDS = ('day', 'civil', 'nautical', 'astronomical', 'night')
+
+SVG_FONT_FAMILY = 'DejaVu Sans, Bitstream Vera Sans, sans-serif'
+SVG_ALT_MIN = -25.0
+SVG_ALT_MAX = 90.0
+
+
+def _twilight_band(sun_alt):
+    if sun_alt > -0.5:
+        return 'day'
+    if sun_alt > -6:
+        return 'civil'
+    if sun_alt > -12:
+        return 'nautical'
+    if sun_alt > -18:
+        return 'astronomical'
+    return 'night'
+
+
+@dataclass(frozen=True)
+class NightContext:
+    """
+    Time base of one night at one location: samples midnight +/-12h, sun altitudes and twilight bands
+    shared by all targets.
+    """
+    latitude: float
+    longitude: float
+    date_str: str
+    midnight_jd: float
+    jd: np.ndarray
+    sun_alt: np.ndarray
+    # (first sample index, last sample index, band name) of merged sample intervals
+    twilight_bands: Tuple[Tuple[int, int, str], ...]
+
+
+@lru_cache(maxsize=256)
+def get_night_context(latitude, longitude, date_str, num_points=73):
+    obs_date = datetime.strptime(date_str, '%Y-%m-%d')
+    midnight_jd = float(solar_midnight_jd(longitude, datetime_to_jd(obs_date)))
+    jd = midnight_jd + np.linspace(-12, 12, num_points) / 24.0
+    sun_alt = sun_altitude_deg(latitude, longitude, jd)
+
+    bands = []
+    for i in range(len(jd) - 1):
+        band = _twilight_band(sun_alt[i])
+        if bands and bands[-1][2] == band:
+            bands[-1] = (bands[-1][0], i + 1, band)
+        else:
+            bands.append((i, i + 1, band))
+
+    jd.setflags(write=False)
+    sun_alt.setflags(write=False)
+    return NightContext(latitude, longitude, date_str, midnight_jd, jd, sun_alt, tuple(bands))
+
+
 def create_visibility_chart(
         location_name,
         latitude, longitude, elevation,
@@ -118,241 +170,218 @@ def create_visibility_chart(
     """
     FAST version: Create SVG visibility chart for an astronomical target (RA/Dec only)
 
-    New parameters allow controlling font sizes and x-grid density for small panels.
-    Backwards compatible: existing calls still work.
+    SVG is written directly from altitude arrays, sun altitudes and twilight bands are shared per night
+    and location (see get_night_context). Identical requests are served from cache.
     """
     if theme not in THEMES:
         raise ValueError(f"Unknown theme '{theme}'")
+
+    font_sizes_key = tuple(sorted(font_sizes.items())) if font_sizes else None
+    svg_str = _create_visibility_svg(location_name, float(latitude), float(longitude), date_str, str(ra), str(dec),
+                                     object_label, theme, num_points, panel_mode, float(scale), font_sizes_key,
+                                     x_major_hours, x_minor_minutes, grid_major, grid_minor, grid_linestyle,
+                                     grid_linewidth, grid_alpha, rotate_xticks)
+    if return_svg_string:
+        return svg_str
+    if not output_file:
+        raise ValueError("output_file must be set when return_svg_string=False")
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(svg_str)
+    return None
+
+
+def _parse_coords(ra, dec):
+    try:
+        return float(ra), float(dec), None
+    except (TypeError, ValueError):
+        coord = _make_target_from_coords(ra, dec)
+        return coord.ra.rad, coord.dec.rad, coord
+
+
+def _default_object_label(ra_rad, dec_rad, coord):
+    if coord is None:
+        coord = SkyCoord(ra=ra_rad * u.rad, dec=dec_rad * u.rad, frame='icrs')
+    ra_fmt = coord.ra.to_string(unit=u.hourangle, sep=':', precision=1, pad=True)
+    dec_fmt = coord.dec.to_string(unit=u.deg, sep=':', precision=1, alwayssign=True, pad=True)
+    return f"RA {ra_fmt}  Dec {dec_fmt}"
+
+
+_GRID_DASHES = {'--': '3.7,1.6', ':': '1,1.65', '-.': '6.4,1.6,1,1.6', '-': None}
+
+
+def _svg_line(x1, y1, x2, y2, color, width, dash=None, opacity=None):
+    attrs = f'x1="{x1:.2f}" y1="{y1:.2f}" x2="{x2:.2f}" y2="{y2:.2f}" stroke="{color}" stroke-width="{width:.2f}"'
+    if dash:
+        attrs += ' stroke-dasharray="{}"'.format(','.join('{:.2f}'.format(float(d) * width) for d in dash.split(',')))
+    if opacity is not None:
+        attrs += f' stroke-opacity="{opacity:.3g}"'
+    return f'<line {attrs}/>'
+
+
+def _svg_text(x, y, text, color, size, anchor='middle', bold=False, rotate=None, baseline=None):
+    attrs = f'x="{x:.2f}" y="{y:.2f}" fill="{color}" font-size="{size:.2f}" text-anchor="{anchor}"'
+    if bold:
+        attrs += ' font-weight="bold"'
+    if baseline:
+        attrs += f' dominant-baseline="{baseline}"'
+    if rotate:
+        attrs += f' transform="rotate({rotate:.2f} {x:.2f} {y:.2f})"'
+    return f'<text {attrs}>{escape(text)}</text>'
+
+
+@lru_cache(maxsize=512)
+def _create_visibility_svg(location_name, latitude, longitude, date_str, ra, dec, object_label, theme, num_points,
+                           panel_mode, scale, font_sizes_key, x_major_hours, x_minor_minutes, grid_major, grid_minor,
+                           grid_linestyle, grid_linewidth, grid_alpha, rotate_xticks):
     colors = THEMES[theme]
 
     # ---- Font sizing defaults (tuned for a small side panel) ----
-    # Note: font_sizes overrides individual fields after base+scale.
-    base_fonts = {
-        "title": 15,
-        "label": 13,
-        "ticks": 11,
-        "legend": 10,
-    }
+    base_fonts = {"title": 15, "label": 13, "ticks": 11, "legend": 10}
     if panel_mode:
-        base_fonts = {
-            "title": 18,
-            "label": 15,
-            "ticks": 14,
-            "legend": 14,
-        }
-
-    # Apply global scale
-    scale = float(scale)
+        base_fonts = {"title": 18, "label": 15, "ticks": 14, "legend": 14}
     base_fonts = {k: v * scale for k, v in base_fonts.items()}
+    for k, v in (font_sizes_key or ()):
+        if k in base_fonts and v is not None:
+            base_fonts[k] = float(v)
 
-    # Apply optional per-field overrides
-    if font_sizes:
-        for k, v in font_sizes.items():
-            if k in base_fonts and v is not None:
-                base_fonts[k] = float(v)
-
-    # Grid alpha default
     if grid_alpha is None:
         grid_alpha = colors['grid_alpha']
 
-    # Create observer
-    location = EarthLocation(lat=latitude * u.deg, lon=longitude * u.deg, height=elevation * u.m)
-    observer = Observer(location=location, name=location_name, timezone='UTC')
+    night = get_night_context(latitude, longitude, date_str, num_points)
 
-    # Observation date
-    obs_date = datetime.strptime(date_str, '%Y-%m-%d')
-    obs_time = Time(obs_date)
+    ra_rad, dec_rad, coord = _parse_coords(ra, dec)
+    if object_label is None:
+        object_label = _default_object_label(ra_rad, dec_rad, coord)
 
-    # Time range
-    midnight = observer.midnight(obs_time, which='next')
-    time_range = midnight + np.linspace(-12, 12, num_points) * u.hour
+    engine = RiseSetEngine(np.array([ra_rad]), np.array([dec_rad]), latitude, longitude, night.midnight_jd)
+    altitudes = engine.altitude_deg(night.jd)[0]
 
-    # Target from coordinates (NO name resolution)
-    coord = _make_target_from_coords(ra, dec)
-    target = FixedTarget(coord=coord, name='target')
+    # figure size in points, same as former matplotlib figure
+    width, height = ((12, 6.5) if panel_mode else (16, 9))
+    width, height = width * 72.0, height * 72.0
+    tick_fs, label_fs, title_fs, legend_fs = base_fonts['ticks'], base_fonts['label'], base_fonts['title'], base_fonts['legend']
 
-    # Altitude of target (vectorized)
-    altaz = observer.altaz(time_range, target)
-    altitudes = altaz.alt.degree
+    sin_rot = np.sin(np.radians(rotate_xticks))
+    cos_rot = np.cos(np.radians(rotate_xticks))
+    left = 10 + label_fs * 1.4 + tick_fs * 2.4 + 6
+    right = width - 15
+    top = 12 + title_fs * 1.2 + 20
+    bottom = height - (10 + label_fs * 1.4 + tick_fs * (2.9 * sin_rot + cos_rot) + 8)
 
-    # Sun altitude (vectorized)
-    sun_coords = get_sun(time_range)
-    sun_altaz = observer.altaz(time_range, sun_coords)
-    sun_altitudes = sun_altaz.alt.degree
+    t0, t1 = night.jd[0], night.jd[-1]
 
-    times_plot = time_range.to_datetime()
+    def px(jd):
+        return left + (jd - t0) / (t1 - t0) * (right - left)
 
-    # Auto label if not provided
-    if object_label is None:
-        ra_fmt = coord.ra.to_string(unit=u.hourangle, sep=':', precision=1, pad=True)
-        dec_fmt = coord.dec.to_string(unit=u.deg, sep=':', precision=1, alwayssign=True, pad=True)
-        object_label = f"RA {ra_fmt}  Dec {dec_fmt}"
-
-    # Figure sizing: for small panels, smaller figsize + higher DPI tends to render nicer
-    dpi = 140 if panel_mode else 100
-    figsize = (12, 6.5) if panel_mode else (16, 9)
-
-    fig = Figure(figsize=figsize, facecolor=colors['bg_color'], dpi=dpi)
-    canvas = FigureCanvasSVG(fig)
-    ax = fig.add_subplot(111)
-    ax.set_facecolor(colors['bg_color'])
-
-    twilight_colors = {
-        'day': (colors['day'][0], colors['day'][1]),
-        'civil': (colors['civil'][0], colors['civil'][1]),
-        'nautical': (colors['nautical'][0], colors['nautical'][1]),
-        'astronomical': (colors['astronomical'][0], colors['astronomical'][1]),
-        'night': (colors['night'][0], colors['night'][1]),
-    }
+    def py(alt):
+        return bottom - (alt - SVG_ALT_MIN) / (SVG_ALT_MAX - SVG_ALT_MIN) * (bottom - top)
 
-    # Background twilight bands
-    for i in range(len(times_plot) - 1):
-        sun_alt = sun_altitudes[i]
-
-        if sun_alt > -0.5:
-            color, alpha = twilight_colors['day']
-        elif sun_alt > -6:
-            color, alpha = twilight_colors['civil']
-        elif sun_alt > -12:
-            color, alpha = twilight_colors['nautical']
-        elif sun_alt > -18:
-            color, alpha = twilight_colors['astronomical']
-        else:
-            color, alpha = twilight_colors['night']
+    fg = colors['fg_color']
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}pt" height="{height:.0f}pt" '
+        f'viewBox="0 0 {width:.0f} {height:.0f}" font-family="{SVG_FONT_FAMILY}">',
+        f'<rect width="100%" height="100%" fill="{colors["bg_color"]}"/>',
+    ]
 
-        ax.axvspan(times_plot[i], times_plot[i + 1], facecolor=color, alpha=alpha, zorder=1)
+    # Background twilight bands, consecutive samples of the same band are merged
+    for i_from, i_to, band in night.twilight_bands:
+        color, alpha = colors[band]
+        x1, x2 = px(night.jd[i_from]), px(night.jd[i_to])
+        out.append(f'<rect x="{x1:.2f}" y="{top:.2f}" width="{x2 - x1:.2f}" height="{bottom - top:.2f}" '
+                   f'fill="{color}" fill-opacity="{alpha}"/>')
+
+    # X ticks on whole hours (UTC)
+    start_dt = jd_to_datetime(t0).replace(minute=0, second=0, microsecond=0)
+    major_ticks, minor_ticks = [], []
+    tick_dt = start_dt
+    while True:
+        tick_jd = datetime_to_jd(tick_dt)
+        if tick_jd > t1:
+            break
+        if tick_jd >= t0:
+            if tick_dt.minute == 0 and tick_dt.hour % int(x_major_hours) == 0:
+                major_ticks.append((tick_jd, tick_dt.strftime('%H:%M')))
+            elif x_minor_minutes and int(x_minor_minutes) > 0:
+                minor_ticks.append(tick_jd)
+        tick_dt += timedelta(minutes=int(x_minor_minutes) if x_minor_minutes and int(x_minor_minutes) > 0 else 60)
+
+    y_ticks = list(range(-20, 91, 10))
+    grid_dash = _GRID_DASHES.get(grid_linestyle)
+    grid_width = grid_linewidth * scale
+    if grid_major:
+        for tick_jd, _ in major_ticks:
+            out.append(_svg_line(px(tick_jd), top, px(tick_jd), bottom, colors['grid_color'], grid_width, grid_dash, grid_alpha))
+        for alt in y_ticks:
+            out.append(_svg_line(left, py(alt), right, py(alt), colors['grid_color'], grid_width, grid_dash, grid_alpha))
+    if grid_minor:
+        minor_width = max(0.5, grid_linewidth * 0.7) * scale
+        for tick_jd in minor_ticks:
+            out.append(_svg_line(px(tick_jd), top, px(tick_jd), bottom, colors['grid_color'], minor_width,
+                                 _GRID_DASHES[':'], grid_alpha * 0.6))
 
-    # Target curve (scale line width slightly too)
-    ax.plot(
-        times_plot,
-        altitudes,
-        color=colors['object_color'],
-        linewidth=3 * scale,
-        label=object_label,
-        zorder=10
-    )
+    # Helper lines
+    for alt in (30, 60):
+        out.append(_svg_line(left, py(alt), right, py(alt), colors['grid_color'], 1.0 * scale, _GRID_DASHES[':'], 0.5))
 
     # Horizon line
-    ax.axhline(
-        y=0,
-        color=colors['horizon_color'],
-        linestyle='-',
-        linewidth=2.5 * scale,
-        label='Horizon',
-        zorder=5
-    )
+    out.append(_svg_line(left, py(0), right, py(0), colors['horizon_color'], 2.5 * scale))
 
-    # Helper lines
-    for alt in [30, 60]:
-        ax.axhline(
-            y=alt,
-            color=colors['grid_color'],
-            linestyle=':',
-            linewidth=1.0 * scale,
-            alpha=0.5,
-            zorder=2
-        )
-
-    # ---- X axis formatting (controls "X mesh" density) ----
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-    ax.xaxis.set_major_locator(mdates.HourLocator(interval=int(x_major_hours)))
-
-    # Minor ticks can be enabled, but keep minor grid off by default to avoid dense mesh
-    if x_minor_minutes and int(x_minor_minutes) > 0:
-        ax.xaxis.set_minor_locator(mdates.MinuteLocator(interval=int(x_minor_minutes)))
-
-    # Major grid only by default (prevents "too dense X mesh")
-    ax.grid(
-        grid_major,
-        which='major',
-        alpha=grid_alpha,
-        linestyle=grid_linestyle,
-        linewidth=grid_linewidth * scale,
-        color=colors['grid_color'],
-        zorder=2
-    )
-    if grid_minor:
-        ax.grid(
-            True,
-            which='minor',
-            alpha=grid_alpha * 0.6,
-            linestyle=':',
-            linewidth=max(0.5, grid_linewidth * 0.7) * scale,
-            color=colors['grid_color'],
-            zorder=2
-        )
-
-    # Tick styling + font sizes
-    plt.setp(
-        ax.xaxis.get_majorticklabels(),
-        rotation=rotate_xticks,
-        ha='right',
-        color=colors['fg_color'],
-        fontsize=base_fonts["ticks"]
-    )
-    plt.setp(
-        ax.yaxis.get_majorticklabels(),
-        color=colors['fg_color'],
-        fontsize=base_fonts["ticks"]
-    )
-    ax.tick_params(axis='x', colors=colors['fg_color'])
-    ax.tick_params(axis='y', colors=colors['fg_color'])
-
-    # Labels
-    ax.set_xlabel('Time (UTC)', fontsize=base_fonts["label"], fontweight='bold', color=colors['fg_color'])
-    ax.set_ylabel('Altitude [°]', fontsize=base_fonts["label"], fontweight='bold', color=colors['fg_color'])
-    ax.set_title(
-        f'{object_label} — {location_name} — {date_str}',
-        fontsize=base_fonts["title"],
-        fontweight='bold',
-        pad=20,
-        color=colors['fg_color']
-    )
-
-    # Y axis range
-    ax.set_ylim(-25, 90)
-    ax.set_yticks(np.arange(-20, 91, 10))
+    # Target curve
+    points = ' '.join(f'{px(jd):.2f},{py(min(max(alt, SVG_ALT_MIN), SVG_ALT_MAX)):.2f}' for jd, alt in zip(night.jd, altitudes))
+    out.append(f'<polyline points="{points}" fill="none" stroke="{colors["object_color"]}" '
+               f'stroke-width="{3 * scale:.2f}" stroke-linejoin="round" stroke-linecap="square"/>')
 
     # Spines
-    for spine in ax.spines.values():
-        spine.set_edgecolor(colors['fg_color'])
-
-    # Legend (simplified for speed)
-    legend_elements = [
-        Line2D([0], [0], color=colors['object_color'], linewidth=3 * scale, label=object_label),
-        Line2D([0], [0], color=colors['horizon_color'], linewidth=2.5 * scale, label='Horizon'),
-        Patch(facecolor=colors['day'][0], alpha=colors['day'][1], label='Day'),
-        Patch(facecolor=colors['night'][0], alpha=colors['night'][1], label='Night'),
-    ]
-    legend = ax.legend(
-        handles=legend_elements,
-        loc='upper right',
-        fontsize=base_fonts["legend"],
-        framealpha=0.9,
-        facecolor=colors['bg_color'],
-        edgecolor=colors['fg_color']
-    )
-    plt.setp(legend.get_texts(), color=colors['fg_color'])
-
-    fig.tight_layout()
+    out.append(f'<rect x="{left:.2f}" y="{top:.2f}" width="{right - left:.2f}" height="{bottom - top:.2f}" '
+               f'fill="none" stroke="{fg}" stroke-width="0.8"/>')
+
+    # Ticks and tick labels
+    tick_len = 3.5
+    for tick_jd, label in major_ticks:
+        x = px(tick_jd)
+        out.append(_svg_line(x, bottom, x, bottom + tick_len, fg, 0.8))
+        out.append(_svg_text(x, bottom + tick_len + 2 + tick_fs * 0.8, label, fg, tick_fs, anchor='end',
+                             rotate=-rotate_xticks if rotate_xticks else None))
+    for tick_jd in minor_ticks:
+        x = px(tick_jd)
+        out.append(_svg_line(x, bottom, x, bottom + 2.0, fg, 0.6))
+    for alt in y_ticks:
+        y = py(alt)
+        out.append(_svg_line(left - tick_len, y, left, y, fg, 0.8))
+        out.append(_svg_text(left - tick_len - 3, y, str(alt), fg, tick_fs, anchor='end', baseline='central'))
 
-    try:
-        if return_svg_string:
-            svg_buffer = io.BytesIO()
-            canvas.print_svg(svg_buffer)
-            svg_buffer.seek(0)
-            svg_str = svg_buffer.getvalue().decode('utf-8')
-            svg_buffer.close()
-            return svg_str
+    # Labels
+    out.append(_svg_text((left + right) / 2, height - 10, 'Time (UTC)', fg, label_fs, bold=True))
+    out.append(_svg_text(10 + label_fs, (top + bottom) / 2, 'Altitude [°]', fg, label_fs, bold=True, rotate=-90))
+    out.append(_svg_text((left + right) / 2, 12 + title_fs, f'{object_label} — {location_name} — {date_str}', fg, title_fs, bold=True))
+
+    # Legend
+    legend_items = [
+        ('line', colors['object_color'], 1.0, 3 * scale, object_label),
+        ('line', colors['horizon_color'], 1.0, 2.5 * scale, 'Horizon'),
+        ('patch', colors['day'][0], colors['day'][1], None, 'Day'),
+        ('patch', colors['night'][0], colors['night'][1], None, 'Night'),
+    ]
+    row_h = legend_fs * 1.4
+    handle_w = legend_fs * 2.0
+    legend_w = handle_w + legend_fs * (0.8 + 0.6 * max(len(item[4]) for item in legend_items)) + 8
+    legend_h = row_h * len(legend_items) + legend_fs * 0.6
+    lx = right - legend_w - 6
+    ly = top + 6
+    out.append(f'<rect x="{lx:.2f}" y="{ly:.2f}" width="{legend_w:.2f}" height="{legend_h:.2f}" rx="3" '
+               f'fill="{colors["bg_color"]}" fill-opacity="0.9" stroke="{fg}" stroke-width="0.8"/>')
+    for i, (kind, color, alpha, line_width, label) in enumerate(legend_items):
+        cy = ly + legend_fs * 0.3 + row_h * (i + 0.5)
+        hx = lx + legend_fs * 0.4
+        if kind == 'line':
+            out.append(_svg_line(hx, cy, hx + handle_w, cy, color, line_width))
         else:
-            if not output_file:
-                raise ValueError("output_file must be set when return_svg_string=False")
-            with open(output_file, 'wb') as f:
-                canvas.print_svg(f)
-            return None
-    finally:
-        fig.clf()
-        del fig, canvas, ax
+            out.append(f'<rect x="{hx:.2f}" y="{cy - legend_fs * 0.35:.2f}" width="{handle_w:.2f}" height="{legend_fs * 0.7:.2f}" '
+                       f'fill="{color}" fill-opacity="{alpha}"/>')
+        out.append(_svg_text(hx + handle_w + legend_fs * 0.8, cy, label, fg, legend_fs, anchor='start', baseline='central'))
+
+    out.append('</svg>')
+    return '\n'.join(out)
 
 
 def get_rise_transit_set_utc(
@@ -389,37 +418,29 @@ def get_rise_transit_set_utc(
     Notes:
     - If the object is always above horizon (circumpolar), rise/set are None, transit is returned.
     - If the object never gets above horizon, all are None.
+    - Events nearest to the midnight are computed from the shared night context (see get_night_context).
     """
     if not ASTRO_AVAILABLE:
         raise ImportError("astropy/astroplan not available (ASTRO_AVAILABLE=False)")
 
-    # Create observer (UTC)
-    location = EarthLocation(lat=latitude * u.deg, lon=longitude * u.deg, height=elevation * u.m)
-    observer = Observer(location=location, name=location_name, timezone='UTC')
-
-    # Observation date
-    obs_date = datetime.strptime(date_str, '%Y-%m-%d')
-    obs_time = Time(obs_date)
-
-    # Match chart logic: define a reference midnight then compute events around it
-    midnight = observer.midnight(obs_time, which=which_midnight)
+    night = get_night_context(float(latitude), float(longitude), date_str)
+    midnight_jd = night.midnight_jd
+    if which_midnight == 'previous':
+        midnight_jd -= 1.0
+    elif which_midnight == 'nearest' and midnight_jd - 0.5 > datetime_to_jd(datetime.strptime(date_str, '%Y-%m-%d')):
+        midnight_jd -= 1.0
 
-    # Target from coordinates (NO name resolution)
-    coord = _make_target_from_coords(ra, dec)
-    target = FixedTarget(coord=coord, name='target')
+    ra_rad, dec_rad, coord = _parse_coords(ra, dec)
 
     # Auto label if not provided
     if object_label is None:
-        ra_fmt = coord.ra.to_string(unit=u.hourangle, sep=':', precision=1, pad=True)
-        dec_fmt = coord.dec.to_string(unit=u.deg, sep=':', precision=1, alwayssign=True, pad=True)
-        object_label = f"RA {ra_fmt}  Dec {dec_fmt}"
+        object_label = _default_object_label(ra_rad, dec_rad, coord)
 
-    horizon = float(horizon_deg) * u.deg
-
-    def _to_out(t):
-        if t is None:
+    def _to_out(jd):
+        dt = jd_to_datetime(jd)
+        if dt is None:
             return None
-        dt = t.to_datetime(timezone=None)  # naive datetime in UTC
+        dt = dt.replace(tzinfo=None)  # naive datetime in UTC
         if return_datetimes:
             return dt
         # Human-readable format
@@ -437,65 +458,20 @@ def get_rise_transit_set_utc(
         "notes": ""
     }
 
-    # Transit is usually well-defined even if circumpolar / never rises, but can fail in edge cases
-    try:
-        t_transit = observer.target_meridian_transit_time(midnight, target, which='nearest')
-        result["transit_utc"] = _to_out(t_transit)
-    except Exception as e:
-        result["notes"] += f"Transit computation failed: {e}. "
-
-    # Rise / set can raise errors if target never rises/sets (or always above)
-    t_rise = None
-    t_set = None
+    engine = RiseSetEngine(np.array([ra_rad]), np.array([dec_rad]), night.latitude, night.longitude, midnight_jd,
+                           horizon_deg=float(horizon_deg))
 
-    try:
-        t_rise = observer.target_rise_time(midnight, target, which='nearest', horizon=horizon)
-    except Exception as e:
-        result["notes"] += f"Rise computation failed: {e}. "
-
-    try:
-        t_set = observer.target_set_time(midnight, target, which='nearest', horizon=horizon)
-    except Exception as e:
-        result["notes"] += f"Set computation failed: {e}. "
-
-    # Determine status robustly via altitudes around +/- 12h like chart
-    # (avoids relying on exception types differing across versions)
-    try:
-        time_range = midnight + np.linspace(-12, 12, 73) * u.hour
-        altitudes = observer.altaz(time_range, target).alt
-        above = altitudes > horizon
-        ever_above = bool(np.any(above))
-        ever_below = bool(np.any(~above))
-
-        if ever_above and ever_below:
-            # Normal case: rises and sets
-            result["status"] = "ok"
-            result["rise_utc"] = _to_out(t_rise)
-            result["set_utc"] = _to_out(t_set)
-        elif ever_above and not ever_below:
-            # Always above horizon
-            result["status"] = "circumpolar"
-            result["rise_utc"] = None
-            result["set_utc"] = None
-            if not result["notes"]:
-                result["notes"] = "Target stays above the horizon for the sampled 24h interval."
-        else:
-            # Never above horizon
-            result["status"] = "never_rises"
-            result["rise_utc"] = None
-            result["set_utc"] = None
-            result["transit_utc"] = None  # optional: usually not useful if never rises
-            if not result["notes"]:
-                result["notes"] = "Target does not rise above the horizon for the sampled 24h interval."
-    except Exception as e:
-        # Fallback: just return what we managed to compute
-        result["rise_utc"] = _to_out(t_rise)
-        result["set_utc"] = _to_out(t_set)
-        if result["status"] == "error":
-            result["notes"] += f"Visibility classification failed: {e}. "
-
-        # Try to infer something basic
-        if result["rise_utc"] is not None and result["set_utc"] is not None:
-            result["status"] = "ok"
+    if engine.circumpolar[0]:
+        result["status"] = "circumpolar"
+        result["transit_utc"] = _to_out(engine.transit_jd(midnight_jd)[0])
+        result["notes"] = "Target stays above the horizon for the sampled 24h interval."
+    elif engine.never_rises[0]:
+        result["status"] = "never_rises"
+        result["notes"] = "Target does not rise above the horizon for the sampled 24h interval."
+    else:
+        result["status"] = "ok"
+        result["transit_utc"] = _to_out(engine.transit_jd(midnight_jd)[0])
+        result["rise_utc"] = _to_out(engine.rise_jd(midnight_jd)[0])
+        result["set_utc"] = _to_out(engine.set_jd(midnight_jd)[0])
 
     return result
@@ -28,7 +28,6 @@ from app.models import (
     UserDsoDescription,
     UserStarDescription,
     UserDsoApertureDescription,
-    WishList,
     User,
 )
 
@@ -44,6 +43,7 @@ from app.commons.chart_generator import (
     common_ra_dec_dt_fsz_from_request,
 )
 from app.commons.chart_scene import build_scene_v1
+from app.commons.user_membership_cache import get_observed_ids, get_wished_ids
 
 from .constellation_forms import (
     ConstellationEditForm,
@@ -210,8 +210,8 @@ def constellation_info(constellation_id):
     observed_list = None
     offered_session_plans = None
     if current_user.is_authenticated:
-        wish_list = [item.dso_id for item in WishList.create_get_wishlist_by_user_id(current_user.id).wish_list_items]
-        observed_list = [item.dso_id for item in ObservedList.create_get_observed_list_by_user_id(current_user.id).observed_list_items]
+        wish_list = get_wished_ids(current_user.id)
+        observed_list = get_observed_ids(current_user.id)
         offered_session_plans = SessionPlan.query.filter_by(user_id=current_user.id, is_archived=False).all()
     else:
         session_plan_id = session.get('session_plan_id')
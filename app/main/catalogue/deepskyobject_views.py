@@ -41,8 +41,9 @@ from app.models import (
     WishListItem,
 )
 from app.commons.pagination import Pagination
+from app.commons.keyset_pagination import paginate_catalogue_query
 from app.commons.dso_utils import normalize_dso_name, denormalize_dso_name
-from app.commons.search_utils import process_paginated_session_search, get_items_per_page, create_table_sort, get_order_by_field
+from app.commons.search_utils import process_paginated_session_search, get_items_per_page, create_table_sort
 from app.commons.utils import get_lang_and_editor_user_from_request, get_lang_and_all_editor_users_from_request, is_splitview_supported
 from app.commons.observation_form_utils import assign_equipment_choices
 from app.commons.chart_generator import resolve_chart_city_lat_lon, get_chart_datetime
@@ -76,6 +77,12 @@ from app.commons.chart_scene import (
 )
 from app.commons.prevnext_utils import create_navigation_wrappers
 from app.commons.highlights_list_utils import create_hightlights_lists, create_observed_dso_ids_list
+from app.commons.user_membership_cache import (
+    MEMBERSHIP_OBSERVED,
+    MEMBERSHIP_WISHLIST,
+    get_observed_ids,
+    invalidate_user_membership,
+)
 
 from app.commons.observing_session_utils import find_observing_session, show_observation_log, combine_observing_session_date_time
 main_deepskyobject = Blueprint('main_deepskyobject', __name__)
@@ -134,8 +141,6 @@ def deepskyobjects():
 
         per_page = get_items_per_page(search_form.items_per_page)
 
-        offset = (page - 1) * per_page
-
         dso_query = DeepskyObject.query
         if search_form.q.data:
             dso_query = dso_query.filter_by(name=normalize_dso_name(search_form.q.data))
@@ -160,19 +165,12 @@ def deepskyobjects():
             if search_form.maglim.data:
                 dso_query = dso_query.filter(DeepskyObject.mag <= search_form.maglim.data)
 
-        order_by_field = get_order_by_field(sort_def, sort_by)
-
-        if order_by_field is None:
-            order_by_field = DeepskyObject.id
-
-        shown_dsos = dso_query.order_by(order_by_field).limit(per_page).offset(offset).all()
+        shown_dsos, total = paginate_catalogue_query(dso_query, sort_def, sort_by, DeepskyObject.id, DeepskyObject.id, page, per_page,
+                                                     DeepskyObject.__tablename__)
 
-        observed = set()
-        if not current_user.is_anonymous:
-            for dso in ObservedList.get_observed_dsos_by_user_id(current_user.id):
-                observed.add(dso.id)
+        observed = get_observed_ids(current_user.id) if not current_user.is_anonymous else set()
 
-        pagination = Pagination(page=page, per_page=per_page, total=dso_query.count(), search=False, record_name='deepskyobjects',
+        pagination = Pagination(page=page, per_page=per_page, total=total, search=False, record_name='deepskyobjects',
                                 css_framework='semantic', not_passed_args='back')
     else:
         table_sort = create_table_sort(request.args.get('sortby'), sort_def.keys())
@@ -228,11 +226,13 @@ def deepskyobject_switch_wish_list():
     if wish_list_item:
         db.session.delete(wish_list_item)
         db.session.commit()
+        invalidate_user_membership(MEMBERSHIP_WISHLIST, current_user.id)
         result = 'off'
     else:
         wish_list_item = wish_list.create_new_deepsky_object_item(dso_id)
         db.session.add(wish_list_item)
         db.session.commit()
+        invalidate_user_membership(MEMBERSHIP_WISHLIST, current_user.id)
         result = 'on'
     return jsonify(result=result)
 
@@ -249,11 +249,13 @@ def deepskyobject_switch_observed_list():
     if observed_list_item:
         db.session.delete(observed_list_item)
         db.session.commit()
+        invalidate_user_membership(MEMBERSHIP_OBSERVED, current_user.id)
         result = 'off'
     else:
         observed_list_item = observed_list.create_new_deepsky_object_item(dso_id)
         db.session.add(observed_list_item)
         db.session.commit()
+        invalidate_user_membership(MEMBERSHIP_OBSERVED, current_user.id)
         result = 'on'
     return jsonify(result=result)
 
@@ -21,16 +21,16 @@ from flask_login import current_user
 from app.models import (
     Constellation,
     DoubleStar,
+    DoubleStarDesignation,
     DoubleStarList,
     DoubleStarListItem,
     DoubleStarListDescription,
-    ObservedList,
     SessionPlan,
     UserDoubleStarDescription,
-    WishList,
 )
 
 from app.commons.dso_utils import CHART_DOUBLE_STAR_PREFIX
+from app.commons.user_membership_cache import MEMBERSHIP_DOUBLE_STAR, get_observed_ids, get_wished_ids
 from app.commons.utils import get_lang_and_editor_user_from_request, get_lang_and_all_editor_users_from_request
 from app.commons.chart_generator import (
     common_chart_pos_img,
@@ -109,8 +109,8 @@ def double_star_list_detail(double_star_list_id):
     observed_list = None
     offered_session_plans = None
     if current_user.is_authenticated:
-        wish_list = [item.double_star_id for item in WishList.create_get_wishlist_by_user_id(current_user.id).wish_list_items]
-        observed_list = [item.double_star_id for item in ObservedList.create_get_observed_list_by_user_id(current_user.id).observed_list_items]
+        wish_list = get_wished_ids(current_user.id, MEMBERSHIP_DOUBLE_STAR)
+        observed_list = get_observed_ids(current_user.id, MEMBERSHIP_DOUBLE_STAR)
         offered_session_plans = SessionPlan.query.filter_by(user_id=current_user.id, is_archived=False).all()
     else:
         session_plan_id = session.get('session_plan_id')
@@ -156,7 +156,7 @@ def double_star_list_info(double_star_list_id):
     if search_form.q.data:
         dbl_list_query = dbl_list_query.filter(or_(DoubleStar.common_cat_id == search_form.q.data,
                                                    DoubleStar.wds_number == search_form.q.data.strip(),
-                                                   DoubleStar.norm_other_designation.like('%;' + search_form.q.data.strip() + ';%')
+                                                   DoubleStar.id.in_(DoubleStarDesignation.double_star_ids(search_form.q.data))
                                                    ))
     else:
         if search_form.mag_max.data is not None:
@@ -23,6 +23,7 @@ from app import db, csrf
 
 from app.models import (
     DoubleStar,
+    DoubleStarDesignation,
     Observation,
     ObservingSession,
     ObservationTargetType,
@@ -36,6 +37,7 @@ from app.models import (
 )
 
 from app.commons.pagination import Pagination
+from app.commons.keyset_pagination import paginate_catalogue_query
 from app.commons.chart_generator import (
     common_chart_pos_img,
     common_chart_pdf_img,
@@ -55,7 +57,6 @@ from app.commons.search_utils import (
     get_items_per_page,
     create_table_sort,
     get_packed_constell_list,
-    get_order_by_field,
 )
 
 from app.commons.dso_utils import normalize_double_star_name
@@ -63,6 +64,14 @@ from app.commons.dso_utils import normalize_double_star_name
 from app.main.chart.chart_forms import ChartForm
 from app.commons.prevnext_utils import create_navigation_wrappers
 from app.commons.highlights_list_utils import create_hightlights_lists, create_observed_dso_ids_list
+from app.commons.user_membership_cache import (
+    MEMBERSHIP_DOUBLE_STAR,
+    MEMBERSHIP_OBSERVED,
+    MEMBERSHIP_WISHLIST,
+    get_observed_ids,
+    get_wished_ids,
+    invalidate_user_membership,
+)
 from app.commons.observing_session_utils import find_observing_session, show_observation_log, combine_observing_session_date_time
 from app.commons.observation_form_utils import assign_equipment_choices
 from app.commons.chart_generator import resolve_chart_city_lat_lon, get_chart_datetime
@@ -97,14 +106,12 @@ def double_stars():
 
     per_page = get_items_per_page(search_form.items_per_page)
 
-    offset = (page - 1) * per_page
-
     dbl_star_query = DoubleStar.query
     if search_form.q.data:
         double_star_q = normalize_double_star_name(search_form.q.data)
         dbl_star_query = dbl_star_query.filter(or_(DoubleStar.common_cat_id == double_star_q,
                                                DoubleStar.wds_number == search_form.q.data.strip(),
-                                               DoubleStar.norm_other_designation.like('%;' + search_form.q.data.strip() + ';%')
+                                               DoubleStar.id.in_(DoubleStarDesignation.double_star_ids(search_form.q.data))
                                                ))
     else:
         if search_form.constellation_id.data is not None:
@@ -137,14 +144,10 @@ def double_stars():
 
     table_sort = create_table_sort(sort_by, sort_def.keys())
 
-    order_by_field = get_order_by_field(sort_def, sort_by)
-
-    if order_by_field is None:
-        order_by_field = DoubleStar.id
-
-    shown_double_stars = dbl_star_query.order_by(order_by_field).limit(per_page).offset(offset).all()
+    shown_double_stars, total = paginate_catalogue_query(dbl_star_query, sort_def, sort_by, DoubleStar.id, DoubleStar.id, page, per_page,
+                                                         DoubleStar.__tablename__)
 
-    pagination = Pagination(page=page, per_page=per_page, total=dbl_star_query.count(), search=False, record_name='double_stars',
+    pagination = Pagination(page=page, per_page=per_page, total=total, search=False, record_name='double_stars',
                             css_framework='semantic', not_passed_args='back')
 
     packed_constell_list = get_packed_constell_list()
@@ -172,11 +175,11 @@ def double_star_info(double_star_id):
     observed_list = None
     offered_session_plans = None
     if current_user.is_authenticated:
-        wish_item = WishListItem.query.filter_by(double_star_id=double_star.id).first()
-        wish_list = [wish_item.double_star_id] if wish_item else []
+        wished_ids = get_wished_ids(current_user.id, MEMBERSHIP_DOUBLE_STAR)
+        wish_list = [double_star.id] if double_star.id in wished_ids else []
 
-        observed_item = ObservedListItem.query.filter_by(double_star_id=double_star.id).first()
-        observed_list = [observed_item.double_star_id] if observed_item else []
+        observed_ids = get_observed_ids(current_user.id, MEMBERSHIP_DOUBLE_STAR)
+        observed_list = [double_star.id] if double_star.id in observed_ids else []
 
         if embed != 'pl':
             offered_session_plans = SessionPlan.query.filter_by(user_id=current_user.id, is_archived=False).all()
@@ -317,11 +320,13 @@ def double_star_switch_wish_list():
     if wish_list_item:
         db.session.delete(wish_list_item)
         db.session.commit()
+        invalidate_user_membership(MEMBERSHIP_WISHLIST, current_user.id)
         result = 'off'
     else:
         wish_list_item = wish_list.create_new_double_star_item(double_star_id)
         db.session.add(wish_list_item)
         db.session.commit()
+        invalidate_user_membership(MEMBERSHIP_WISHLIST, current_user.id)
         result = 'on'
     return jsonify(result=result)
 
@@ -339,11 +344,13 @@ def double_star_switch_observed_list():
     if observed_list_item:
         db.session.delete(observed_list_item)
         db.session.commit()
+        invalidate_user_membership(MEMBERSHIP_OBSERVED, current_user.id)
         result = 'off'
     else:
         observed_list_item = observed_list.create_new_double_star_item(double_star_id)
         db.session.add(observed_list_item)
         db.session.commit()
+        invalidate_user_membership(MEMBERSHIP_OBSERVED, current_user.id)
         result = 'on'
     return jsonify(result=result)
 
@@ -31,11 +31,11 @@ from app.models import (
     ObservedListItem,
     StarList,
     UserDsoDescription,
-    WishList,
 )
 
 from app.commons.dso_utils import normalize_dso_name
 from app.commons.highlights_list_utils import find_dso_list_observed
+from app.commons.user_membership_cache import get_observed_ids, get_wished_ids
 from app.commons.search_utils import process_paginated_session_search, create_table_sort, get_order_by_field
 from app.commons.utils import get_lang_and_editor_user_from_request
 from app.commons.chart_generator import (
@@ -48,6 +48,7 @@ from app.commons.chart_scene import (
     build_scene_v1,
     build_cross_highlight,
     build_circle_highlight,
+    add_scene_list_dsos,
     ensure_scene_dso_item,
 )
 
@@ -159,8 +160,8 @@ def dso_list_info(dso_list_id):
 
     dso_list_descr = DsoListDescription.query.filter_by(dso_list_id=dso_list.id, lang_code=lang).first()
 
-    observed = {dso.id for dso in ObservedList.get_observed_dsos_by_user_id(current_user.id)} if not current_user.is_anonymous else None
-    wished = {dso.id for dso in WishList.get_wished_dsos_by_user_id(current_user.id)} if not current_user.is_anonymous else None
+    observed = get_observed_ids(current_user.id) if not current_user.is_anonymous else None
+    wished = get_wished_ids(current_user.id) if not current_user.is_anonymous else None
 
     user_descrs = {} if dso_list.show_descr_name else None
     dso_list_items = []
@@ -267,15 +268,10 @@ def dso_list_chart_scene_v1(dso_list_id):
             build_cross_highlight(highlight_id=selected_dso.name, label=selected_dso.denormalized_name(), ra=selected_dso.ra, dec=selected_dso.dec, theme_name=cur_theme,)
         )
 
-    for dso in dso_list_dsos:
-        if dso is None:
-            continue
-        hl_id = str(dso.name).replace(' ', '')
-        observed = bool(observed_dso_ids and dso.id in observed_dso_ids)
-        ensure_scene_dso_item(scene, dso)
-        highlights.append(
-            build_circle_highlight(highlight_id=hl_id, label=dso.denormalized_name(), ra=dso.ra, dec=dso.dec, dashed=observed, theme_name=cur_theme,)
-        )
+    add_scene_list_dsos(scene, dso_list_dsos, lambda dso: build_circle_highlight(
+        highlight_id=str(dso.name).replace(' ', ''), label=dso.denormalized_name(), ra=dso.ra, dec=dso.dec,
+        dashed=bool(observed_dso_ids and dso.id in observed_dso_ids), theme_name=cur_theme,
+    ))
 
     scene_meta['object_context'] = {
         'kind': 'dso_list',
@@ -40,6 +40,7 @@ from app.models import (
 )
 
 from app.commons.pagination import Pagination
+from app.commons.keyset_pagination import paginate_catalogue_query
 from app.commons.chart_generator import (
     common_chart_pos_img,
     common_chart_legend_img,
@@ -53,7 +54,6 @@ from app.commons.search_utils import (
     get_items_per_page,
     create_table_sort,
     get_packed_constell_list,
-    get_order_by_field,
 )
 
 from app.commons.supernova_loader import update_supernovae_from_rochesterastronomy
@@ -69,7 +69,7 @@ from app.commons.chart_scene import (
 )
 
 from .supernova_forms import SearchSupernovaForm
-from app.commons.dbupdate_utils import ask_dbupdate_permit
+from app.commons.dbupdate_utils import ask_dbupdate_permit, mark_catalogue_updated
 from app.commons.utils import is_splitview_supported
 from app.commons.visibility_utils import get_rise_transit_set_utc
 
@@ -81,6 +81,7 @@ def _update_supernovae():
     with app.app_context():
         if ask_dbupdate_permit(DB_UPDATE_SUPERNOVAE, timedelta(days=1)):
             update_supernovae_from_rochesterastronomy()
+            mark_catalogue_updated(Supernova.__tablename__)
 
 def _delete_obsolete_supernovae():
     app = create_app(os.getenv('FLASK_CONFIG') or 'default', web=False)
@@ -91,6 +92,7 @@ def _delete_obsolete_supernovae():
             for supernova in supernovas_to_delete:
                 db.session.delete(supernova)
             db.session.commit()
+            mark_catalogue_updated(Supernova.__tablename__)
 
 
 job1 = scheduler.add_job(_update_supernovae, 'cron', hour='6,18', replace_existing=True)
@@ -115,8 +117,6 @@ def supernovae():
 
     per_page = get_items_per_page(search_form.items_per_page)
 
-    offset = (page - 1) * per_page
-
     supernova_query = Supernova.query
     if search_form.q.data:
         supernova_q = normalize_supernova_name(search_form.q.data)
@@ -148,14 +148,10 @@ def supernovae():
 
     table_sort = create_table_sort(sort_by, sort_def.keys())
 
-    order_by_field = get_order_by_field(sort_def, sort_by)
-
-    if order_by_field is None:
-        order_by_field = Supernova.latest_mag
-
-    shown_supernovae = supernova_query.order_by(order_by_field).limit(per_page).offset(offset).all()
+    shown_supernovae, total = paginate_catalogue_query(supernova_query, sort_def, sort_by, Supernova.latest_mag, Supernova.id, page, per_page,
+                                                       Supernova.__tablename__)
 
-    pagination = Pagination(page=page, per_page=per_page, total=supernova_query.count(), search=False, record_name='supernovae',
+    pagination = Pagination(page=page, per_page=per_page, total=total, search=False, record_name='supernovae',
                             css_framework='semantic', not_passed_args='back')
 
     packed_constell_list = get_packed_constell_list()
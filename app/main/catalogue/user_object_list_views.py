@@ -45,6 +45,7 @@ from app.commons.chart_scene import (
     build_scene_v1,
     build_cross_highlight,
     build_circle_highlight,
+    add_scene_list_dsos,
     ensure_scene_dso_item,
 )
 from app.commons.dso_utils import CHART_DOUBLE_STAR_PREFIX
@@ -352,13 +353,10 @@ def user_object_list_chart_scene_v1(user_object_list_id):
         )
 
     if highlights_dso_list:
-        for hl_dso in highlights_dso_list:
-            if hl_dso is None:
-                continue
-            ensure_scene_dso_item(scene, hl_dso)
-            highlights.append(
-                build_circle_highlight(highlight_id=str(hl_dso.name).replace(' ', ''), label=hl_dso.denormalized_name(), ra=hl_dso.ra, dec=hl_dso.dec, dashed=False, theme_name=cur_theme,)
-            )
+        add_scene_list_dsos(scene, highlights_dso_list, lambda hl_dso: build_circle_highlight(
+            highlight_id=str(hl_dso.name).replace(' ', ''), label=hl_dso.denormalized_name(), ra=hl_dso.ra, dec=hl_dso.dec,
+            dashed=False, theme_name=cur_theme,
+        ))
 
     if highlights_pos_list:
         for hl_pos in highlights_pos_list:
@@ -27,6 +27,7 @@ from app.commons.chart_generator import (
 from app.commons.chart_scene import (
     build_scene_v1,
     build_stars_zones_v1,
+    build_stars_zones_bin_v1,
     build_milkyway_catalog_v1,
     build_milkyway_select_v1,
     build_dso_outlines_catalog_v1,
@@ -120,9 +121,14 @@ def chart_stars_zones_v1():
     return jsonify(build_stars_zones_v1())
 
 
+@main_chart.route('/chart/stars-v1/zones.bin', methods=['GET'])
+def chart_stars_zones_bin_v1():
+    return build_stars_zones_bin_v1()
+
+
 @main_chart.route('/chart/milkyway-v1/catalog', methods=['GET'])
 def chart_milkyway_catalog_v1():
-    return jsonify(build_milkyway_catalog_v1())
+    return build_milkyway_catalog_v1()
 
 
 @main_chart.route('/chart/milkyway-v1/select', methods=['GET'])
@@ -132,17 +138,17 @@ def chart_milkyway_select_v1():
 
 @main_chart.route('/chart/dso-outlines-v1/catalog', methods=['GET'])
 def chart_dso_outlines_catalog_v1():
-    return jsonify(build_dso_outlines_catalog_v1())
+    return build_dso_outlines_catalog_v1()
 
 
 @main_chart.route('/chart/constellation-lines-v1/catalog', methods=['GET'])
 def chart_constellation_lines_catalog_v1():
-    return jsonify(build_constellation_lines_catalog_v1())
+    return build_constellation_lines_catalog_v1()
 
 
 @main_chart.route('/chart/constellation-boundaries-v1/catalog', methods=['GET'])
 def chart_constellation_boundaries_catalog_v1():
-    return jsonify(build_constellation_boundaries_catalog_v1())
+    return build_constellation_boundaries_catalog_v1()
 
 
 @main_chart.route('/chart/chart-pdf', methods=['GET'])
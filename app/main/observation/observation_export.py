@@ -1,5 +1,11 @@
+import codecs
 import pytz
 import datetime
+from io import StringIO
+
+from flask import Response, stream_with_context
+
+from app import db
 
 from app.commons.coordinates import parse_latlon
 
@@ -13,6 +19,10 @@ from app.commons.oal_export_utils import (
 )
 
 from app.models import (
+    DeepskyObject,
+    DoubleStar,
+    Observation,
+    dso_observation_association_table,
     Telescope,
     Eyepiece,
     Lens,
@@ -52,7 +62,138 @@ from app.commons.openastronomylog import (
 )
 
 
-def create_oal_observations(user, observing_sessions):
+OAL_EXPORT_SESSIONS_CHUNK_SIZE = 50
+OAL_EXPORT_IN_QUERY_CHUNK_SIZE = 500
+OAL_NAMESPACE_DEF = 'xmlns:oal="http://groups.google.com/group/openastronomylog"'
+
+
+def iter_oal_observations_xml(user, observing_sessions):
+    """
+    Generates OAL document of observing sessions chunk by chunk. Targets are loaded by a few bulk queries,
+    observations are loaded and written per chunk of sessions, so neither the number of queries nor memory grows
+    with number of observations. Locations of observing sessions should be eager loaded.
+    """
+    session_ids = [observing_session.id for observing_session in observing_sessions]
+    session_observation_targets = _load_observation_targets(session_ids)
+
+    dso_ids = set()
+    double_star_ids = set()
+    for observation_targets in session_observation_targets.values():
+        for target_type, double_star_id, observation_dso_ids in observation_targets.values():
+            if target_type == ObservationTargetType.DSO:
+                dso_ids.update(observation_dso_ids)
+            elif target_type == ObservationTargetType.DBL_STAR:
+                double_star_ids.add(double_star_id)
+    dsos = {dso.id: dso for dso in _query_in(DeepskyObject.query, DeepskyObject.id, dso_ids)}
+    double_stars = {double_star.id: double_star for double_star in _query_in(DoubleStar.query, DoubleStar.id, double_star_ids)}
+
+    oal_observers, oal_sites, oal_sessions = _create_oal_observers_sites_sessions(user, observing_sessions)
+
+    # Targets
+    oal_targets = OaltargetsType()
+    proc_targets = set()
+    for session_id in session_ids:
+        for target_type, double_star_id, observation_dso_ids in session_observation_targets.get(session_id, {}).values():
+            if target_type == ObservationTargetType.DSO:
+                for dso_id in observation_dso_ids:
+                    target_id = '_dso_{}'.format(dso_id)
+                    if target_id in proc_targets:
+                        continue
+                    proc_targets.add(target_id)
+                    oal_targets.add_target(create_dso_observation_target(dsos[dso_id]))
+            elif target_type == ObservationTargetType.DBL_STAR and double_star_id in double_stars:
+                target_id = '_dbl_{}'.format(double_star_id)
+                if target_id in proc_targets:
+                    continue
+                proc_targets.add(target_id)
+                oal_targets.add_target(create_double_star_observation_target(double_stars[double_star_id]))
+
+    oal_scopes, oal_eyepieces, oal_lenses, oal_filters = _create_oal_equipment(user)
+
+    oal_observations = Oalobservations(observers=oal_observers, sites=oal_sites, sessions=oal_sessions, targets=oal_targets,
+                                       scopes=oal_scopes, eyepieces=oal_eyepieces, lenses=oal_lenses, filters=oal_filters,
+                                       images=None, observation=[])
+
+    buf = StringIO()
+    buf.write('<observations {}'.format(OAL_NAMESPACE_DEF))
+    oal_observations._exportAttributes(buf, 0, set(), '', name_='observations')
+    buf.write('>\n')
+    oal_observations._exportChildren(buf, 1, '', OAL_NAMESPACE_DEF, name_='observations')
+    yield buf.getvalue()
+    del oal_observations, oal_targets
+
+    for i in range(0, len(observing_sessions), OAL_EXPORT_SESSIONS_CHUNK_SIZE):
+        chunk_sessions = observing_sessions[i:i + OAL_EXPORT_SESSIONS_CHUNK_SIZE]
+        session_observations = {}
+        observations = Observation.query.filter(Observation.observing_session_id.in_([s.id for s in chunk_sessions])) \
+            .order_by(Observation.id)
+        for observation in observations:
+            session_observations.setdefault(observation.observing_session_id, []).append(observation)
+
+        for observing_session in chunk_sessions:
+            observation_targets = session_observation_targets.get(observing_session.id, {})
+            oal_observation_ar = []
+            for observation in session_observations.get(observing_session.id, []):
+                if observation.target_type == ObservationTargetType.DSO:
+                    for dso_id in observation_targets.get(observation.id, (None, None, []))[2]:
+                        _append_oalobservation_type(user, observing_session, observation, get_dso_target_id(dsos[dso_id]), oal_observation_ar)
+                elif observation.target_type == ObservationTargetType.DBL_STAR and observation.double_star_id in double_stars:
+                    _append_oalobservation_type(user, observing_session, observation,
+                                                get_double_star_target_id(double_stars[observation.double_star_id]), oal_observation_ar)
+            if oal_observation_ar:
+                buf = StringIO()
+                for oal_obs in oal_observation_ar:
+                    oal_obs.export(buf, 1, '', namespacedef_='', name_='observation')
+                yield buf.getvalue()
+
+    yield '</observations>\n'
+
+
+def oal_observations_response(user, observing_sessions, download_name):
+    """
+    Streamed attachment response with OAL document of observing sessions.
+    """
+    def generate():
+        yield codecs.BOM_UTF8
+        yield '<?xml version="1.0" encoding="utf-8"?>\n'.encode('utf-8')
+        for chunk in iter_oal_observations_xml(user, observing_sessions):
+            yield chunk.encode('utf-8')
+
+    response = Response(stream_with_context(generate()), mimetype='text/xml')
+    response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    return response
+
+
+def _query_in(query, column, values):
+    values = list(values)
+    result = []
+    for i in range(0, len(values), OAL_EXPORT_IN_QUERY_CHUNK_SIZE):
+        result.extend(query.filter(column.in_(values[i:i + OAL_EXPORT_IN_QUERY_CHUNK_SIZE])).all())
+    return result
+
+
+def _load_observation_targets(session_ids):
+    """
+    Targets of observations in sessions - {session_id: {observation_id: (target_type, double_star_id, [dso_id, ...])}},
+    observations are in id order.
+    """
+    session_observation_targets = {}
+    for i in range(0, len(session_ids), OAL_EXPORT_IN_QUERY_CHUNK_SIZE):
+        rows = db.session.query(Observation.observing_session_id, Observation.id, Observation.target_type,
+                                Observation.double_star_id, dso_observation_association_table.c.dso_id) \
+            .outerjoin(dso_observation_association_table, dso_observation_association_table.c.observation_id == Observation.id) \
+            .filter(Observation.observing_session_id.in_(session_ids[i:i + OAL_EXPORT_IN_QUERY_CHUNK_SIZE])) \
+            .order_by(Observation.id)
+        for session_id, observation_id, target_type, double_star_id, dso_id in rows:
+            observation_targets = session_observation_targets.setdefault(session_id, {})
+            if observation_id not in observation_targets:
+                observation_targets[observation_id] = (target_type, double_star_id, [])
+            if dso_id is not None:
+                observation_targets[observation_id][2].append(dso_id)
+    return session_observation_targets
+
+
+def _create_oal_observers_sites_sessions(user, observing_sessions):
     # Observers
     oal_observer = OalobserverType(id='usr_{}'.format(user.id),
                                    name=user.get_first_name(),
@@ -99,27 +240,10 @@ def create_oal_observations(user, observing_sessions):
                                      )
         oal_sessions.add_session(oal_session)
 
-    # Targets
-    oal_targets = OaltargetsType()
-    proc_targets = set()
-    for observing_session in observing_sessions:
-        for observation in observing_session.observations:
-            if observation.target_type == ObservationTargetType.DSO:
-                for dso in observation.deepsky_objects:
-                    target_id = '_dso_{}'.format(dso.id)
-                    if target_id in proc_targets:
-                        continue
-                    proc_targets.add(target_id)
-                    oal_obs_target = create_dso_observation_target(dso)
-                    oal_targets.add_target(oal_obs_target)
-            elif observation.target_type == ObservationTargetType.DBL_STAR:
-                target_id = '_dbl_{}'.format(observation.double_star.id)
-                if target_id in proc_targets:
-                    continue
-                proc_targets.add(target_id)
-                oal_obs_target = create_double_star_observation_target(observation.double_star)
-                oal_targets.add_target(oal_obs_target)
+    return oal_observers, oal_sites, oal_sessions
+
 
+def _create_oal_equipment(user):
     # Scopes
     oal_scopes = OalscopesType()
     telescopes = Telescope.query.filter_by(user_id=user.id, is_deleted=False).all()
@@ -160,21 +284,7 @@ def create_oal_observations(user, observing_sessions):
                                    wratten=None, schott=None)
         oal_filters.add_filter(oal_filter)
 
-    oal_observation_ar = []
-
-    for observing_session in observing_sessions:
-        for observation in observing_session.observations:
-            if observation.target_type == ObservationTargetType.DSO:
-                for dso in observation.deepsky_objects:
-                    _append_oalobservation_type(user, observing_session, observation, get_dso_target_id(dso), oal_observation_ar)
-            elif observation.target_type == ObservationTargetType.DBL_STAR:
-                _append_oalobservation_type(user, observing_session, observation, get_double_star_target_id(observation.double_star), oal_observation_ar)
-
-    oal_observations = Oalobservations(observers=oal_observers, sites=oal_sites, sessions=oal_sessions, targets=oal_targets,
-                                       scopes=oal_scopes, eyepieces=oal_eyepieces, lenses=oal_lenses, filters=oal_filters,
-                                       images=None, observation=oal_observation_ar)
-
-    return oal_observations
+    return oal_scopes, oal_eyepieces, oal_lenses, oal_filters
 
 
 def _append_oalobservation_type(user, observing_session, observation, target_id, oal_observation_ar):
@@ -1,7 +1,6 @@
 import re
 import math
 from datetime import datetime
-from sqlalchemy import and_, or_, not_
 
 from flask_babel import lazy_gettext
 
@@ -24,382 +23,97 @@ from app.models import (
     TelescopeType,
     FilterType,
     Seeing,
+    ImportHistoryRec,
     dso_observation_association_table,
 )
 
-from app.commons.openastronomylog import (
-    OaldeepSkyDS,
-    OaldeepSkyGC,
-    OaldeepSkyOC,
-    OaldeepSkyGN,
-    OaldeepSkyDN,
-    OaldeepSkyPN,
-    OaldeepSkyAS,
-    OaldeepSkyQS,
-    OaldeepSkyCG,
-    OalobservationTargetType,
-    OaldeepSkyMS,
-)
-
-from app.commons.openastronomylog import parse, filterKind, OalfixedMagnificationOpticsType, OalscopeType, angleUnit
+from app.commons.openastronomylog import filterKind, angleUnit
+from app.commons.oal_reader import read_oal_observations
 from app.commons.dso_utils import normalize_dso_name_ext, denormalize_dso_name, normalize_double_star_name
 from app.commons.search_sky_object_utils import search_double_star_strict, search_double_star
 
 
+IMPORT_BATCH_SIZE = 500
+IN_QUERY_CHUNK_SIZE = 500
+
+
 def import_observations(user_id, import_user_id, import_history_rec_id, file, imp_observing_session=None):
+    """
+    Import OAL file. Sites, equipment, sessions, targets and existing observations of the user are resolved
+    by a fixed number of bulk queries before observations are written. Observations are written in batches,
+    each batch commit reports progress to the import history record.
+    """
     log_warn = []
     log_error = []
 
-    oal_observations = parse(file, silence=True)
+    oal_document = read_oal_observations(file)
 
-    # Locations
-    oal_sites = oal_observations.get_sites()
-    found_locations = {}
+    import_history_rec = None
+    if import_history_rec_id is not None:
+        import_history_rec = ImportHistoryRec.query.filter_by(id=import_history_rec_id).first()
+
+    found_locations = _import_locations(oal_document.sites, user_id, import_user_id, import_history_rec_id)
     add_hoc_locations = {}
-    if oal_sites and oal_sites.get_site():
-        for oal_site in oal_sites.get_site():
-            location = None
-            if oal_site.get_name():
-                location = Location.query.filter_by(name=oal_site.get_name()).first()
-            if location is None:
-                lat = _get_angle_from_oal_angle(oal_site.get_latitude())
-                lon = _get_angle_from_oal_angle(oal_site.get_longitude())
-                location = Location(
-                    name=oal_site.get_name(),
-                    longitude=lon,
-                    latitude=lat,
-                    country_code=None,
-                    descr=None,
-                    bortle=None,
-                    rating=None,
-                    is_public=True,
-                    is_for_observation=True,
-                    time_zone=None,
-                    iau_code=None,
-                    import_history_rec_id=import_history_rec_id,
-                    user_id=user_id,
-                    create_by=import_user_id,
-                    update_by=import_user_id,
-                    create_date=datetime.now(),
-                    update_date=datetime.now()
-                )
-                db.session.add(location)
-                found_locations[oal_site.get_id()] = location
-            else:
-                found_locations[oal_site.get_id()] = location
+    found_telescopes = _import_telescopes(oal_document.scopes, user_id, import_user_id, import_history_rec_id)
+    found_eyepieces = _import_eyepieces(oal_document.eyepieces, user_id, import_user_id, import_history_rec_id)
+    found_filters = _import_filters(oal_document.filters, user_id, import_user_id, import_history_rec_id)
+    found_lenses = _import_lenses(oal_document.lenses, user_id, import_user_id, import_history_rec_id)
 
-    # Scopes
-    found_telescopes = {}
-    oal_scopes = oal_observations.get_scopes()
-    if oal_scopes:
-        for oal_scope in oal_scopes.get_scope():
-            model = oal_scope.get_model()
-            telescope_type = _get_telescope_type_from_oal_scope_type(oal_scope.get_type())
-            vendor = oal_scope.get_vendor()
-            aperture_mm = oal_scope.get_aperture()
-
-            focal_length_mm = None
-            fixed_magnification = None
-            if isinstance(oal_scope, OalscopeType):
-                focal_length_mm = oal_scope.get_focalLength()
-            if isinstance(oal_scope, OalfixedMagnificationOpticsType):
-                fixed_magnification = oal_scope.get_magnification()
-
-            telescope_query = Telescope.query.filter_by(user_id=user_id)
-            if model:
-                telescope_query = telescope_query.filter_by(model=model)
-            if telescope_type:
-                telescope_query = telescope_query.filter_by(telescope_type=telescope_type)
-            if vendor:
-                telescope_query = telescope_query.filter_by(vendor=vendor)
-            if aperture_mm:
-                telescope_query = telescope_query.filter_by(aperture_mm=aperture_mm)
-            if focal_length_mm:
-                telescope_query = telescope_query.filter_by(focal_length_mm=focal_length_mm)
-            if fixed_magnification:
-                telescope_query = telescope_query.filter_by(fixed_magnification=fixed_magnification)
-            telescope = telescope_query.first()
-            if not telescope:
-                telescope = Telescope(
-                    name=oal_scope.get_id(),
-                    vendor=vendor,
-                    model=model,
-                    descr='',
-                    aperture_mm=aperture_mm,
-                    focal_length_mm=focal_length_mm,
-                    fixed_magnification=fixed_magnification,
-                    telescope_type=telescope_type,
-                    is_default=False,
-                    is_active=True,
-                    is_deleted=False,
-                    import_history_rec_id=import_history_rec_id,
-                    user_id=user_id,
-                    create_by=import_user_id,
-                    update_by=import_user_id,
-                    create_date=datetime.now(),
-                    update_date=datetime.now()
-                )
-                db.session.add(telescope)
-            found_telescopes[oal_scope.get_id()] = telescope
+    # new locations must have id before sessions refer them
+    db.session.flush()
 
-    # Eyepieces
-    found_eyepieces = {}
-    oal_eyepieces = oal_observations.get_eyepieces()
-    if oal_eyepieces:
-        for oal_eyepiece in oal_eyepieces.get_eyepiece():
-            model = oal_eyepiece.get_model()
-            vendor = oal_eyepiece.get_vendor()
-            focal_length_mm = oal_eyepiece.get_focalLength()
-            fov_deg = _get_angle_from_oal_angle(oal_eyepiece.get_apparentFOV())
-
-            eyepiece_query = Eyepiece.query.filter_by(user_id=user_id)
-            if model:
-                eyepiece_query = eyepiece_query.filter_by(model=model)
-            if vendor:
-                eyepiece_query = eyepiece_query.filter_by(vendor=vendor)
-            if focal_length_mm:
-                eyepiece_query = eyepiece_query.filter_by(focal_length_mm=focal_length_mm)
-            if fov_deg:
-                eyepiece_query = eyepiece_query.filter_by(fov_deg=fov_deg)
-            eyepiece = eyepiece_query.first()
-            if not eyepiece:
-                eyepiece = Eyepiece(
-                    name=oal_eyepiece.get_id(),
-                    vendor=vendor,
-                    model=model,
-                    descr='',
-                    focal_length_mm=focal_length_mm,
-                    fov_deg=fov_deg,
-                    diameter_inch=None,
-                    is_active=True,
-                    is_deleted=False,
-                    import_history_rec_id=import_history_rec_id,
-                    user_id=user_id,
-                    create_by=import_user_id,
-                    update_by=import_user_id,
-                    create_date=datetime.now(),
-                    update_date=datetime.now()
-                )
-                db.session.add(eyepiece)
-            found_eyepieces[oal_eyepiece.get_id()] = eyepiece
+    if imp_observing_session:
+        user_observing_sessions = []
+    else:
+        user_observing_sessions = ObservingSession.query.filter_by(user_id=user_id).order_by(ObservingSession.id).all()
 
-    # Filters
-    found_filters = {}
-    oal_filters = oal_observations.get_filters()
-    if oal_filters:
-        for oal_filter in oal_filters.get_filter():
-            model = oal_filter.get_model()
-            vendor = oal_filter.get_vendor()
-            filter_type = _get_filter_type_from_oal_filter_kind(oal_filter.get_type())
-
-            filter_query = Filter.query.filter_by(user_id=user_id)
-            if model:
-                filter_query = filter_query.filter_by(model=model)
-            if vendor:
-                filter_query = filter_query.filter_by(vendor=vendor)
-            if filter_type:
-                filter_query = filter_query.filter_by(filter_type=filter_type)
-
-            filter = filter_query.first()
-            if not filter:
-                filter = Filter(
-                    name=oal_filter.get_id(),
-                    vendor=vendor,
-                    model=model,
-                    descr='',
-                    filter_type=filter_type,
-                    diameter_inch=None,
-                    is_active=True,
-                    is_deleted=False,
-                    import_history_rec_id=import_history_rec_id,
-                    user_id=user_id,
-                    create_by=import_user_id,
-                    update_by=import_user_id,
-                    create_date=datetime.now(),
-                    update_date=datetime.now()
-                )
-                db.session.add(filter)
-            found_filters[oal_filter.get_id()] = filter
+    found_observing_sessions, new_observing_sessions = _import_observing_sessions(
+        oal_document.sessions, user_observing_sessions, found_locations, add_hoc_locations,
+        user_id, import_user_id, import_history_rec_id, imp_observing_session)
 
-    # Lenses
-    found_lenses = {}
-    oal_lenses = oal_observations.get_lenses()
-    if oal_lenses:
-        for oal_lens in oal_lenses.get_lens():
-            model = oal_lens.get_model()
-            vendor = oal_lens.get_vendor()
-            factor = oal_lens.get_factor()
-
-            lens_query = Lens.query.filter_by(user_id=user_id)
-            if model:
-                lens_query = lens_query.filter_by(model=model)
-            if vendor:
-                lens_query = lens_query.filter_by(vendor=vendor)
-            if factor:
-                lens_query = lens_query.filter_by(magnification=factor)
-
-            lens = lens_query.first()
-            if not lens:
-                lens = Lens(
-                    name=oal_lens.get_id(),
-                    vendor=vendor,
-                    model=model,
-                    descr='',
-                    lens_type=None,
-                    magnification=factor,
-                    diameter_inch=None,
-                    is_active=True,
-                    is_deleted=False,
-                    import_history_rec_id=import_history_rec_id,
-                    user_id=user_id,
-                    create_by=import_user_id,
-                    update_by=import_user_id,
-                    create_date=datetime.now(),
-                    update_date=datetime.now()
-                )
-                db.session.add(lens)
-            found_lenses[oal_lens.get_id()] = lens
+    found_dsos, found_double_stars, not_found_targets = _resolve_oal_targets(oal_document.targets, log_error)
 
-    # Observations
-    oal_sessions = oal_observations.get_sessions()
-    found_observing_sessions = {}
-    new_observing_sessions = {}
-    if oal_sessions and oal_sessions.get_session():
-        for i, oal_session in enumerate(oal_sessions.get_session()):
-            if imp_observing_session and i>0:
-                break
-
-            begin = oal_session.get_begin()
-            end = oal_session.get_end()
-            if begin and not end:
-                end = begin
-            if end and not begin:
-                begin = end
-
-            if imp_observing_session:
-                found_observing_sessions[oal_session.get_id()] = imp_observing_session
-            else:
-                observing_session = ObservingSession.query.filter(ObservingSession.user_id == user_id) \
-                    .filter(and_(ObservingSession.date_to >= begin, ObservingSession.date_from <= end)) \
-                    .first()
-                if observing_session and observing_session.update_date != observing_session.create_date:
-                    found_observing_sessions[oal_session.get_id()] = observing_session
-                else:
-                    location = found_locations.get(oal_session.get_site())
-                    location_position = add_hoc_locations.get(oal_session.get_site())
-                    if location:
-                        title = location.name + ' ' + begin.strftime('%d.%m.%Y')
-                    elif begin:
-                        title = begin.strftime('%d.%m.%Y')
-                    else:
-                        title = oal_session.get_id()
-
-                    now = datetime.now()
-                    if not observing_session:
-                        observing_session = ObservingSession(
-                            user_id=user_id,
-                            title=title,
-                            date_from=begin,
-                            date_to=end,
-                            location_id=location.id if location else None,
-                            location_position=location_position,
-                            sqm=None,
-                            faintest_star=None,
-                            seeing=None,
-                            transparency=None,
-                            rating=None,
-                            weather=oal_session.get_weather(),
-                            equipment=oal_session.get_equipment(),
-                            notes=oal_session.get_comments(),
-                            import_history_rec_id=import_history_rec_id,
-                            create_by=import_user_id,
-                            update_by=import_user_id,
-                            create_date=now,
-                            update_date=now
-                        )
-                        new_observing_sessions[oal_session.get_id()] = observing_session
-                    else:
-                        observing_session.title = title
-                        observing_session.date_from = begin
-                        observing_session.date_to = end
-                        observing_session.location_id = location.id if location else None
-                        observing_session.location_position = location_position
-                        observing_session.weather = oal_session.get_weather()
-                        observing_session.equipment = oal_session.get_equipment()
-                        observing_session.notes = oal_session.get_comments()
-                        observing_session.import_history_rec_id = import_history_rec_id
-                        observing_session.update_by = import_user_id
-                        observing_session.create_date = now
-                        observing_session.update_date = now
-                        found_observing_sessions[oal_session.get_id()] = observing_session
-
-                    db.session.add(observing_session)
-
-    # Targets
-    oal_targets = oal_observations.get_targets()
-    found_dsos = {}
-    found_double_stars = {}
-    not_found_targets = set()
-    if oal_targets and oal_targets.get_target():
-        for target in oal_targets.get_target():
-            if isinstance(target, (OaldeepSkyDS, OaldeepSkyMS)):
-                double_star = search_double_star(target.get_name())
-                if double_star:
-                    found_double_stars[target.get_id()] = double_star
-                else:
-                    not_found_targets.add(target.get_id())
-                    log_error.append(lazy_gettext('Double star "{}" not found').format(target.get_name()))
-            else:
-                normalized_name = normalize_dso_name_ext(denormalize_dso_name(target.get_name()))
-                m = re.search(r'^(NGC|IC)\d+([A-Z]|-[1-9])$', normalized_name)
-                if m:
-                    normalized_name = normalized_name[:m.start(2)].strip()
-                dso = DeepskyObject.query.filter_by(name=normalized_name).first()
-                if dso:
-                    found_dsos[target.get_id()] = dso
-                else:
-                    not_found_targets.add(target.get_id())
-                    log_error.append(lazy_gettext('DSO "{}" not found').format(target.get_name()))
-
-    oal_observations = oal_observations.get_observation()
+    oal_observations = oal_document.observations
 
+    # Sessions of observations, observations out of OAL sessions are grouped to ad-hoc sessions by date
     addhoc_observing_sessions = {}
+    sessions_by_date_from = {}
+    for observing_session in user_observing_sessions:
+        sessions_by_date_from.setdefault(observing_session.date_from, observing_session)
 
-    obs_count = 0
-
-    for i, oal_observation in enumerate(oal_observations):
-        location = found_locations.get(oal_observation.get_site())
-        location_position = add_hoc_locations.get(oal_observation.get_site())
+    observation_sessions = []
+    for oal_observation in oal_observations:
+        location = found_locations.get(oal_observation.site)
+        location_position = add_hoc_locations.get(oal_observation.site)
 
-        observing_session = found_observing_sessions.get(oal_observation.get_session())
+        observing_session = found_observing_sessions.get(oal_observation.session)
 
         if not observing_session and imp_observing_session:
+            observation_sessions.append(None)
             continue
 
         is_session_new = False
         if not observing_session:
-            observing_session = new_observing_sessions.get(oal_observation.get_session())
+            observing_session = new_observing_sessions.get(oal_observation.session)
             is_session_new = True
 
         if not observing_session:
-            if oal_observation.get_begin():
-                observing_session = addhoc_observing_sessions.get(oal_observation.get_begin().date())
+            if oal_observation.begin:
+                observing_session = addhoc_observing_sessions.get(oal_observation.begin.date())
                 if not observing_session:
-                    observing_session = ObservingSession.query.filter(ObservingSession.user_id == user_id) \
-                        .filter(ObservingSession.date_from == oal_observation.get_begin())  \
-                        .first()
+                    observing_session = sessions_by_date_from.get(oal_observation.begin)
                     if not observing_session:
                         now = datetime.now()
                         observing_session = ObservingSession(
                             user_id=user_id,
-                            title=str(oal_observation.get_begin().date()),
-                            date_from=oal_observation.get_begin(),
-                            date_to=oal_observation.get_end(),
+                            title=str(oal_observation.begin.date()),
+                            date_from=oal_observation.begin,
+                            date_to=oal_observation.end,
                             location_id=location.id if location else None,
                             location_position=location_position,
-                            sqm=_get_sqm_from_oal_surface_brightness(oal_observation.get_sky_quality()),
-                            faintest_star=oal_observation.get_faintestStar(),
-                            seeing=_get_seeing_from_oal_seeing(oal_observation.get_seeing()),
+                            sqm=_get_sqm_from_oal_surface_brightness(oal_observation.sky_quality),
+                            faintest_star=oal_observation.faintest_star,
+                            seeing=_get_seeing_from_oal_seeing(oal_observation.seeing),
                             transparency=None,
                             rating=None,
                             weather=None,
@@ -412,144 +126,587 @@ def import_observations(user_id, import_user_id, import_history_rec_id, file, im
                             update_date=now
                         )
                         db.session.add(observing_session)
-                    addhoc_observing_sessions[oal_observation.get_begin().date()] = observing_session
+                        sessions_by_date_from.setdefault(observing_session.date_from, observing_session)
+                    addhoc_observing_sessions[oal_observation.begin.date()] = observing_session
                 is_session_new = True
 
-        observed_double_star = found_double_stars.get(oal_observation.get_target())
-        observed_dso = found_dsos.get(oal_observation.get_target())
+        observation_sessions.append((observing_session, is_session_new))
 
-        if not observed_dso and not observed_double_star:
-            if oal_observation.get_target() not in not_found_targets:
-                log_error.append(lazy_gettext('OAL Target "{}" not found.').format(oal_observation.get_target()))
+    # sessions and equipment get ids, then only ids and snapshots of them are used, so objects expired
+    # by batch commits are not reloaded
+    db.session.flush()
+
+    location_ids = {oal_id: location.id for oal_id, location in found_locations.items()}
+    telescope_ids = {oal_id: telescope.id for oal_id, telescope in found_telescopes.items()}
+    eyepiece_ids = {oal_id: eyepiece.id for oal_id, eyepiece in found_eyepieces.items()}
+    filter_ids = {oal_id: filter.id for oal_id, filter in found_filters.items()}
+    lens_ids = {oal_id: lens.id for oal_id, lens in found_lenses.items()}
+
+    session_states = {}
+    for i, observation_session in enumerate(observation_sessions):
+        if observation_session is None:
+            continue
+        observing_session, is_session_new = observation_session
+        session_id = observing_session.id if observing_session else None
+        if session_id is not None and session_id not in session_states:
+            session_states[session_id] = {
+                'session': observing_session,
+                'location_id': observing_session.location_id,
+                'location_position': observing_session.location_position,
+                'sqm': observing_session.sqm,
+                'faintest_star': observing_session.faintest_star,
+                'seeing': observing_session.seeing,
+            }
+        observation_sessions[i] = (session_id, is_session_new)
+
+    session_observations, dated_observations, modified_observations = _load_user_observations(user_id)
+
+    pending_dso_links = []
+    obs_count = 0
+
+    for oal_observation, observation_session in zip(oal_observations, observation_sessions):
+        if observation_session is None:
             continue
+        session_id, is_session_new = observation_session
+        session_state = session_states.get(session_id)
+
+        location_id = location_ids.get(oal_observation.site)
+        location_position = add_hoc_locations.get(oal_observation.site)
+
+        observed_double_star_id = found_double_stars.get(oal_observation.target)
+        observed_dso_id = found_dsos.get(oal_observation.target)
+
+        if not observed_dso_id and not observed_double_star_id:
+            if oal_observation.target not in not_found_targets:
+                log_error.append(lazy_gettext('OAL Target "{}" not found.').format(oal_observation.target))
+            continue
+
+        if observed_dso_id:
+            target_key = (ObservationTargetType.DSO, observed_dso_id)
+        else:
+            target_key = (ObservationTargetType.DBL_STAR, observed_double_star_id)
 
         observation = None
-        if not is_session_new:
-            for obs in observing_session.observations:
-                if obs.target_type == ObservationTargetType.DBL_STAR:
-                    if observed_double_star and observed_double_star.id == obs.double_star_id:
-                        observation = obs
-                elif obs.target_type == ObservationTargetType.DSO:
-                    if observed_dso:
-                        for dso in obs.deepsky_objects:
-                            if dso.id == observed_dso.id:
-                                observation = obs
-                                break
-                if observation:
-                    break
-
-        if observation and observation.create_date != observation.update_date:
-            log_warn.append(lazy_gettext('OAL Observation "{}" for session "{}" already exists and was modified by user.').format(oal_observation.get_id(), oal_observation.get_session()))
+        if not is_session_new and session_id is not None:
+            observation = session_observations.get((session_id, ) + target_key)
+
+        if observation is not None and observation in modified_observations:
+            log_warn.append(lazy_gettext('OAL Observation "{}" for session "{}" already exists and was modified by user.').format(oal_observation.id, oal_observation.session))
         else:
             notes = ''
-            if oal_observation.get_result():
-                notes = oal_observation.get_result()[0].get_description()
+            if oal_observation.results:
+                notes = oal_observation.results[0]
 
-            if observing_session:
-                if location and observing_session.location_id == location.id:
-                    location = None
-                if location_position and observing_session.location_position == location_position:
+            if session_state:
+                if location_id and session_state['location_id'] == location_id:
+                    location_id = None
+                if location_position and session_state['location_position'] == location_position:
                     location_position = None
 
-            telescope = found_telescopes.get(oal_observation.get_scope()) if oal_observation.get_scope() else None
-            eyepiece = found_eyepieces.get(oal_observation.get_eyepiece()) if oal_observation.get_eyepiece() else None
-            filter = found_filters.get(oal_observation.get_filter()) if oal_observation.get_filter() else None
-
-            oal_lens = oal_observation.get_lens()
-            lens = found_lenses.get(oal_observation.get_lens()) if oal_observation.get_lens() else None
+            telescope_id = telescope_ids.get(oal_observation.scope) if oal_observation.scope else None
+            eyepiece_id = eyepiece_ids.get(oal_observation.eyepiece) if oal_observation.eyepiece else None
+            filter_id = filter_ids.get(oal_observation.filter) if oal_observation.filter else None
+            lens_id = lens_ids.get(oal_observation.lens) if oal_observation.lens else None
 
             # find out existing observation by date and observed object
-            if not observation:
-                if observed_double_star:
-                    observation = Observation.query.filter_by(user_id=user_id) \
-                                                   .filter(Observation.double_star_id == observed_double_star.id) \
-                                                   .filter(Observation.date_from == oal_observation.get_begin())
-                if observed_dso:
-                    observation = Observation.query.filter_by(user_id=user_id) \
-                        .join(dso_observation_association_table, isouter=True) \
-                        .join(DeepskyObject, isouter=True) \
-                        .filter(Observation.date_from == oal_observation.get_begin()) \
-                        .filter((Observation.target_type == ObservationTargetType.DSO) &
-                                (dso_observation_association_table.c.observation_id == Observation.id) &
-                                (dso_observation_association_table.c.dso_id == DeepskyObject.id) &
-                                (DeepskyObject.id == observed_dso.id))
-                if observation:
-                    observation = observation.first()
+            if observation is None:
+                observation = dated_observations.get(target_key + (oal_observation.begin, ))
 
             now = datetime.now()
-            if not observation:
+            if observation is None:
                 observation = Observation(
                     user_id=user_id,
-                    observing_session_id=observing_session.id if observing_session else None,
-                    location_id=location.id if location else None,
+                    observing_session_id=session_id,
+                    location_id=location_id,
                     location_position=location_position,
-                    date_from=oal_observation.get_begin(),
-                    date_to=oal_observation.get_end(),
-                    sqm=_get_sqm_from_oal_surface_brightness(oal_observation.get_sky_quality()),
-                    faintest_star=oal_observation.get_faintestStar(),
-                    seeing=_get_seeing_from_oal_seeing(oal_observation.get_seeing()),
-                    telescope_id=telescope.id if telescope else None,
-                    eyepiece_id=eyepiece.id if eyepiece else None,
-                    filter_id=filter.id if filter else None,
-                    lens_id=lens.id if lens else None,
+                    date_from=oal_observation.begin,
+                    date_to=oal_observation.end,
+                    sqm=_get_sqm_from_oal_surface_brightness(oal_observation.sky_quality),
+                    faintest_star=oal_observation.faintest_star,
+                    seeing=_get_seeing_from_oal_seeing(oal_observation.seeing),
+                    telescope_id=telescope_id,
+                    eyepiece_id=eyepiece_id,
+                    filter_id=filter_id,
+                    lens_id=lens_id,
                     notes=notes,
+                    target_type=target_key[0],
                     import_history_rec_id=import_history_rec_id,
                     create_by=import_user_id,
                     update_by=import_user_id,
                     create_date=now,
                     update_date=now,
                 )
-                if observed_double_star:
-                    observation.double_star_id = observed_double_star.id
-                    observation.target_type = ObservationTargetType.DBL_STAR
+                if observed_double_star_id:
+                    observation.double_star_id = observed_double_star_id
                 db.session.add(observation)
-                if observed_dso:
-                    observation.deepsky_objects.append(observed_dso)
-                    observation.target_type = ObservationTargetType.DSO
-                if observing_session:
-                    observing_session.observations.append(observation)
+                if observed_dso_id:
+                    pending_dso_links.append((observation, observed_dso_id))
+                _register_observation(observation, session_id, observation.date_from, target_key,
+                                      session_observations, dated_observations)
             else:
-                observation.observing_session_id = observing_session.id if observing_session else None
-                observation.location_id = location.id if location else None
+                observation.observing_session_id = session_id
+                observation.location_id = location_id
                 observation.location_position = location_position
-                observation.date_from = oal_observation.get_begin()
-                observation.date_to = oal_observation.get_end()
-                observation.sqm = _get_sqm_from_oal_surface_brightness(oal_observation.get_sky_quality())
-                observation.faintest_star = oal_observation.get_faintestStar()
-                observation.seeing = _get_seeing_from_oal_seeing(oal_observation.get_seeing())
-                observation.telescope_id = telescope.id if telescope else None
-                observation.eyepiece_id = eyepiece.id if eyepiece else None
-                observation.filter_id = filter.id if filter else None
-                observation.lens_id = lens.id if lens else None
+                observation.date_from = oal_observation.begin
+                observation.date_to = oal_observation.end
+                observation.sqm = _get_sqm_from_oal_surface_brightness(oal_observation.sky_quality)
+                observation.faintest_star = oal_observation.faintest_star
+                observation.seeing = _get_seeing_from_oal_seeing(oal_observation.seeing)
+                observation.telescope_id = telescope_id
+                observation.eyepiece_id = eyepiece_id
+                observation.filter_id = filter_id
+                observation.lens_id = lens_id
                 observation.notes = notes
                 observation.import_history_rec_id = import_history_rec_id
                 observation.update_by = import_user_id
                 observation.create_date = now  # set create date to update date to easy detect user modifications
                 observation.update_date = now
-                db.session.add(observation)
+                modified_observations.discard(observation)
 
             obs_count += 1
 
-            if obs_count % 500 == 0:
-                print('Committing {} of {}'.format(obs_count, len(oal_observations)), flush=True)
-                db.session.commit()
+            if obs_count % IMPORT_BATCH_SIZE == 0:
+                _commit_import_batch(pending_dso_links, import_history_rec, obs_count, len(oal_observations))
 
-            if is_session_new and observing_session:
-                if not observing_session.sqm and oal_observation.get_sky_quality():
-                    observing_session.sqm = _get_sqm_from_oal_surface_brightness(oal_observation.get_sky_quality())
-                if not observing_session.faintest_star and oal_observation.get_faintestStar():
-                    observing_session.faintest_star = oal_observation.get_faintestStar()
-                if not observing_session.seeing and oal_observation.get_seeing():
-                    observing_session.seeing = _get_seeing_from_oal_seeing(oal_observation.get_seeing())
+            if is_session_new and session_state:
+                observing_session = session_state['session']
+                if not session_state['sqm'] and oal_observation.sky_quality:
+                    observing_session.sqm = session_state['sqm'] = _get_sqm_from_oal_surface_brightness(oal_observation.sky_quality)
+                if not session_state['faintest_star'] and oal_observation.faintest_star:
+                    observing_session.faintest_star = session_state['faintest_star'] = oal_observation.faintest_star
+                if not session_state['seeing'] and oal_observation.seeing:
+                    observing_session.seeing = session_state['seeing'] = _get_seeing_from_oal_seeing(oal_observation.seeing)
 
     try:
-        db.session.commit()
+        _commit_import_batch(pending_dso_links, import_history_rec, obs_count, len(oal_observations))
     except Exception as e:
         db.session.rollback()
 
     return log_warn, log_error
 
 
+def _commit_import_batch(pending_dso_links, import_history_rec, obs_count, obs_total):
+    if pending_dso_links:
+        db.session.flush()
+        db.session.execute(dso_observation_association_table.insert(),
+                           [{'observation_id': observation.id, 'dso_id': dso_id} for observation, dso_id in pending_dso_links])
+        pending_dso_links.clear()
+    if import_history_rec is not None:
+        import_history_rec.log = 'Imported {} of {} observations'.format(obs_count, obs_total)
+    db.session.commit()
+
+
+def _query_in(query, column, values):
+    """
+    Rows of query with column value in values, queried in chunks to keep number of bound parameters bounded.
+    """
+    values = list(values)
+    result = []
+    for i in range(0, len(values), IN_QUERY_CHUNK_SIZE):
+        result.extend(query.filter(column.in_(values[i:i + IN_QUERY_CHUNK_SIZE])).all())
+    return result
+
+
+def _find_equipment(candidates, **attrs):
+    """
+    First of candidates matching all non-empty attributes, empty attributes are not compared.
+    """
+    for candidate in candidates:
+        if all(getattr(candidate, attr) == value for attr, value in attrs.items() if value):
+            return candidate
+    return None
+
+
+def _import_locations(oal_sites, user_id, import_user_id, import_history_rec_id):
+    found_locations = {}
+    if not oal_sites:
+        return found_locations
+
+    locations_by_name = {}
+    site_names = {oal_site.name for oal_site in oal_sites if oal_site.name}
+    for location in sorted(_query_in(Location.query, Location.name, site_names), key=lambda l: l.id):
+        locations_by_name.setdefault(location.name, location)
+
+    for oal_site in oal_sites:
+        location = None
+        if oal_site.name:
+            location = locations_by_name.get(oal_site.name)
+        if location is None:
+            lat = _get_angle_from_oal_angle(oal_site.latitude)
+            lon = _get_angle_from_oal_angle(oal_site.longitude)
+            location = Location(
+                name=oal_site.name,
+                longitude=lon,
+                latitude=lat,
+                country_code=None,
+                descr=None,
+                bortle=None,
+                rating=None,
+                is_public=True,
+                is_for_observation=True,
+                time_zone=None,
+                iau_code=None,
+                import_history_rec_id=import_history_rec_id,
+                user_id=user_id,
+                create_by=import_user_id,
+                update_by=import_user_id,
+                create_date=datetime.now(),
+                update_date=datetime.now()
+            )
+            db.session.add(location)
+            if oal_site.name:
+                locations_by_name[oal_site.name] = location
+        found_locations[oal_site.id] = location
+    return found_locations
+
+
+def _import_telescopes(oal_scopes, user_id, import_user_id, import_history_rec_id):
+    found_telescopes = {}
+    if not oal_scopes:
+        return found_telescopes
+
+    telescopes = Telescope.query.filter_by(user_id=user_id).order_by(Telescope.id).all()
+    for oal_scope in oal_scopes:
+        model = oal_scope.model
+        telescope_type = _get_telescope_type_from_oal_scope_type(oal_scope.type)
+        vendor = oal_scope.vendor
+        aperture_mm = oal_scope.aperture
+
+        focal_length_mm = oal_scope.focal_length
+        fixed_magnification = oal_scope.magnification
+
+        telescope = _find_equipment(telescopes, model=model, telescope_type=telescope_type, vendor=vendor,
+                                    aperture_mm=aperture_mm, focal_length_mm=focal_length_mm,
+                                    fixed_magnification=fixed_magnification)
+        if not telescope:
+            telescope = Telescope(
+                name=oal_scope.id,
+                vendor=vendor,
+                model=model,
+                descr='',
+                aperture_mm=aperture_mm,
+                focal_length_mm=focal_length_mm,
+                fixed_magnification=fixed_magnification,
+                telescope_type=telescope_type,
+                is_default=False,
+                is_active=True,
+                is_deleted=False,
+                import_history_rec_id=import_history_rec_id,
+                user_id=user_id,
+                create_by=import_user_id,
+                update_by=import_user_id,
+                create_date=datetime.now(),
+                update_date=datetime.now()
+            )
+            db.session.add(telescope)
+            telescopes.append(telescope)
+        found_telescopes[oal_scope.id] = telescope
+    return found_telescopes
+
+
+def _import_eyepieces(oal_eyepieces, user_id, import_user_id, import_history_rec_id):
+    found_eyepieces = {}
+    if not oal_eyepieces:
+        return found_eyepieces
+
+    eyepieces = Eyepiece.query.filter_by(user_id=user_id).order_by(Eyepiece.id).all()
+    for oal_eyepiece in oal_eyepieces:
+        model = oal_eyepiece.model
+        vendor = oal_eyepiece.vendor
+        focal_length_mm = oal_eyepiece.focal_length
+        fov_deg = _get_angle_from_oal_angle(oal_eyepiece.apparent_fov)
+
+        eyepiece = _find_equipment(eyepieces, model=model, vendor=vendor, focal_length_mm=focal_length_mm, fov_deg=fov_deg)
+        if not eyepiece:
+            eyepiece = Eyepiece(
+                name=oal_eyepiece.id,
+                vendor=vendor,
+                model=model,
+                descr='',
+                focal_length_mm=focal_length_mm,
+                fov_deg=fov_deg,
+                diameter_inch=None,
+                is_active=True,
+                is_deleted=False,
+                import_history_rec_id=import_history_rec_id,
+                user_id=user_id,
+                create_by=import_user_id,
+                update_by=import_user_id,
+                create_date=datetime.now(),
+                update_date=datetime.now()
+            )
+            db.session.add(eyepiece)
+            eyepieces.append(eyepiece)
+        found_eyepieces[oal_eyepiece.id] = eyepiece
+    return found_eyepieces
+
+
+def _import_filters(oal_filters, user_id, import_user_id, import_history_rec_id):
+    found_filters = {}
+    if not oal_filters:
+        return found_filters
+
+    filters = Filter.query.filter_by(user_id=user_id).order_by(Filter.id).all()
+    for oal_filter in oal_filters:
+        model = oal_filter.model
+        vendor = oal_filter.vendor
+        filter_type = _get_filter_type_from_oal_filter_kind(oal_filter.type)
+
+        filter = _find_equipment(filters, model=model, vendor=vendor, filter_type=filter_type)
+        if not filter:
+            filter = Filter(
+                name=oal_filter.id,
+                vendor=vendor,
+                model=model,
+                descr='',
+                filter_type=filter_type,
+                diameter_inch=None,
+                is_active=True,
+                is_deleted=False,
+                import_history_rec_id=import_history_rec_id,
+                user_id=user_id,
+                create_by=import_user_id,
+                update_by=import_user_id,
+                create_date=datetime.now(),
+                update_date=datetime.now()
+            )
+            db.session.add(filter)
+            filters.append(filter)
+        found_filters[oal_filter.id] = filter
+    return found_filters
+
+
+def _import_lenses(oal_lenses, user_id, import_user_id, import_history_rec_id):
+    found_lenses = {}
+    if not oal_lenses:
+        return found_lenses
+
+    lenses = Lens.query.filter_by(user_id=user_id).order_by(Lens.id).all()
+    for oal_lens in oal_lenses:
+        model = oal_lens.model
+        vendor = oal_lens.vendor
+        factor = oal_lens.factor
+
+        lens = _find_equipment(lenses, model=model, vendor=vendor, magnification=factor)
+        if not lens:
+            lens = Lens(
+                name=oal_lens.id,
+                vendor=vendor,
+                model=model,
+                descr='',
+                lens_type=None,
+                magnification=factor,
+                diameter_inch=None,
+                is_active=True,
+                is_deleted=False,
+                import_history_rec_id=import_history_rec_id,
+                user_id=user_id,
+                create_by=import_user_id,
+                update_by=import_user_id,
+                create_date=datetime.now(),
+                update_date=datetime.now()
+            )
+            db.session.add(lens)
+            lenses.append(lens)
+        found_lenses[oal_lens.id] = lens
+    return found_lenses
+
+
+def _find_overlapping_session(observing_sessions, begin, end):
+    if begin is None or end is None:
+        return None
+    for observing_session in observing_sessions:
+        if observing_session.date_to is not None and observing_session.date_from is not None and \
+                observing_session.date_to >= begin and observing_session.date_from <= end:
+            return observing_session
+    return None
+
+
+def _import_observing_sessions(oal_sessions, user_observing_sessions, found_locations, add_hoc_locations,
+                               user_id, import_user_id, import_history_rec_id, imp_observing_session):
+    found_observing_sessions = {}
+    new_observing_sessions = {}
+    if not oal_sessions:
+        return found_observing_sessions, new_observing_sessions
+
+    for i, oal_session in enumerate(oal_sessions):
+        if imp_observing_session and i > 0:
+            break
+
+        begin = oal_session.begin
+        end = oal_session.end
+        if begin and not end:
+            end = begin
+        if end and not begin:
+            begin = end
+
+        if imp_observing_session:
+            found_observing_sessions[oal_session.id] = imp_observing_session
+            continue
+
+        observing_session = _find_overlapping_session(user_observing_sessions, begin, end)
+        if observing_session and observing_session.update_date != observing_session.create_date:
+            found_observing_sessions[oal_session.id] = observing_session
+            continue
+
+        location = found_locations.get(oal_session.site)
+        location_position = add_hoc_locations.get(oal_session.site)
+        if location:
+            title = location.name + ' ' + begin.strftime('%d.%m.%Y')
+        elif begin:
+            title = begin.strftime('%d.%m.%Y')
+        else:
+            title = oal_session.id
+
+        now = datetime.now()
+        if not observing_session:
+            observing_session = ObservingSession(
+                user_id=user_id,
+                title=title,
+                date_from=begin,
+                date_to=end,
+                location_id=location.id if location else None,
+                location_position=location_position,
+                sqm=None,
+                faintest_star=None,
+                seeing=None,
+                transparency=None,
+                rating=None,
+                weather=oal_session.weather,
+                equipment=oal_session.equipment,
+                notes=oal_session.comments,
+                import_history_rec_id=import_history_rec_id,
+                create_by=import_user_id,
+                update_by=import_user_id,
+                create_date=now,
+                update_date=now
+            )
+            new_observing_sessions[oal_session.id] = observing_session
+            user_observing_sessions.append(observing_session)
+        else:
+            observing_session.title = title
+            observing_session.date_from = begin
+            observing_session.date_to = end
+            observing_session.location_id = location.id if location else None
+            observing_session.location_position = location_position
+            observing_session.weather = oal_session.weather
+            observing_session.equipment = oal_session.equipment
+            observing_session.notes = oal_session.comments
+            observing_session.import_history_rec_id = import_history_rec_id
+            observing_session.update_by = import_user_id
+            observing_session.create_date = now
+            observing_session.update_date = now
+            found_observing_sessions[oal_session.id] = observing_session
+
+        db.session.add(observing_session)
+
+    return found_observing_sessions, new_observing_sessions
+
+
+def _get_oal_target_dso_name(target):
+    normalized_name = normalize_dso_name_ext(denormalize_dso_name(target.name))
+    m = re.search(r'^(NGC|IC)\d+([A-Z]|-[1-9])$', normalized_name)
+    if m:
+        normalized_name = normalized_name[:m.start(2)].strip()
+    return normalized_name
+
+
+def _resolve_oal_targets(oal_targets, log_error):
+    """
+    Resolve OAL targets to DSO and double star ids, all names are resolved by few IN queries,
+    only double stars not found by designation are searched one by one.
+    """
+    found_dsos = {}
+    found_double_stars = {}
+    not_found_targets = set()
+    if not oal_targets:
+        return found_dsos, found_double_stars, not_found_targets
+
+    targets = oal_targets
+    double_star_targets = [t for t in targets if t.is_double_star()]
+    dso_names = {t.id: _get_oal_target_dso_name(t) for t in targets if not t.is_double_star()}
+
+    dso_ids = {}
+    for dso_id, dso_name in sorted(_query_in(db.session.query(DeepskyObject.id, DeepskyObject.name),
+                                             DeepskyObject.name, set(dso_names.values()))):
+        dso_ids.setdefault(dso_name, dso_id)
+
+    double_star_names = {t.name for t in double_star_targets}
+    wds_numbers = {name for name in double_star_names if name and name[0].isdigit()}
+    common_cat_ids = {normalize_double_star_name(name) for name in double_star_names if name}
+    double_star_query = db.session.query(DoubleStar.id, DoubleStar.wds_number, DoubleStar.common_cat_id)
+    double_star_by_wds = {}
+    for double_star_id, wds_number, _ in sorted(_query_in(double_star_query, DoubleStar.wds_number, wds_numbers)):
+        double_star_by_wds.setdefault(wds_number, double_star_id)
+    double_star_by_common_cat_id = {}
+    for double_star_id, _, common_cat_id in sorted(_query_in(double_star_query, DoubleStar.common_cat_id, common_cat_ids)):
+        double_star_by_common_cat_id.setdefault(common_cat_id, double_star_id)
+
+    double_star_ids = {}
+    for target in targets:
+        if target.is_double_star():
+            name = target.name
+            if name not in double_star_ids:
+                double_star_id = double_star_by_wds.get(name) or double_star_by_common_cat_id.get(normalize_double_star_name(name))
+                if not double_star_id:
+                    double_star = search_double_star(name)
+                    double_star_id = double_star.id if double_star else None
+                double_star_ids[name] = double_star_id
+            if double_star_ids[name]:
+                found_double_stars[target.id] = double_star_ids[name]
+            else:
+                not_found_targets.add(target.id)
+                log_error.append(lazy_gettext('Double star "{}" not found').format(target.name))
+        else:
+            dso_id = dso_ids.get(dso_names[target.id])
+            if dso_id:
+                found_dsos[target.id] = dso_id
+            else:
+                not_found_targets.add(target.id)
+                log_error.append(lazy_gettext('DSO "{}" not found').format(target.name))
+
+    return found_dsos, found_double_stars, not_found_targets
+
+
+def _register_observation(observation, session_id, date_from, target_key, session_observations, dated_observations):
+    if session_id is not None:
+        session_observations.setdefault((session_id, ) + target_key, observation)
+    dated_observations.setdefault(target_key + (date_from, ), observation)
+
+
+def _load_user_observations(user_id):
+    """
+    Existing observations of the user by (session id, target type, target id) and by (target type, target id, date),
+    and set of observations modified by the user.
+    """
+    session_observations = {}
+    dated_observations = {}
+    modified_observations = set()
+
+    observation_dso_ids = {}
+    dso_links = db.session.query(dso_observation_association_table.c.observation_id, dso_observation_association_table.c.dso_id) \
+        .join(Observation, Observation.id == dso_observation_association_table.c.observation_id) \
+        .filter(Observation.user_id == user_id) \
+        .order_by(dso_observation_association_table.c.observation_id)
+    for observation_id, dso_id in dso_links:
+        observation_dso_ids.setdefault(observation_id, []).append(dso_id)
+
+    for observation in Observation.query.filter_by(user_id=user_id).order_by(Observation.id):
+        if observation.create_date != observation.update_date:
+            modified_observations.add(observation)
+        if observation.double_star_id is not None:
+            target_key = (ObservationTargetType.DBL_STAR, observation.double_star_id)
+            if observation.target_type == ObservationTargetType.DBL_STAR and observation.observing_session_id is not None:
+                session_observations.setdefault((observation.observing_session_id, ) + target_key, observation)
+            dated_observations.setdefault(target_key + (observation.date_from, ), observation)
+        if observation.target_type == ObservationTargetType.DSO:
+            for dso_id in observation_dso_ids.get(observation.id, ()):
+                _register_observation(observation, observation.observing_session_id, observation.date_from,
+                                      (ObservationTargetType.DSO, dso_id), session_observations, dated_observations)
+
+    return session_observations, dated_observations, modified_observations
+
+
 def _get_seeing_from_oal_seeing(seeing):
     if seeing == 5:
         return Seeing.VERYBAD
@@ -566,7 +723,7 @@ def _get_seeing_from_oal_seeing(seeing):
 
 def _get_sqm_from_oal_surface_brightness(surf_brightness):
     if surf_brightness:
-        return surf_brightness.get_valueOf_()
+        return surf_brightness.value
     return None
 
 
@@ -616,8 +773,8 @@ def _get_filter_type_from_oal_filter_kind(filter_kind):
 
 def _get_angle_from_oal_angle(oal_angle):
     if oal_angle:
-        value = float(oal_angle.get_valueOf_())
-        unit = oal_angle.get_unit()
+        value = float(oal_angle.value)
+        unit = oal_angle.unit
         if unit == angleUnit.ARCSEC:
             return value / (60.0 * 60.0)
         if unit == angleUnit.ARCMIN:
@@ -1,7 +1,6 @@
 import os
 import re
 from datetime import datetime
-from io import StringIO, BytesIO
 import codecs
 
 from werkzeug.utils import secure_filename
@@ -13,9 +12,9 @@ from flask import (
     redirect,
     render_template,
     request,
-    send_file,
 )
 from flask_login import current_user, login_required
+from sqlalchemy.orm import joinedload
 from flask_babel import gettext
 from app.compat.flask_rq import get_queue
 
@@ -32,7 +31,7 @@ from .observation_forms import (
     ObservationExportForm,
 )
 
-from .observation_export import create_oal_observations
+from .observation_export import oal_observations_response
 from .observation_import import import_observations
 from app.commons.utils import get_about_oal
 
@@ -51,18 +50,11 @@ def observation_export():
     """Export observation."""
     form = ObservationExportForm()
     if request.method == 'POST':
-        buf = StringIO()
-        buf.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        observing_sessions = ObservingSession.query.filter_by(user_id=current_user.id).all()
-        oal_observations = create_oal_observations(current_user, observing_sessions)
-        oal_observations.export(buf, 0)
-        mem = BytesIO()
-        mem.write(codecs.BOM_UTF8)
-        mem.write(buf.getvalue().encode('utf-8'))
-        mem.seek(0)
-        return send_file(mem, as_attachment=True,
-                         download_name='observations-' + current_user.user_name + '.xml',
-                         mimetype='text/xml')
+        observing_sessions = ObservingSession.query.filter_by(user_id=current_user.id) \
+            .options(joinedload(ObservingSession.location)) \
+            .order_by(ObservingSession.id) \
+            .all()
+        return oal_observations_response(current_user, observing_sessions, 'observations-' + current_user.user_name + '.xml')
     return render_template('main/observation/observation_export.html', about_oal=get_about_oal())
 
 
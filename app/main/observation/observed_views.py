@@ -42,6 +42,7 @@ from app.commons.chart_generator import (
 )
 from app.commons.chart_scene import (
     build_scene_v1,
+    add_scene_list_dsos,
     ensure_scene_dso_item,
     SceneHighlight, normalized_theme_name,
 )
@@ -61,6 +62,7 @@ from app.commons.search_sky_object_utils import (
 
 from app.commons.prevnext_utils import find_by_url_obj_id_in_list, get_default_chart_iframe_url
 from app.commons.highlights_list_utils import common_highlights_from_observed_list_items
+from app.commons.user_membership_cache import MEMBERSHIP_OBSERVED, invalidate_user_membership
 
 from app.main.chart.chart_forms import ChartForm
 
@@ -136,6 +138,7 @@ def observed_list_item_add():
         if new_item is not None:
             db.session.add(new_item)
             db.session.commit()
+            invalidate_user_membership(MEMBERSHIP_OBSERVED, current_user.id)
             flash(gettext('Object was added to observed list.'), 'form-success')
         elif not not_found:
             flash(gettext('Object is already on observed list.'), 'form-info')
@@ -156,6 +159,7 @@ def observed_list_item_delete(item_id):
         abort(404)
     db.session.delete(observed_list_item)
     db.session.commit()
+    invalidate_user_membership(MEMBERSHIP_OBSERVED, current_user.id)
     flash(gettext('Observed list item was deleted'), 'form-success')
     return redirect(url_for('main_observed.observed_list_info'))
 
@@ -168,6 +172,7 @@ def observed_list_delete():
     observed_list = ObservedList.create_get_observed_list_by_user_id(current_user.id)
     ObservedListItem.query.filter_by(observed_list_id=observed_list.id).delete()
     db.session.commit()
+    invalidate_user_membership(MEMBERSHIP_OBSERVED, current_user.id)
     flash(gettext('Observed list deleted'), 'form-success')
     return redirect(url_for('main_observed.observed_list_info'))
 
@@ -206,6 +211,7 @@ def observed_list_upload():
                     db.session.add(new_item)
                     existing_ids.add(dso.id)
         db.session.commit()
+        invalidate_user_membership(MEMBERSHIP_OBSERVED, current_user.id)
         os.remove(path)
         flash(gettext('Observed list updated.'), 'form-success')
 
@@ -338,13 +344,10 @@ def observed_list_chart_scene_v1():
             )
 
     if highlights_dso_list:
-        for hl_dso in highlights_dso_list:
-            if hl_dso is None:
-                continue
-            ensure_scene_dso_item(scene, hl_dso)
-            highlights.append(
-                build_obs_highlight_cross(highlight_id=str(hl_dso.name).replace(' ', ''), label=hl_dso.denormalized_name(), ra=hl_dso.ra, dec=hl_dso.dec, theme_name=cur_theme, size=0.75,)
-            )
+        add_scene_list_dsos(scene, highlights_dso_list, lambda hl_dso: build_obs_highlight_cross(
+            highlight_id=str(hl_dso.name).replace(' ', ''), label=hl_dso.denormalized_name(), ra=hl_dso.ra, dec=hl_dso.dec,
+            theme_name=cur_theme, size=0.75,
+        ))
 
     if highlights_pos_list:
         for hl_pos in highlights_pos_list:
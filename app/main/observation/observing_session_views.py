@@ -1,7 +1,6 @@
 import os
 from datetime import datetime
 import base64
-from io import StringIO, BytesIO
 import codecs
 from werkzeug.utils import secure_filename
 
@@ -31,7 +30,7 @@ from .observing_session_forms import (
     ObservingSessionRunPlanForm,
 )
 
-from .observation_export import create_oal_observations
+from .observation_export import oal_observations_response
 from .observation_import import import_observations
 
 from app.models import (
@@ -65,6 +64,7 @@ from app.commons.chart_scene import (
     build_scene_v1,
     build_cross_highlight,
     build_circle_highlight,
+    add_scene_list_dsos,
     ensure_scene_dso_item,
 )
 from app.commons.dso_utils import (
@@ -170,17 +170,7 @@ def observing_session_export(observing_session_id):
     user = User.query.filter_by(id=observing_session.user_id).first()
     exp_form = ObservingSessionExportForm()
     if request.method == 'POST':
-        buf = StringIO()
-        buf.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        oal_observations = create_oal_observations(user, [observing_session])
-        oal_observations.export(buf, 0)
-        mem = BytesIO()
-        mem.write(codecs.BOM_UTF8)
-        mem.write(buf.getvalue().encode('utf-8'))
-        mem.seek(0)
-        return send_file(mem, as_attachment=True,
-                         download_name='observation-' + user.user_name + '.xml',
-                         mimetype='text/xml')
+        return oal_observations_response(user, [observing_session], 'observation-' + user.user_name + '.xml')
 
     return render_template('main/observation/observing_session_info.html', exp_form=exp_form, type='imp_exp',
                            observing_session=observing_session, is_mine_observing_session=is_mine_observing_session, about_oal=get_about_oal())
@@ -608,13 +598,10 @@ def observing_session_chart_scene_v1(observing_session_id):
             )
 
     if highlights_dso_list:
-        for hl_dso in highlights_dso_list:
-            if hl_dso is None:
-                continue
-            ensure_scene_dso_item(scene, hl_dso)
-            highlights.append(
-                build_circle_highlight(highlight_id=str(hl_dso.name).replace(' ', ''), label=hl_dso.denormalized_name(), ra=hl_dso.ra, dec=hl_dso.dec, dashed=False, theme_name=cur_theme,)
-            )
+        add_scene_list_dsos(scene, highlights_dso_list, lambda hl_dso: build_circle_highlight(
+            highlight_id=str(hl_dso.name).replace(' ', ''), label=hl_dso.denormalized_name(), ra=hl_dso.ra, dec=hl_dso.dec,
+            dashed=False, theme_name=cur_theme,
+        ))
 
     if highlights_pos_list:
         for hl_pos in highlights_pos_list:
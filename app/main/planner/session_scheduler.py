@@ -1,17 +1,17 @@
 from app import db
 import pytz
 
-from astropy.time import Time, TimeDelta
+import numpy as np
+from astropy.time import Time
 import astropy.units as u
-from astropy.coordinates import EarthLocation, SkyCoord
-from astroplan import Observer, FixedTarget
-from astroplan import (AltitudeConstraint, AirmassConstraint, AtNightConstraint)
-from astroplan import is_observable, is_always_observable, months_observable
-from lru import LRU
+from astropy.coordinates import EarthLocation
+from astroplan import Observer
 
 from sqlalchemy import or_
 from flask_login import current_user, login_required
 
+from app.commons.rise_set_cache import get_rise_set_elements
+from app.commons.rise_set_utils import RiseSetElements, RiseSetEngine, WHICH_NEXT, WHICH_PREVIOUS, jd_to_datetime, to_jd
 from app.commons.search_utils import get_order_by_field
 from app.models import (
     Catalogue,
@@ -25,9 +25,6 @@ from app.models import (
     WishListItem,
 )
 
-rise_set_cache = l = LRU(10000)
-
-
 def create_session_plan_compound_list(session_plan, observer, observation_time, tz_info, sort_def):
     # create session plan list
     spi = session_plan.session_plan_items.copy()
@@ -42,8 +39,6 @@ def create_session_plan_compound_list(session_plan, observer, observation_time,
 def create_selection_coumpound_list(session_plan, schedule_form, observer, observation_time, time_from, time_to, tz_info,
                                     page, offset, per_page, sort_by, mag_scale, sort_def):
 
-    global rise_set_cache
-
     if session_plan.is_anonymous and (schedule_form.obj_source.data is None or schedule_form.obj_source.data == 'WL'):
         schedule_form.obj_source.data = 'M'  # set Messier
 
@@ -105,96 +100,95 @@ def create_selection_coumpound_list(session_plan, schedule_form, observer, obser
     if order_by_field is None:
         order_by_field = DeepskyObject.id
 
-    all_count = dso_query.count()
+    # rise/set is computed for all candidates at once, so only coordinates are loaded for the whole selection
+    # and full objects are loaded just for the displayed page
+    candidates = dso_query.with_entities(DeepskyObject.id, DeepskyObject.ra, DeepskyObject.dec).order_by(order_by_field).all()
 
-    if all_count > 500:
-        selection_list = dso_query.order_by(order_by_field).limit(per_page).offset(offset).all().copy()
-        use_time_filter = False
-    else:
-        selection_list = dso_query.order_by(order_by_field).all().copy()
-        use_time_filter = True
+    elements = get_rise_set_elements(observer.location.lat.deg, observer.location.lon.deg, observation_time, candidates)
+    composed_selection_rms_list = _window_events(elements, time_from, time_to)
 
     # filter by rise-set time
-    if use_time_filter:
-        key_suffix = '/' + str(observer.location.lat) + '/' + str(observer.location.lon) + '/' + observation_time.strftime('%Y-%m-%d')
-        index_table = []
-        i = 0
-        composed_selection_rms_list = []
-        to_process_list = []
-        for x in selection_list:
-            key = str(x.id) + key_suffix
-            cached = rise_set_cache.get(key, None)
-            if cached is None:
-                index_table.append(i)
-                composed_selection_rms_list.append(None)
-                to_process_list.append((x.ra, x.dec))
-            else:
-                composed_selection_rms_list.append(cached)
-            i += 1
-
-        if to_process_list:
-            selection_rms_list = rise_merid_set_up(time_from, time_to, observer, to_process_list)
-            for i in range(len(selection_rms_list)):
-                index = index_table[i]
-                val = selection_rms_list[i]
-                composed_selection_rms_list[index] = val
-                key = str(selection_list[index].id) + key_suffix
-                rise_set_cache[key] = val
-
-        time_filtered_list = []
-        i = 0
-        for rise_t, merid_t, set_t, is_up in composed_selection_rms_list:
-            if is_up or rise_t < time_to or set_t>time_from:
-                time_filtered_list.append((selection_list[i], _to_HM_format(rise_t, tz_info), _to_HM_format(merid_t, tz_info), _to_HM_format(set_t, tz_info)))
-            i += 1
-
-        # filter by altitude
-        if len(time_filtered_list) > 0 and schedule_form.min_altitude.data is not None and schedule_form.min_altitude.data > 0:
-            constraints = [AltitudeConstraint(schedule_form.min_altitude.data*u.deg)]
-            targets = []
-            for item in time_filtered_list:
-                dso = item[0]
-                target = FixedTarget(coord=SkyCoord(ra=dso.ra * u.rad, dec=dso.dec * u.rad), name=dso.name)
-                targets.append(target)
-            time_range = Time([time_from, time_to])
-            observable_list = is_observable(constraints, observer, targets, time_range=time_range)
-            time_filtered_list = [ time_filtered_list[i] for i in range(len(time_filtered_list)) if observable_list[i] ]
-
-        all_count = len(time_filtered_list)
-        if offset >= all_count:
-            offset = 0
-            page = 1
-        selection_compound_list = time_filtered_list[offset:offset+per_page]
-    else:
-        selection_rms_list = rise_merid_set_time_str(observation_time, observer, [(x.ra, x.dec) for x in selection_list], tz_info)
-        selection_compound_list = [(selection_list[i], selection_rms_list[i]) for i in range(len(selection_list))]
+    jd_from, jd_to = to_jd(time_from), to_jd(time_to)
+    time_filtered = [i for i, (rise_jd, merid_jd, set_jd, is_up) in enumerate(composed_selection_rms_list)
+                     if is_up or rise_jd < jd_to or set_jd > jd_from]
+
+    # filter by altitude
+    if time_filtered and schedule_form.min_altitude.data is not None and schedule_form.min_altitude.data > 0:
+        observable = altitude_observable(time_from, time_to, observer, [candidates[i][1:] for i in time_filtered],
+                                         schedule_form.min_altitude.data)
+        time_filtered = [i for i, ok in zip(time_filtered, observable) if ok]
+
+    all_count = len(time_filtered)
+    if offset >= all_count:
+        offset = 0
+        page = 1
+    page_indexes = time_filtered[offset:offset+per_page]
+
+    dso_by_id = { dso.id: dso for dso in DeepskyObject.query.filter(DeepskyObject.id.in_([candidates[i][0] for i in page_indexes])) }
+    selection_compound_list = []
+    for i in page_indexes:
+        rise_jd, merid_jd, set_jd, is_up = composed_selection_rms_list[i]
+        selection_compound_list.append((dso_by_id[candidates[i][0]], jd_to_HM_format(rise_jd, tz_info),
+                                        jd_to_HM_format(merid_jd, tz_info), jd_to_HM_format(set_jd, tz_info)))
 
     return selection_compound_list, page, all_count
 
 
-def rise_merid_set_up(time_from, time_to, observer, ra_dec_list):
-    coords = [ SkyCoord(x[0] * u.rad, x[1] * u.rad) for x in ra_dec_list]
-    rise_list = _unmask_time(_wrap2array(observer.target_rise_time(time_from, coords, which='next', n_grid_points=10))) if len(coords) > 0 else []
-    merid_list = _unmask_time(_wrap2array(observer.target_meridian_transit_time(time_from, coords, which='next', n_grid_points=10)))  if len(coords) > 0 else []
-    set_list = _unmask_time(_wrap2array(observer.target_set_time(time_to, coords, which='previous', n_grid_points=10))) if len(coords) > 0 else []
-    up_list = _wrap2array(observer.target_is_up(time_from, coords)) if len(coords) > 0 else []
+def _create_engine(observer, ra_dec_list, epoch_jd):
+    ra_dec = np.array(ra_dec_list, dtype=float).reshape(-1, 2)
+    return RiseSetEngine(ra_dec[:, 0], ra_dec[:, 1], observer.location.lat.deg, observer.location.lon.deg, epoch_jd)
 
-    return [(rise_list[i], merid_list[i], set_list[i], up_list[i]) for i in range(len(rise_list))]
+
+def _window_events(elements, time_from, time_to):
+    jd_from, jd_to = to_jd(time_from), to_jd(time_to)
+    rise_list = elements.rise_jd(jd_from, WHICH_NEXT)
+    merid_list = elements.transit_jd(jd_from, WHICH_NEXT)
+    set_list = elements.set_jd(jd_to, WHICH_PREVIOUS)
+    up_list = elements.is_up(jd_from)
+
+    return [(float(rise_list[i]), float(merid_list[i]), float(set_list[i]), bool(up_list[i])) for i in range(len(elements))]
+
+
+def rise_merid_set_up(time_from, time_to, observer, ra_dec_list):
+    """
+    Returns list of (rise, merid, set, is_up) for each (ra, dec): next rise and meridian transit after time_from,
+    previous set before time_to, as Julian dates (NaN if object does not rise/set), and whether it is up at time_from.
+    """
+    if len(ra_dec_list) == 0:
+        return []
+    jd_from = to_jd(time_from)
+    return _window_events(RiseSetElements(*_create_engine(observer, ra_dec_list, jd_from).elements(jd_from)), time_from, time_to)
+
+
+def altitude_observable(time_from, time_to, observer, ra_dec_list, min_altitude):
+    """
+    Returns bool array, True for objects reaching min_altitude (deg) in interval <time_from, time_to>.
+    """
+    if len(ra_dec_list) == 0:
+        return np.zeros(0, dtype=bool)
+    jd_from, jd_to = to_jd(time_from), to_jd(time_to)
+    engine = _create_engine(observer, ra_dec_list, jd_from)
+    return engine.max_altitude_deg(jd_from, jd_to) >= min_altitude
 
 
 def rise_merid_set_time_str(t, observer, ra_dec_list, tz_info):
-    coords = [SkyCoord(x[0] * u.rad, x[1] * u.rad) for x in ra_dec_list]
-    rise_list = _ar_to_HM_format(_unmask_time(_wrap2array(observer.target_rise_time(t, coords, n_grid_points=10))), tz_info) if len(coords) > 0 else []
-    merid_list = _ar_to_HM_format(_unmask_time(_wrap2array(observer.target_meridian_transit_time(t, coords, n_grid_points=10))), tz_info) if len(coords) > 0 else []
-    set_list = _ar_to_HM_format(_unmask_time(_wrap2array(observer.target_set_time(t, coords, n_grid_points=10))), tz_info) if len(coords) > 0 else []
+    if len(ra_dec_list) == 0:
+        return []
+    jd = to_jd(t)
+    engine = _create_engine(observer, ra_dec_list, jd)
+    rise_list = engine.rise_jd(jd)
+    merid_list = engine.transit_jd(jd)
+    set_list = engine.set_jd(jd)
 
-    return [(rise_list[i], merid_list[i], set_list[i]) for i in range(len(rise_list))]
+    return [(jd_to_HM_format(rise_list[i], tz_info), jd_to_HM_format(merid_list[i], tz_info), jd_to_HM_format(set_list[i], tz_info))
+            for i in range(len(engine))]
 
 
 def merid_time(t, observer, ra_dec_list):
-    coords = [ SkyCoord(x[0] * u.rad, x[1] * u.rad) for x in ra_dec_list]
-    merid_list = observer.target_meridian_transit_time(t, coords, n_grid_points=10) if len(coords) > 0 else []
-    return _wrap2array(merid_list)
+    if len(ra_dec_list) == 0:
+        return []
+    jd = to_jd(t)
+    return list(_create_engine(observer, ra_dec_list, jd).transit_jd(jd))
 
 
 def reorder_by_merid_time(session_plan):
@@ -218,37 +212,6 @@ def reorder_by_merid_time(session_plan):
     db.session.commit()
 
 
-def _to_HM_format(t, tz_info):
-    try:
-        return t.to_datetime(tz_info).strftime('%H:%M')
-    except ValueError:
-        return ''
-
-
-def _ar_to_HM_format(tm, tz_info):
-    ret = []
-    tm = _wrap2array(tm)
-
-    for t in tm:
-        try:
-            ret.append(t.to_datetime(tz_info).strftime('%H:%M'))
-        except ValueError:
-            ret.append('')
-    return ret
-
-
-def _wrap2array(ar):
-    try:
-        it = iter(ar)
-        return ar
-    except TypeError:
-        return [ar]
-
-def _unmask_time(ar):
-    result = []
-    for t in ar:
-        if t.masked:
-            result.append(t.unmasked)
-        else:
-            result.append(t)
-    return result
\ No newline at end of file
+def jd_to_HM_format(jd, tz_info):
+    dt = jd_to_datetime(jd, tz_info)
+    return dt.strftime('%H:%M') if dt is not None else ''
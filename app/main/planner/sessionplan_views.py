@@ -13,9 +13,6 @@ from astropy.coordinates import EarthLocation, SkyCoord
 import astropy.units as u
 from astroplan import Observer
 
-from skyfield import almanac
-from skyfield.api import load, wgs84
-
 from flask import (
     abort,
     Blueprint,
@@ -34,14 +31,16 @@ from flask_login import current_user, login_required
 
 from flask_babel import gettext
 
-from app import db, csrf
+from app import create_app, db, csrf
+from app import scheduler
 
 from app.models import (
     Constellation,
+    DB_UPDATE_ALMANAC,
+    DB_UPDATE_RISE_SET_CACHE,
     DeepskyObject,
     DsoList,
     Location,
-    ObservedList,
     SessionPlan,
     SessionPlanItem,
     SessionPlanItemType,
@@ -69,6 +68,7 @@ from app.commons.chart_scene import (
     build_scene_v1,
     build_cross_highlight,
     build_circle_highlight,
+    add_scene_list_dsos,
     ensure_scene_dso_item,
 )
 
@@ -104,12 +104,49 @@ from app.commons.comet_utils import find_mpc_comet, get_mpc_comet_position
 from app.commons.search_sky_object_utils import search_double_star, search_comet, search_minor_planet, search_planet, search_dso
 from app.commons.minor_planet_utils import get_mpc_minor_planet_position, find_mpc_minor_planet
 from app.commons.solar_system_chart_utils import get_mpc_planet_position
+from app.commons.almanac_utils import (
+    TWILIGHT_ASTRONOMICAL,
+    TWILIGHT_NAUTICAL,
+    get_almanac_night,
+    get_moonless_window,
+    get_twilight_window,
+    precompute_almanac,
+)
+from app.commons.rise_set_cache import precompute_rise_set_cache
+from app.commons.user_membership_cache import get_observed_ids
+from app.commons.dbupdate_utils import ask_dbupdate_permit
 
 main_sessionplan = Blueprint('main_sessionplan', __name__)
 
 min_alt_item_list = [0, 5, 10, 15, 20, 25, 30, 35, 40, 45]
 
 
+def _precompute_rise_set_cache():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default', web=False)
+    with app.app_context():
+        # local cache belongs to the scheduler process only, precompute makes sense for shared cache
+        if current_app.config.get('RISE_SET_CACHE_BACKEND') != 'redis':
+            return
+        if ask_dbupdate_permit(DB_UPDATE_RISE_SET_CACHE, timedelta(hours=1)):
+            cat_codes = current_app.config.get('RISE_SET_PRECOMPUTE_CATALOGS').split(',')
+            count = precompute_rise_set_cache(current_app.config.get('RISE_SET_PRECOMPUTE_NIGHTS'), cat_codes)
+            current_app.logger.info('Rise/set cache precomputed for {} location nights.'.format(count))
+
+
+job1 = scheduler.add_job(_precompute_rise_set_cache, 'cron', hour=11, replace_existing=True, jitter=60)
+
+
+def _precompute_almanac():
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default', web=False)
+    with app.app_context():
+        if ask_dbupdate_permit(DB_UPDATE_ALMANAC, timedelta(hours=1)):
+            count = precompute_almanac(current_app.config.get('ALMANAC_PRECOMPUTE_DAYS'))
+            current_app.logger.info('Almanac precomputed for {} location nights.'.format(count))
+
+
+job2 = scheduler.add_job(_precompute_almanac, 'cron', hour=10, replace_existing=True, jitter=60)
+
+
 @main_sessionplan.route('/session-plans',  methods=['GET', 'POST'])
 @login_required
 def session_plans():
@@ -158,7 +195,7 @@ def session_plan_info(session_plan_id):
     """View a session plan info."""
     session_plan = SessionPlan.query.filter_by(id=session_plan_id).first()
     is_mine_session_plan = _check_session_plan(session_plan, allow_public=True)
-    observed = { dso.id for dso in ObservedList.get_observed_dsos_by_user_id(current_user.id) } if not current_user.is_anonymous else None
+    observed = get_observed_ids(current_user.id) if not current_user.is_anonymous else None
     observer, tz_info = _get_observer_tzinfo(session_plan)
     observation_time = Time(session_plan.for_date)
     session_plan_compound_list = create_session_plan_compound_list(session_plan, observer, observation_time, tz_info, None)
@@ -552,10 +589,10 @@ def session_plan_schedule(session_plan_id):
     observation_time = Time(session_plan.for_date)
 
     # try astronomical twilight
-    default_t1, default_t2 = _get_twighligh_component(session_plan, 1)
+    default_t1, default_t2 = _get_twighligh_component(session_plan, TWILIGHT_ASTRONOMICAL)
     if not default_t2 and not default_t2:
         # try nautical twilight
-        default_t1, default_t2 = _get_twighligh_component(session_plan, 2)
+        default_t1, default_t2 = _get_twighligh_component(session_plan, TWILIGHT_NAUTICAL)
         if not default_t2 and not default_t2:
             default_t1 = tz_info.localize(session_plan.for_date + timedelta(hours=22)).time()
             default_t2 = tz_info.localize(session_plan.for_date + timedelta(hours=26)).time()
@@ -779,15 +816,10 @@ def session_plan_chart_scene_v1(session_plan_id):
             )
 
     if highlights_dso_list:
-        for hl_dso in highlights_dso_list:
-            if hl_dso is None:
-                continue
-            ensure_scene_dso_item(scene, hl_dso)
-            hl_id = str(hl_dso.name).replace(' ', '')
-            observed = bool(observed_dso_ids and hl_dso.id in observed_dso_ids)
-            highlights.append(
-                build_circle_highlight(highlight_id=hl_id, label=hl_dso.denormalized_name(), ra=hl_dso.ra, dec=hl_dso.dec, dashed=observed, theme_name=cur_theme,)
-            )
+        add_scene_list_dsos(scene, highlights_dso_list, lambda hl_dso: build_circle_highlight(
+            highlight_id=str(hl_dso.name).replace(' ', ''), label=hl_dso.denormalized_name(), ra=hl_dso.ra, dec=hl_dso.dec,
+            dashed=bool(observed_dso_ids and hl_dso.id in observed_dso_ids), theme_name=cur_theme,
+        ))
 
     if highlights_pos_list:
         for hl_pos in highlights_pos_list:
@@ -846,29 +878,14 @@ def session_plan_chart_items(session_plan_id):
                      mimetype='text/csv')
 
 
-def _get_twighligh_component(session_plan, comp):
-    ts = load.timescale()
+def _get_session_plan_almanac(session_plan):
     _, latitude, longitude, _ = _get_location_info_from_session_plan(session_plan)
-    observer = wgs84.latlon(latitude, longitude)
+    return get_almanac_night(latitude, longitude, session_plan.for_date)
+
+
+def _get_twighligh_component(session_plan, comp):
     tz_info = _get_session_plan_tzinfo(session_plan)
-    ldate1 = tz_info.localize(session_plan.for_date + timedelta(hours=12))
-    ldate2 = tz_info.localize(session_plan.for_date + timedelta(hours=36))
-    t1 = ts.from_datetime(ldate1)
-    t2 = ts.from_datetime(ldate2)
-    eph = load('de421.bsp')
-    t, y = almanac.find_discrete(t1, t2, almanac.dark_twilight_day(eph, observer))
-
-    index1 = None
-    index2 = None
-    for i in range(len(y)):
-        if y[i] == comp:
-            if index1 is None:
-                index1 = i + 1
-            elif index2 is None:
-                index2 = i
-    if index1 is None or index2 is None:
-        return None, None
-    return t[index1].astimezone(tz_info), t[index2].astimezone(tz_info)
+    return get_twilight_window(_get_session_plan_almanac(session_plan), comp, tz_info)
 
 
 @main_sessionplan.route('/session-plan/<int:session_plan_id>/set-nautical-twilight', methods=['GET'])
@@ -876,7 +893,7 @@ def session_plan_set_nautical_twilight(session_plan_id):
     session_plan = SessionPlan.query.filter_by(id=session_plan_id).first()
     _check_session_plan(session_plan)
 
-    t1, t2 = _get_twighligh_component(session_plan, 2)
+    t1, t2 = _get_twighligh_component(session_plan, TWILIGHT_NAUTICAL)
 
     if t1 and t2:
         session['planner_time_from'] = t1.strftime(SCHEDULE_TIME_FORMAT)
@@ -891,7 +908,7 @@ def session_plan_set_astro_twilight(session_plan_id):
     session_plan = SessionPlan.query.filter_by(id=session_plan_id).first()
     _check_session_plan(session_plan)
 
-    t1, t2 = _get_twighligh_component(session_plan, 1)
+    t1, t2 = _get_twighligh_component(session_plan, TWILIGHT_ASTRONOMICAL)
 
     if t1 and t2:
         session['planner_time_from'] = t1.strftime(SCHEDULE_TIME_FORMAT)
@@ -906,50 +923,7 @@ def session_plan_set_moonless_astro_twilight(session_plan_id):
     session_plan = SessionPlan.query.filter_by(id=session_plan_id).first()
     _check_session_plan(session_plan)
 
-    t1, t2 = _get_twighligh_component(session_plan, 1)
-
-    if t1 and t2:
-        ts = load.timescale()
-        _,  latitude, longitude, _ = _get_location_info_from_session_plan(session_plan)
-        observer = wgs84.latlon(latitude, longitude)
-        tz_info = _get_session_plan_tzinfo(session_plan)
-        ldate_start = tz_info.localize(session_plan.for_date + timedelta(hours=0))
-        ldate_end = tz_info.localize(session_plan.for_date + timedelta(hours=48))
-        start_t = ts.from_datetime(ldate_start)
-        end_t = ts.from_datetime(ldate_end)
-        eph = load('de421.bsp')
-        f = almanac.risings_and_settings(eph, eph['Moon'], observer)
-        t, y = almanac.find_discrete(start_t, end_t, f)
-
-        if t1 and t2:
-            rise_sets = []
-            moon_rise, moon_set = None, None
-            for i in range(len(y)):
-                if y[i]:
-                    moon_rise = t[i].astimezone(tz_info)
-                else:
-                    moon_set = t[i].astimezone(tz_info)
-                    rise_sets.append((moon_rise, moon_set))
-                    moon_rise, moon_set = None, None
-            if moon_rise or moon_set:
-                rise_sets.append((moon_rise, moon_set))
-
-            for moon_rise, moon_set in rise_sets:
-                if not moon_rise:
-                    moon_rise = ldate_start
-                if not moon_set:
-                    moon_set = ldate_end
-                if moon_set < t1 or moon_rise > t2:
-                    continue
-                if moon_rise < t1 and moon_set > t2:
-                    t1, t2 = None, None
-                    break
-                if moon_rise > t1:
-                    t2 = moon_rise
-                else:
-                    t1 = moon_set
-            if t1 and t2 and t1 > t2:
-                t1, t2 = None, None
+    t1, t2 = get_moonless_window(_get_session_plan_almanac(session_plan), _get_session_plan_tzinfo(session_plan))
 
     if t1 and t2:
         session['planner_time_from'] = t1.strftime(SCHEDULE_TIME_FORMAT)
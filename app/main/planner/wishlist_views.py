@@ -46,6 +46,7 @@ from app.commons.chart_scene import (
     build_scene_v1,
     build_cross_highlight,
     build_circle_highlight,
+    add_scene_list_dsos,
     ensure_scene_dso_item,
 )
 from .wishlist_forms import (
@@ -59,6 +60,7 @@ from app.commons.dso_utils import normalize_dso_name, CHART_DOUBLE_STAR_PREFIX
 from app.commons.prevnext_utils import find_by_url_obj_id_in_list, get_default_chart_iframe_url
 from app.commons.highlights_list_utils import common_highlights_from_wishlist_items, find_wish_list_observed
 from app.commons.search_sky_object_utils import search_double_star, search_dso
+from app.commons.user_membership_cache import MEMBERSHIP_WISHLIST, invalidate_user_membership
 from .wishlist_export import create_oal_observations_from_wishlist
 from .wishlist_import import import_wishlist_items
 
@@ -120,6 +122,7 @@ def wish_list_item_add():
             if new_item:
                 db.session.add(new_item)
                 db.session.commit()
+                invalidate_user_membership(MEMBERSHIP_WISHLIST, current_user.id)
                 flash('Object was added to wishlist.', 'form-success')
             else:
                 flash('Object is already on wishlist.', 'form-info')
@@ -139,6 +142,8 @@ def wish_list_item_remove(item_id):
     if wish_list_item.wish_list.user_id != current_user.id:
         abort(404)
     db.session.delete(wish_list_item)
+    db.session.commit()
+    invalidate_user_membership(MEMBERSHIP_WISHLIST, current_user.id)
     flash('Wishlist item was deleted', 'form-success')
     return redirect(url_for('main_wishlist.wish_list_info'))
 
@@ -164,6 +169,7 @@ def wish_list_import():
             with open(path) as oalfile:
                 log_warn, log_error = import_wishlist_items(wish_list, oalfile)
             db.session.commit()
+            invalidate_user_membership(MEMBERSHIP_WISHLIST, current_user.id)
             flash(gettext('Wish list uploaded.'), 'form-success')
         else:
             with open(path) as csvfile:
@@ -184,6 +190,7 @@ def wish_list_import():
                             db.session.add(new_item)
                         existing_ids.add(dso.id)
                 db.session.commit()
+                invalidate_user_membership(MEMBERSHIP_WISHLIST, current_user.id)
                 os.remove(path)
                 flash(gettext('Wishlist uploaded.'), 'form-success')
 
@@ -251,6 +258,7 @@ def wishlist_clear():
 
     WishListItem.query.filter_by(wish_list_id=wish_list.id).delete()
     db.session.commit()
+    invalidate_user_membership(MEMBERSHIP_WISHLIST, current_user.id)
     flash(gettext('Wishlist items deleted'), 'form-success')
     session['is_backr'] = True
     return redirect(url_for('main_wishlist.wish_list_info'))
@@ -333,15 +341,10 @@ def wish_list_chart_scene_v1():
             )
 
     if highlights_dso_list:
-        for hl_dso in highlights_dso_list:
-            if hl_dso is None:
-                continue
-            ensure_scene_dso_item(scene, hl_dso)
-            hl_id = str(hl_dso.name).replace(' ', '')
-            observed = bool(observed_dso_ids and hl_dso.id in observed_dso_ids)
-            highlights.append(
-                build_circle_highlight(highlight_id=hl_id, label=hl_dso.denormalized_name(), ra=hl_dso.ra, dec=hl_dso.dec, dashed=observed, theme_name=cur_theme,)
-            )
+        add_scene_list_dsos(scene, highlights_dso_list, lambda hl_dso: build_circle_highlight(
+            highlight_id=str(hl_dso.name).replace(' ', ''), label=hl_dso.denormalized_name(), ra=hl_dso.ra, dec=hl_dso.dec,
+            dashed=bool(observed_dso_ids and hl_dso.id in observed_dso_ids), theme_name=cur_theme,
+        ))
 
     if highlights_pos_list:
         for hl_pos in highlights_pos_list:
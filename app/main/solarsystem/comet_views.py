@@ -27,8 +27,9 @@ from skyfield.constants import GM_SUN_Pitjeva_2005_km3_s2 as GM_SUN
 from app import create_app, csrf, db
 
 from app.commons.pagination import Pagination
-from app.commons.search_utils import process_paginated_session_search, get_items_per_page, create_table_sort, \
-    get_order_by_field
+from app.commons.keyset_pagination import paginate_catalogue_query
+from app.commons.search_name_index import rebuild_search_names, search_object_ids_select
+from app.commons.search_utils import process_paginated_session_search, get_items_per_page, create_table_sort
 from app import scheduler
 
 from .comet_forms import (
@@ -81,11 +82,12 @@ from app.models import (
     DB_UPDATE_COMETS,
     Observation,
     ObservationTargetType,
+    SEARCH_NAME_COMET,
 )
 
 from app.commons.dso_utils import CHART_COMET_PREFIX
 
-from app.commons.dbupdate_utils import ask_dbupdate_permit
+from app.commons.dbupdate_utils import ask_dbupdate_permit, mark_catalogue_updated
 
 main_comet = Blueprint('main_comet', __name__)
 
@@ -104,10 +106,12 @@ def _update_comets():
 
             if reload_comets:
                 import_update_comets(get_all_comets(update_cobs_props=False, force_reload=True), False)
+                rebuild_search_names(SEARCH_NAME_COMET)
 
             update_comets_positions(reload_comets=reload_comets)
             if (comet_update_counter % 4) == 1:
                 update_comets_cobs_observations()
+            mark_catalogue_updated(Comet.__tablename__)
             if (comet_update_counter % 2) == 1:
                 update_evaluated_comet_brightness(reload_comets=False)
 
@@ -141,12 +145,10 @@ def comets():
 
     table_sort = create_table_sort(sort_by, sort_def.keys())
 
-    offset = (page - 1) * per_page
-
 
     if search_form.q.data:
         search_expr = search_form.q.data.replace('"', '')
-        comet_query = Comet.query.filter(Comet.designation.like('%' + search_expr + '%'))
+        comet_query = Comet.query.filter(Comet.id.in_(search_object_ids_select(SEARCH_NAME_COMET, search_expr)))
     else:
         comet_query = Comet.query.filter(Comet.mag < 20)
         if search_form.dec_min.data:
@@ -154,14 +156,10 @@ def comets():
         if search_form.maglim.data:
             comet_query = comet_query.filter(Comet.mag <= search_form.maglim.data)
 
-    order_by_field = get_order_by_field(sort_def, sort_by)
-
-    if order_by_field is None:
-        order_by_field = Comet.mag
-
-    shown_comets = comet_query.order_by(order_by_field).limit(per_page).offset(offset).all()
+    shown_comets, total = paginate_catalogue_query(comet_query, sort_def, sort_by, Comet.mag, Comet.id, page, per_page,
+                                                   Comet.__tablename__)
 
-    pagination = Pagination(page=page, per_page=per_page, total=comet_query.count(), search=False,
+    pagination = Pagination(page=page, per_page=per_page, total=total, search=False,
                             record_name='comets', css_framework='semantic', not_passed_args='back')
 
     return render_template('main/solarsystem/comets.html', type='list', comets=shown_comets, pagination=pagination, search_form=search_form,
@@ -23,7 +23,7 @@ from flask import (
 )
 
 from flask_login import current_user
-from sqlalchemy import func, or_
+from sqlalchemy import or_
 
 from skyfield.api import load, wgs84
 from skyfield.data import mpc
@@ -37,16 +37,18 @@ from app.models import (
     MinorPlanet,
     Observation,
     ObservationTargetType,
+    SEARCH_NAME_MINOR_PLANET,
 )
 
 from app.commons.dso_utils import CHART_MINOR_PLANET_PREFIX
 
 from app.commons.pagination import Pagination
+from app.commons.keyset_pagination import paginate_catalogue_query
+from app.commons.search_name_index import search_object_ids_select
 from app.commons.search_utils import (
     process_paginated_session_search,
     get_items_per_page,
     create_table_sort,
-    get_order_by_field,
 )
 
 from .minor_planet_forms import (
@@ -89,7 +91,7 @@ from app.commons.chart_scene import (
     build_scene_v1,
 )
 
-from app.commons.dbupdate_utils import ask_dbupdate_permit
+from app.commons.dbupdate_utils import ask_dbupdate_permit, mark_catalogue_updated
 from app.commons.coordinates import ra_to_str, dec_to_str
 from app.commons.solar_system_chart_utils import AU_TO_KM
 
@@ -126,13 +128,8 @@ def _import_minor_planet_from_search(search_expr):
 
 
 def _build_minor_planet_search_filters(search_expr):
-    search_filters = [
-        MinorPlanet.designation.like('%' + search_expr + '%'),
-        func.lower(MinorPlanet.mpc_designation) == func.lower(search_expr),
-    ]
-    if search_expr.isdigit():
-        search_filters.append(MinorPlanet.int_designation == int(search_expr))
-    return search_filters
+    # designation, mpc designation and number are indexed
+    return [MinorPlanet.id.in_(search_object_ids_select(SEARCH_NAME_MINOR_PLANET, search_expr))]
 
 
 def _update_minor_planet_positions():
@@ -141,6 +138,7 @@ def _update_minor_planet_positions():
         if ask_dbupdate_permit(DB_UPDATE_MINOR_PLANETS_POS_BRIGHT_KEY, timedelta(hours=1)):
             update_minor_planets_positions()
             update_minor_planets_brightness()
+            mark_catalogue_updated(MinorPlanet.__tablename__)
 
 
 def _download_mpcorb_dat():
@@ -258,7 +256,6 @@ def minor_planets():
 
     table_sort = create_table_sort(sort_by, sort_def.keys())
 
-    offset = (page - 1) * per_page
     minor_planet_query = MinorPlanet.query
 
     if search_form.q.data:
@@ -276,14 +273,10 @@ def minor_planets():
             minor_planet_query = minor_planet_query.join(Constellation) \
                                                    .filter(Constellation.season == search_form.season.data)
 
-    order_by_field = get_order_by_field(sort_def, sort_by)
+    minor_planets_for_render, total = paginate_catalogue_query(minor_planet_query, sort_def, sort_by, MinorPlanet.eval_mag, MinorPlanet.id, page, per_page,
+                                                               MinorPlanet.__tablename__)
 
-    if order_by_field is None:
-        order_by_field = MinorPlanet.eval_mag
-
-    minor_planets_for_render = minor_planet_query.order_by(order_by_field).limit(per_page).offset(offset).all()
-
-    pagination = Pagination(page=page, per_page=per_page, total=minor_planet_query.count(), search=False, record_name='minor_planets',
+    pagination = Pagination(page=page, per_page=per_page, total=total, search=False, record_name='minor_planets',
                             css_framework='semantic', not_passed_args='back')
 
     return render_template('main/solarsystem/minor_planets.html', type='list', minor_planets=minor_planets_for_render,
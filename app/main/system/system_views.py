@@ -4,9 +4,14 @@ import subprocess
 from flask import (
     abort,
     Blueprint,
+    jsonify,
     render_template,
 )
 from flask_login import current_user, login_required
+
+from app.commons.chart_generator import get_star_zone_cache_stats
+from app.commons.chart_image_cache import get_chart_image_cache_stats
+
 main_system = Blueprint('main_system', __name__)
 
 
@@ -42,4 +47,20 @@ def htop():
     except Exception as e:
         htop_html = f"<pre>Unexpected error: {e}</pre>"
 
-    return render_template('main/system/htop.html', htop_output=htop_html)
\ No newline at end of file
+    return render_template('main/system/htop.html', htop_output=htop_html)
+
+
+@main_system.route('/chart-image-cache-stats', methods=['GET'])
+@login_required
+def chart_image_cache_stats():
+    if not current_user.is_monitor():
+        abort(404)
+    return jsonify(get_chart_image_cache_stats())
+
+
+@main_system.route('/star-zone-cache-stats', methods=['GET'])
+@login_required
+def star_zone_cache_stats():
+    if not current_user.is_monitor():
+        abort(404)
+    return jsonify(get_star_zone_cache_stats())
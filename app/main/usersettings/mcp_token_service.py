@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import atexit
+import hashlib
 import secrets
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Any
 
+from flask import current_app
+from lru import LRU
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from app import db
@@ -11,6 +17,16 @@ from app.models import McpUserToken
 
 TOKEN_PREFIX = "czmcp_"
 DEFAULT_SCOPE = "wishlist:read"
+VERIFIED_TOKEN_CACHE_SIZE = 1024
+
+# (token_id, digest of presented secret) -> (token_hash it was verified against, valid until monotonic time)
+_verified_token_cache = LRU(VERIFIED_TOKEN_CACHE_SIZE)
+_verified_token_cache_lock = threading.Lock()
+
+# token row id -> last use time, written to db in batches by the flush thread
+_pending_last_used: dict[int, datetime] = {}
+_pending_last_used_lock = threading.Lock()
+_last_used_flush_thread: threading.Thread | None = None
 
 
 def normalize_scope(scope: str | None) -> str:
@@ -128,9 +144,96 @@ def revoke_user_mcp_token(user_id: int, token_row_id: int) -> bool:
     token_row.update_date = datetime.now()
     db.session.add(token_row)
     db.session.commit()
+    invalidate_verified_token_cache(token_row.token_id)
     return True
 
 
+def _secret_digest(secret: str) -> bytes:
+    return hashlib.sha256(secret.encode("utf-8")).digest()
+
+
+def _is_verified_cached(token_row: McpUserToken, secret: str) -> bool:
+    key = (token_row.token_id, _secret_digest(secret))
+    with _verified_token_cache_lock:
+        entry = _verified_token_cache.get(key)
+    if entry is None:
+        return False
+    token_hash, valid_until = entry
+    return token_hash == token_row.token_hash and valid_until > time.monotonic()
+
+
+def _cache_verified(token_row: McpUserToken, secret: str) -> None:
+    ttl = float(current_app.config.get("MCP_TOKEN_CACHE_TTL", 60))
+    if ttl <= 0:
+        return
+    with _verified_token_cache_lock:
+        _verified_token_cache[(token_row.token_id, _secret_digest(secret))] = (token_row.token_hash, time.monotonic() + ttl)
+
+
+def invalidate_verified_token_cache(token_id: str | None = None) -> None:
+    with _verified_token_cache_lock:
+        if token_id is None:
+            _verified_token_cache.clear()
+            return
+        for key in [key for key in _verified_token_cache.keys() if key[0] == token_id]:
+            del _verified_token_cache[key]
+
+
+def _record_token_use(token_row_id: int) -> None:
+    global _last_used_flush_thread
+    with _pending_last_used_lock:
+        _pending_last_used[token_row_id] = datetime.now()
+        if _last_used_flush_thread is None:
+            app = current_app._get_current_object()
+            interval = float(app.config.get("MCP_TOKEN_LAST_USED_FLUSH_INTERVAL", 60))
+            _last_used_flush_thread = threading.Thread(target=_flush_last_used_loop, args=(app, interval), daemon=True)
+            _last_used_flush_thread.start()
+            atexit.register(_flush_last_used_at_exit, app)
+
+
+def flush_mcp_token_last_used() -> int:
+    """
+    Write pending last_used_date updates in one batch, returns number of updated tokens.
+    """
+    with _pending_last_used_lock:
+        pending = dict(_pending_last_used)
+        _pending_last_used.clear()
+    if not pending:
+        return 0
+    try:
+        db.session.bulk_update_mappings(McpUserToken, [
+            {"id": token_row_id, "last_used_date": used_date, "update_date": used_date}
+            for token_row_id, used_date in pending.items()
+        ])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        # keep newer uses recorded meanwhile
+        with _pending_last_used_lock:
+            for token_row_id, used_date in pending.items():
+                _pending_last_used.setdefault(token_row_id, used_date)
+        raise
+    return len(pending)
+
+
+def _flush_last_used_loop(app, interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                flush_mcp_token_last_used()
+            except Exception:
+                app.logger.exception("Failed to flush MCP token last used dates.")
+
+
+def _flush_last_used_at_exit(app) -> None:
+    with app.app_context():
+        try:
+            flush_mcp_token_last_used()
+        except Exception:
+            pass
+
+
 def verify_user_mcp_token(
     raw_token: str,
     required_scope: str | None = None,
@@ -147,17 +250,17 @@ def verify_user_mcp_token(
         return None
     if token_row.expires_date and token_row.expires_date < datetime.now():
         return None
-    if not check_password_hash(token_row.token_hash, secret):
-        return None
+    # token row is read on every call, so revocation and expiry apply immediately, only the slow hash check is cached
+    if not _is_verified_cached(token_row, secret):
+        if not check_password_hash(token_row.token_hash, secret):
+            return None
+        _cache_verified(token_row, secret)
 
     token_scopes = set((token_row.scope or "").split())
     if required_scope and required_scope not in token_scopes:
         return None
 
-    token_row.last_used_date = datetime.now()
-    token_row.update_date = datetime.now()
-    db.session.add(token_row)
-    db.session.commit()
+    _record_token_use(token_row.id)
 
     return {
         "user_id": token_row.user_id,
@@ -30,16 +30,17 @@ from app.commons.coordinates import parse_radec
 from app.commons.visibility_utils import create_visibility_chart
 from app.commons.solar_system_chart_utils import get_solsys_bodies
 
+from app.commons.dbupdate_utils import mark_catalogue_updated
+from app.commons.search_name_index import index_object_search_names
 from app.commons.search_sky_object_utils import (
     search_constellation,
     search_dso,
     search_star,
-    search_comet,
     search_double_star,
-    search_minor_planet,
     search_planet,
     search_planet_moon,
     search_earth_moon,
+    search_named_object,
 )
 
 from app.models import (
@@ -52,6 +53,11 @@ from app.models import (
     News,
     Star,
     EditableHTML,
+    SEARCH_NAME_COMET,
+    SEARCH_NAME_DOUBLE_STAR,
+    SEARCH_NAME_DSO,
+    SEARCH_NAME_MINOR_PLANET,
+    SEARCH_NAME_STAR,
 )
 
 
@@ -141,48 +147,17 @@ def do_global_search(query, level):
     # 2. Search DSO
     dso = search_dso(query)
     if dso:
-        return redirect(url_for('main_deepskyobject.deepskyobject_seltab',
-                                dso_id=dso.name,
-                                seltab=request.args.get('seltab'),
-                                fullscreen=request.args.get('fullscreen'),
-                                splitview=request.args.get('splitview'),
-                                back=request.args.get('back'),
-                                back_id=request.args.get('back_id'),
-                                embed=request.args.get('embed'),
-                                screenWidth=request.args.get('screenWidth'),
-                                dt=request.args.get('dt'),
-                                realfullscreen=request.args.get('realfullscreen'),
-                                ))
+        return _dso_redirect(dso)
 
     # 3. Search Double Star
     double_star = search_double_star(query)
     if double_star:
-        return redirect(url_for('main_double_star.double_star_seltab',
-                                double_star_id=double_star.id,
-                                seltab=request.args.get('seltab'),
-                                fullscreen=request.args.get('fullscreen'),
-                                splitview=request.args.get('splitview'),
-                                back=request.args.get('back'),
-                                back_id=request.args.get('back_id'),
-                                embed=request.args.get('embed'),
-                                screenWidth=request.args.get('screenWidth'),
-                                dt=request.args.get('dt'),
-                                realfullscreen=request.args.get('realfullscreen'),
-                                ))
+        return _double_star_redirect(double_star)
 
     # 4. Search Star
     star, usd = search_star(query)
     if star:
-        if usd:
-            if request.args.get('fromchart') is not None:
-                return redirect(url_for('main_star.star_descr_chart', star_descr_id=usd.id,
-                                        fullscreen=request.args.get('fullscreen'), splitview=request.args.get('splitview'),
-                                        embed=request.args.get('embed'), realfullscreen=request.args.get('realfullscreen')))
-            else:
-                return redirect(url_for('main_star.star_descr_info', star_descr_id=usd.id))
-        else:
-            return redirect(url_for('main_star.star_chart', star_id=star.id, splitview=request.args.get('splitview'),
-                                    embed=request.args.get('embed'), realfullscreen=request.args.get('realfullscreen')))
+        return _star_redirect(star, usd)
 
     # 5. Search Earth Moon
     moon = _search_earth_moon(query)
@@ -228,44 +203,17 @@ def do_global_search(query, level):
                                 realfullscreen=request.args.get('realfullscreen'),
                                 ))
 
-    # 8. Search comet
-    comet = search_comet(query)
-    if comet is not None:
-        return redirect(url_for('main_comet.comet_seltab',
-                                comet_id=comet.comet_id,
-                                seltab=request.args.get('seltab'),
-                                fullscreen=request.args.get('fullscreen'),
-                                splitview=request.args.get('splitview'),
-                                back=request.args.get('back'),
-                                back_id=request.args.get('back_id'),
-                                embed=request.args.get('embed'),
-                                screenWidth=request.args.get('screenWidth'),
-                                dt=request.args.get('dt'),
-                                realfullscreen=request.args.get('realfullscreen'),
-                                ))
-
-    # 9. Search minor planet
-    minor_planet = search_minor_planet(query)
-    if minor_planet is not None:
-        return redirect(url_for('main_minor_planet.minor_planet_seltab',
-                                minor_planet_id=minor_planet.url_id(),
-                                seltab=request.args.get('seltab'),
-                                fullscreen=request.args.get('fullscreen'),
-                                splitview=request.args.get('splitview'),
-                                back=request.args.get('back'),
-                                back_id=request.args.get('back_id'),
-                                embed=request.args.get('embed'),
-                                screenWidth=request.args.get('screenWidth'),
-                                dt=request.args.get('dt'),
-                                realfullscreen=request.args.get('realfullscreen'),
-                                ))
+    # 8. Search comets, minor planets and names and aliases of other catalogue objects
+    object_type, obj = search_named_object(query)
+    if obj is not None:
+        return _NAMED_OBJECT_REDIRECTS[object_type](obj)
 
-    # 10. search by radec
+    # 9. search by radec
     res = _search_by_ra_dec(query)
     if res:
         return res
 
-    # 11. Search Simbad
+    # 10. Search Simbad
     if level != 2:
         simbad_obj = simbad_query(dso_name_to_simbad_id(query))
         if simbad_obj is not None:
@@ -278,6 +226,8 @@ def do_global_search(query, level):
                     simbad_obj_to_deepsky(simbad_obj, dso)
                     db.session.add(dso)
                     db.session.commit()
+                    index_object_search_names(SEARCH_NAME_DSO, dso)
+                    mark_catalogue_updated(DeepskyObject.__tablename__)
                     res = do_global_search(simbad_obj['MAIN_ID'], 2)
                 else:
                     ra_dec_query = '{} {}'.format(simbad_obj['RA'], simbad_obj['DEC'])
@@ -302,6 +252,88 @@ def do_global_search(query, level):
     return redirect(url_for('main.object_not_found'))
 
 
+def _dso_redirect(dso):
+    return redirect(url_for('main_deepskyobject.deepskyobject_seltab',
+                            dso_id=dso.name,
+                            seltab=request.args.get('seltab'),
+                            fullscreen=request.args.get('fullscreen'),
+                            splitview=request.args.get('splitview'),
+                            back=request.args.get('back'),
+                            back_id=request.args.get('back_id'),
+                            embed=request.args.get('embed'),
+                            screenWidth=request.args.get('screenWidth'),
+                            dt=request.args.get('dt'),
+                            realfullscreen=request.args.get('realfullscreen'),
+                            ))
+
+
+def _double_star_redirect(double_star):
+    return redirect(url_for('main_double_star.double_star_seltab',
+                            double_star_id=double_star.id,
+                            seltab=request.args.get('seltab'),
+                            fullscreen=request.args.get('fullscreen'),
+                            splitview=request.args.get('splitview'),
+                            back=request.args.get('back'),
+                            back_id=request.args.get('back_id'),
+                            embed=request.args.get('embed'),
+                            screenWidth=request.args.get('screenWidth'),
+                            dt=request.args.get('dt'),
+                            realfullscreen=request.args.get('realfullscreen'),
+                            ))
+
+
+def _star_redirect(star, usd=None):
+    if usd:
+        if request.args.get('fromchart') is not None:
+            return redirect(url_for('main_star.star_descr_chart', star_descr_id=usd.id,
+                                    fullscreen=request.args.get('fullscreen'), splitview=request.args.get('splitview'),
+                                    embed=request.args.get('embed'), realfullscreen=request.args.get('realfullscreen')))
+        else:
+            return redirect(url_for('main_star.star_descr_info', star_descr_id=usd.id))
+    else:
+        return redirect(url_for('main_star.star_chart', star_id=star.id, splitview=request.args.get('splitview'),
+                                embed=request.args.get('embed'), realfullscreen=request.args.get('realfullscreen')))
+
+
+def _comet_redirect(comet):
+    return redirect(url_for('main_comet.comet_seltab',
+                            comet_id=comet.comet_id,
+                            seltab=request.args.get('seltab'),
+                            fullscreen=request.args.get('fullscreen'),
+                            splitview=request.args.get('splitview'),
+                            back=request.args.get('back'),
+                            back_id=request.args.get('back_id'),
+                            embed=request.args.get('embed'),
+                            screenWidth=request.args.get('screenWidth'),
+                            dt=request.args.get('dt'),
+                            realfullscreen=request.args.get('realfullscreen'),
+                            ))
+
+
+def _minor_planet_redirect(minor_planet):
+    return redirect(url_for('main_minor_planet.minor_planet_seltab',
+                            minor_planet_id=minor_planet.url_id(),
+                            seltab=request.args.get('seltab'),
+                            fullscreen=request.args.get('fullscreen'),
+                            splitview=request.args.get('splitview'),
+                            back=request.args.get('back'),
+                            back_id=request.args.get('back_id'),
+                            embed=request.args.get('embed'),
+                            screenWidth=request.args.get('screenWidth'),
+                            dt=request.args.get('dt'),
+                            realfullscreen=request.args.get('realfullscreen'),
+                            ))
+
+
+_NAMED_OBJECT_REDIRECTS = {
+    SEARCH_NAME_DSO: _dso_redirect,
+    SEARCH_NAME_DOUBLE_STAR: _double_star_redirect,
+    SEARCH_NAME_STAR: _star_redirect,
+    SEARCH_NAME_COMET: _comet_redirect,
+    SEARCH_NAME_MINOR_PLANET: _minor_planet_redirect,
+}
+
+
 def _search_by_ra_dec(query):
     try:
         ra, dec = parse_radec(query)
@@ -33,38 +33,23 @@ def _get_twilight_window(session_plan: Any, latitude: float, longitude: float, t
     """Return (time_from, time_to) for astronomical twilight, falling back to nautical then fixed."""
     from datetime import timedelta
 
-    from skyfield.api import load, wgs84
-    from skyfield import almanac
-
-    def _try_twilight(comp):
-        try:
-            ts = load.timescale()
-            observer = wgs84.latlon(latitude, longitude)
-            ldate1 = tz_info.localize(session_plan.for_date + timedelta(hours=12))
-            ldate2 = tz_info.localize(session_plan.for_date + timedelta(hours=36))
-            t1 = ts.from_datetime(ldate1)
-            t2 = ts.from_datetime(ldate2)
-            eph = load('de421.bsp')
-            t, y = almanac.find_discrete(t1, t2, almanac.dark_twilight_day(eph, observer))
-            index1 = index2 = None
-            for i in range(len(y)):
-                if y[i] == comp:
-                    if index1 is None:
-                        index1 = i + 1
-                    elif index2 is None:
-                        index2 = i
-            if index1 is not None and index2 is not None:
-                return t[index1].astimezone(tz_info), t[index2].astimezone(tz_info)
-        except Exception:
-            pass
-        return None, None
-
-    t1, t2 = _try_twilight(1)  # astronomical
-    if t1 and t2:
-        return t1, t2
-    t1, t2 = _try_twilight(2)  # nautical
-    if t1 and t2:
-        return t1, t2
+    from app.commons.almanac_utils import (
+        TWILIGHT_ASTRONOMICAL,
+        TWILIGHT_NAUTICAL,
+        get_almanac_night,
+        get_twilight_window,
+    )
+
+    try:
+        night = get_almanac_night(latitude, longitude, session_plan.for_date)
+    except Exception:
+        night = None
+
+    if night is not None:
+        for level in (TWILIGHT_ASTRONOMICAL, TWILIGHT_NAUTICAL):
+            t1, t2 = get_twilight_window(night, level, tz_info)
+            if t1 and t2:
+                return t1, t2
     # fallback: 22:00 – 02:00
     t1 = tz_info.localize(session_plan.for_date + timedelta(hours=22))
     t2 = tz_info.localize(session_plan.for_date + timedelta(hours=26))
@@ -138,10 +123,7 @@ def dso_find_payload(
     resolve_mcp_user_id_func: Callable[[int | None], int],
     get_app: Callable[[], Any],
 ) -> dict[str, Any]:
-    import astropy.units as u
-    from astropy.coordinates import SkyCoord
     from astropy.time import Time
-    from astroplan import AltitudeConstraint, FixedTarget, is_observable
     from sqlalchemy import or_
 
     from app.models import (
@@ -284,7 +266,8 @@ def dso_find_payload(
             return result
 
         if session_plan is not None:
-            from app.main.planner.session_scheduler import rise_merid_set_up
+            from app.commons.rise_set_utils import to_jd
+            from app.main.planner.session_scheduler import altitude_observable, jd_to_HM_format, rise_merid_set_up
 
             observer, tz_info, latitude, longitude = _build_observer_tzinfo(session_plan)
             observation_time = Time(session_plan.for_date)
@@ -299,28 +282,18 @@ def dso_find_payload(
             coords_list = [(dso.ra, dso.dec) for dso in candidate_dsos]
             rms_list = rise_merid_set_up(tf, tt, observer, coords_list)
 
-            def _fmt(t: Any) -> str | None:
-                if t is None:
-                    return None
-                try:
-                    return t.astimezone(tz_info).strftime('%H:%M')
-                except Exception:
-                    return None
+            def _fmt(jd: float) -> str | None:
+                return jd_to_HM_format(jd, tz_info) or None
 
+            jd_from, jd_to = to_jd(tf), to_jd(tt)
             visible_items = [
-                (candidate_dsos[i], _fmt(rms_list[i][0]), _fmt(rms_list[i][1]), _fmt(rms_list[i][2]))
-                for i, (rise_t, merid_t, set_t, is_up) in enumerate(rms_list)
-                if is_up or rise_t < tt or set_t > tf
+                (candidate_dsos[i], _fmt(rise_jd), _fmt(merid_jd), _fmt(set_jd))
+                for i, (rise_jd, merid_jd, set_jd, is_up) in enumerate(rms_list)
+                if is_up or rise_jd < jd_to or set_jd > jd_from
             ]
 
             if min_altitude > 0 and visible_items:
-                constraints = [AltitudeConstraint(min_altitude * u.deg)]
-                targets = [
-                    FixedTarget(coord=SkyCoord(ra=item[0].ra * u.rad, dec=item[0].dec * u.rad), name=item[0].name)
-                    for item in visible_items
-                ]
-                time_range = Time([tf, tt])
-                observable = is_observable(constraints, observer, targets, time_range=time_range)
+                observable = altitude_observable(tf, tt, observer, [(item[0].ra, item[0].dec) for item in visible_items], min_altitude)
                 visible_items = [visible_items[i] for i in range(len(visible_items)) if observable[i]]
 
             results = [_serialize(dso, rise, merid, sett) for dso, rise, merid, sett in visible_items[:max_results]]
@@ -197,6 +197,7 @@ def wishlist_add_payload(
     build_wishlist_item_detail_func: Callable[[Any, set[int], set[int]], dict[str, Any] | None],
 ) -> dict[str, Any]:
     from app import db
+    from app.commons.user_membership_cache import MEMBERSHIP_WISHLIST, invalidate_user_membership
     from app.models import WishList
 
     require_scope_if_available_func(required_scope)
@@ -248,6 +249,7 @@ def wishlist_add_payload(
         )
         db.session.add(new_item)
         db.session.commit()
+        invalidate_user_membership(MEMBERSHIP_WISHLIST, resolved_user_id)
 
         detail = _build_item_detail_if_available(
             item=new_item,
@@ -275,6 +277,7 @@ def wishlist_remove_payload(
     get_app: Callable[[], Any],
 ) -> dict[str, Any]:
     from app import db
+    from app.commons.user_membership_cache import MEMBERSHIP_WISHLIST, invalidate_user_membership
     from app.models import WishList, WishListItem
 
     require_scope_if_available_func(required_scope)
@@ -304,6 +307,7 @@ def wishlist_remove_payload(
 
         db.session.delete(wish_list_item)
         db.session.commit()
+        invalidate_user_membership(MEMBERSHIP_WISHLIST, resolved_user_id)
 
         return {
             "removed": True,
@@ -321,6 +325,7 @@ def _bulk_add_objects_for_user(
     parse_wishlist_object_id_func: Callable[[str | None], tuple[str, int] | None],
 ) -> tuple[list[dict[str, Any]], int, int]:
     from app import db
+    from app.commons.user_membership_cache import MEMBERSHIP_WISHLIST, invalidate_user_membership
     from app.models import WishList
 
     if isinstance(object_inputs, str) or not isinstance(object_inputs, list):
@@ -428,6 +433,7 @@ def _bulk_add_objects_for_user(
 
         if new_items:
             db.session.commit()
+            invalidate_user_membership(MEMBERSHIP_WISHLIST, resolved_user_id)
 
         for result in results:
             pending_item = result.pop("_wishlist_item_obj", None)
@@ -480,6 +486,7 @@ def wishlist_bulk_remove_payload(
     get_app: Callable[[], Any],
 ) -> dict[str, Any]:
     from app import db
+    from app.commons.user_membership_cache import MEMBERSHIP_WISHLIST, invalidate_user_membership
     from app.models import WishList, WishListItem
 
     require_scope_if_available_func(required_scope)
@@ -546,6 +553,7 @@ def wishlist_bulk_remove_payload(
 
         if removed_count:
             db.session.commit()
+            invalidate_user_membership(MEMBERSHIP_WISHLIST, resolved_user_id)
 
         return {
             "total": len(results),
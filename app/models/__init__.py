@@ -4,6 +4,7 @@ module (as opposed to just their python files)
 """
 
 from .commons import *
+from .almanac import *
 from .catalogue import *
 from .chart_theme import *
 from .constellation import *
@@ -23,6 +24,7 @@ from .observation import *
 from .observed_list import *
 from .planet import *
 from .planet_moon import *
+from .search_name import *
 from .session_plan import *
 from .sqm import *
 from .skylist import *
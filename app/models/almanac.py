@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from .. import db
+
+
+class AlmanacNight(db.Model):
+    """
+    Sun and moon events of the night following for_date at rounded location, see almanac_utils.
+    Times are naive UTC, None if the event does not occur in the night.
+    """
+    __tablename__ = 'almanac_nights'
+    id = db.Column(db.Integer, primary_key=True)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    for_date = db.Column(db.Date, nullable=False)
+    sunset = db.Column(db.DateTime)
+    sunrise = db.Column(db.DateTime)
+    civil_dusk = db.Column(db.DateTime)
+    civil_dawn = db.Column(db.DateTime)
+    nautical_dusk = db.Column(db.DateTime)
+    nautical_dawn = db.Column(db.DateTime)
+    astro_dusk = db.Column(db.DateTime)
+    astro_dawn = db.Column(db.DateTime)
+    moon_rise = db.Column(db.DateTime)
+    moon_set = db.Column(db.DateTime)
+    # moon phase angle at local midnight in degrees, 0 new moon, 180 full moon
+    moon_phase = db.Column(db.Float)
+    moon_illumination = db.Column(db.Float)
+    moonless_from = db.Column(db.DateTime)
+    moonless_to = db.Column(db.DateTime)
+    create_date = db.Column(db.DateTime, default=datetime.now)
+
+    __table_args__ = (
+        db.Index('ix_almanac_nights_location_date', 'latitude', 'longitude', 'for_date', unique=True),
+    )
@@ -6,6 +6,10 @@ DB_UPDATE_COMETS = 'COMETS_UPDATE'
 DB_UPDATE_MINOR_PLANETS_POS_BRIGHT_KEY = 'MINOR_PLANETS_POS_BRIGHT'
 DB_UPDATE_SUPERNOVAE = 'SUPERNOVAE_UPDATE'
 DB_DELETE_SUPERNOVAE = 'SUPERNOVAE_DELETE'
+DB_UPDATE_RISE_SET_CACHE = 'RISE_SET_CACHE_UPDATE'
+DB_UPDATE_ALMANAC = 'ALMANAC_UPDATE'
+# count of the record is version of the catalogue table, see dbupdate_utils.mark_catalogue_updated
+DB_CATALOGUE_VERSION_PREFIX = 'CATALOGUE_VERSION_'
 
 
 class DbUpdate(db.Model):
@@ -45,6 +45,15 @@ class DoubleStar(db.Model):
                     return name
         return self.common_cat_id
 
+    def get_norm_other_designations(self):
+        designations = []
+        if self.norm_other_designation:
+            for name in self.norm_other_designation.split(';'):
+                designation = DoubleStarDesignation.normalize(name)
+                if designation and designation not in designations:
+                    designations.append(designation)
+        return designations
+
     def ra_first_str_short(self):
         return ra_to_str_short(self.ra_first)
 
@@ -69,6 +78,31 @@ class DoubleStar(db.Model):
         return ''
 
 
+class DoubleStarDesignation(db.Model):
+    """
+    Normalized alternative designation (bayer, flamsteed, variable star or proper name) of double star,
+    rows are created from DoubleStar.norm_other_designation by WDS import.
+    """
+    __tablename__ = 'double_star_designations'
+    id = db.Column(db.Integer, primary_key=True)
+    designation = db.Column(db.String(64), nullable=False)
+    double_star_id = db.Column(db.Integer, db.ForeignKey('double_stars.id'), nullable=False, index=True)
+
+    __table_args__ = (db.Index('ix_double_star_designations_designation', 'designation', 'double_star_id', unique=True), )
+
+    @staticmethod
+    def normalize(designation):
+        return ' '.join(designation.split()).lower() if designation else ''
+
+    @staticmethod
+    def double_star_ids(designation):
+        """
+        Select of ids of double stars with the designation, to be used in DoubleStar.id.in_()
+        """
+        return db.select(DoubleStarDesignation.double_star_id) \
+            .where(DoubleStarDesignation.designation == DoubleStarDesignation.normalize(designation))
+
+
 class UserDoubleStarDescription(db.Model):
     __tablename__ = 'user_double_star_descriptions'
     id = db.Column(db.Integer, primary_key=True)
@@ -0,0 +1,31 @@
+from sqlalchemy import DDL, event
+
+from .. import db
+
+SEARCH_NAME_DSO = 'dso'
+SEARCH_NAME_DOUBLE_STAR = 'double_star'
+SEARCH_NAME_STAR = 'star'
+SEARCH_NAME_COMET = 'comet'
+SEARCH_NAME_MINOR_PLANET = 'minor_planet'
+
+
+class SearchName(db.Model):
+    """
+    Name or alias of searchable object, see search_name_index
+    """
+    __tablename__ = 'search_names'
+    id = db.Column(db.Integer, primary_key=True)
+    object_type = db.Column(db.String(16), nullable=False)
+    object_id = db.Column(db.Integer, nullable=False)
+    name = db.Column(db.String(256), nullable=False)
+    norm_name = db.Column(db.String(256), nullable=False, index=True)
+
+    __table_args__ = (
+        db.Index('ix_search_names_object', 'object_type', 'object_id'),
+        db.Index('ix_search_names_norm_name_trgm', 'norm_name', postgresql_using='gin',
+                 postgresql_ops={'norm_name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
+
+
+event.listen(SearchName.__table__, 'before_create',
+             DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql'))
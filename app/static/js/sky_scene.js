@@ -1565,6 +1565,66 @@
         return url;
     };
 
+    // "CZS1" read as little-endian u32, see STARS_BIN_MAGIC in chart_scene.py
+    const STARS_BIN_MAGIC = 0x31535A43;
+    const STARS_BIN_ZONE_HEADER_SIZE = 20;
+
+    SkyScene.prototype._fetchZoneBatch = function (scene, tokens) {
+        const binUrl = U.sceneStarsZonesBinUrl(scene);
+        if (binUrl && typeof fetch === 'function' && typeof TextDecoder === 'function') {
+            const url = U.addOrReplaceQueryParam(binUrl, 'zones', tokens);
+            return fetch(url, { credentials: 'same-origin' }).then((resp) => {
+                if (!resp.ok) throw new Error('Star zones request failed: ' + resp.status);
+                return resp.arrayBuffer();
+            }).then((buf) => this._decodeStarsZonesBin(buf));
+        }
+        const url = this._buildStarsZonesRequestUrl(scene, tokens);
+        return new Promise((resolve, reject) => {
+            $.getJSON(url).done((zoneData) => {
+                resolve(zoneData && Array.isArray(zoneData.zones) ? zoneData.zones : null);
+            }).fail(reject);
+        });
+    };
+
+    SkyScene.prototype._decodeStarsZonesBin = function (buf) {
+        if (!buf || buf.byteLength < 8) return null;
+        const view = new DataView(buf);
+        if (view.getUint32(0, true) !== STARS_BIN_MAGIC) return null;
+        const zonesCount = view.getUint32(4, true);
+        const decoder = new TextDecoder('utf-8');
+        const zones = [];
+        let offset = 8;
+        for (let i = 0; i < zonesCount; i++) {
+            const level = view.getInt32(offset, true);
+            const zone = view.getInt32(offset + 4, true);
+            const n = view.getUint32(offset + 12, true);
+            const labelsLen = view.getUint32(offset + 16, true);
+            offset += STARS_BIN_ZONE_HEADER_SIZE;
+            const pinNoEvict = level === 0;
+            if (n === 0) {
+                zones.push({ level: level, zone: zone, starsSoA: this._emptyZoneStarsSoA(pinNoEvict) });
+                continue;
+            }
+            // sections are 4 byte aligned, typed arrays map them directly (little-endian platforms)
+            const ra = Float64Array.from(new Float32Array(buf, offset, n));
+            const dec = Float64Array.from(new Float32Array(buf, offset + 4 * n, n));
+            const mag = new Float32Array(buf, offset + 8 * n, n).slice();
+            const bv = new Int16Array(buf, offset + 12 * n, n).slice();
+            offset += 14 * n + ((4 - (2 * n) % 4) % 4);
+            let labels = null;
+            if (labelsLen > 0) {
+                labels = this._expandCompactStarLabels(JSON.parse(decoder.decode(new Uint8Array(buf, offset, labelsLen))), n);
+                offset += labelsLen + ((4 - labelsLen % 4) % 4);
+            }
+            zones.push({
+                level: level,
+                zone: zone,
+                starsSoA: { ra: ra, dec: dec, mag: mag, bv: bv, labels: labels, count: n, pinNoEvict: pinNoEvict },
+            });
+        }
+        return zones;
+    };
+
     SkyScene.prototype._evictZoneCache = function () {
         while (this.starZoneCache.size > this.starZoneCacheMax) {
             let removed = false;
@@ -1719,36 +1779,37 @@
             mag[i] = Number(compact.mag[i]);
             bv[i] = bvArr ? (Number(bvArr[i]) | 0) : -1;
         }
-        let labels = null;
-        if (compactLabels && Array.isArray(compactLabels.i) && Array.isArray(compactLabels.t)) {
-            const labelCount = Math.max(
-                0,
-                Math.min(
-                    compactLabels.i.length,
-                    compactLabels.t.length
-                )
-            );
-            if (labelCount > 0) {
-                const index = new Int32Array(labelCount);
-                const text = new Array(labelCount);
-                let outPos = 0;
-                for (let i = 0; i < labelCount; i++) {
-                    const starIdx = compactLabels.i[i] | 0;
-                    if (starIdx < 0 || starIdx >= n) continue;
-                    index[outPos] = starIdx;
-                    text[outPos] = compactLabels.t[i];
-                    outPos += 1;
-                }
-                labels = {
-                    index: index,
-                    text: text,
-                    count: outPos,
-                };
-            }
-        }
+        const labels = this._expandCompactStarLabels(compactLabels, n);
         return { ra: ra, dec: dec, mag: mag, bv: bv, labels: labels, count: n, pinNoEvict: pinNoEvict };
     };
 
+    SkyScene.prototype._expandCompactStarLabels = function (compactLabels, n) {
+        if (!compactLabels || !Array.isArray(compactLabels.i) || !Array.isArray(compactLabels.t)) return null;
+        const labelCount = Math.max(
+            0,
+            Math.min(
+                compactLabels.i.length,
+                compactLabels.t.length
+            )
+        );
+        if (labelCount <= 0) return null;
+        const index = new Int32Array(labelCount);
+        const text = new Array(labelCount);
+        let outPos = 0;
+        for (let i = 0; i < labelCount; i++) {
+            const starIdx = compactLabels.i[i] | 0;
+            if (starIdx < 0 || starIdx >= n) continue;
+            index[outPos] = starIdx;
+            text[outPos] = compactLabels.t[i];
+            outPos += 1;
+        }
+        return {
+            index: index,
+            text: text,
+            count: outPos,
+        };
+    };
+
     SkyScene.prototype._sortZoneStarsByMag = function (zoneStars) {
         const n = this._zoneStarsCount(zoneStars);
         if (n <= 1) {
@@ -1802,9 +1863,14 @@
         zones.forEach((z) => {
             const key = this._zoneCacheKey(z.level, z.zone);
             const pinNoEvict = z.level === 0;
-            const stars = z.stars
-                ? this._expandCompactStarsSoA(z.stars, { pinNoEvict: pinNoEvict })
-                : this._emptyZoneStarsSoA(pinNoEvict);
+            let stars;
+            if (z.starsSoA) {
+                stars = z.starsSoA;
+            } else if (z.stars) {
+                stars = this._expandCompactStarsSoA(z.stars, { pinNoEvict: pinNoEvict });
+            } else {
+                stars = this._emptyZoneStarsSoA(pinNoEvict);
+            }
             this._sortZoneStarsByMag(stars);
             this.starZoneCache.set(key, stars);
         });
@@ -1823,12 +1889,11 @@
         this.starZoneLevel0PrefetchStarted = true;
         missing.forEach((r) => this.starZoneInFlight.set(r.key, epoch));
         const tokens = missing.map((r) => 'L' + r.level + 'Z' + r.zone).join(',');
-        const url = this._buildStarsZonesRequestUrl(scene, tokens);
 
-        $.getJSON(url).done((zoneData) => {
+        this._fetchZoneBatch(scene, tokens).then((zones) => {
             missing.forEach((r) => this.starZoneInFlight.delete(r.key));
-            if (zoneData && Array.isArray(zoneData.zones)) {
-                this._storeZoneBatch(zoneData.zones);
+            if (Array.isArray(zones)) {
+                this._storeZoneBatch(zones);
             }
             const allCached = refs.every((r) => this.starZoneCache.has(r.key));
             this.starZoneLevel0PrefetchDone = allCached;
@@ -1839,7 +1904,7 @@
                 this.zoneStars = this._collectCachedZoneStars(this.sceneData);
                 this.requestDraw();
             }
-        }).fail(() => {
+        }, () => {
             missing.forEach((r) => this.starZoneInFlight.delete(r.key));
             this.starZoneLevel0PrefetchStarted = false;
         });
@@ -1880,18 +1945,17 @@
             batch.forEach((r) => this.starZoneInFlight.set(r.key, epoch));
 
             const tokens = batch.map((r) => 'L' + r.level + 'Z' + r.zone).join(',');
-            const url = this._buildStarsZonesRequestUrl(scene, tokens);
 
-            $.getJSON(url).done((zoneData) => {
+            this._fetchZoneBatch(scene, tokens).then((zones) => {
                 batch.forEach((r) => this.starZoneInFlight.delete(r.key));
-                if (!zoneData || !Array.isArray(zoneData.zones)) return;
-                this._storeZoneBatch(zoneData.zones);
+                if (!Array.isArray(zones)) return;
+                this._storeZoneBatch(zones);
                 if (epoch !== this.sceneRequestEpoch || !this.sceneData) {
                     return;
                 }
                 this.zoneStars = this._collectCachedZoneStars(this.sceneData);
                 this.requestDraw();
-            }).fail(() => {
+            }, () => {
                 batch.forEach((r) => this.starZoneInFlight.delete(r.key));
             });
         }
@@ -1941,18 +2005,27 @@
         return datasetId ? (this.constellBoundariesCatalogById[datasetId] || null) : null;
     };
 
+    // Dataset with known digest is immutable and independent of the view, so its url is kept stable
+    // for the browser cache. Otherwise fall back to cache busting view url.
+    SkyScene.prototype._sceneDatasetUrl = function (baseUrl, digest) {
+        if (digest) {
+            return U.addOrReplaceQueryParam(U.urlPathOnly(baseUrl), 'dsv', digest);
+        }
+        const url = this.formatUrl(baseUrl, { timeISO: this._resolveRequestTimeISO() });
+        return url + (url.indexOf('?') >= 0 ? '&' : '?') + 't=' + Date.now();
+    };
+
     SkyScene.prototype.ensureMilkyWayCatalog = function (mwMeta) {
         if (!mwMeta || !mwMeta.dataset_id) return;
         const datasetId = mwMeta.dataset_id;
         if (this.mwCatalogById[datasetId] || this.mwCatalogLoadingById[datasetId]) return;
 
         this.mwCatalogLoadingById[datasetId] = true;
-        let url = this.formatUrl(U.sceneMilkyCatalogUrl(this.sceneUrl, this.sceneData), { timeISO: this._resolveRequestTimeISO() });
+        let url = this._sceneDatasetUrl(U.sceneMilkyCatalogUrl(this.sceneUrl, this.sceneData), mwMeta.digest);
         if (mwMeta.quality) {
             url = U.addOrReplaceQueryParam(url, 'quality', mwMeta.quality);
         }
         url = U.addOrReplaceQueryParam(url, 'optimized', mwMeta.optimized ? '1' : '0');
-        url += '&t=' + Date.now();
 
         $.getJSON(url).done((data) => {
             delete this.mwCatalogLoadingById[datasetId];
@@ -1971,8 +2044,7 @@
         if (this.dsoOutlinesCatalogById[datasetId] || this.dsoOutlinesCatalogLoadingById[datasetId]) return;
 
         this.dsoOutlinesCatalogLoadingById[datasetId] = true;
-        let url = this.formatUrl(U.sceneDsoOutlinesCatalogUrl(this.sceneUrl, this.sceneData), { timeISO: this._resolveRequestTimeISO() });
-        url += '&t=' + Date.now();
+        const url = this._sceneDatasetUrl(U.sceneDsoOutlinesCatalogUrl(this.sceneUrl, this.sceneData), dsoOutlinesMeta.digest);
 
         $.getJSON(url).done((data) => {
             delete this.dsoOutlinesCatalogLoadingById[datasetId];
@@ -1998,8 +2070,7 @@
         if (this.constellLinesCatalogById[datasetId] || this.constellLinesCatalogLoadingById[datasetId]) return;
 
         this.constellLinesCatalogLoadingById[datasetId] = true;
-        let url = this.formatUrl(U.sceneConstellationLinesCatalogUrl(this.sceneUrl, this.sceneData), { timeISO: this._resolveRequestTimeISO() });
-        url += '&t=' + Date.now();
+        const url = this._sceneDatasetUrl(U.sceneConstellationLinesCatalogUrl(this.sceneUrl, this.sceneData), constellLinesMeta.digest);
 
         $.getJSON(url).done((data) => {
             delete this.constellLinesCatalogLoadingById[datasetId];
@@ -2017,8 +2088,7 @@
         if (this.constellBoundariesCatalogById[datasetId] || this.constellBoundariesCatalogLoadingById[datasetId]) return;
 
         this.constellBoundariesCatalogLoadingById[datasetId] = true;
-        let url = this.formatUrl(U.sceneConstellationBoundariesCatalogUrl(this.sceneUrl, this.sceneData), { timeISO: this._resolveRequestTimeISO() });
-        url += '&t=' + Date.now();
+        const url = this._sceneDatasetUrl(U.sceneConstellationBoundariesCatalogUrl(this.sceneUrl, this.sceneData), constellBoundariesMeta.digest);
 
         $.getJSON(url).done((data) => {
             delete this.constellBoundariesCatalogLoadingById[datasetId];
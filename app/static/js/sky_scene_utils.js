@@ -240,6 +240,10 @@
         return sceneSharedUrl(sceneData, 'stars_zones') || sceneUrl.replace('/scene-v1', '/stars-v1/zones');
     }
 
+    function sceneStarsZonesBinUrl(sceneData) {
+        return sceneSharedUrl(sceneData, 'stars_zones_bin');
+    }
+
     function sceneDsoOutlinesCatalogUrl(sceneUrl, sceneData) {
         return sceneSharedUrl(sceneData, 'dso_outlines_catalog') || sceneUrl.replace('/scene-v1', '/dso-outlines-v1/catalog');
     }
@@ -288,6 +292,7 @@
         sceneMilkyCatalogUrl: sceneMilkyCatalogUrl,
         sceneMilkySelectUrl: sceneMilkySelectUrl,
         sceneStarsZonesUrl: sceneStarsZonesUrl,
+        sceneStarsZonesBinUrl: sceneStarsZonesBinUrl,
         sceneDsoOutlinesCatalogUrl: sceneDsoOutlinesCatalogUrl,
         sceneConstellationLinesCatalogUrl: sceneConstellationLinesCatalogUrl,
         sceneConstellationBoundariesCatalogUrl: sceneConstellationBoundariesCatalogUrl,
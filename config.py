@@ -100,6 +100,47 @@ class Config:
     CHART_AVIF_THRESHOLD_WIDTH = os.environ.get('CHART_AVIF_THRESHOLD_WIDTH', 768)
     STAR_CATALOG = os.environ.get('STAR_CATALOG', 'nomad')
 
+    # Rendered chart image cache. Memory tier is bounded by entries and bytes, disk tier is enabled by CHART_IMG_CACHE_DIR.
+    CHART_IMG_CACHE_SIZE = int(os.environ.get('CHART_IMG_CACHE_SIZE', 500))
+    CHART_IMG_CACHE_MAX_BYTES = int(os.environ.get('CHART_IMG_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    CHART_IMG_CACHE_DIR = os.environ.get('CHART_IMG_CACHE_DIR')
+    CHART_IMG_CACHE_DISK_MAX_BYTES = int(os.environ.get('CHART_IMG_CACHE_DISK_MAX_BYTES', 1024 * 1024 * 1024))
+    CHART_IMG_CACHE_TIME_BUCKET = int(os.environ.get('CHART_IMG_CACHE_TIME_BUCKET', 60))
+    CHART_IMG_CACHE_COORD_STEP = float(os.environ.get('CHART_IMG_CACHE_COORD_STEP', 1e-6))
+
+    # Loaded star catalogue zones, LRU bounded by total bytes.
+    STAR_ZONE_CACHE_MAX_BYTES = int(os.environ.get('STAR_ZONE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+    # MCP token verification - lifetime of verified token cache entry, interval of batched last used date writes (seconds).
+    MCP_TOKEN_CACHE_TTL = float(os.environ.get('MCP_TOKEN_CACHE_TTL', 60))
+    MCP_TOKEN_LAST_USED_FLUSH_INTERVAL = float(os.environ.get('MCP_TOKEN_LAST_USED_FLUSH_INTERVAL', 60))
+
+    # Prebuilt scene catalogue datasets (manage.py build_scene_datasets), datasets are built in each worker if not set.
+    SCENE_DATASETS_DIR = os.environ.get('SCENE_DATASETS_DIR')
+
+    # Out-of-process chart render pool (manage.py run_chart_render_pool). Charts are rendered in web worker if address is not set.
+    CHART_RENDER_POOL_ADDRESS = os.environ.get('CHART_RENDER_POOL_ADDRESS')
+    CHART_RENDER_POOL_WORKERS = int(os.environ.get('CHART_RENDER_POOL_WORKERS', 2))
+    CHART_RENDER_POOL_MAX_QUEUE = int(os.environ.get('CHART_RENDER_POOL_MAX_QUEUE', 16))
+    CHART_RENDER_POOL_TIMEOUT = float(os.environ.get('CHART_RENDER_POOL_TIMEOUT', 30))
+
+    # Load chart catalogues and scene datasets in gunicorn master before workers are forked (gunicorn.conf.py).
+    CHART_PRELOAD_CATALOGS = (os.environ.get('CHART_PRELOAD_CATALOGS', 'False') == 'True')
+
+    # Rise/set elements cache of the session planner, 'redis' shares it between workers, 'local' keeps it per process.
+    RISE_SET_CACHE_BACKEND = os.environ.get('RISE_SET_CACHE_BACKEND', 'local')
+    RISE_SET_CACHE_LOCAL_NIGHTS = int(os.environ.get('RISE_SET_CACHE_LOCAL_NIGHTS', 16))
+    RISE_SET_PRECOMPUTE_NIGHTS = int(os.environ.get('RISE_SET_PRECOMPUTE_NIGHTS', 3))
+    RISE_SET_PRECOMPUTE_CATALOGS = os.environ.get('RISE_SET_PRECOMPUTE_CATALOGS', 'M,NGC,IC')
+    # Days ahead of almanac (twilights, moon) precomputed nightly for saved locations.
+    ALMANAC_PRECOMPUTE_DAYS = int(os.environ.get('ALMANAC_PRECOMPUTE_DAYS', 21))
+
+    # Observed/wish list membership cache, 'redis' shares it between workers, 'local' keeps it per process,
+    # other processes see list changes after USER_MEMBERSHIP_CACHE_LOCAL_TTL seconds.
+    USER_MEMBERSHIP_CACHE_BACKEND = os.environ.get('USER_MEMBERSHIP_CACHE_BACKEND', 'local')
+    USER_MEMBERSHIP_CACHE_LOCAL_SIZE = int(os.environ.get('USER_MEMBERSHIP_CACHE_LOCAL_SIZE', 4096))
+    USER_MEMBERSHIP_CACHE_LOCAL_TTL = float(os.environ.get('USER_MEMBERSHIP_CACHE_LOCAL_TTL', 60))
+
     TURNSTILE_SITE_KEY = os.environ.get('TURNSTILE_SITE_KEY', '')
     TURNSTILE_SECRET_KEY = os.environ.get('TURNSTILE_SECRET_KEY', '')
 
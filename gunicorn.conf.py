@@ -0,0 +1,34 @@
+"""
+Gunicorn settings of the web process (Procfile: gunicorn manage:app), loaded by gunicorn from the working directory.
+
+With CHART_PRELOAD_CATALOGS=True the master loads chart catalogues and scene datasets before workers are forked.
+Workers share them copy-on-write instead of loading own copy on the first chart request, memory of each
+worker is logged when it starts and exits.
+"""
+import os
+
+from config import Config
+
+
+def on_starting(server):
+    if not Config.CHART_PRELOAD_CATALOGS:
+        return
+    from app import create_app
+    from app.commons.catalog_preload import log_process_memory_usage, preload_chart_catalogs
+
+    app = create_app(os.getenv('FLASK_CONFIG') or 'default', web=False)
+    with app.app_context():
+        preload_chart_catalogs()
+    log_process_memory_usage('Chart catalogues preloaded in gunicorn master', server.log)
+
+
+def post_worker_init(worker):
+    if Config.CHART_PRELOAD_CATALOGS:
+        from app.commons.catalog_preload import log_process_memory_usage
+        log_process_memory_usage('Gunicorn worker started', worker.log)
+
+
+def worker_exit(server, worker):
+    if Config.CHART_PRELOAD_CATALOGS:
+        from app.commons.catalog_preload import log_process_memory_usage
+        log_process_memory_usage('Gunicorn worker exiting', worker.log)
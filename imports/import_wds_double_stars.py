@@ -4,7 +4,7 @@ from sqlalchemy.exc import IntegrityError
 import gzip
 
 from app import db
-from app.models import Constellation, DoubleStar, Star
+from app.models import Constellation, DoubleStar, DoubleStarDesignation, Star
 
 from .import_utils import progress
 
@@ -524,6 +524,23 @@ def import_wds_doubles(bmcevoy_filename, print_not_found=False):
     except IntegrityError as err:
         print('\nIntegrity error {}'.format(err))
         db.session.rollback()
+        return
+    update_double_star_designations()
+
+
+def update_double_star_designations():
+    """
+    Rebuild double_star_designations from norm_other_designation of all double stars
+    """
+    DoubleStarDesignation.query.delete(synchronize_session=False)
+    designations = []
+    for double_star in DoubleStar.query.filter(DoubleStar.norm_other_designation.isnot(None),
+                                               DoubleStar.norm_other_designation != '').all():
+        for designation in double_star.get_norm_other_designations():
+            designations.append({'designation': designation[:64], 'double_star_id': double_star.id})
+    if designations:
+        db.session.execute(DoubleStarDesignation.__table__.insert(), designations)
+    db.session.commit()
 
 
 def _parse_int(val):
@@ -26,9 +26,17 @@ from app.models import (
     User,
     UserDsoDescription,
     DeepskyObject,
+    DoubleStar,
+    MinorPlanet,
+    Supernova,
     UserDsoApertureDescription,
+    SEARCH_NAME_COMET,
+    SEARCH_NAME_DSO,
+    SEARCH_NAME_MINOR_PLANET,
 )
 
+from app.commons.dbupdate_utils import mark_catalogue_updated
+from app.commons.search_name_index import rebuild_search_names
 from app.commons.solar_system_chart_utils import MAR099S_BSP, JUP365_BSP, JUP347_BSP, SAT_441_BSP, URA111_BSP, NEP097_BSP
 
 from imports.import_utils import progress
@@ -127,6 +135,13 @@ def run_worker():
     worker = Worker(queues)
     worker.work()
 
+@app.cli.command("run_chart_render_pool")
+def run_chart_render_pool():
+    """Runs pool of pre-warmed chart render processes."""
+    from app.commons.chart_render_pool import run_chart_render_pool as run_pool
+    run_pool(app)
+
+
 @app.cli.command("format")
 def format():
     """Runs the yapf and isort formatters over the project."""
@@ -167,6 +182,9 @@ def initialize_catalogues():
     import_collinder('data/collinder.txt')
     import_constellations_positions('data/constlabel.cla')
     import_wds_doubles('data/BruceMacEvoy_doubles.csv.gz')
+    mark_catalogue_updated(DeepskyObject.__tablename__)
+    mark_catalogue_updated(DoubleStar.__tablename__)
+    rebuild_search_names()
 
 
 @app.cli.command("import_dso_list")
@@ -210,6 +228,8 @@ def import_hnsky_supplements():
     import_hnsky_supplement('data/supplements/M31 global clusters, Revised Bologna Catalogue v5.sup', allowed_cat_prefixes = ['Bol', 'SKHB'])
     import_hnsky_supplement('data/supplements/M33 global clusters,  2007 catalog.sup', allowed_cat_prefixes = ['CBF'])
     import_hnsky_supplement('data/supplements/VDB, catalogue of reflection nebulae.sup')
+    mark_catalogue_updated(DeepskyObject.__tablename__)
+    rebuild_search_names(SEARCH_NAME_DSO)
 
 
 @app.cli.command("import_star_list")
@@ -233,6 +253,8 @@ def import_minor_planets():
     import_mpcorb_minor_planets('data/MPCORB.9999.DAT')
     update_minor_planets_positions(True)
     # update_minor_planets_brightness(True)
+    mark_catalogue_updated(MinorPlanet.__tablename__)
+    rebuild_search_names(SEARCH_NAME_MINOR_PLANET)
 
 
 @app.cli.command("import_comets")
@@ -244,6 +266,8 @@ def import_comets():
     update_evaluated_comet_brightness(all_mpc_comets=all_mpc_comets, show_progress=True)
     update_comets_cobs_observations()
     update_comets_positions(None, True)
+    mark_catalogue_updated(Comet.__tablename__)
+    rebuild_search_names(SEARCH_NAME_COMET)
 
 
 @app.cli.command("delete_lost_comets")
@@ -255,6 +279,8 @@ def delete_lost_comets():
             print('Deleting comet', comet.comet_id)
             db.session.delete(comet)
     db.session.commit()
+    mark_catalogue_updated(Comet.__tablename__)
+    rebuild_search_names(SEARCH_NAME_COMET)
 
 
 @app.cli.command("import_planets")
@@ -273,6 +299,7 @@ def import_planet_moons():
 def import_supernovae():
     from app.commons.supernova_loader import update_supernovae_from_rochesterastronomy
     update_supernovae_from_rochesterastronomy()
+    mark_catalogue_updated(Supernova.__tablename__)
 
 
 @app.cli.command("import_new_skyquality_locations")
@@ -351,6 +378,7 @@ def update_dso_axis_ratio():
         progress(i, all_count, 'Updating DSOs axis ratio...')
         i += 1
     db.session.commit()
+    mark_catalogue_updated(DeepskyObject.__tablename__)
     print('')
 
 
@@ -388,6 +416,13 @@ def create_pgc_update_file():
 def update_pgc_imported_dsos():
     from imports.import_pgc import update_pgc_imported_dsos_from_updatefile
     update_pgc_imported_dsos_from_updatefile('data/PGC_update.dat')
+    mark_catalogue_updated(DeepskyObject.__tablename__)
+    rebuild_search_names(SEARCH_NAME_DSO)
+
+
+@app.cli.command("rebuild_search_names")
+def rebuild_search_names_cmd():
+    rebuild_search_names()
 
 
 @app.cli.command("preload_ephemeris")
@@ -400,6 +435,39 @@ def preload_ephemeris():
     skyfield.api.load(NEP097_BSP)
 
 
+@app.cli.command("precompute_rise_set_cache")
+def precompute_rise_set_cache():
+    """Fills session planner rise/set cache for public locations."""
+    from app.commons.rise_set_cache import precompute_rise_set_cache as precompute
+    count = precompute(app.config.get('RISE_SET_PRECOMPUTE_NIGHTS'), app.config.get('RISE_SET_PRECOMPUTE_CATALOGS').split(','))
+    print('Rise/set cache precomputed for {} location nights.'.format(count))
+
+
+@app.cli.command("precompute_almanac")
+def precompute_almanac():
+    """Fills almanac of twilights and moon events for saved locations."""
+    from app.commons.almanac_utils import precompute_almanac as precompute
+    count = precompute(app.config.get('ALMANAC_PRECOMPUTE_DAYS'))
+    print('Almanac precomputed for {} location nights.'.format(count))
+
+
+@app.cli.command("build_scene_datasets")
+def build_scene_datasets():
+    """Writes compressed scene catalogue datasets to SCENE_DATASETS_DIR."""
+    from app.commons.chart_generator import get_used_catalogs_version
+    from app.commons.chart_scene import build_all_scene_datasets
+    from app.commons.scene_dataset_store import write_scene_datasets
+    out_dir = app.config.get('SCENE_DATASETS_DIR')
+    if not out_dir:
+        print('SCENE_DATASETS_DIR is not set.')
+        return
+    datasets = build_all_scene_datasets()
+    write_scene_datasets(out_dir, datasets, get_used_catalogs_version())
+    for name, dataset in datasets.items():
+        print('{}: {} gzip={} br={}'.format(name, dataset.digest, len(dataset.gzip_data),
+                                            len(dataset.br_data) if dataset.br_data is not None else '-'))
+
+
 def _create_update_theme(user, name, definition):
     t = ChartTheme.query.filter_by(name=name)
     if not t:
@@ -698,6 +766,15 @@ def tmp_update_minor_planets_positions():
     from app.commons.minor_planet_utils import update_minor_planets_positions
     update_minor_planets_positions(True)
 
+
+@app.cli.command("build_mpcorb_index")
+def build_mpcorb_index():
+    """Decompresses MPCORB.DAT.gz and rebuilds its designation index."""
+    from app.commons.minor_planet_utils import ensure_full_mpcorb_file, rebuild_mpcorb_index
+    records = rebuild_mpcorb_index(ensure_full_mpcorb_file())
+    print('MPCORB index: {} records.'.format(records))
+
+
 @app.cli.command("tmp_update_comets")
 def tmp_update_comets():
     from app.commons.comet_utils import update_comets_positions
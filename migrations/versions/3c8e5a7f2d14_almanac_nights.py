@@ -0,0 +1,50 @@
+"""Almanac nights
+
+Revision ID: 3c8e5a7f2d14
+Revises: 9b4f1d6e3c27
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8e5a7f2d14'
+down_revision = '9b4f1d6e3c27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('almanac_nights',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('for_date', sa.Date(), nullable=False),
+    sa.Column('sunset', sa.DateTime(), nullable=True),
+    sa.Column('sunrise', sa.DateTime(), nullable=True),
+    sa.Column('civil_dusk', sa.DateTime(), nullable=True),
+    sa.Column('civil_dawn', sa.DateTime(), nullable=True),
+    sa.Column('nautical_dusk', sa.DateTime(), nullable=True),
+    sa.Column('nautical_dawn', sa.DateTime(), nullable=True),
+    sa.Column('astro_dusk', sa.DateTime(), nullable=True),
+    sa.Column('astro_dawn', sa.DateTime(), nullable=True),
+    sa.Column('moon_rise', sa.DateTime(), nullable=True),
+    sa.Column('moon_set', sa.DateTime(), nullable=True),
+    sa.Column('moon_phase', sa.Float(), nullable=True),
+    sa.Column('moon_illumination', sa.Float(), nullable=True),
+    sa.Column('moonless_from', sa.DateTime(), nullable=True),
+    sa.Column('moonless_to', sa.DateTime(), nullable=True),
+    sa.Column('create_date', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('almanac_nights', schema=None) as batch_op:
+        batch_op.create_index('ix_almanac_nights_location_date', ['latitude', 'longitude', 'for_date'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('almanac_nights', schema=None) as batch_op:
+        batch_op.drop_index('ix_almanac_nights_location_date')
+
+    op.drop_table('almanac_nights')
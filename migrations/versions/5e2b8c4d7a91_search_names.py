@@ -0,0 +1,90 @@
+"""Search names
+
+Revision ID: 5e2b8c4d7a91
+Revises: 2a6d9f1e8b3c
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2b8c4d7a91'
+down_revision = '2a6d9f1e8b3c'
+branch_labels = None
+depends_on = None
+
+INSERT_BATCH = 5000
+
+# object type -> (table, name columns), as in search_name_index.SEARCH_NAME_SOURCES
+SEARCH_NAME_SOURCES = {
+    'dso': ('deepsky_objects', ('name', 'common_name')),
+    'double_star': ('double_stars', ('common_cat_id', 'wds_number')),
+    'star': ('stars', ('common_name',)),
+    'comet': ('comets', ('designation',)),
+    'minor_planet': ('minor_planets', ('designation', 'mpc_designation', 'int_designation')),
+}
+
+
+def _normalize_search_name(name):
+    name = str(name).strip().lower()
+    name = ''.join(char for char in unicodedata.normalize('NFKD', name) if not unicodedata.combining(char))
+    return re.sub(r'[\s\-_]+', ' ', name)
+
+
+def _fill_search_names(search_names):
+    conn = op.get_bind()
+    for object_type, (table_name, columns) in SEARCH_NAME_SOURCES.items():
+        table = sa.table(table_name, sa.column('id'), *(sa.column(column) for column in columns))
+        rows = []
+        for row in conn.execute(sa.select(table.c.id, *(table.c[column] for column in columns))):
+            norm_names = set()
+            for value in row[1:]:
+                if value is None:
+                    continue
+                name = str(value).strip()
+                norm_name = _normalize_search_name(name)
+                if norm_name and norm_name not in norm_names:
+                    norm_names.add(norm_name)
+                    rows.append({'object_type': object_type, 'object_id': row[0], 'name': name[:256],
+                                 'norm_name': norm_name[:256]})
+            if len(rows) >= INSERT_BATCH:
+                op.bulk_insert(search_names, rows)
+                rows = []
+        if rows:
+            op.bulk_insert(search_names, rows)
+
+
+def upgrade():
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    if is_postgresql:
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    search_names = op.create_table('search_names',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('object_type', sa.String(length=16), nullable=False),
+    sa.Column('object_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=256), nullable=False),
+    sa.Column('norm_name', sa.String(length=256), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('search_names', schema=None) as batch_op:
+        batch_op.create_index('ix_search_names_object', ['object_type', 'object_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_search_names_norm_name'), ['norm_name'], unique=False)
+    _fill_search_names(search_names)
+    if is_postgresql:
+        op.create_index('ix_search_names_norm_name_trgm', 'search_names', ['norm_name'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'norm_name': 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_search_names_norm_name_trgm', table_name='search_names')
+    with op.batch_alter_table('search_names', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_search_names_norm_name'))
+        batch_op.drop_index('ix_search_names_object')
+
+    op.drop_table('search_names')
@@ -0,0 +1,54 @@
+"""Double star designations
+
+Revision ID: 9b4f1d6e3c27
+Revises: 5e2b8c4d7a91
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b4f1d6e3c27'
+down_revision = '5e2b8c4d7a91'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    double_star_designations = op.create_table('double_star_designations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('designation', sa.String(length=64), nullable=False),
+    sa.Column('double_star_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['double_star_id'], ['double_stars.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('double_star_designations', schema=None) as batch_op:
+        batch_op.create_index('ix_double_star_designations_designation', ['designation', 'double_star_id'], unique=True)
+        batch_op.create_index(batch_op.f('ix_double_star_designations_double_star_id'), ['double_star_id'], unique=False)
+
+    conn = op.get_bind()
+    double_stars = sa.table('double_stars',
+                            sa.column('id', sa.Integer),
+                            sa.column('norm_other_designation', sa.Text))
+    rows = []
+    for double_star_id, norm_other_designation in conn.execute(
+            sa.select(double_stars.c.id, double_stars.c.norm_other_designation)
+              .where(double_stars.c.norm_other_designation.isnot(None))):
+        designations = set()
+        for name in norm_other_designation.split(';'):
+            designation = ' '.join(name.split()).lower()[:64]
+            if designation and designation not in designations:
+                designations.add(designation)
+                rows.append({'designation': designation, 'double_star_id': double_star_id})
+    if rows:
+        op.bulk_insert(double_star_designations, rows)
+
+
+def downgrade():
+    with op.batch_alter_table('double_star_designations', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_double_star_designations_double_star_id'))
+        batch_op.drop_index('ix_double_star_designations_designation')
+
+    op.drop_table('double_star_designations')
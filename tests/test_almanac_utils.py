@@ -0,0 +1,171 @@
+import os
+import unittest
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+import pytz
+from skyfield import almanac
+from skyfield.api import load, wgs84
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+from app.commons.almanac_utils import (
+    TWILIGHT_ASTRONOMICAL,
+    TWILIGHT_DAY,
+    TWILIGHT_NAUTICAL,
+    _dark_window,
+    _moonless_window,
+    almanac_key,
+    compute_almanac_night,
+    get_almanac_night,
+    get_moonless_window,
+    get_twilight_window,
+    night_start_utc,
+    precompute_almanac,
+)
+from app.models import AlmanacNight, Location
+
+
+def _dt(day, hour, minute=0):
+    return datetime(2026, 3, day, hour, minute)
+
+
+class AlmanacWindowsTestCase(unittest.TestCase):
+    # dark_twilight_day transitions of a spring night: civil, nautical, astronomical, night and back
+    TIMES = [_dt(10, 17), _dt(10, 17, 30), _dt(10, 18), _dt(10, 18, 30), _dt(11, 3, 30), _dt(11, 4), _dt(11, 4, 30),
+             _dt(11, 5)]
+    STATES = [3, 2, 1, 0, 1, 2, 3, 4]
+
+    def test_dark_window(self):
+        self.assertEqual(_dark_window(self.TIMES, self.STATES, TWILIGHT_DAY), (_dt(10, 17), _dt(11, 5)))
+        self.assertEqual(_dark_window(self.TIMES, self.STATES, TWILIGHT_NAUTICAL), (_dt(10, 18), _dt(11, 4)))
+        self.assertEqual(_dark_window(self.TIMES, self.STATES, TWILIGHT_ASTRONOMICAL), (_dt(10, 18, 30), _dt(11, 3, 30)))
+        # summer night without astronomical darkness
+        self.assertEqual(_dark_window(self.TIMES[:3] + self.TIMES[-3:], [3, 2, 1, 2, 3, 4], TWILIGHT_ASTRONOMICAL),
+                         (None, None))
+        self.assertEqual(_dark_window([], [], TWILIGHT_ASTRONOMICAL), (None, None))
+
+    def test_moonless_window(self):
+        dusk, dawn = _dt(10, 19), _dt(11, 4)
+        events_from, events_to = _dt(10, 0), _dt(12, 0)
+        # moon sets in the evening
+        self.assertEqual(_moonless_window(dusk, dawn, [(_dt(10, 9), True), (_dt(10, 22), False)], events_from, events_to),
+                         (_dt(10, 22), dawn))
+        # moon rises after midnight
+        self.assertEqual(_moonless_window(dusk, dawn, [(_dt(10, 8), False), (_dt(11, 1), True)], events_from, events_to),
+                         (dusk, _dt(11, 1)))
+        # moon up whole night
+        self.assertEqual(_moonless_window(dusk, dawn, [(_dt(10, 17), True), (_dt(11, 7), False)], events_from, events_to),
+                         (None, None))
+        # moon below horizon whole night
+        self.assertEqual(_moonless_window(dusk, dawn, [(_dt(10, 8), True), (_dt(10, 18), False), (_dt(11, 9), True)],
+                                          events_from, events_to), (dusk, dawn))
+        self.assertEqual(_moonless_window(None, None, [], events_from, events_to), (None, None))
+
+    def test_night_start(self):
+        self.assertEqual(night_start_utc(15.0, date(2026, 3, 10)), _dt(10, 11))
+        self.assertEqual(night_start_utc(-90.0, datetime(2026, 3, 10, 20)), _dt(10, 18))
+        self.assertEqual(almanac_key(50.123456, 14.987654, datetime(2026, 3, 10)), (50.12, 14.99, date(2026, 3, 10)))
+
+
+class AlmanacNightTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _night(self, latitude, longitude, for_date, eph=None):
+        return AlmanacNight(latitude=latitude, longitude=longitude, for_date=for_date,
+                            astro_dusk=_dt(10, 18, 30), astro_dawn=_dt(11, 3, 30),
+                            nautical_dusk=_dt(10, 18), nautical_dawn=_dt(11, 4),
+                            moonless_from=_dt(10, 22), moonless_to=_dt(11, 3, 30))
+
+    def test_get_almanac_night_on_demand(self):
+        with mock.patch('app.commons.almanac_utils.compute_almanac_night', side_effect=self._night) as compute:
+            night = get_almanac_night(50.0761, 14.4378, datetime(2026, 3, 10))
+            self.assertEqual(compute.call_count, 1)
+            self.assertEqual(get_almanac_night(50.0801, 14.4412, date(2026, 3, 10)).id, night.id)
+            self.assertEqual(compute.call_count, 1)
+        self.assertEqual((night.latitude, night.longitude), (50.08, 14.44))
+
+        tz_info = pytz.timezone('Europe/Prague')
+        t1, t2 = get_twilight_window(night, TWILIGHT_ASTRONOMICAL, tz_info)
+        self.assertEqual((t1.strftime('%H:%M'), t2.strftime('%H:%M')), ('19:30', '04:30'))
+        self.assertEqual(get_twilight_window(night, TWILIGHT_DAY, tz_info), (None, None))
+        t1, t2 = get_moonless_window(night, tz_info)
+        self.assertEqual((t1.strftime('%H:%M'), t2.strftime('%H:%M')), ('23:00', '04:30'))
+
+    def test_get_almanac_night_keeps_caller_transaction(self):
+        location = Location(name='Praha', latitude=50.0761, longitude=14.4378)
+        db.session.add(location)
+        with db.session.no_autoflush, \
+                mock.patch('app.commons.almanac_utils.compute_almanac_night', side_effect=self._night):
+            night = get_almanac_night(50.0761, 14.4378, date(2026, 3, 10))
+        self.assertIn(location, db.session.new)
+        db.session.rollback()
+        self.assertEqual(Location.query.count(), 0)
+        self.assertEqual(AlmanacNight.query.one().id, night.id)
+
+    def test_get_almanac_night_store_failure(self):
+        with mock.patch('app.commons.almanac_utils.compute_almanac_night', side_effect=self._night), \
+                mock.patch('app.commons.almanac_utils.Session.commit', side_effect=OperationalError('insert', {}, None)):
+            night = get_almanac_night(50.0761, 14.4378, date(2026, 3, 10))
+        self.assertEqual(night.astro_dusk, _dt(10, 18, 30))
+        self.assertEqual(AlmanacNight.query.count(), 0)
+
+    def test_precompute_almanac(self):
+        db.session.add_all([Location(name='Praha', latitude=50.0761, longitude=14.4378),
+                            Location(name='Praha 2', latitude=50.0759, longitude=14.4381),
+                            Location(name='Brno', latitude=49.1951, longitude=16.6068)])
+        db.session.add(self._night(50.08, 14.44, date(2026, 3, 10)))
+        db.session.commit()
+        with mock.patch('app.commons.almanac_utils.load'), \
+                mock.patch('app.commons.almanac_utils.compute_almanac_night', side_effect=self._night):
+            self.assertEqual(precompute_almanac(3, date(2026, 3, 10)), 5)
+            self.assertEqual(precompute_almanac(3, date(2026, 3, 10)), 0)
+        self.assertEqual(AlmanacNight.query.count(), 6)
+
+
+def _session_plan_twilight(eph, latitude, longitude, for_date, comp, tz_info):
+    """
+    Twilight of session plan as computed before almanac_nights table.
+    """
+    ts = load.timescale()
+    observer = wgs84.latlon(latitude, longitude)
+    t1 = ts.from_datetime(tz_info.localize(for_date + timedelta(hours=12)))
+    t2 = ts.from_datetime(tz_info.localize(for_date + timedelta(hours=36)))
+    t, y = almanac.find_discrete(t1, t2, almanac.dark_twilight_day(eph, observer))
+    index1 = None
+    index2 = None
+    for i in range(len(y)):
+        if y[i] == comp:
+            if index1 is None:
+                index1 = i + 1
+            elif index2 is None:
+                index2 = i
+    if index1 is None or index2 is None:
+        return None, None
+    return t[index1].astimezone(tz_info), t[index2].astimezone(tz_info)
+
+
+@unittest.skipUnless(os.path.exists(load.path_to('de421.bsp')), 'de421.bsp ephemeris is not available')
+class AlmanacEphemerisTestCase(unittest.TestCase):
+    def test_twilight_equals_session_plan_twilight(self):
+        eph = load('de421.bsp')
+        tz_info = pytz.timezone('Europe/Prague')
+        for for_date in [datetime(2026, 1, 15), datetime(2026, 3, 10), datetime(2026, 6, 21), datetime(2026, 10, 25)]:
+            night = compute_almanac_night(50.08, 14.44, for_date, eph=eph)
+            for level in (TWILIGHT_ASTRONOMICAL, TWILIGHT_NAUTICAL):
+                expected = _session_plan_twilight(eph, 50.08, 14.44, for_date, level, tz_info)
+                window = get_twilight_window(night, level, tz_info)
+                if expected[0] is None:
+                    self.assertEqual(window, (None, None), (for_date, level))
+                    continue
+                for t_expected, t in zip(expected, window):
+                    self.assertLess(abs((t - t_expected).total_seconds()), 1.0, (for_date, level))
@@ -0,0 +1,17 @@
+import os
+import sys
+import unittest
+
+from app.commons.catalog_preload import process_memory_usage
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), 'reads /proc')
+class ProcessMemoryUsageTestCase(unittest.TestCase):
+    def test_reports_resident_and_shared_memory(self):
+        usage = process_memory_usage()
+        self.assertGreater(usage['rss'], 0)
+        self.assertGreaterEqual(usage['rss'], usage['shared'])
+        self.assertGreater(process_memory_usage(os.getpid())['rss'], 0)
+
+    def test_unknown_process(self):
+        self.assertEqual(process_memory_usage(2 ** 22 + 1), {})
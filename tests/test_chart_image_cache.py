@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app.commons import chart_image_cache
+from app.commons.chart_image_cache import (
+    ChartImageCache,
+    ChartImageCacheEntry,
+    build_chart_image_cache_key,
+    get_catalogs_version,
+    quantize,
+)
+
+
+def _entry(size, img_format='jpg', visible_objects=None):
+    return ChartImageCacheEntry(img_data=b'x' * size, img_format=img_format, visible_objects=visible_objects)
+
+
+class ChartImageCacheTestCase(unittest.TestCase):
+    def test_memory_lru_evicts_least_recently_used(self):
+        cache = ChartImageCache(max_entries=2)
+        cache.put('a', _entry(10))
+        cache.put('b', _entry(10))
+        self.assertIsNotNone(cache.get('a'))
+        cache.put('c', _entry(10))
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 3)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['entries'], 2)
+
+    def test_memory_is_bounded_by_bytes(self):
+        cache = ChartImageCache(max_entries=100, max_bytes=25)
+        cache.put('a', _entry(10))
+        cache.put('b', _entry(10))
+        cache.put('c', _entry(10))
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['bytes'], 20)
+
+    def test_disk_tier_survives_new_cache_instance(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = ChartImageCache(max_entries=10, disk_dir=tmp_dir)
+            cache.put('k', _entry(5, img_format='png', visible_objects=['M31', 1.0, 2.0, 3.0, 4.0]))
+
+            other_cache = ChartImageCache(max_entries=10, disk_dir=tmp_dir)
+            entry = other_cache.get('k')
+
+            self.assertIsNotNone(entry)
+            self.assertEqual(entry.img_format, 'png')
+            self.assertEqual(entry.img_data, b'xxxxx')
+            self.assertEqual(entry.visible_objects, ['M31', 1.0, 2.0, 3.0, 4.0])
+            self.assertEqual(other_cache.stats()['disk_hits'], 1)
+
+            other_cache.clear()
+            self.assertEqual(os.listdir(tmp_dir), [])
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = ChartImageCache()
+        self.assertFalse(cache.enabled)
+        cache.put('a', _entry(10))
+        self.assertIsNone(cache.get('a'))
+
+    def test_key_is_stable_and_sensitive_to_params(self):
+        params = {'phi': quantize(1.2345678901, 1e-6), 'fsz': 2, 'flags': 'CBD'}
+        same_params = {'flags': 'CBD', 'fsz': 2, 'phi': quantize(1.2345679, 1e-6)}
+        other_params = {'phi': quantize(1.2345678901, 1e-6), 'fsz': 2, 'flags': 'CB'}
+
+        self.assertEqual(build_chart_image_cache_key(params), build_chart_image_cache_key(same_params))
+        self.assertNotEqual(build_chart_image_cache_key(params), build_chart_image_cache_key(other_params))
+
+    def test_catalogs_version_follows_file_updates(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_file = os.path.join(tmp_dir, 'PGC_update.dat')
+            with open(data_file, 'w') as f:
+                f.write('a')
+            with mock.patch.object(chart_image_cache, '_catalogs_version', None):
+                version = get_catalogs_version('0.11.1', [data_file])
+                with open(data_file, 'w') as f:
+                    f.write('ab')
+                # files are not stat'ed again before ttl expires
+                self.assertEqual(get_catalogs_version('0.11.1', [data_file]), version)
+            # expired version
+            with mock.patch.object(chart_image_cache, '_catalogs_version', (0.0, version)):
+                self.assertNotEqual(get_catalogs_version('0.11.1', [data_file]), version)
+
+    def test_catalogs_version_covers_data_dir_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            star_dir = os.path.join(tmp_dir, 'stars_gaia')
+            os.makedirs(os.path.join(star_dir, 'L2'))
+            star_file = os.path.join(star_dir, 'L2', 'stars_2.cat')
+            with open(star_file, 'w') as f:
+                f.write('a')
+            with mock.patch.object(chart_image_cache, '_catalogs_version', None):
+                version = get_catalogs_version('0.11.1', [], [star_dir])
+            with open(star_file, 'w') as f:
+                f.write('ab')
+            with mock.patch.object(chart_image_cache, '_catalogs_version', None):
+                self.assertNotEqual(get_catalogs_version('0.11.1', [], [star_dir]), version)
@@ -0,0 +1,67 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app.commons.chart_render_pool import ChartRenderPool
+
+
+def _sleep_render(kind, job):
+    time.sleep(job)
+    return kind
+
+
+class FakeConnection:
+    def __init__(self, job):
+        self.job = job
+        self.sent = []
+
+    def recv(self):
+        return 'img', self.job
+
+    def send(self, value):
+        self.sent.append(value)
+
+    def close(self):
+        pass
+
+
+class ChartRenderPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.patcher = mock.patch('app.commons.chart_render_pool._render_job', _sleep_render)
+        self.patcher.start()
+        self.pool = ChartRenderPool(None, 'secret', workers=1, max_queue=1, timeout=0.5)
+        self.pool._executor = self.pool._create_executor()
+
+    def tearDown(self):
+        self.pool._executor.shutdown(wait=False, cancel_futures=True)
+        self.patcher.stop()
+
+    def _handle(self, job):
+        conn = FakeConnection(job)
+        self.pool._handle_connection(conn)
+        return conn.sent
+
+    def _wait_pending(self, value):
+        for _ in range(100):
+            if self.pool._pending == value:
+                return
+            time.sleep(0.05)
+        self.fail('pending={}'.format(self.pool._pending))
+
+    def test_render(self):
+        self.assertEqual(self._handle(0), [('ok', 'img')])
+        self._wait_pending(0)
+
+    def test_timed_out_render_stays_pending_until_recycled(self):
+        executor = self.pool._executor
+        slow = threading.Thread(target=self._handle, args=(30,))
+        slow.start()
+        self._wait_pending(1)
+        # stuck render still occupies the queue
+        self.assertEqual(self._handle(0), [('busy', None)])
+        slow.join()
+        self.assertIsNot(self.pool._executor, executor)
+        # killed worker finishes the job and frees the queue
+        self._wait_pending(0)
+        self.assertEqual(self._handle(0), [('ok', 'img')])
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from skyfield.api import load
+from skyfield.constants import GM_SUN_Pitjeva_2005_km3_s2 as GM_SUN
+from skyfield.data import mpc
+
+from app.commons.comet_orbit_store import CometOrbitStore
+
+
+def _fixed_body(position_au):
+    return SimpleNamespace(at=lambda t: SimpleNamespace(position=SimpleNamespace(au=np.array(position_au))))
+
+
+class CometOrbitStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ts = load.timescale(builtin=True)
+        rng = np.random.default_rng(3)
+        eccentricities = [0.2, 0.7, 0.97, 0.9999, 1.0, 1.0005, 1.3]
+        n = len(eccentricities)
+        self.comets = pd.DataFrame({
+            'designation': ['C{}'.format(i) for i in range(n)],
+            'comet_id': ['C{}'.format(i) for i in range(n)],
+            'eccentricity': eccentricities,
+            'perihelion_distance_au': rng.uniform(0.3, 5.0, n),
+            'inclination_degrees': rng.uniform(0.0, 180.0, n),
+            'longitude_of_ascending_node_degrees': rng.uniform(0.0, 360.0, n),
+            'argument_of_perihelion_degrees': rng.uniform(0.0, 360.0, n),
+            'perihelion_year': [2026] * n,
+            'perihelion_month': rng.integers(1, 13, n),
+            'perihelion_day': rng.uniform(1.0, 28.0, n),
+            'magnitude_g': rng.uniform(5.0, 15.0, n),
+            'magnitude_k': rng.uniform(2.0, 4.0, n),
+        })
+        self.store = CometOrbitStore.from_dataframe(self.comets, self.ts, 'digest')
+        self.t = self.ts.tt(2026, 10, 18.3)
+
+    def test_positions_match_skyfield_kepler_orbit(self):
+        positions = self.store.orbits.positions(self.t.tt)
+        for i, (_, row) in enumerate(self.comets.iterrows()):
+            expected = mpc.comet_orbit(row, self.ts, GM_SUN).at(self.t).position.au
+            np.testing.assert_allclose(positions[:, i], expected, rtol=1e-8, atol=1e-10)
+
+    def test_observe_selected_comets(self):
+        eph = {'earth': _fixed_body([1.0, 0.0, 0.0]), 'sun': _fixed_body([0.0, 0.0, 0.0])}
+        ephemeris = self.store.observe(self.t, eph, np.array([self.store.index_of('C4'), self.store.index_of('C1')]))
+        self.assertEqual(len(ephemeris.ra), 2)
+
+        # geocentric vector from ra/dec and distance points to light-time corrected heliocentric position
+        geo = ephemeris.dist_earth * np.array([np.cos(ephemeris.dec) * np.cos(ephemeris.ra),
+                                               np.cos(ephemeris.dec) * np.sin(ephemeris.ra),
+                                               np.sin(ephemeris.dec)])
+        np.testing.assert_allclose(np.linalg.norm(geo + np.array([[1.0], [0.0], [0.0]]), axis=0), ephemeris.dist_sun)
+        row = self.comets.iloc[4]
+        expected_mag = row.magnitude_g + 5.0 * np.log10(ephemeris.dist_earth[0]) + 2.5 * row.magnitude_k * np.log10(ephemeris.dist_sun[0])
+        self.assertAlmostEqual(ephemeris.mag[0], expected_mag)
+
+    def test_saved_store_is_loaded_back(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'CometEls.npz')
+            self.store.save(path)
+            loaded = CometOrbitStore.load(path)
+        self.assertEqual(loaded.source_digest, 'digest')
+        self.assertEqual(loaded.index_of('C3'), 3)
+        self.assertIsNone(loaded.index_of('unknown'))
+        np.testing.assert_array_equal(loaded.orbits.positions(self.t.tt), self.store.orbits.positions(self.t.tt))
@@ -0,0 +1,52 @@
+import unittest
+
+from app import create_app, db
+from app.commons.search_sky_object_utils import search_double_star
+from app.models import DoubleStar, DoubleStarDesignation
+from imports.import_wds_double_stars import update_double_star_designations
+
+
+class DoubleStarDesignationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        db.session.add_all([
+            DoubleStar(wds_number='06451-1643', common_cat_id='AGC 1', components='AB',
+                       norm_other_designation=';Alp CMa;9 CMa;Sirius;'),
+            DoubleStar(wds_number='07346+3153', common_cat_id='STF 1110', components='AB',
+                       norm_other_designation=';Alp Gem;66 Gem;Castor;'),
+            DoubleStar(wds_number='07346+3153', common_cat_id='STF 1110', components='AC',
+                       norm_other_designation=';Alp Gem;66 Gem;Castor;'),
+            DoubleStar(wds_number='00057+4549', common_cat_id='STT 547', components='AB', norm_other_designation=''),
+            DoubleStar(wds_number='16147+3352', common_cat_id='STF2032', components='AB',
+                       norm_other_designation=';Sig CrB;17  CrB;;17 CrB;'),
+        ])
+        db.session.commit()
+        update_double_star_designations()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_designations(self):
+        self.assertEqual(DoubleStarDesignation.query.count(), 3 + 3 + 3 + 2)
+        sig_crb = DoubleStar.query.filter_by(common_cat_id='STF2032').first()
+        self.assertEqual(sig_crb.get_norm_other_designations(), ['sig crb', '17 crb'])
+
+        castor_ids = db.session.scalars(DoubleStarDesignation.double_star_ids(' castor ')).all()
+        self.assertEqual(sorted(castor_ids),
+                         sorted(ds.id for ds in DoubleStar.query.filter_by(common_cat_id='STF 1110').all()))
+
+        update_double_star_designations()
+        self.assertEqual(DoubleStarDesignation.query.count(), 11)
+
+    def test_search_double_star(self):
+        self.assertEqual(search_double_star('Sirius').common_cat_id, 'AGC 1')
+        self.assertEqual(search_double_star('alpha CMa').common_cat_id, 'AGC 1')
+        self.assertEqual(search_double_star('17 CrB', number_search=False).common_cat_id, 'STF2032')
+        self.assertEqual(search_double_star('STF1110').common_cat_id, 'STF 1110')
+        self.assertIsNone(search_double_star('Vega'))
+        self.assertIsNone(search_double_star('CMa'))
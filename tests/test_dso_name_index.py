@@ -0,0 +1,39 @@
+import unittest
+from types import SimpleNamespace
+
+import fchart3
+
+from app.commons.dso_name_index import DsoNameIndex
+
+
+def _dso(cat, names, synonyms=(), messier=None):
+    return SimpleNamespace(cat=cat, all_names=list(names), synonyms=list(synonyms), messier=messier)
+
+
+class DsoNameIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.deeplist = [
+            _dso('NGC', ['1909'], [('IC', '2118')]),
+            _dso('IC', ['443']),
+            _dso('IC', ['2118']),
+            _dso('Sh2', ['155'], [('LBN', '529')]),
+            _dso('3C', ['273']),
+            _dso('Mi', ['1-92']),
+            _dso('Abell', ['2151'], [('UGC', '10000')]),
+            _dso('NGC', ['224'], messier=31),
+        ]
+        self.messierlist = [d for d in self.deeplist if d.messier is not None]
+        self.catalogs = SimpleNamespace(deeplist=self.deeplist, messierlist=self.messierlist)
+        self.index = DsoNameIndex(self.deeplist, self.messierlist)
+
+    def test_lookup_matches_used_catalogs_lookup(self):
+        names = ['NGC 1909', 'NGC1909', 'N1909', '1909', 'IC443', 'IC 443', 'I443', 'IC2118', 'Sh2-155', 'LBN529',
+                 '3C273', 'M1-92', 'Abell2151', 'UGC10000', 'M31', 'M 31', 'NGC 9999', 'Abell']
+        for name in names:
+            expected, _, _ = fchart3.UsedCatalogs.lookup_dso(self.catalogs, name)
+            self.assertIs(self.index.lookup(name), expected, name)
+
+    def test_unresolvable_names(self):
+        self.assertIsNone(self.index.lookup(''))
+        self.assertIsNone(self.index.lookup('M abc'))
+        self.assertEqual(len(self.index), 10)
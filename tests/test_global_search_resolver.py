@@ -13,8 +13,7 @@ class GlobalSearchResolverTestCase(unittest.TestCase):
              patch("app.commons.global_search_resolver.search_earth_moon", return_value=False), \
              patch("app.commons.global_search_resolver.search_planet", return_value=None), \
              patch("app.commons.global_search_resolver.search_planet_moon", return_value=None), \
-             patch("app.commons.global_search_resolver.search_comet", return_value=None), \
-             patch("app.commons.global_search_resolver.search_minor_planet", return_value=None):
+             patch("app.commons.global_search_resolver.search_named_object", return_value=(None, None)):
             result = resolve_global_object("M1")
 
         self.assertEqual(result["object_type"], "constellation")
@@ -31,9 +30,22 @@ class GlobalSearchResolverTestCase(unittest.TestCase):
              patch("app.commons.global_search_resolver.search_earth_moon", return_value=True), \
              patch("app.commons.global_search_resolver.search_planet", return_value=None), \
              patch("app.commons.global_search_resolver.search_planet_moon", return_value=None), \
-             patch("app.commons.global_search_resolver.search_comet", return_value=None), \
-             patch("app.commons.global_search_resolver.search_minor_planet", return_value=None):
+             patch("app.commons.global_search_resolver.search_named_object", return_value=(None, None)):
             result = resolve_global_object("moon")
 
         self.assertEqual(result["object_type"], "earth_moon")
         self.assertEqual(result["object"]["identifier"], "moon")
+
+    def test_returns_named_object_by_index_type(self):
+        with patch("app.commons.global_search_resolver.search_constellation", return_value=None), \
+             patch("app.commons.global_search_resolver.search_dso", return_value=None), \
+             patch("app.commons.global_search_resolver.search_double_star", return_value=None), \
+             patch("app.commons.global_search_resolver._search_star_safe", return_value=(None, None)), \
+             patch("app.commons.global_search_resolver.search_earth_moon", return_value=False), \
+             patch("app.commons.global_search_resolver.search_planet", return_value=None), \
+             patch("app.commons.global_search_resolver.search_planet_moon", return_value=None), \
+             patch("app.commons.global_search_resolver.search_named_object", return_value=("comet", "comet")):
+            result = resolve_global_object("Tsuchinshan")
+
+        self.assertEqual(result["object_type"], "comet")
+        self.assertEqual(result["object"], "comet")
@@ -0,0 +1,76 @@
+import unittest
+
+from app import create_app, db
+from app.commons.dbupdate_utils import mark_catalogue_updated
+from app.commons.keyset_pagination import clear_keyset_pagination_cache, paginate_catalogue_query, _order_by
+from app.models import Supernova
+
+SORT_DEF = {'designation': Supernova.designation,
+            'latest_mag': Supernova.latest_mag,
+            'ra': Supernova.ra,
+            }
+
+
+class KeysetPaginationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        clear_keyset_pagination_cache()
+        # few distinct magnitudes with NULLs to test ties and null ordering
+        for i in range(53):
+            db.session.add(Supernova(designation='SN 2023{:03d}'.format(i), ra=(i * 37 % 53) * 0.1,
+                                     latest_mag=None if i % 7 == 3 else 12.0 + (i * 11 % 5) * 0.5,
+                                     is_archived=i % 4 == 0))
+        db.session.commit()
+
+    def tearDown(self):
+        clear_keyset_pagination_cache()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _offset_page(self, query, sort_by, default_sort_field, page, per_page):
+        desc = sort_by.startswith('-')
+        column = SORT_DEF.get(sort_by.lstrip('-'), default_sort_field)
+        return query.order_by(*_order_by(column, Supernova.id, desc)).limit(per_page).offset((page - 1) * per_page).all()
+
+    def _assert_pages(self, query, sort_by, default_sort_field, pages_order, per_page=5):
+        expected_total = query.count()
+        for page in pages_order:
+            rows, total = paginate_catalogue_query(query, SORT_DEF, sort_by, default_sort_field, Supernova.id, page,
+                                                   per_page, Supernova.__tablename__)
+            self.assertEqual(total, expected_total)
+            self.assertEqual([r.id for r in rows],
+                             [r.id for r in self._offset_page(query, sort_by, default_sort_field, page, per_page)],
+                             'sort_by={} page={}'.format(sort_by, page))
+
+    def test_pages_equal_offset_pages(self):
+        queries = [Supernova.query, Supernova.query.filter(Supernova.is_archived == False)]
+        pages_order = [1, 2, 3, 5, 4, 9, 11, 10, 7, 6, 8, 2, 12]
+        for query in queries:
+            for sort_by in ['latest_mag', '-latest_mag', 'designation', '-ra', '', 'unknown']:
+                clear_keyset_pagination_cache()
+                self._assert_pages(query, sort_by, Supernova.latest_mag, pages_order)
+                self._assert_pages(query, sort_by, Supernova.latest_mag, pages_order)
+            self._assert_pages(query, '', Supernova.id, pages_order, per_page=7)
+
+    def test_page_out_of_range(self):
+        rows, total = paginate_catalogue_query(Supernova.query, SORT_DEF, None, Supernova.latest_mag, Supernova.id, 12,
+                                               5, Supernova.__tablename__)
+        self.assertEqual((rows, total), ([], 53))
+
+    def test_total_invalidated_by_catalogue_update(self):
+        query = Supernova.query.filter(Supernova.is_archived == False)
+        self._assert_pages(query, 'latest_mag', Supernova.latest_mag, [1, 2, 3])
+
+        for sn in Supernova.query.filter(Supernova.latest_mag.is_(None)).all():
+            db.session.delete(sn)
+        db.session.commit()
+        _, total = paginate_catalogue_query(query, SORT_DEF, 'latest_mag', Supernova.latest_mag, Supernova.id, 1, 5,
+                                            Supernova.__tablename__)
+        self.assertNotEqual(total, query.count())
+
+        mark_catalogue_updated(Supernova.__tablename__)
+        self._assert_pages(query, 'latest_mag', Supernova.latest_mag, [1, 2, 3, 8, 7])
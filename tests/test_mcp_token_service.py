@@ -1,9 +1,18 @@
 import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 
+from flask import Flask
+
+from app.main.usersettings import mcp_token_service
 from app.main.usersettings.mcp_token_service import (
     build_plain_mcp_token,
+    flush_mcp_token_last_used,
+    invalidate_verified_token_cache,
     normalize_scope,
     parse_plain_mcp_token,
+    verify_user_mcp_token,
 )
 
 
@@ -31,3 +40,55 @@ class McpTokenServiceTestCase(unittest.TestCase):
         self.assertIsNone(parse_plain_mcp_token("abc123.s3cr3t"))
         self.assertIsNone(parse_plain_mcp_token("czmcp_abc123"))
         self.assertIsNone(parse_plain_mcp_token("czmcp_.secret"))
+
+
+class McpTokenVerificationCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config["MCP_TOKEN_CACHE_TTL"] = 60
+        self.token_row = SimpleNamespace(id=7, user_id=3, token_id="abc123", token_hash="hash", scope="wishlist:read",
+                                         is_revoked=False, expires_date=None)
+        query = MagicMock()
+        query.filter_by.return_value.first.return_value = self.token_row
+        self.patches = [
+            patch("app.main.usersettings.mcp_token_service.McpUserToken", MagicMock(query=query)),
+            patch("app.main.usersettings.mcp_token_service._record_token_use"),
+        ]
+        for p in self.patches:
+            p.start()
+        invalidate_verified_token_cache()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        invalidate_verified_token_cache()
+
+    def test_verified_secret_is_not_hashed_again(self):
+        token = build_plain_mcp_token("abc123", "s3cr3t")
+        with self.app.app_context(), \
+             patch("app.main.usersettings.mcp_token_service.check_password_hash", return_value=True) as check:
+            self.assertEqual(verify_user_mcp_token(token)["user_id"], 3)
+            self.assertEqual(verify_user_mcp_token(token)["user_id"], 3)
+            self.assertEqual(check.call_count, 1)
+
+            # other secret of the same token id is verified
+            check.return_value = False
+            self.assertIsNone(verify_user_mcp_token(build_plain_mcp_token("abc123", "other")))
+            self.assertEqual(check.call_count, 2)
+
+    def test_revoked_token_is_rejected_despite_cache(self):
+        token = build_plain_mcp_token("abc123", "s3cr3t")
+        with self.app.app_context(), \
+             patch("app.main.usersettings.mcp_token_service.check_password_hash", return_value=True):
+            self.assertIsNotNone(verify_user_mcp_token(token))
+            self.token_row.is_revoked = True
+            self.assertIsNone(verify_user_mcp_token(token))
+
+    def test_last_used_dates_are_flushed_in_one_batch(self):
+        with patch("app.main.usersettings.mcp_token_service.db") as db_mock:
+            mcp_token_service._pending_last_used.update({7: datetime(2026, 1, 1), 8: datetime(2026, 1, 2)})
+            self.assertEqual(flush_mcp_token_last_used(), 2)
+            self.assertEqual(flush_mcp_token_last_used(), 0)
+        mappings = db_mock.session.bulk_update_mappings.call_args[0][1]
+        self.assertEqual(sorted(m["id"] for m in mappings), [7, 8])
+        db_mock.session.commit.assert_called_once()
@@ -0,0 +1,56 @@
+import math
+import unittest
+
+import numpy as np
+from skyfield.api import load
+from skyfield.constants import GM_SUN_Pitjeva_2005_km3_s2 as GM_SUN
+from skyfield.data import mpc
+
+from app.commons.minor_planet_orbit_store import MinorPlanetOrbitStore, apparent_magnitudes_hg
+
+MPCORB_EXCERPT_FILE = 'data/MPCORB.9999.DAT'
+
+
+def _scalar_magnitude_hg(h, g, body_earth_distance, body_sun_distance, earth_sun_distance):
+    fac = (body_sun_distance ** 2 + body_earth_distance ** 2 - earth_sun_distance ** 2) / (2 * body_sun_distance * body_earth_distance)
+    beta = math.acos(min(max(fac, -1), 1))
+    psi_1 = math.exp(-3.33 * math.exp(math.log(math.tan(beta / 2.0)) * 0.63))
+    psi_2 = math.exp(-1.87 * math.exp(math.log(math.tan(beta / 2.0)) * 1.22))
+    return h + 5.0 * math.log10(body_sun_distance * body_earth_distance) - 2.5 * math.log10((1 - g) * psi_1 + g * psi_2)
+
+
+class MinorPlanetOrbitStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ts = load.timescale(builtin=True)
+        with load.open(MPCORB_EXCERPT_FILE) as f:
+            minor_planets = mpc.load_mpcorb_dataframe(f)
+        self.minor_planets = minor_planets[~minor_planets.semimajor_axis_au.isnull()].iloc[::97]
+        self.store = MinorPlanetOrbitStore.from_dataframe(self.minor_planets)
+        self.t = self.ts.tt(2026, 10, 18.3)
+
+    def test_positions_match_skyfield_mpcorb_orbit(self):
+        positions = self.store.orbits().positions(self.t.tt)
+        for i, (_, row) in enumerate(self.minor_planets.iterrows()):
+            expected = mpc.mpcorb_orbit(row, self.ts, GM_SUN).at(self.t).position.au
+            np.testing.assert_allclose(positions[:, i], expected, rtol=1e-8, atol=1e-10)
+
+    def test_index_of_packed_designation(self):
+        designation = str(self.minor_planets.iloc[3]['designation_packed']).strip()
+        self.assertEqual(self.store.index_of(designation), 3)
+        self.assertIsNone(self.store.index_of('unknown'))
+        np.testing.assert_array_equal(self.store.orbits(np.array([3])).positions(self.t.tt)[:, 0],
+                                      self.store.orbits().positions(self.t.tt)[:, 3])
+
+    def test_magnitudes_match_scalar_hg(self):
+        rng = np.random.default_rng(7)
+        n = 200
+        h = rng.uniform(3.0, 20.0, n)
+        g = rng.uniform(-0.1, 0.5, n)
+        helio = rng.uniform(-5.0, 5.0, (3, n))
+        dist_sun = np.linalg.norm(helio, axis=0)
+        dist_earth = np.linalg.norm(helio - np.array([[1.0], [0.0], [0.0]]), axis=0)
+        mags = apparent_magnitudes_hg(h, g, dist_earth, dist_sun, 1.0)
+        for i in range(n):
+            expected = _scalar_magnitude_hg(h[i], g[i], dist_earth[i], dist_sun[i], 1.0)
+            self.assertAlmostEqual(mags[i], expected, places=9)
+        self.assertTrue(np.isnan(apparent_magnitudes_hg([None], [0.15], np.array([1.0]), np.array([1.5]), 1.0)[0]))
@@ -0,0 +1,45 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from app.commons.mpcorb_index import MpcorbIndex, build_mpcorb_index
+
+MPCORB_EXCERPT_FILE = 'data/MPCORB.9999.DAT'
+MPCORB_HEADER = 'MINOR PLANET CENTER ORBIT DATABASE (MPCORB)\n\nDes\'n     H     G   Epoch     M\n' + '-' * 160 + '\n'
+
+
+class MpcorbIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        with open(MPCORB_EXCERPT_FILE, 'r', encoding='ascii') as f:
+            self.lines = [f.readline() for _ in range(200)]
+        self.source_file = os.path.join(self.tmp_dir, 'MPCORB.DAT.gz')
+        with gzip.open(self.source_file, 'wt', encoding='ascii') as f:
+            f.write(MPCORB_HEADER)
+            f.writelines(self.lines)
+        self.dat_file = os.path.join(self.tmp_dir, 'MPCORB.DAT')
+        self.index_file = os.path.join(self.tmp_dir, 'MPCORB.DAT.idx')
+        self.records = build_mpcorb_index(self.source_file, self.dat_file, self.index_file)
+        self.index = MpcorbIndex.open(self.dat_file, self.index_file, self.source_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_lookup_by_designation_number_and_name(self):
+        self.assertEqual(self.records, len(self.lines))
+        self.assertEqual(self.index.find_line('00001'), self.lines[0])
+        self.assertEqual(self.index.find_line('4'), self.lines[3])
+        self.assertEqual(self.index.find_line(' "Ceres" '), self.lines[0])
+        self.assertEqual(self.index.find_line('(2) pallas'), self.lines[1])
+        self.assertIsNone(self.index.find_line('MINOR PLANET'))
+        self.assertIsNone(self.index.find_line('999999'))
+
+    def test_find_lines_by_designations(self):
+        lines = self.index.find_lines_by_designations(['00010', '00150', 'K99Z99Z', None])
+        self.assertEqual(lines, {'00010': self.lines[9], '00150': self.lines[149]})
+
+    def test_index_of_other_source_is_not_used(self):
+        os.utime(self.source_file, ns=(0, 0))
+        self.assertIsNone(MpcorbIndex.open(self.dat_file, self.index_file, self.source_file))
@@ -0,0 +1,151 @@
+import codecs
+import io
+import os
+import tempfile
+import unittest
+
+from app.commons.oal_reader import (
+    OalDocument,
+    OalEyepiece,
+    OalFilter,
+    OalLens,
+    OalMeasure,
+    OalObservation,
+    OalScope,
+    OalSession,
+    OalSite,
+    OalTarget,
+    read_oal_observations,
+)
+from app.commons.openastronomylog import OalfixedMagnificationOpticsType, OalobservationTargetType, OalscopeType, parse
+
+OAL_DOCUMENT = '''<?xml version="1.0" encoding="{encoding}"?>
+<oal:observations xmlns:oal="http://groups.google.com/group/openastronomylog" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" version="2.1">
+  <!-- exported by CzSky -->
+  <observers><observer id="usr_1"><name>Jan</name><surname>Novák</surname></observer></observers>
+  <sites>
+    <site id="site_1"><name>Ondřejov</name><longitude unit="deg">14.78</longitude><latitude unit="deg">49.91</latitude><timezone>60</timezone></site>
+    <site id="site_2"><name>Kleť</name><longitude unit="arcmin">868.2</longitude><latitude unit="rad">0.852</latitude></site>
+    <site id="site_3"><longitude unit="deg">-70.4</longitude><latitude unit="deg">-24.6</latitude></site>
+  </sites>
+  <sessions>
+    <session id="se_1" lang="cs"><begin>2023-03-20T20:00:00+01:00</begin><end>2023-03-21T02:00:00Z</end><site>site_1</site><weather>jasno</weather><equipment>Dobson 300</equipment><comments>Výborná noc &amp; klid</comments></session>
+    <session id="se_2" lang="en"><begin>2023-04-01T21:30:00.5</begin><site>site_2</site></session>
+  </sessions>
+  <targets>
+    <target id="_NGC2392" xsi:type="oal:deepSkyPN"><datasource>CzSky</datasource><name>NGC2392</name><constellation>GEM</constellation></target>
+    <target id="_M42" xsi:type="oal:deepSkyGN"><datasource>CzSky</datasource><name>M42</name><alias>NGC1976</alias></target>
+    <target id="_STF1110" xsi:type="oal:deepSkyDS"><datasource>CzSky</datasource><name>STF 1110</name></target>
+    <target id="_STF2" xsi:type="oal:deepSkyMS"><datasource>CzSky</datasource><name>STF 2</name></target>
+    <target id="_JUPITER" xsi:type="oal:PlanetTargetType"><datasource>CzSky</datasource><name>Jupiter</name></target>
+  </targets>
+  <scopes>
+    <scope id="opt_1" xsi:type="oal:scopeType"><model>Dobson</model><type>N</type><vendor>GSO</vendor><aperture>300</aperture><focalLength>1500</focalLength></scope>
+    <scope id="opt_2" xsi:type="oal:fixedMagnificationOpticsType"><model>10x50</model><type>B</type><aperture>50</aperture><magnification>10</magnification></scope>
+  </scopes>
+  <eyepieces>
+    <eyepiece id="ep_1"><model>Nagler</model><vendor>TeleVue</vendor><focalLength>13</focalLength><apparentFOV unit="deg">82</apparentFOV></eyepiece>
+    <eyepiece id="ep_2"><model>Zoom</model><focalLength>8</focalLength><maxFocalLength>24</maxFocalLength></eyepiece>
+  </eyepieces>
+  <lenses><lens id="le_1"><model>Barlow</model><vendor>TeleVue</vendor><factor>2</factor></lens></lenses>
+  <filters><filter id="flt_1"><model>UHC</model><type>narrow band</type></filter><filter id="flt_2"><model>OIII</model><vendor>Lumicon</vendor><type>O-III</type></filter></filters>
+  <observation id="obs_1"><observer>usr_1</observer><site>site_1</site><session>se_1</session><target>_NGC2392</target><begin>2023-03-20T21:00:00+01:00</begin><faintestStar>6.2</faintestStar><sky-quality unit="mags-per-squarearcsec">21.1</sky-quality><seeing>2</seeing><scope>opt_1</scope><eyepiece>ep_1</eyepiece><filter>flt_1</filter><result xsi:type="oal:findingsDeepSkyType" lang="cs"><description>Eskymák</description><rating>2</rating></result></observation>
+  <observation id="obs_2"><observer>usr_1</observer><site>site_1</site><session>se_1</session><target>_STF1110</target><begin>2023-03-20T22:00:00+01:00</begin><end>2023-03-20T22:10:00+01:00</end><scope>opt_1</scope><lens>le_1</lens><result xsi:type="oal:findingsType" lang="en"><description>Castor split</description></result><result xsi:type="oal:findingsType" lang="cs"><description>Rozdělen</description></result></observation>
+  <observation id="obs_3"><observer>usr_1</observer><site>site_3</site><target>_M42</target><begin>2023-01-10T19:30:00</begin><faintestStar></faintestStar><scope>opt_2</scope></observation>
+  <observation id="obs_4"><observer>usr_1</observer><site>site_2</site><session>se_2</session><target>_JUPITER</target><begin>2023-04-01T22:00:00</begin><eyepiece>ep_2</eyepiece><filter>flt_2</filter><result xsi:type="oal:findingsType" lang="en"/></observation>
+</oal:observations>
+'''
+
+
+def _measure(oal_value):
+    return OalMeasure(value=oal_value.get_valueOf_(), unit=oal_value.get_unit()) if oal_value is not None else None
+
+
+def _xsi_type(oal_obj, base_class):
+    return type(oal_obj).__name__[len('Oal'):] if type(oal_obj) is not base_class else None
+
+
+def _items(container, getter):
+    return getattr(container, getter)() if container is not None else []
+
+
+def _generateds_document(file):
+    """ Project generated parser object tree to records returned by read_oal_observations """
+    root = parse(file, silence=True)
+    return OalDocument(
+        sites=[OalSite(id=s.get_id(), name=s.get_name(), longitude=_measure(s.get_longitude()),
+                       latitude=_measure(s.get_latitude()))
+               for s in _items(root.get_sites(), 'get_site')],
+        sessions=[OalSession(id=s.get_id(), begin=s.get_begin(), end=s.get_end(), site=s.get_site(),
+                             weather=s.get_weather(), equipment=s.get_equipment(), comments=s.get_comments())
+                  for s in _items(root.get_sessions(), 'get_session')],
+        targets=[OalTarget(id=t.get_id(), xsi_type=_xsi_type(t, OalobservationTargetType), name=t.get_name())
+                 for t in _items(root.get_targets(), 'get_target')],
+        scopes=[OalScope(id=s.get_id(), xsi_type=_xsi_type(s, None), model=s.get_model(), type=s.get_type(),
+                         vendor=s.get_vendor(), aperture=s.get_aperture(),
+                         focal_length=s.get_focalLength() if isinstance(s, OalscopeType) else None,
+                         magnification=s.get_magnification() if isinstance(s, OalfixedMagnificationOpticsType) else None)
+                for s in _items(root.get_scopes(), 'get_scope')],
+        eyepieces=[OalEyepiece(id=e.get_id(), model=e.get_model(), vendor=e.get_vendor(), focal_length=e.get_focalLength(),
+                               apparent_fov=_measure(e.get_apparentFOV()))
+                   for e in _items(root.get_eyepieces(), 'get_eyepiece')],
+        lenses=[OalLens(id=l.get_id(), model=l.get_model(), vendor=l.get_vendor(), factor=l.get_factor())
+                for l in _items(root.get_lenses(), 'get_lens')],
+        filters=[OalFilter(id=f.get_id(), model=f.get_model(), vendor=f.get_vendor(), type=f.get_type())
+                 for f in _items(root.get_filters(), 'get_filter')],
+        observations=[OalObservation(id=o.get_id(), site=o.get_site(), session=o.get_session(), target=o.get_target(),
+                                     begin=o.get_begin(), end=o.get_end(), faintest_star=o.get_faintestStar(),
+                                     sky_quality=_measure(o.get_sky_quality()), seeing=o.get_seeing(),
+                                     scope=o.get_scope(), eyepiece=o.get_eyepiece(), lens=o.get_lens(),
+                                     filter=o.get_filter(), results=[r.get_description() for r in o.get_result()])
+                      for o in root.get_observation()],
+    )
+
+
+def _large_document(observations):
+    rows = []
+    for i in range(observations):
+        rows.append('  <observation id="obs_x{i}"><observer>usr_1</observer><site>site_{site}</site>'
+                    '<session>se_{session}</session><target>{target}</target><begin>2022-01-01T20:{minute:02d}:00</begin>'
+                    '<scope>opt_1</scope><result xsi:type="oal:findingsType" lang="en"><description>x{i}</description>'
+                    '</result></observation>\n'.format(i=i, site=i % 2 + 1, session=i % 2 + 1, minute=i % 60,
+                                                        target=('_NGC2392', '_M42', '_STF1110')[i % 3]))
+    return OAL_DOCUMENT.replace('</oal:observations>', ''.join(rows) + '</oal:observations>')
+
+
+class OalReaderTestCase(unittest.TestCase):
+    def _assert_equivalent(self, content):
+        data = content.format(encoding='utf-8').encode('utf-8')
+        expected = _generateds_document(io.BytesIO(data))
+        self.assertEqual(read_oal_observations(io.BytesIO(data)), expected)
+        return expected
+
+    def test_read_equals_generateds_parse(self):
+        expected = self._assert_equivalent(OAL_DOCUMENT)
+
+        self.assertEqual(len(expected.observations), 4)
+        self.assertEqual([s.focal_length for s in expected.scopes], [1500.0, None])
+        self.assertEqual([s.magnification for s in expected.scopes], [None, 10.0])
+        self.assertEqual(expected.observations[1].results, ['Castor split', 'Rozdělen'])
+        self.assertEqual([t.is_double_star() for t in expected.targets], [False, False, True, True, False])
+
+    def test_read_large_document_equals_generateds_parse(self):
+        expected = self._assert_equivalent(_large_document(500))
+        self.assertEqual(len(expected.observations), 504)
+
+    def test_read_decoded_text_file(self):
+        fd, file_name = tempfile.mkstemp(suffix='.xml')
+        os.close(fd)
+        self.addCleanup(os.remove, file_name)
+        with open(file_name, 'w', encoding='iso-8859-2') as f:
+            f.write(OAL_DOCUMENT.format(encoding='iso-8859-2'))
+
+        # generated parser misreads decoded text with non utf-8 declaration, compare with parse of raw bytes
+        with open(file_name, 'rb') as oal_file:
+            expected = _generateds_document(oal_file)
+        with codecs.open(file_name, 'r', encoding='iso-8859-2') as oal_file:
+            oal_document = read_oal_observations(oal_file)
+
+        self.assertEqual(oal_document, expected)
+        self.assertEqual(oal_document.sites[0].name, 'Ondřejov')
+        self.assertEqual(read_oal_observations(file_name), expected)
@@ -0,0 +1,193 @@
+import io
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+
+from app import create_app, db
+from app.models import (
+    DeepskyObject,
+    DoubleStar,
+    Eyepiece,
+    Location,
+    Observation,
+    ObservationTargetType,
+    ObservingSession,
+    Seeing,
+    Telescope,
+    User,
+    dso_observation_association_table,
+)
+from app.commons.oal_export_utils import (
+    create_double_star_observation_target,
+    create_dso_observation_target,
+    get_double_star_target_id,
+    get_dso_target_id,
+)
+from app.commons.openastronomylog import Oalobservations, OaltargetsType
+from app.main.observation.observation_export import (
+    _append_oalobservation_type,
+    _create_oal_equipment,
+    _create_oal_observers_sites_sessions,
+    iter_oal_observations_xml,
+)
+
+
+def _create_oal_observations(user, observing_sessions):
+    """
+    Reference export - whole document as generateDS object tree built from lazy loaded relationships.
+    """
+    oal_observers, oal_sites, oal_sessions = _create_oal_observers_sites_sessions(user, observing_sessions)
+
+    # Targets
+    oal_targets = OaltargetsType()
+    proc_targets = set()
+    for observing_session in observing_sessions:
+        for observation in observing_session.observations:
+            if observation.target_type == ObservationTargetType.DSO:
+                for dso in observation.deepsky_objects:
+                    target_id = '_dso_{}'.format(dso.id)
+                    if target_id in proc_targets:
+                        continue
+                    proc_targets.add(target_id)
+                    oal_obs_target = create_dso_observation_target(dso)
+                    oal_targets.add_target(oal_obs_target)
+            elif observation.target_type == ObservationTargetType.DBL_STAR:
+                target_id = '_dbl_{}'.format(observation.double_star.id)
+                if target_id in proc_targets:
+                    continue
+                proc_targets.add(target_id)
+                oal_obs_target = create_double_star_observation_target(observation.double_star)
+                oal_targets.add_target(oal_obs_target)
+
+    oal_scopes, oal_eyepieces, oal_lenses, oal_filters = _create_oal_equipment(user)
+
+    oal_observation_ar = []
+
+    for observing_session in observing_sessions:
+        for observation in observing_session.observations:
+            if observation.target_type == ObservationTargetType.DSO:
+                for dso in observation.deepsky_objects:
+                    _append_oalobservation_type(user, observing_session, observation, get_dso_target_id(dso), oal_observation_ar)
+            elif observation.target_type == ObservationTargetType.DBL_STAR:
+                _append_oalobservation_type(user, observing_session, observation, get_double_star_target_id(observation.double_star), oal_observation_ar)
+
+    oal_observations = Oalobservations(observers=oal_observers, sites=oal_sites, sessions=oal_sessions, targets=oal_targets,
+                                       scopes=oal_scopes, eyepieces=oal_eyepieces, lenses=oal_lenses, filters=oal_filters,
+                                       images=None, observation=oal_observation_ar)
+
+    return oal_observations
+
+
+class ObservationExportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.user = User(user_name='observer', email='observer@example.com', full_name='Jan Novak', lang_code='en')
+        self.location = Location(name='Ondrejov', longitude=14.78, latitude=49.91)
+        self.dsos = [DeepskyObject(name='NGC{}'.format(2392 + i), type=('PN', 'GX', 'OC', 'GC')[i % 4], ra=1.0 + i * 0.01,
+                                   dec=0.3, mag=9.0 + i * 0.1) for i in range(8)]
+        self.double_star = DoubleStar(common_cat_id='STF 1110', components='AB', ra_first=1.98, dec_first=0.55, mag_first=1.9)
+        db.session.add_all([self.user, self.location, self.double_star] + self.dsos)
+        db.session.commit()
+        self.telescope = Telescope(name='Dob', model='Dobson', aperture_mm=300, focal_length_mm=1500, user_id=self.user.id,
+                                   is_deleted=False)
+        self.eyepiece = Eyepiece(name='Nagler', model='Nagler', focal_length_mm=13, fov_deg=82, user_id=self.user.id,
+                                 is_deleted=False)
+        db.session.add_all([self.telescope, self.eyepiece])
+        db.session.commit()
+        self.user_id = self.user.id
+        self.location_id = self.location.id
+        self.telescope_id = self.telescope.id
+        self.eyepiece_id = self.eyepiece.id
+        self.double_star_id = self.double_star.id
+        self.dso_ids = [dso.id for dso in self.dsos]
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_sessions(self, sessions_count, observations_per_session):
+        date_from = datetime(2023, 3, 1, 20, 0, 0)
+        for i in range(sessions_count):
+            observing_session = ObservingSession(
+                user_id=self.user_id, title='Session {}'.format(i),
+                date_from=date_from + timedelta(days=i), date_to=date_from + timedelta(days=i, hours=5),
+                location_id=self.location_id if i % 2 == 0 else None,
+                location_position=None if i % 2 == 0 else '49.91N, 14.78E',
+                sqm=20.5, faintest_star=6.1, seeing=Seeing.GOOD, notes='Notes <{}> & more'.format(i))
+            db.session.add(observing_session)
+            db.session.flush()
+            for j in range(observations_per_session):
+                observation = Observation(
+                    user_id=self.user_id, observing_session_id=observing_session.id,
+                    date_from=observing_session.date_from + timedelta(minutes=j),
+                    date_to=observing_session.date_from + timedelta(minutes=j + 10),
+                    telescope_id=self.telescope_id, eyepiece_id=self.eyepiece_id if j % 2 else None,
+                    notes='Observation {} of "{}"'.format(j, i))
+                if j % 5 == 4:
+                    observation.target_type = ObservationTargetType.DBL_STAR
+                    observation.double_star_id = self.double_star_id
+                else:
+                    observation.target_type = ObservationTargetType.DSO
+                    observation.deepsky_objects.append(db.session.get(DeepskyObject, self.dso_ids[(i + j) % len(self.dso_ids)]))
+                    if j % 7 == 6:
+                        observation.deepsky_objects.append(db.session.get(DeepskyObject, self.dso_ids[(i + j + 1) % len(self.dso_ids)]))
+                db.session.add(observation)
+        db.session.commit()
+        db.session.expunge_all()
+
+    def _load_sessions(self):
+        return ObservingSession.query.filter_by(user_id=self.user_id) \
+            .options(joinedload(ObservingSession.location)) \
+            .order_by(ObservingSession.id) \
+            .all()
+
+    def _count_queries(self, fn):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            result = fn()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+        return result, len(statements)
+
+    def test_streamed_document_equals_generateds_export(self):
+        self._add_sessions(4, 12)
+        user = db.session.get(User, self.user_id)
+        buf = io.StringIO()
+        _create_oal_observations(user, self._load_sessions()).export(buf, 0)
+        db.session.expunge_all()
+
+        user = db.session.get(User, self.user_id)
+        streamed = ''.join(iter_oal_observations_xml(user, self._load_sessions()))
+
+        self.assertEqual(streamed.count('<observation id='), 4 * (12 + 1))
+        self.assertEqual(streamed, buf.getvalue())
+
+    def test_query_count_does_not_grow_with_observations(self):
+        self._add_sessions(2, 5)
+        user = db.session.get(User, self.user_id)
+        sessions = self._load_sessions()
+        small_doc, small = self._count_queries(lambda: ''.join(iter_oal_observations_xml(user, sessions)))
+
+        db.session.execute(dso_observation_association_table.delete())
+        Observation.query.delete()
+        ObservingSession.query.delete()
+        db.session.commit()
+        self._add_sessions(2, 60)
+        user = db.session.get(User, self.user_id)
+        sessions = self._load_sessions()
+        large_doc, large = self._count_queries(lambda: ''.join(iter_oal_observations_xml(user, sessions)))
+
+        self.assertEqual(small_doc.count('<observation id='), 2 * 5)
+        self.assertEqual(large_doc.count('<observation id='), 2 * (60 + 7))
+        self.assertEqual(large, small)
@@ -0,0 +1,159 @@
+import io
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import (
+    DeepskyObject,
+    DoubleStar,
+    ImportHistoryRec,
+    ImportHistoryRecStatus,
+    ImportType,
+    Observation,
+    ObservationTargetType,
+    ObservingSession,
+    Telescope,
+    User,
+    dso_observation_association_table,
+)
+from app.main.observation.observation_import import import_observations
+
+OAL_HEADER = '''<?xml version="1.0" encoding="utf-8"?>
+<oal:observations xmlns:oal="http://groups.google.com/group/openastronomylog" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" version="2.1">
+  <observers><observer id="usr_1"><name>Jan</name><surname>Novak</surname></observer></observers>
+  <sites>
+    <site id="site_1"><name>Ondrejov</name><longitude unit="deg">14.78</longitude><latitude unit="deg">49.91</latitude><timezone>60</timezone></site>
+  </sites>
+  <sessions>
+    <session id="se_1" lang="en"><begin>2023-03-20T20:00:00</begin><end>2023-03-21T02:00:00</end><site>site_1</site><weather>clear</weather></session>
+  </sessions>
+  <targets>
+    <target id="_NGC2392" xsi:type="oal:deepSkyPN"><datasource>CzSky</datasource><name>NGC2392</name></target>
+    <target id="_M42" xsi:type="oal:deepSkyGN"><datasource>CzSky</datasource><name>M42</name></target>
+    <target id="_STF1110" xsi:type="oal:deepSkyDS"><datasource>CzSky</datasource><name>STF 1110</name></target>
+    <target id="_NGC9999" xsi:type="oal:deepSkyGX"><datasource>CzSky</datasource><name>NGC9999</name></target>
+  </targets>
+  <scopes>
+    <scope id="opt_1" xsi:type="oal:scopeType"><model>Dobson</model><type>N</type><vendor>GSO</vendor><aperture>300</aperture><focalLength>1500</focalLength></scope>
+  </scopes>
+  <eyepieces>
+    <eyepiece id="ep_1"><model>Nagler</model><vendor>TeleVue</vendor><focalLength>13</focalLength><apparentFOV unit="deg">82</apparentFOV></eyepiece>
+  </eyepieces>
+  <lenses><lens id="le_1"><model>Barlow</model><factor>2</factor></lens></lenses>
+  <filters><filter id="flt_1"><model>UHC</model><type>narrow band</type></filter></filters>
+  <observation id="obs_1"><observer>usr_1</observer><site>site_1</site><session>se_1</session><target>_NGC2392</target><begin>2023-03-20T21:00:00</begin><faintestStar>6.2</faintestStar><seeing>2</seeing><scope>opt_1</scope><eyepiece>ep_1</eyepiece><filter>flt_1</filter><result xsi:type="oal:findingsType" lang="en"><description>Eskimo</description></result></observation>
+  <observation id="obs_2"><observer>usr_1</observer><site>site_1</site><session>se_1</session><target>_STF1110</target><begin>2023-03-20T22:00:00</begin><scope>opt_1</scope><result xsi:type="oal:findingsType" lang="en"><description>Castor split</description></result></observation>
+  <observation id="obs_3"><observer>usr_1</observer><site>site_1</site><target>_M42</target><begin>2023-01-10T19:30:00</begin><end>2023-01-10T20:00:00</end><sky-quality unit="mags-per-squarearcsec">20.8</sky-quality><lens>le_1</lens><result xsi:type="oal:findingsType" lang="en"><description>Trapezium</description></result></observation>
+  <observation id="obs_4"><observer>usr_1</observer><site>site_1</site><session>se_1</session><target>_NGC9999</target><begin>2023-03-20T23:00:00</begin><result xsi:type="oal:findingsType" lang="en"><description>Missing</description></result></observation>
+'''
+
+OAL_ADHOC_OBSERVATION = '''  <observation id="obs_x{i}"><observer>usr_1</observer><site>site_1</site><target>{target}</target><begin>{begin}</begin><scope>opt_1</scope><result xsi:type="oal:findingsType" lang="en"><description>x{i}</description></result></observation>
+'''
+
+OAL_FOOTER = '</oal:observations>\n'
+
+
+def _oal_file(extra_observations=0):
+    body = ''
+    begin = datetime(2022, 1, 1, 20, 0, 0)
+    for i in range(extra_observations):
+        target = ('_NGC2392', '_M42', '_STF1110')[i % 3]
+        body += OAL_ADHOC_OBSERVATION.format(i=i, target=target, begin=(begin + timedelta(days=i)).isoformat())
+    return io.BytesIO((OAL_HEADER + body + OAL_FOOTER).encode('utf-8'))
+
+
+class ObservationImportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('testing')
+        # import log messages are localized
+        self.app_context = self.app.test_request_context(base_url='https://www.czsky.eu')
+        self.app_context.push()
+        db.create_all()
+        self.user = User(user_name='observer', email='observer@example.com')
+        self.ngc2392 = DeepskyObject(name='NGC2392', type='PN')
+        self.m42 = DeepskyObject(name='M42', type='BN')
+        self.stf1110 = DoubleStar(common_cat_id='STF 1110', wds_number='07346+3153')
+        self.import_history_rec = ImportHistoryRec(import_type=ImportType.OBSERVATION,
+                                                   status=ImportHistoryRecStatus.PROCESSING)
+        db.session.add_all([self.user, self.ngc2392, self.m42, self.stf1110, self.import_history_rec])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _import(self, file):
+        return import_observations(self.user.id, self.user.id, self.import_history_rec.id, file)
+
+    def test_import_creates_sessions_equipment_and_observations(self):
+        log_warn, log_error = self._import(_oal_file())
+
+        self.assertEqual(log_warn, [])
+        self.assertEqual([str(e) for e in log_error], ['DSO "NGC9999" not found'])
+
+        sessions = ObservingSession.query.filter_by(user_id=self.user.id).order_by(ObservingSession.date_from).all()
+        self.assertEqual(len(sessions), 2)
+        adhoc_session, oal_session = sessions
+        self.assertEqual(oal_session.title, 'Ondrejov 20.03.2023')
+        self.assertEqual(oal_session.faintest_star, 6.2)
+        self.assertEqual(adhoc_session.title, '2023-01-10')
+        self.assertEqual(adhoc_session.sqm, 20.8)
+
+        observations = Observation.query.filter_by(user_id=self.user.id).order_by(Observation.date_from).all()
+        self.assertEqual(len(observations), 3)
+        m42_obs, ngc2392_obs, stf1110_obs = observations
+        self.assertEqual([d.id for d in ngc2392_obs.deepsky_objects], [self.ngc2392.id])
+        self.assertEqual(ngc2392_obs.observing_session_id, oal_session.id)
+        self.assertEqual(ngc2392_obs.telescope.model, 'Dobson')
+        self.assertEqual(ngc2392_obs.eyepiece.focal_length_mm, 13)
+        self.assertEqual(ngc2392_obs.filter.model, 'UHC')
+        self.assertEqual(ngc2392_obs.notes, 'Eskimo')
+        self.assertEqual(stf1110_obs.target_type, ObservationTargetType.DBL_STAR)
+        self.assertEqual(stf1110_obs.double_star_id, self.stf1110.id)
+        self.assertEqual([d.id for d in m42_obs.deepsky_objects], [self.m42.id])
+        self.assertEqual(m42_obs.observing_session_id, adhoc_session.id)
+        self.assertEqual(m42_obs.lens.magnification, 2)
+        self.assertEqual(self.import_history_rec.log, 'Imported 3 of 4 observations')
+
+    def test_reimport_updates_existing_observations(self):
+        self._import(_oal_file())
+        modified = Observation.query.filter_by(user_id=self.user.id, double_star_id=self.stf1110.id).first()
+        modified.notes = 'My notes'
+        modified.update_date = datetime.now() + timedelta(minutes=1)
+        db.session.commit()
+
+        log_warn, _ = self._import(_oal_file())
+
+        self.assertEqual(len(log_warn), 1)
+        self.assertEqual(Observation.query.filter_by(user_id=self.user.id).count(), 3)
+        self.assertEqual(ObservingSession.query.filter_by(user_id=self.user.id).count(), 2)
+        self.assertEqual(Telescope.query.filter_by(user_id=self.user.id).count(), 1)
+        self.assertEqual(db.session.get(Observation, modified.id).notes, 'My notes')
+
+    def test_query_count_does_not_grow_with_observations(self):
+        def count_queries(file):
+            statements = []
+
+            def before_cursor_execute(conn, cursor, statement, *args):
+                if statement.lstrip().upper().startswith('SELECT'):
+                    statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            try:
+                self._import(file)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+            return len(statements)
+
+        small = count_queries(_oal_file(3))
+        db.session.execute(dso_observation_association_table.delete())
+        Observation.query.delete()
+        ObservingSession.query.delete()
+        db.session.commit()
+        large = count_queries(_oal_file(120))
+
+        self.assertEqual(Observation.query.filter_by(user_id=self.user.id).count(), 123)
+        self.assertEqual(large, small)
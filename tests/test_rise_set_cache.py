@@ -0,0 +1,87 @@
+import unittest
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.commons.rise_set_cache import (
+    LocalRiseSetStore,
+    RedisRiseSetStore,
+    get_rise_set_elements,
+    rise_set_night_key,
+)
+
+FOR_DATE = date(2026, 3, 10)
+
+
+class _FakePipeline:
+    def __init__(self, data):
+        self.data = data
+        self.commands = []
+
+    def hset(self, key, mapping):
+        self.commands.append((key, mapping))
+
+    def expireat(self, key, when):
+        pass
+
+    def execute(self):
+        for key, mapping in self.commands:
+            self.data.setdefault(key, {}).update(mapping)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def hmget(self, key, fields):
+        values = self.data.get(key, {})
+        return [values.get(field) for field in fields]
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self.data)
+
+
+class _DownRedis:
+    def hmget(self, key, fields):
+        raise RedisConnectionError()
+
+    def pipeline(self, transaction=True):
+        raise RedisConnectionError()
+
+
+class RiseSetCacheTestCase(unittest.TestCase):
+    def test_local_store_is_bounded_by_nights(self):
+        store = LocalRiseSetStore(max_nights=1)
+        store.put_many('n1', FOR_DATE, {1: (2461110.5, 0.25)})
+        store.put_many('n2', FOR_DATE, {2: (2461111.5, 0.3)})
+
+        self.assertEqual(store.get_many('n1', [1]), {})
+        self.assertEqual(store.get_many('n2', [1, 2]), {2: (2461111.5, 0.3)})
+
+    def test_redis_store_bulk_round_trip(self):
+        store = RedisRiseSetStore(_FakeRedis(), LocalRiseSetStore(max_nights=4))
+        store.put_many('n1', FOR_DATE, {1: (2461110.5, 0.25), 2: (2461110.7, float('inf'))})
+
+        self.assertEqual(store.get_many('n1', [1, 2, 3]), {1: (2461110.5, 0.25), 2: (2461110.7, float('inf'))})
+
+    def test_redis_store_falls_back_to_local_store(self):
+        local_store = LocalRiseSetStore(max_nights=4)
+        store = RedisRiseSetStore(_DownRedis(), local_store)
+        with patch('app.commons.rise_set_cache.current_app', new=MagicMock()):
+            store.put_many('n1', FOR_DATE, {1: (2461110.5, 0.25)})
+            self.assertEqual(store.get_many('n1', [1]), {1: (2461110.5, 0.25)})
+        self.assertEqual(local_store.get_many('n1', [1]), {1: (2461110.5, 0.25)})
+
+    def test_elements_are_computed_once_per_night(self):
+        store = LocalRiseSetStore(max_nights=4)
+        items = [(1, 0.18, 0.72), (2, 3.5, -0.2)]
+        with patch('app.commons.rise_set_cache.get_rise_set_store', return_value=store):
+            elements = get_rise_set_elements(50.08, 14.42, FOR_DATE, items)
+            with patch('app.commons.rise_set_cache.compute_rise_set_elements') as compute:
+                cached_elements = get_rise_set_elements(50.08, 14.42, FOR_DATE, items)
+                compute.assert_not_called()
+
+        self.assertEqual(list(elements.transit), list(cached_elements.transit))
+        self.assertEqual(list(elements.half_arc), list(cached_elements.half_arc))
+        self.assertEqual(len(store.get_many(rise_set_night_key(50.08, 14.42, FOR_DATE), [1, 2])), 2)
@@ -0,0 +1,89 @@
+import unittest
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+import astropy.units as u
+from astropy.coordinates import EarthLocation, SkyCoord
+from astropy.time import Time
+from astroplan import Observer
+
+from app.commons.rise_set_utils import (
+    RiseSetElements,
+    RiseSetEngine,
+    WHICH_NEXT,
+    WHICH_PREVIOUS,
+    datetime_to_jd,
+    jd_to_datetime,
+)
+
+# agreement with astroplan in seconds
+TOLERANCE_SEC = 60.0
+
+
+class RiseSetUtilsTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.ra = rng.uniform(0.0, 2.0 * np.pi, 12)
+        self.dec = np.arcsin(rng.uniform(-0.5, 0.9, 12))
+        self.lat, self.lon = 50.08, 14.42
+        self.t = Time('2026-03-10 20:00:00')
+        self.engine = RiseSetEngine(self.ra, self.dec, self.lat, self.lon, self.t.jd)
+
+    def _assert_close_to_astroplan(self, expected, actual):
+        expected = np.ma.filled(expected.jd, np.nan)
+        np.testing.assert_array_equal(np.isnan(expected), np.isnan(actual))
+        # astroplan may skip event lying at the very edge of its search window, ignore those
+        mask = ~np.isnan(expected) & (np.abs(expected - self.t.jd) > 0.01)
+        diff_sec = np.abs(expected[mask] - actual[mask]) * 86400.0
+        self.assertLess(diff_sec.max(), TOLERANCE_SEC)
+
+    def test_events_match_astroplan(self):
+        observer = Observer(location=EarthLocation.from_geodetic(self.lon * u.deg, self.lat * u.deg, 0))
+        coords = SkyCoord(self.ra * u.rad, self.dec * u.rad)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            rise = observer.target_rise_time(self.t, coords, which='next', n_grid_points=200)
+            transit = observer.target_meridian_transit_time(self.t, coords, which='next', n_grid_points=200)
+            set_ = observer.target_set_time(self.t, coords, which='previous', n_grid_points=200)
+            is_up = observer.target_is_up(self.t, coords)
+
+        self._assert_close_to_astroplan(rise, self.engine.rise_jd(self.t.jd, WHICH_NEXT))
+        self._assert_close_to_astroplan(transit, self.engine.transit_jd(self.t.jd, WHICH_NEXT))
+        self._assert_close_to_astroplan(set_, self.engine.set_jd(self.t.jd, WHICH_PREVIOUS))
+        np.testing.assert_array_equal(np.asarray(is_up), self.engine.is_up(self.t.jd))
+
+    def test_circumpolar_and_never_rising_have_no_events(self):
+        engine = RiseSetEngine(np.array([1.0, 1.0]), np.radians([85.0, -85.0]), self.lat, self.lon, self.t.jd)
+        self.assertTrue(engine.circumpolar[0])
+        self.assertTrue(engine.never_rises[1])
+        self.assertTrue(np.isnan(engine.rise_jd(self.t.jd)).all())
+        self.assertTrue(np.isnan(engine.set_jd(self.t.jd)).all())
+        self.assertFalse(np.isnan(engine.transit_jd(self.t.jd)).any())
+        np.testing.assert_array_equal(engine.is_up(self.t.jd), [True, False])
+
+    def test_altitude_is_zero_at_rise_and_culminates_at_transit(self):
+        rise = self.engine.rise_jd(self.t.jd)
+        transit = self.engine.transit_jd(self.t.jd, WHICH_NEXT)
+        max_alt = self.engine.max_altitude_deg(self.t.jd, self.t.jd + 1.0)
+        for i in range(len(self.engine)):
+            if not np.isnan(rise[i]):
+                self.assertAlmostEqual(self.engine.altitude_deg(rise[i])[i], 0.0, places=6)
+            self.assertAlmostEqual(max_alt[i], self.engine.altitude_deg(transit[i])[i], places=6)
+
+    def test_elements_reproduce_engine_events_in_any_window(self):
+        engine = RiseSetEngine(np.append(self.ra, [1.0, 1.0]), np.append(self.dec, np.radians([85.0, -85.0])),
+                               self.lat, self.lon, self.t.jd)
+        elements = RiseSetElements(*engine.elements(self.t.jd))
+        for jd in (self.t.jd - 0.3, self.t.jd, self.t.jd + 0.4):
+            for which in (WHICH_NEXT, WHICH_PREVIOUS):
+                np.testing.assert_allclose(elements.rise_jd(jd, which), engine.rise_jd(jd, which), atol=1e-9)
+                np.testing.assert_allclose(elements.set_jd(jd, which), engine.set_jd(jd, which), atol=1e-9)
+                np.testing.assert_allclose(elements.transit_jd(jd, which), engine.transit_jd(jd, which), atol=1e-9)
+            np.testing.assert_array_equal(elements.is_up(jd), engine.is_up(jd))
+
+    def test_jd_datetime_round_trip(self):
+        dt = datetime(2026, 3, 10, 20, 0, tzinfo=timezone.utc)
+        self.assertAlmostEqual(datetime_to_jd(dt), self.t.jd, places=8)
+        self.assertEqual(jd_to_datetime(datetime_to_jd(dt)).replace(microsecond=0), dt)
+        self.assertIsNone(jd_to_datetime(np.nan))
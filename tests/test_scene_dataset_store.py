@@ -0,0 +1,70 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from flask import Flask
+
+from app.commons.scene_dataset_store import (
+    SCENE_DATASET_IMMUTABLE_CACHE_CONTROL,
+    SceneDatasetStore,
+    encode_scene_dataset,
+    make_scene_dataset_response,
+    read_scene_datasets,
+    write_scene_datasets,
+)
+
+PAYLOAD = {'version': 'dso-outlines-v1', 'dataset_id': 'dso-outlines-abc', 'items': [{'id': 'M31'}],
+           'stats': {'objects_count': 1}}
+
+
+class SceneDatasetStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+
+    def test_written_datasets_are_read_back_for_same_catalogs(self):
+        dataset = encode_scene_dataset('dso-outlines', PAYLOAD)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_scene_datasets(tmp_dir, {'dso-outlines': dataset}, 'cat1')
+            datasets = read_scene_datasets(tmp_dir, 'cat1')
+            self.assertEqual(read_scene_datasets(tmp_dir, 'cat2'), {})
+
+            # rebuild with other content removes files of the previous build
+            write_scene_datasets(tmp_dir, {'dso-outlines': encode_scene_dataset('dso-outlines', dict(PAYLOAD, items=[]))}, 'cat1')
+            self.assertFalse(any(dataset.digest in f for f in os.listdir(tmp_dir)))
+
+        self.assertEqual(datasets['dso-outlines'].digest, dataset.digest)
+        self.assertEqual(datasets['dso-outlines'].meta, {'dataset_id': 'dso-outlines-abc', 'stats': {'objects_count': 1}})
+        self.assertEqual(json.loads(datasets['dso-outlines'].raw_data()), PAYLOAD)
+
+    def test_store_builds_missing_dataset_once(self):
+        built = []
+
+        def build(name):
+            built.append(name)
+            return PAYLOAD
+
+        store = SceneDatasetStore(build, None, 'cat1')
+        self.assertIs(store.get('dso-outlines'), store.get('dso-outlines'))
+        self.assertEqual(built, ['dso-outlines'])
+
+    def test_response_is_precompressed_and_cacheable(self):
+        dataset = encode_scene_dataset('dso-outlines', PAYLOAD)
+        url = '/chart/dso-outlines-v1/catalog?dsv=' + dataset.digest
+        with self.app.test_request_context(url, headers={'Accept-Encoding': 'gzip'}):
+            response = make_scene_dataset_response(dataset)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.get_data())), PAYLOAD)
+        self.assertEqual(response.headers['Cache-Control'], SCENE_DATASET_IMMUTABLE_CACHE_CONTROL)
+
+        with self.app.test_request_context('/chart/dso-outlines-v1/catalog',
+                                           headers={'If-None-Match': '"{}"'.format(dataset.digest)}):
+            response = make_scene_dataset_response(dataset)
+        self.assertEqual(response.status_code, 304)
+        self.assertNotEqual(response.headers['Cache-Control'], SCENE_DATASET_IMMUTABLE_CACHE_CONTROL)
+
+        with self.app.test_request_context('/chart/dso-outlines-v1/catalog'):
+            response = make_scene_dataset_response(dataset)
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(json.loads(response.get_data()), PAYLOAD)
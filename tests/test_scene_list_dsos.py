@@ -0,0 +1,54 @@
+import math
+import unittest
+from types import SimpleNamespace
+
+from app.commons.chart_scene import (
+    add_scene_list_dsos,
+    ensure_scene_dso_item,
+)
+
+
+def _dso(name, ra_deg, dec_deg):
+    return SimpleNamespace(name=name, ra=math.radians(ra_deg), dec=math.radians(dec_deg), mag=10.0, type='GX',
+                           rlong=None, rshort=None, position_angle=None)
+
+
+def _scene(ra_deg, dec_deg, fov_deg):
+    return {
+        'meta': {'fov_deg': fov_deg, 'center': {'equatorial_ra': math.radians(ra_deg), 'equatorial_dec': math.radians(dec_deg)}},
+        'objects': {'dso': [{'id': 'NGC1', 'label': 'NGC 1'}], 'highlights': []},
+    }
+
+
+class SceneListDsosTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dsos = [_dso('NGC {}'.format(i), (i * 7) % 360, ((i * 13) % 170) - 85) for i in range(1, 2001)]
+
+    def _add(self, scene):
+        add_scene_list_dsos(scene, self.dsos + [None], lambda dso: {'id': dso.name.replace(' ', '')})
+
+    def test_only_members_near_field_are_emitted(self):
+        scene = _scene(10.0, 20.0, 10.0)
+        self._add(scene)
+        emitted = {h['id'] for h in scene['objects']['highlights']}
+        radius = math.radians(10.0) / 2.0 * math.sqrt(2.0) * 1.5
+        center = _dso('c', 10.0, 20.0)
+        for dso in self.dsos:
+            sep = math.acos(min(1.0, math.sin(dso.dec) * math.sin(center.dec) +
+                                math.cos(dso.dec) * math.cos(center.dec) * math.cos(dso.ra - center.ra)))
+            self.assertEqual(dso.name.replace(' ', '') in emitted, sep <= radius, dso.name)
+        self.assertTrue(emitted)
+        self.assertEqual(scene['meta']['list']['total'], len(self.dsos))
+        self.assertEqual(scene['meta']['list']['count'], len(emitted))
+
+        # existing scene item is reused, new ones are appended once
+        ids = [item['id'] for item in scene['objects']['dso']]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(ids), len(emitted | {'NGC1'}))
+
+    def test_ensure_scene_dso_item_marks_existing_item(self):
+        scene = _scene(0.0, 0.0, 10.0)
+        ensure_scene_dso_item(scene, _dso('NGC 1', 0.0, 0.0))
+        ensure_scene_dso_item(scene, _dso('NGC 2', 0.0, 0.0))
+        self.assertEqual([item['id'] for item in scene['objects']['dso']], ['NGC1', 'NGC2'])
+        self.assertTrue(all(item['force_visible'] for item in scene['objects']['dso']))
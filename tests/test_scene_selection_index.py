@@ -0,0 +1,43 @@
+import math
+import unittest
+
+import numpy as np
+
+from app.commons.chart_scene import _bbox_from_point, _build_selection_index, _stereographic_project_px
+
+
+def _scalar_selection_index(ids, ras, decs, radii, center_ra, center_dec, width, height, fov_deg, mirror_x, mirror_y):
+    selection_index, img_map = [], []
+    for obj_id, ra, dec, radius_px in zip(ids, ras, decs, radii):
+        pxy = _stereographic_project_px(ra, dec, center_ra, center_dec, width, height, fov_deg, mirror_x, mirror_y)
+        if pxy is None:
+            continue
+        bbox = _bbox_from_point(pxy[0], pxy[1], radius_px, width, height)
+        if bbox is None:
+            continue
+        selection_index.append({"id": obj_id, "bbox": list(bbox)})
+        img_map.extend([obj_id, *bbox])
+    return selection_index, img_map
+
+
+class SceneSelectionIndexTestCase(unittest.TestCase):
+    def test_matches_scalar_projection(self):
+        rng = np.random.default_rng(11)
+        n = 3000
+        ras = rng.uniform(0.0, 2.0 * math.pi, n)
+        decs = np.arcsin(rng.uniform(-1.0, 1.0, n))
+        radii = rng.choice([3.0, 6.0, 8.0], n)
+        ids = ['o{}'.format(i) for i in range(n)]
+        for center_ra, center_dec, fov_deg, mirror_x, mirror_y in ((0.1, 0.2, 60.0, False, False),
+                                                                   (3.3, -1.2, 120.0, True, False),
+                                                                   (6.2, 1.5, 180.0, False, True)):
+            expected = _scalar_selection_index(ids, ras, decs, radii, center_ra, center_dec, 1024, 768, fov_deg,
+                                               mirror_x, mirror_y)
+            actual = _build_selection_index(ids, ras, decs, radii, center_ra, center_dec, 1024, 768, fov_deg,
+                                            mirror_x, mirror_y)
+            self.assertTrue(expected[0])
+            self.assertEqual(actual, expected)
+
+    def test_empty(self):
+        self.assertEqual(_build_selection_index([], np.array([]), np.array([]), np.array([]), 0.0, 0.0, 800, 600,
+                                                10.0, False, False), ([], []))
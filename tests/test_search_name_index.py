@@ -0,0 +1,122 @@
+import unittest
+
+from app import create_app, db
+from app.commons.search_name_index import (
+    index_object_search_names,
+    normalize_search_name,
+    rebuild_search_names,
+    search_object_ids,
+    search_object_ids_select,
+    search_object_names,
+)
+from app.commons.search_sky_object_utils import search_comet, search_minor_planet, search_named_object
+from app.models import (
+    Comet,
+    DeepskyObject,
+    MinorPlanet,
+    SEARCH_NAME_COMET,
+    SEARCH_NAME_DSO,
+    SEARCH_NAME_MINOR_PLANET,
+)
+
+COMET_DESIGNATIONS = [
+    'C/2023 A3 (Tsuchinshan-ATLAS)',
+    'C/2022 E3 (ZTF)',
+    '12P/Pons-Brooks',
+    '13P/Olbers',
+    'C/2020 F3 (NEOWISE)',
+    'C/2021 A1 (Leonard)',
+    'P/2010 A2 (LINEAR)',
+]
+
+
+class SearchNameIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        for i, designation in enumerate(COMET_DESIGNATIONS):
+            db.session.add(Comet(comet_id=designation, designation=designation, mag=5.0 + i))
+        db.session.add_all([
+            MinorPlanet(int_designation=1, mpc_designation='00001', designation='(1) Ceres'),
+            MinorPlanet(int_designation=4, mpc_designation='00004', designation='(4) Vesta'),
+            MinorPlanet(int_designation=1234, mpc_designation='01234', designation='(1234) Elyna'),
+            MinorPlanet(int_designation=12345, mpc_designation='1A345', designation='(12345) Ceresia'),
+            DeepskyObject(name='NGC1976', common_name='Orion Nebula'),
+            DeepskyObject(name='M42', common_name='Orion Nebula'),
+            DeepskyObject(name='NGC2392', common_name='Eskimo Nebula'),
+            DeepskyObject(name='PGC12340'),
+        ])
+        db.session.commit()
+        rebuild_search_names()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_normalize(self):
+        self.assertEqual(normalize_search_name('  C/2023 A3 (Tsuchinshan-ATLAS) '), 'c/2023 a3 (tsuchinshan atlas)')
+        self.assertEqual(normalize_search_name('Ondřejov_Kleť'), 'ondrejov klet')
+
+    def test_substring_search_equals_like_scan(self):
+        for query in ['2023', 'neowise', 'P/', 'Pons Brooks', 'c/202', 'A', 'xyz', '(L']:
+            expected = {c.id for c in Comet.query.all() if normalize_search_name(query) in normalize_search_name(c.designation)}
+            self.assertEqual(set(search_object_ids(SEARCH_NAME_COMET, query)), expected, query)
+            comet_ids = {c.id for c in Comet.query.filter(Comet.id.in_(search_object_ids_select(SEARCH_NAME_COMET, query)))}
+            self.assertEqual(comet_ids, expected, query)
+
+    def test_ranking(self):
+        hits = search_object_names('ceres', (SEARCH_NAME_MINOR_PLANET,))
+        self.assertEqual([h.name for h in hits], ['(1) Ceres', '(12345) Ceresia'])
+
+        hits = search_object_names('1234', (SEARCH_NAME_MINOR_PLANET,))
+        self.assertEqual([(h.name, h.rank) for h in hits], [('1234', 0), ('12345', 1)])
+
+        hits = search_object_names('orion nebula')
+        self.assertEqual({(h.object_type, h.rank) for h in hits}, {(SEARCH_NAME_DSO, 0)})
+        self.assertEqual(len(hits), 2)
+
+        self.assertEqual(len(search_object_names('e', limit=3)), 3)
+
+    def test_search_comet_and_minor_planet(self):
+        self.assertEqual(search_comet('Tsuchinshan').designation, 'C/2023 A3 (Tsuchinshan-ATLAS)')
+        self.assertIsNone(search_comet('Hale-Bopp'))
+        self.assertEqual(search_minor_planet('00004').designation, '(4) Vesta')
+        self.assertEqual(search_minor_planet('1234').designation, '(1234) Elyna')
+        self.assertEqual(search_minor_planet('Cere').designation, '(1) Ceres')
+
+    def test_search_named_object(self):
+        object_type, obj = search_named_object('eskimo-nebula')
+        self.assertEqual((object_type, obj.name), (SEARCH_NAME_DSO, 'NGC2392'))
+        # DSO names match exactly only, unknown designation goes to Simbad
+        self.assertEqual(search_named_object('Eskimo'), (None, None))
+        self.assertEqual(search_named_object('PGC1234'), (None, None))
+        object_type, obj = search_named_object('Tsuchinshan')
+        self.assertEqual((object_type, obj.designation), (SEARCH_NAME_COMET, 'C/2023 A3 (Tsuchinshan-ATLAS)'))
+        object_type, obj = search_named_object('"Vesta"')
+        self.assertEqual((object_type, obj.designation), (SEARCH_NAME_MINOR_PLANET, '(4) Vesta'))
+        self.assertEqual(search_named_object('Hale-Bopp'), (None, None))
+        self.assertEqual(search_named_object('P/'), (None, None))
+
+    def test_index_updates(self):
+        comet = Comet(comet_id='C/1995 O1', designation='C/1995 O1 (Hale-Bopp)')
+        db.session.add(comet)
+        db.session.commit()
+        self.assertIsNone(search_comet('Hale-Bopp'))
+
+        index_object_search_names(SEARCH_NAME_COMET, comet)
+        self.assertEqual(search_comet('Hale-Bopp').id, comet.id)
+
+        # reindexed object is found by new name only
+        comet.designation = 'C/1995 O1 (Hale Bopp 2)'
+        db.session.commit()
+        index_object_search_names(SEARCH_NAME_COMET, comet)
+        self.assertEqual([h.name for h in search_object_names('Hale-Bopp')], ['C/1995 O1 (Hale Bopp 2)'])
+
+        Comet.query.filter(Comet.designation.like('%ATLAS%')).delete(synchronize_session=False)
+        db.session.commit()
+        rebuild_search_names(SEARCH_NAME_COMET)
+        self.assertEqual(search_object_ids(SEARCH_NAME_COMET, 'atlas'), [])
+        self.assertEqual(len(search_object_ids(SEARCH_NAME_DSO, 'nebula')), 3)
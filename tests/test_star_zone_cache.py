@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.commons.star_zone_cache import ZONE_ENTRY_OVERHEAD, StarZoneCache, install_star_zone_cache
+
+_ZONE_DT = np.dtype([('x0', '<i4'), ('vmag', '<i2')])
+
+
+class _FakeReader:
+    def __init__(self, counts, offsets):
+        self._counts = counts
+        self._offsets = offsets
+        self.byteswap = False
+
+    def get_record_count(self, zone):
+        return self._counts[zone]
+
+    def get_offset(self, zone):
+        return self._offsets[zone]
+
+
+class _FakeComponent:
+    def __init__(self, file_name, level, zones):
+        self.file_name = file_name
+        self.level = level
+        self._file_opened = True
+        self._star_blocks = [None] * len(zones)
+        counts, offsets = [], []
+        offset = 16
+        with open(file_name, 'wb') as f:
+            f.write(b'\0' * offset)
+            for zone_stars in zones:
+                f.write(zone_stars.tobytes())
+                counts.append(len(zone_stars))
+                offsets.append(offset)
+                offset += zone_stars.nbytes
+        self._data_reader = _FakeReader(counts, offsets)
+
+    def _get_data_format(self):
+        return _ZONE_DT
+
+    def _convert_zone_stars(self, zone_stars):
+        return np.array(zone_stars['vmag'] / 1000.0)
+
+    def get_zone_stars(self, zone):
+        zone_stars = self._star_blocks[zone]
+        if zone_stars is None:
+            zone_stars = []
+            self._star_blocks[zone] = zone_stars
+        return zone_stars
+
+
+class StarZoneCacheTestCase(unittest.TestCase):
+    def test_lru_eviction_by_bytes(self):
+        zone = np.zeros(100, dtype=np.float64)
+        cache = StarZoneCache(2 * (zone.nbytes + ZONE_ENTRY_OVERHEAD))
+        cache.put((1, 0), zone)
+        cache.put((1, 1), zone.copy())
+        self.assertIs(cache.get((1, 0)), zone)
+        cache.put((1, 2), zone.copy())
+
+        self.assertIsNone(cache.get((1, 1)))
+        self.assertIs(cache.get((1, 0)), zone)
+        stats = cache.stats()
+        self.assertEqual(stats['zones'], 2)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertLessEqual(stats['bytes'], cache.max_bytes)
+
+    def test_installed_cache_reads_zones_from_mapped_file(self):
+        zones = [np.array([(i, 1000 * (i + 1) + j) for j in range(i + 1)], dtype=_ZONE_DT) for i in range(4)]
+        zones.append(np.zeros(0, dtype=_ZONE_DT))
+        fd, file_name = tempfile.mkstemp(suffix='.cat')
+        os.close(fd)
+        self.addCleanup(os.remove, file_name)
+        static_comp = _FakeComponent(file_name, 0, zones)
+        comp = _FakeComponent(file_name, 1, zones)
+        cache = install_star_zone_cache(SimpleNamespace(_cat_components=[static_comp, comp]), 1024 * 1024)
+
+        self.assertIsInstance(static_comp._star_blocks, list)
+        self.assertEqual(len(comp._star_blocks), len(zones))
+        for zone, zone_stars in enumerate(zones):
+            np.testing.assert_allclose(comp.get_zone_stars(zone), zone_stars['vmag'] / 1000.0)
+        self.assertEqual(len(comp.get_zone_stars(4)), 0)
+        stats = cache.stats()
+        self.assertEqual(stats['zones'], len(zones))
+        self.assertEqual(stats['misses'], len(zones))
+        self.assertEqual(stats['hits'], 1)
+
+        comp._star_blocks[2] = None
+        self.assertEqual(cache.stats()['zones'], len(zones) - 1)
+        np.testing.assert_allclose(comp.get_zone_stars(2), zones[2]['vmag'] / 1000.0)
+
+    def test_no_cache_without_loadable_levels(self):
+        self.assertIsNone(install_star_zone_cache(SimpleNamespace(), 1024))
+
+    def test_stock_reader_kept_with_unsupported_catalogue(self):
+        zones = [np.zeros(1, dtype=_ZONE_DT) for _ in range(3)]
+        fd, file_name = tempfile.mkstemp(suffix='.cat')
+        os.close(fd)
+        self.addCleanup(os.remove, file_name)
+        comp = _FakeComponent(file_name, 1, zones)
+        old_comp = _FakeComponent(file_name, 2, zones)
+        del old_comp._data_reader
+        with self.assertLogs('app.commons.star_zone_cache', level='WARNING'):
+            cache = install_star_zone_cache(SimpleNamespace(_cat_components=[comp, old_comp]), 1024)
+
+        self.assertIsNone(cache)
+        self.assertIsInstance(comp._star_blocks, list)
+        self.assertIsInstance(old_comp._star_blocks, list)
@@ -0,0 +1,85 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+from app import create_app
+from app.commons.chart_scene import (
+    STARS_BIN_MIMETYPE,
+    build_stars_zones_bin_v1,
+    decode_stars_zones_bin,
+    encode_star_zone_bin,
+)
+
+
+def _star_selection(ra, dec, mag, bvind, hip):
+    sel = np.zeros(len(ra), dtype=[('x', 'f8'), ('y', 'f8'), ('z', 'f8'), ('mag', 'f4'), ('bvind', 'i2'), ('hip', 'i4')])
+    sel['x'] = np.cos(dec) * np.cos(ra)
+    sel['y'] = np.cos(dec) * np.sin(ra)
+    sel['z'] = np.sin(dec)
+    sel['mag'] = mag
+    sel['bvind'] = bvind
+    sel['hip'] = hip
+    return sel
+
+
+class _FakeStarCatalog:
+    def __init__(self, zones):
+        self.zones = zones
+
+    def select_zone_stars(self, level, zone, mag_limit):
+        return self.zones.get((level, zone))
+
+
+class StarsZonesBinTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('testing')
+        self.sel = _star_selection(np.array([0.1, 3.0, 6.2]), np.array([0.5, -1.2, 0.0]),
+                                   np.array([1.25, 7.5, 11.0]), np.array([3, -1, 120]), np.array([32349, 0, 7]))
+        self.bsc_hip_map = {32349: SimpleNamespace(name='Sirius')}
+
+    def test_encoded_zones_round_trip(self):
+        with patch('app.commons.chart_scene.resolve_star_label_metadata',
+                   side_effect=lambda star: {'full_text': star.name} if star else None):
+            data = b''.join((b'CZS1', (3).to_bytes(4, 'little'),
+                             encode_star_zone_bin(2, 17, self.sel, self.bsc_hip_map),
+                             encode_star_zone_bin(2, 18, self.sel[:0]),
+                             encode_star_zone_bin(2, 19, None)))
+        self.assertEqual(len(data) % 4, 0)
+
+        zones = decode_stars_zones_bin(data)
+        self.assertEqual([(z['level'], z['zone'], z['missing']) for z in zones], [(2, 17, False), (2, 18, False), (2, 19, True)])
+        np.testing.assert_allclose(zones[0]['ra'], [0.1, 3.0, 6.2], atol=1e-6)
+        np.testing.assert_allclose(zones[0]['dec'], [0.5, -1.2, 0.0], atol=1e-6)
+        np.testing.assert_allclose(zones[0]['mag'], [1.25, 7.5, 11.0])
+        np.testing.assert_array_equal(zones[0]['bv'], [3, -1, 120])
+        self.assertEqual(zones[0]['labels'], {'i': [0], 't': ['Sirius']})
+        self.assertEqual(len(zones[1]['ra']), 0)
+
+    def test_response_has_etag_and_honors_if_none_match(self):
+        used_catalogs = SimpleNamespace(star_catalog=_FakeStarCatalog({(1, 5): self.sel}), bsc_hip_map={})
+        with patch('app.commons.chart_scene.load_used_catalogs', return_value=used_catalogs), \
+             patch('app.commons.chart_scene.get_loaded_catalogs_version', return_value='v1'), \
+             patch('app.commons.chart_scene.is_used_catalogs_outdated', return_value=False):
+            with self.app.test_request_context('/chart/stars-v1/zones.bin?zones=L1Z5'):
+                response = build_stars_zones_bin_v1()
+                data = b''.join(response.response)
+            etag, _ = response.get_etag()
+            self.assertEqual(response.mimetype, STARS_BIN_MIMETYPE)
+            self.assertIn('immutable', response.headers['Cache-Control'])
+            self.assertEqual(len(decode_stars_zones_bin(data)[0]['ra']), 3)
+
+            with self.app.test_request_context('/chart/stars-v1/zones.bin?zones=L1Z5',
+                                               headers={'If-None-Match': '"{}"'.format(etag)}):
+                response = build_stars_zones_bin_v1()
+            self.assertEqual(response.status_code, 304)
+
+    def test_response_of_outdated_catalogs_is_not_immutable(self):
+        used_catalogs = SimpleNamespace(star_catalog=_FakeStarCatalog({(1, 5): self.sel}), bsc_hip_map={})
+        with patch('app.commons.chart_scene.load_used_catalogs', return_value=used_catalogs), \
+             patch('app.commons.chart_scene.get_loaded_catalogs_version', return_value='v1'), \
+             patch('app.commons.chart_scene.is_used_catalogs_outdated', return_value=True):
+            with self.app.test_request_context('/chart/stars-v1/zones.bin?zones=L1Z5'):
+                response = build_stars_zones_bin_v1()
+        self.assertEqual(response.headers['Cache-Control'], 'public, no-cache')
@@ -0,0 +1,148 @@
+import unittest
+
+from redis import Redis
+from redis.exceptions import ConnectionError
+
+from app import create_app, db
+from app.commons.user_membership_cache import (
+    LocalMembershipStore,
+    MEMBERSHIP_DOUBLE_STAR,
+    MEMBERSHIP_DSO,
+    MEMBERSHIP_OBSERVED,
+    MEMBERSHIP_WISHLIST,
+    RedisMembershipStore,
+    clear_membership_store,
+    get_observed_ids,
+    get_wished_ids,
+    invalidate_user_membership,
+    pack_member_ids,
+    unpack_member_ids,
+)
+from app.models import DeepskyObject, DoubleStar, ObservedList, WishList
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError('down')
+
+    def mget(self, *keys):
+        self._check()
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self._check()
+        self.values[key] = value
+
+    def incr(self, key):
+        self._check()
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def pipeline(self, transaction=True):
+        redis_conn = self
+
+        class Pipeline:
+            def __init__(self):
+                self.keys = []
+
+            def incr(self, key):
+                self.keys.append(key)
+
+            def execute(self):
+                return [redis_conn.incr(key) for key in self.keys]
+        return Pipeline()
+
+
+class UserMembershipCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        clear_membership_store()
+        self.m42 = DeepskyObject(name='M42')
+        self.ngc1976 = DeepskyObject(name='NGC1976')
+        self.m31 = DeepskyObject(name='M31')
+        self.double_star = DoubleStar(wds_number='07346+3153', common_cat_id='STF 1110', components='AB')
+        db.session.add_all([self.m42, self.ngc1976, self.m31, self.double_star])
+        db.session.commit()
+        self.ngc1976.master_id = self.m42.id
+        self.observed_list = ObservedList.create_get_observed_list_by_user_id(1)
+        self.wish_list = WishList.create_get_wishlist_by_user_id(1)
+        db.session.add(self.observed_list.create_new_deepsky_object_item(self.m42.id))
+        db.session.add(self.observed_list.create_new_double_star_item(self.double_star.id))
+        db.session.add(self.wish_list.create_new_deepsky_object_item(self.m31.id))
+        db.session.commit()
+
+    def tearDown(self):
+        clear_membership_store()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_member_ids(self):
+        self.assertEqual(get_observed_ids(1), {self.m42.id, self.ngc1976.id})
+        self.assertEqual(get_observed_ids(1, MEMBERSHIP_DOUBLE_STAR), {self.double_star.id})
+        self.assertEqual(get_wished_ids(1), {self.m31.id})
+        self.assertEqual(get_wished_ids(1, MEMBERSHIP_DOUBLE_STAR), set())
+        self.assertEqual(get_observed_ids(2), set())
+
+    def test_invalidation(self):
+        self.assertNotIn(self.m31.id, get_observed_ids(1))
+        db.session.add(self.observed_list.create_new_deepsky_object_item(self.m31.id))
+        db.session.commit()
+        self.assertNotIn(self.m31.id, get_observed_ids(1))
+
+        invalidate_user_membership(MEMBERSHIP_WISHLIST, 1)
+        self.assertNotIn(self.m31.id, get_observed_ids(1))
+        invalidate_user_membership(MEMBERSHIP_OBSERVED, 1)
+        self.assertIn(self.m31.id, get_observed_ids(1))
+
+    def test_stale_put_is_ignored(self):
+        store = LocalMembershipStore(16, 60.0)
+        generation, ids = store.get(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO)
+        self.assertIsNone(ids)
+        store.invalidate(MEMBERSHIP_OBSERVED, 1)
+        store.put(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO, generation, frozenset([1]))
+        self.assertEqual(store.get(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO), (generation + 1, None))
+
+        store.put(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO, generation + 1, frozenset([1]))
+        self.assertEqual(store.get(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO), (generation + 1, frozenset([1])))
+
+        expired_store = LocalMembershipStore(16, -1.0)
+        expired_store.put(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO, 0, frozenset([1]))
+        self.assertEqual(expired_store.get(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO), (0, None))
+
+    def test_pack(self):
+        ids = frozenset([7, 3, 123456, 0])
+        self.assertEqual(unpack_member_ids(pack_member_ids(5, ids)), (5, ids))
+        self.assertEqual(unpack_member_ids(pack_member_ids(0, [])), (0, frozenset()))
+
+    def test_redis_fallback(self):
+        fallback = LocalMembershipStore(16, 60.0)
+        store = RedisMembershipStore(Redis(host='127.0.0.1', port=1, socket_connect_timeout=0.1), fallback)
+        store.put(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO, 0, frozenset([1]))
+        self.assertEqual(store.get(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO), (0, frozenset([1])))
+        store.invalidate(MEMBERSHIP_OBSERVED, 1)
+        self.assertEqual(store.get(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO), (1, None))
+
+    def test_redis_invalidation_replayed_after_outage(self):
+        redis_conn = FakeRedis()
+        store = RedisMembershipStore(redis_conn, LocalMembershipStore(16, 60.0))
+        other_worker = RedisMembershipStore(redis_conn, LocalMembershipStore(16, 60.0))
+        store.put(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO, 0, frozenset([1]))
+        self.assertEqual(other_worker.get(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO), (0, frozenset([1])))
+
+        redis_conn.down = True
+        store.invalidate(MEMBERSHIP_OBSERVED, 1)
+        self.assertEqual(store.get(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO), (1, None))
+
+        redis_conn.down = False
+        store._retry_at = 0.0
+        self.assertEqual(store.get(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO), (1, None))
+        self.assertEqual(other_worker.get(MEMBERSHIP_OBSERVED, 1, MEMBERSHIP_DSO), (1, None))
@@ -0,0 +1,69 @@
+import unittest
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+from app.commons.visibility_utils import create_visibility_chart, get_night_context, get_rise_transit_set_utc
+
+SVG_NS = '{http://www.w3.org/2000/svg}'
+
+
+def _chart(**kwargs):
+    params = dict(location_name='Praha', latitude=50.08, longitude=14.42, elevation=0, date_str='2026-03-10',
+                  ra='0.1864', dec='0.7202', object_label='M31', theme='light', return_svg_string=True,
+                  num_points=40, scale=1.2)
+    params.update(kwargs)
+    return create_visibility_chart(**params)
+
+
+class VisibilityUtilsTestCase(unittest.TestCase):
+    def test_svg_is_well_formed_and_escapes_labels(self):
+        svg = _chart(location_name='<Home & Garden>', theme='dark')
+        root = ET.fromstring(svg)
+
+        self.assertEqual(root.tag, SVG_NS + 'svg')
+        texts = [el.text for el in root.iter(SVG_NS + 'text')]
+        self.assertIn('M31 — <Home & Garden> — 2026-03-10', texts)
+        self.assertEqual(len(root.findall(SVG_NS + 'polyline')), 1)
+
+    def test_identical_requests_are_cached(self):
+        self.assertIs(_chart(), _chart())
+        self.assertIsNot(_chart(), _chart(theme='night'))
+
+    def test_night_context_is_shared_and_bands_cover_night(self):
+        night = get_night_context(50.08, 14.42, '2026-03-10', 40)
+        self.assertIs(night, get_night_context(50.08, 14.42, '2026-03-10', 40))
+
+        bands = night.twilight_bands
+        self.assertEqual(bands[0][0], 0)
+        self.assertEqual(bands[-1][1], len(night.jd) - 1)
+        for prev, cur in zip(bands, bands[1:]):
+            self.assertEqual(prev[1], cur[0])
+            self.assertNotEqual(prev[2], cur[2])
+        self.assertEqual(bands[0][2], 'day')
+        self.assertIn('night', [band[2] for band in bands])
+
+    def test_unknown_theme_is_rejected(self):
+        with self.assertRaises(ValueError):
+            _chart(theme='unknown')
+
+    def test_rise_transit_set_around_midnight(self):
+        result = get_rise_transit_set_utc('Praha', 50.08, 14.42, 0, '2026-03-10', 3.0, 0.2, return_datetimes=True)
+
+        self.assertEqual(result['status'], 'ok')
+        self.assertLess(result['rise_utc'], result['transit_utc'])
+        self.assertLess(result['transit_utc'], result['set_utc'])
+        # transit is in the middle of the arc above horizon
+        half_arc1 = (result['transit_utc'] - result['rise_utc']).total_seconds()
+        half_arc2 = (result['set_utc'] - result['transit_utc']).total_seconds()
+        self.assertAlmostEqual(half_arc1, half_arc2, delta=5)
+        self.assertAlmostEqual(result['transit_utc'].timestamp(), datetime(2026, 3, 10, 23, 16, 39).timestamp(), delta=60)
+
+    def test_rise_transit_set_status(self):
+        circumpolar = get_rise_transit_set_utc('Praha', 50.08, 14.42, 0, '2026-03-10', 1.0, 1.45)
+        never_rises = get_rise_transit_set_utc('Praha', 50.08, 14.42, 0, '2026-03-10', 5.0, -1.2)
+
+        self.assertEqual(circumpolar['status'], 'circumpolar')
+        self.assertIsNone(circumpolar['rise_utc'])
+        self.assertTrue(circumpolar['transit_utc'].startswith('2026-03-10 15:4'))
+        self.assertEqual(never_rises['status'], 'never_rises')
+        self.assertIsNone(never_rises['transit_utc'])
@@ -0,0 +1,82 @@
+#!/usr/bin/python
+"""
+Benchmark of OAL import parsing: generated openastronomylog parse() vs. streaming read_oal_observations().
+Synthetic document of deep sky observations, peak memory is Python heap measured by tracemalloc
+(libxml2 buffers are not included).
+
+    PYTHONPATH=. python tools/bench_oal_reader.py [observations]
+"""
+import io
+import sys
+import timeit
+import tracemalloc
+
+from app.commons.oal_reader import read_oal_observations
+from app.commons.openastronomylog import parse
+
+OAL_HEADER = '''<?xml version="1.0" encoding="utf-8"?>
+<oal:observations xmlns:oal="http://groups.google.com/group/openastronomylog" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" version="2.1">
+  <observers><observer id="usr_1"><name>Jan</name><surname>Novak</surname></observer></observers>
+  <sites><site id="site_1"><name>Ondrejov</name><longitude unit="deg">14.78</longitude><latitude unit="deg">49.91</latitude><timezone>60</timezone></site></sites>
+  <sessions>
+{sessions}  </sessions>
+  <targets>
+{targets}  </targets>
+  <scopes><scope id="opt_1" xsi:type="oal:scopeType"><model>Dobson</model><type>N</type><aperture>300</aperture><focalLength>1500</focalLength></scope></scopes>
+  <eyepieces><eyepiece id="ep_1"><model>Nagler</model><focalLength>13</focalLength><apparentFOV unit="deg">82</apparentFOV></eyepiece></eyepieces>
+'''
+
+OAL_SESSION = '    <session id="se_{i}" lang="en"><begin>2020-01-{day:02d}T20:00:00+01:00</begin><end>2020-01-{day:02d}T23:00:00+01:00</end><site>site_1</site><weather>clear</weather></session>\n'
+
+OAL_TARGET = '    <target id="_NGC{i}" xsi:type="oal:deepSkyGX"><datasource>CzSky</datasource><name>NGC{i}</name><constellation>UMA</constellation></target>\n'
+
+OAL_OBSERVATION = '''  <observation id="obs_{i}"><observer>usr_1</observer><site>site_1</site><session>se_{session}</session><target>_NGC{target}</target><begin>2020-01-{day:02d}T21:{minute:02d}:00</begin><faintestStar>6.5</faintestStar><sky-quality unit="mags-per-squarearcsec">21.2</sky-quality><seeing>2</seeing><scope>opt_1</scope><eyepiece>ep_1</eyepiece><result xsi:type="oal:findingsDeepSkyType" lang="en"><description>Faint elongated glow with brighter core, {i}</description><rating>3</rating></result></observation>
+'''
+
+
+def oal_document(observations):
+    sessions = max(1, observations // 50)
+    targets = max(1, observations // 2)
+    header = OAL_HEADER.format(
+        sessions=''.join(OAL_SESSION.format(i=i, day=i % 28 + 1) for i in range(sessions)),
+        targets=''.join(OAL_TARGET.format(i=i + 1) for i in range(targets)))
+    body = ''.join(OAL_OBSERVATION.format(i=i, session=i % sessions, target=i % targets + 1, day=i % sessions % 28 + 1,
+                                          minute=i % 60)
+                   for i in range(observations))
+    return (header + body + '</oal:observations>\n').encode('utf-8')
+
+
+def peak_memory(fn, data):
+    tracemalloc.start()
+    result = fn(io.BytesIO(data))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    data = oal_document(n)
+
+    def generateds():
+        return parse(io.BytesIO(data), silence=True)
+
+    def streaming():
+        return read_oal_observations(io.BytesIO(data))
+
+    assert len(streaming().observations) == len(generateds().get_observation()) == n
+
+    repeat = 3
+    t_generateds = min(timeit.repeat(generateds, number=1, repeat=repeat))
+    t_streaming = min(timeit.repeat(streaming, number=1, repeat=repeat))
+    m_generateds = peak_memory(lambda f: parse(f, silence=True), data)
+    m_streaming = peak_memory(read_oal_observations, data)
+    print('observations={} size={:.1f} MB'.format(n, len(data) / 1024.0 / 1024.0))
+    print('generateDS parse: {:8.1f} ms  peak {:8.1f} MB'.format(t_generateds * 1000.0, m_generateds / 1024.0 / 1024.0))
+    print('streaming reader: {:8.1f} ms  peak {:8.1f} MB'.format(t_streaming * 1000.0, m_streaming / 1024.0 / 1024.0))
+    print('speedup:          {:8.1f}x       {:8.1f}x'.format(t_generateds / t_streaming, m_generateds / m_streaming))
+
+
+if __name__ == '__main__':
+    main()
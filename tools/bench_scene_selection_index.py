@@ -0,0 +1,62 @@
+#!/usr/bin/python
+"""
+Micro-benchmark of scene selection index: per-object scalar projection vs. _build_selection_index.
+Dense field around Virgo cluster, 2 deg FoV, object count of DSO maglim 16.
+
+    PYTHONPATH=. python tools/bench_scene_selection_index.py [objects]
+"""
+import math
+import sys
+import timeit
+
+import numpy as np
+
+from app.commons.chart_scene import _bbox_from_point, _build_selection_index, _stereographic_project_px
+
+WIDTH, HEIGHT = 1920, 1080
+FOV_DEG = 2.0
+CENTER_RA = math.radians(186.75)
+CENTER_DEC = math.radians(12.72)
+
+
+def scalar_selection_index(ids, ras, decs, radii):
+    selection_index, img_map = [], []
+    for obj_id, ra, dec, radius_px in zip(ids, ras, decs, radii):
+        pxy = _stereographic_project_px(ra, dec, CENTER_RA, CENTER_DEC, WIDTH, HEIGHT, FOV_DEG, False, False)
+        if pxy is None:
+            continue
+        bbox = _bbox_from_point(pxy[0], pxy[1], radius_px, WIDTH, HEIGHT)
+        if bbox is None:
+            continue
+        x1, y1, x2, y2 = bbox
+        selection_index.append({"id": obj_id, "bbox": [x1, y1, x2, y2]})
+        img_map.extend([obj_id, x1, y1, x2, y2])
+    return selection_index, img_map
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    rng = np.random.default_rng(1)
+    field_radius = math.radians(FOV_DEG) * 0.75
+    ras = [float(v) for v in CENTER_RA + rng.uniform(-field_radius, field_radius, n) / math.cos(CENTER_DEC)]
+    decs = [float(v) for v in CENTER_DEC + rng.uniform(-field_radius, field_radius, n)]
+    ids = ['PGC{}'.format(i) for i in range(n)]
+    radii = [8.0] * n
+
+    def vectorized():
+        return _build_selection_index(ids, np.array(ras), np.array(decs), np.array(radii), CENTER_RA, CENTER_DEC,
+                                      WIDTH, HEIGHT, FOV_DEG, False, False)
+
+    assert vectorized() == scalar_selection_index(ids, ras, decs, radii)
+
+    repeat = 20
+    t_scalar = min(timeit.repeat(lambda: scalar_selection_index(ids, ras, decs, radii), number=1, repeat=repeat))
+    t_vector = min(timeit.repeat(vectorized, number=1, repeat=repeat))
+    print('objects={} selectable={}'.format(n, len(vectorized()[0])))
+    print('scalar:     {:8.3f} ms'.format(t_scalar * 1000.0))
+    print('vectorized: {:8.3f} ms'.format(t_vector * 1000.0))
+    print('speedup:    {:8.1f}x'.format(t_scalar / t_vector))
+
+
+if __name__ == '__main__':
+    main()